@@ -0,0 +1,320 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Headless benchmarks for the scan engine, analyzer, history and treemap layout.
+#
+#   python benchmarks/run_benchmarks.py                       # default profile, compare to baseline
+#   python benchmarks/run_benchmarks.py --profile deep --repeat 5
+#   python benchmarks/run_benchmarks.py --save-baseline       # store the results as the new baseline
+#
+# Every benchmark runs in a fresh process so peak RSS is measured per benchmark.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_fs import TreeSpec, generate_tree
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PROFILES = {
+    "small": TreeSpec(width=4, depth=4, files_per_dir=20),
+    "wide": TreeSpec(width=40, depth=2, files_per_dir=30),
+    "deep": TreeSpec(width=2, depth=8, files_per_dir=5, deep_chain=250),
+    "dups": TreeSpec(width=4, depth=4, files_per_dir=25, size_distribution="fixed",
+                     mean_file_size=64 * 1024, duplicate_ratio=0.5),
+    "large": TreeSpec(width=6, depth=5, files_per_dir=20),
+}
+
+# Metric used to compare against the baseline, and whether higher is better
+PRIMARY_METRICS = {
+    "scan": ("files_per_sec", True),
+    "scan_process": ("files_per_sec", True),
+    "suggestions": ("files_per_sec", True),
+    "duplicates": ("bytes_hashed_per_sec", True),
+    "history": ("seconds", False),
+    "treemap_layout": ("seconds", False),
+    "name_index": ("names_per_sec", True),
+}
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return 0.0 # Not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _count(root):
+    files = dirs = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.is_dir:
+            dirs += 1
+            stack.extend(node.children)
+        else:
+            files += 1
+    return files, dirs
+
+
+def bench_scan(tree_dir):
+    from src.scan_engine import Scanner
+    start = time.perf_counter()
+    root = Scanner(tree_dir).scan()
+    seconds = time.perf_counter() - start
+    files, dirs = _count(root)
+    return {"seconds": seconds, "files": files, "dirs": dirs,
+            "files_per_sec": files / seconds, "dirs_per_sec": dirs / seconds}
+
+
+def bench_scan_process(tree_dir):
+    from src.process_scan import ProcessScanner
+    from src.metrics import JobMetrics
+    metrics = JobMetrics("scan_process")
+    start = time.perf_counter()
+    root = ProcessScanner(tree_dir, backend="process", metrics=metrics).scan()
+    seconds = time.perf_counter() - start
+    files, dirs = _count(root)
+    # Split and stitch run in this process, so they bound the speedup more workers can give
+    return {"seconds": seconds, "files": files, "dirs": dirs, "workers": os.cpu_count() or 1,
+            "files_per_sec": files / seconds, "dirs_per_sec": dirs / seconds,
+            "split_seconds": metrics.timers.get("split", 0.0), "stitch_seconds": metrics.timers.get("stitch", 0.0)}
+
+
+def bench_suggestions(tree_dir):
+    from src.scan_engine import Scanner
+    from src.analyzer import Analyzer
+    root = Scanner(tree_dir).scan()
+    files, _ = _count(root)
+    start = time.perf_counter()
+    suggestions = Analyzer().get_cleanup_suggestions(root)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "files_per_sec": files / seconds,
+            "suggested": sum(len(v) for v in suggestions.values())}
+
+
+def bench_duplicates(tree_dir):
+    from src.scan_engine import Scanner
+    from src.analyzer import Analyzer
+    root = Scanner(tree_dir).scan()
+
+    # Bytes the duplicate finder will read: the first 1 KB of every file sharing its size
+    by_size = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.is_dir:
+            stack.extend(node.children)
+        elif node.size > 0:
+            by_size[node.size] = by_size.get(node.size, 0) + 1
+    hashed = sum(min(size, 1024) * count for size, count in by_size.items() if count > 1)
+
+    start = time.perf_counter()
+    groups = Analyzer().find_duplicates(root)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "groups": len(groups), "bytes_hashed": hashed,
+            "bytes_hashed_per_sec": hashed / seconds}
+
+
+def bench_history(tree_dir, scans: int = 50):
+    from src.scan_engine import Scanner
+    from src.history_manager import HistoryManager
+    from src.tree_diff import to_snapshot, diff_trees
+    root = Scanner(tree_dir).scan()
+
+    # HistoryManager keeps its files under the working directory
+    work = tempfile.mkdtemp(prefix="sb-history-")
+    cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        start = time.perf_counter()
+        history = HistoryManager()
+        for _ in range(scans):
+            history.save_scan(root.path, root)
+        save_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        history.save_snapshot(root.path, to_snapshot(root))
+        snapshot = history.load_snapshot(history.list_snapshots(root.path)[-1][1])
+        diff_trees(snapshot, root)
+        snapshot_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reloaded = HistoryManager()
+        reloaded.get_trend(root.path)
+        load_seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    return {"seconds": save_seconds + snapshot_seconds + load_seconds,
+            "save_scan_per_sec": scans / save_seconds, "snapshot_roundtrip_seconds": snapshot_seconds,
+            "load_seconds": load_seconds}
+
+
+def bench_treemap_layout(tree_dir, width: float = 1600, height: float = 1000):
+    from src.scan_engine import Scanner
+    from src.treemap_layout import LayoutCache
+    root = Scanner(tree_dir).scan()
+    cache = LayoutCache()
+    start = time.perf_counter()
+    rects = cache.compute(root, width, height, max_depth=8, min_area=36.0)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    cache.lookup(root, width * 1.1, height, max_depth=8, min_area=36.0)
+    rescale = time.perf_counter() - start
+    return {"seconds": cold, "rects": len(rects), "rescale_seconds": rescale}
+
+
+def bench_name_index(tree_dir):
+    from src.scan_engine import Scanner
+    from src.search_index import NameIndex
+    root = Scanner(tree_dir).scan()
+    files, dirs = _count(root)
+    start = time.perf_counter()
+    index = NameIndex(root)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for query in ("file", "file_0001", ".log", "dir_2", "nested"):
+        index.search(query)
+    return {"seconds": seconds, "names_per_sec": (files + dirs) / seconds,
+            "index_mb": index.memory_bytes() / (1024 * 1024),
+            "search_ms": (time.perf_counter() - start) * 1000 / 5}
+
+
+BENCHMARKS = {
+    "scan": bench_scan,
+    "scan_process": bench_scan_process,
+    "suggestions": bench_suggestions,
+    "duplicates": bench_duplicates,
+    "history": bench_history,
+    "treemap_layout": bench_treemap_layout,
+    "name_index": bench_name_index,
+}
+
+
+def _run_in_child(name, tree_dir, queue):
+    result = BENCHMARKS[name](tree_dir)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    queue.put(result)
+
+
+def run_benchmark(name: str, tree_dir: str, repeat: int) -> dict:
+    """
+    Runs one benchmark `repeat` times, each in a fresh process, and keeps the fastest run.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    best = None
+    for _ in range(repeat):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_in_child, args=(name, tree_dir, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns (benchmark, metric, baseline value, current value, change, regressed) rows.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        metric, higher_is_better = PRIMARY_METRICS[name]
+        old, new = baseline[name].get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = change < -threshold if higher_is_better else change > threshold
+        rows.append((name, metric, old, new, change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Storage Bot benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is kept")
+    parser.add_argument("--seed", type=int, help="Override the profile's seed")
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--depth", type=int)
+    parser.add_argument("--files-per-dir", type=int)
+    parser.add_argument("--duplicate-ratio", type=float)
+    parser.add_argument("--deep-chain", type=int)
+    parser.add_argument("--size-distribution", choices=["lognormal", "uniform", "fixed"])
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    spec = TreeSpec(**PROFILES[args.profile].to_dict())
+    for field in ("seed", "width", "depth", "files_per_dir", "duplicate_ratio", "deep_chain", "size_distribution"):
+        if getattr(args, field) is not None:
+            setattr(spec, field, getattr(args, field))
+
+    tree_dir = tempfile.mkdtemp(prefix="sb-bench-")
+    try:
+        start = time.perf_counter()
+        stats = generate_tree(tree_dir, spec)
+        print(f"Generated {stats['files']} files in {stats['dirs']} folders "
+              f"({stats['bytes'] / 1024 ** 3:.2f} GB apparent, {stats['duplicates']} duplicates) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        results = {}
+        for name in args.only or BENCHMARKS:
+            results[name] = run_benchmark(name, tree_dir, args.repeat)
+            metric = PRIMARY_METRICS[name][0]
+            rate = f"{metric} = {results[name][metric]:,.0f}" if metric != "seconds" else ""
+            print(f"  {name:<15} {results[name]['seconds'] * 1000:9.1f} ms   "
+                  f"peak RSS {results[name]['peak_rss_mb']:4.0f} MB   {rate}")
+    finally:
+        shutil.rmtree(tree_dir, ignore_errors=True)
+
+    report = {"profile": args.profile, "spec": spec.to_dict(), "python": sys.version.split()[0],
+              "timestamp": time.time(), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    # Baselines are stored per profile, since the numbers only compare on the same tree
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    previous = baselines.get(args.profile)
+    regressions = 0
+    if previous and previous.get("spec") == spec.to_dict():
+        print(f"\nCompared to baseline from {time.strftime('%Y-%m-%d %H:%M', time.localtime(previous['timestamp']))}:")
+        for name, metric, old, new, change, regressed in compare(results, previous["results"], args.threshold):
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {name:<15} {metric:<22} {old:>14,.3f} -> {new:>14,.3f}  ({change:+.1%}){flag}")
+            regressions += regressed
+    elif previous:
+        print("\nBaseline was recorded with different tree parameters; not comparing.")
+    else:
+        print(f"\nNo baseline for profile '{args.profile}' yet (run with --save-baseline).")
+
+    if args.save_baseline:
+        baselines[args.profile] = report
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
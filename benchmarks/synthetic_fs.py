@@ -0,0 +1,107 @@
+import math
+import os
+import random
+from dataclasses import dataclass, asdict
+
+# Deterministic synthetic directory trees for the benchmarks. The same spec and
+# seed always produce the same names, sizes, contents and mtimes.
+
+# Extensions cycle through every scanner category so analysis has work to do
+EXTENSIONS = [".log", ".tmp", ".mp4", ".jpg", ".py", ".json", ".zip", ".exe", ".txt", ".dat", ".md", ".cache"]
+HEADER_SIZE = 1024     # The duplicate finder hashes the first 1 KB, so only that much is ever written
+BASE_MTIME = 1577836800.0  # 2020-01-01, old enough for every "abandoned" rule to fire
+
+@dataclass
+class TreeSpec:
+    width: int = 4                # Subfolders per folder
+    depth: int = 4                # Levels of subfolders below the root
+    files_per_dir: int = 20
+    size_distribution: str = "lognormal"  # lognormal, uniform or fixed
+    mean_file_size: int = 256 * 1024
+    max_file_size: int = 64 * 1024 * 1024
+    duplicate_ratio: float = 0.1  # Fraction of files that copy an earlier file
+    deep_chain: int = 0           # Extra chain of nested folders (one file each) to stress deep paths
+    seed: int = 42
+
+    def expected_dirs(self) -> int:
+        return sum(self.width ** level for level in range(self.depth + 1)) + self.deep_chain
+
+    def expected_files(self) -> int:
+        return self.expected_dirs() * self.files_per_dir - self.deep_chain * (self.files_per_dir - 1)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _file_size(rng: random.Random, spec: TreeSpec) -> int:
+    if spec.size_distribution == "fixed":
+        size = spec.mean_file_size
+    elif spec.size_distribution == "uniform":
+        size = rng.randint(0, 2 * spec.mean_file_size)
+    elif spec.size_distribution == "lognormal":
+        # Heavy tail like real disks: most files small, a few very large
+        sigma = 1.5
+        size = int(rng.lognormvariate(math.log(max(1, spec.mean_file_size)) - sigma * sigma / 2, sigma))
+    else:
+        raise ValueError(f"Unknown size distribution: {spec.size_distribution}")
+    return max(0, min(size, spec.max_file_size))
+
+
+def _write_file(path: str, header: bytes, size: int, mtime: float):
+    # Sparse files: only the hashed header is real data, so big trees stay cheap on disk
+    with open(path, "wb") as f:
+        f.write(header[:size])
+        if size > len(header):
+            f.truncate(size)
+    os.utime(path, (mtime, mtime))
+
+
+def generate_tree(root: str, spec: TreeSpec) -> dict:
+    """
+    Creates the tree described by `spec` under `root` (which must exist).
+    Returns counts of what was written.
+    """
+    rng = random.Random(spec.seed)
+    stats = {"dirs": 0, "files": 0, "bytes": 0, "duplicates": 0}
+    originals = [] # (size, header) of files that later files may duplicate
+
+    def make_files(folder: str, count: int):
+        for i in range(count):
+            if originals and rng.random() < spec.duplicate_ratio:
+                size, header = originals[rng.randrange(len(originals))]
+                ext = ".dat"
+                stats["duplicates"] += 1
+            else:
+                size = _file_size(rng, spec)
+                header = rng.getrandbits(HEADER_SIZE * 8).to_bytes(HEADER_SIZE, "little")
+                ext = EXTENSIONS[i % len(EXTENSIONS)]
+                if size > 0 and len(originals) < 100000:
+                    originals.append((size, header))
+            mtime = BASE_MTIME + rng.randrange(4 * 365 * 86400)
+            _write_file(os.path.join(folder, f"file_{i:05d}{ext}"), header, size, mtime)
+            stats["files"] += 1
+            stats["bytes"] += size
+
+    # Breadth-first so the generator itself never recurses
+    level = [root]
+    for depth in range(spec.depth + 1):
+        next_level = []
+        for folder in level:
+            stats["dirs"] += 1
+            make_files(folder, spec.files_per_dir)
+            if depth < spec.depth:
+                for w in range(spec.width):
+                    name = "Downloads" if depth == 0 and w == 0 else f"dir_{depth}_{w:03d}"
+                    child = os.path.join(folder, name)
+                    os.mkdir(child)
+                    next_level.append(child)
+        level = next_level
+
+    folder = root
+    for d in range(spec.deep_chain):
+        folder = os.path.join(folder, f"nested_{d:04d}")
+        os.mkdir(folder)
+        stats["dirs"] += 1
+        make_files(folder, 1)
+
+    return stats
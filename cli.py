@@ -0,0 +1,401 @@
+import argparse
+import heapq
+import json
+import os
+import sys
+
+# Headless entry point (storage-bot). Only the Qt-free engine is imported, and
+# analysis/history modules are loaded on demand, so startup stays in milliseconds.
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if abs(size) < 1024:
+            return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} PB"
+
+
+def node_summary(node):
+    return {"path": node.path, "size": node.size, "is_dir": node.is_dir,
+            "category": node.category, "modified": node.modified}
+
+
+def iter_files(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.is_dir:
+            stack.extend(node.peek_children()) # Spilled folders stay on disk
+        else:
+            yield node
+
+
+def throttle_config(args):
+    # Throttle options given on the command line replace $STORAGE_BOT_THROTTLE_*
+    from src.scan_engine import parse_size
+    from src.throttle import ThrottleConfig
+    if not (args.throttle or args.max_ops or args.max_read_rate or args.idle_io):
+        return ThrottleConfig.from_env()
+    return ThrottleConfig(max_ops=args.max_ops or 0, max_read_bytes=parse_size(args.max_read_rate or "0"),
+                          idle_io=args.idle_io)
+
+
+def cmd_scan(args):
+    from src.scan_engine import MultiScanner, ScanBudget, parse_size, is_aggregate
+    from src.process_scan import make_scanner
+    from src.throttle import Throttle
+    from src.metrics import recorder
+
+    options = {}
+    if args.memory_budget or args.small_files or args.max_files_per_dir or args.spill_threshold:
+        options["budget"] = ScanBudget(small_file_size=parse_size(args.small_files or "0"),
+                                       max_files_per_dir=args.max_files_per_dir or 0,
+                                       max_memory=parse_size(args.memory_budget or "0"),
+                                       spill_threshold=parse_size(args.spill_threshold or "0"))
+    throttle = throttle_config(args)
+    if throttle is not None:
+        options["throttle"] = Throttle(throttle)
+
+    totals = {}
+    def on_categories(deltas):
+        for cat, size in deltas.items():
+            totals[cat] = totals.get(cat, 0) + size
+
+    if len(args.paths) > 1:
+        # Several volumes: scanned in parallel, limited per backing disk, into one tree
+        scanner = MultiScanner(args.paths, on_categories=on_categories, category_interval=3600,
+                               budget=options.get("budget", ScanBudget.from_env()), throttle=options.get("throttle"))
+        scan_path = MultiScanner.combined_path(scanner.roots)
+    else:
+        scan_path = args.paths[0]
+        scanner = make_scanner(scan_path, backend=args.backend, workers=args.workers,
+                               on_categories=on_categories, category_interval=3600, **options)
+    with recorder.job("scan", path=scan_path) as metrics:
+        scanner.metrics = metrics
+        root = scanner.scan()
+    top_folders = sorted(root.children, key=lambda n: n.size, reverse=True)[:args.top]
+    top_files = heapq.nlargest(args.top, (n for n in iter_files(root) if not is_aggregate(n)), key=lambda n: n.size)
+
+    report = {
+        "path": root.path,
+        "total_size": root.size,
+        "categories": dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True)),
+        "top_folders": [node_summary(n) for n in top_folders],
+        "top_files": [node_summary(n) for n in top_files],
+    }
+
+    if args.export_suggestions:
+        args.suggestions = True
+    if args.export_duplicates:
+        args.duplicates = True
+    if args.duplicates or args.suggestions:
+        from src.analyzer import Analyzer
+        with recorder.job("analysis", path=scan_path) as metrics:
+            analyzer = Analyzer(metrics=metrics, throttle=Throttle(throttle) if throttle is not None else None)
+            if args.suggestions:
+                suggestions = analyzer.get_cleanup_suggestions(root)
+            if args.duplicates:
+                duplicates = analyzer.find_duplicates(root)
+        if args.suggestions:
+            report["suggestions"] = {cat: [node_summary(n) for n in nodes] for cat, nodes in suggestions.items()}
+        if args.duplicates:
+            groups = sorted(duplicates, key=lambda g: g[0].size * (len(g) - 1), reverse=True)
+            report["duplicates"] = [{"size": g[0].size, "reclaimable": g[0].size * (len(g) - 1),
+                                     "paths": [n.path for n in g]} for g in groups]
+
+    exports = [("tree", root, args.export_tree)]
+    if args.suggestions:
+        exports.append(("suggestions", suggestions, args.export_suggestions))
+    if args.duplicates:
+        exports.append(("duplicates", duplicates, args.export_duplicates))
+    for kind, source, target in exports:
+        if target:
+            from src.exporters import ExportError
+            try:
+                rows = export_report(kind, source, target, args.export_format)
+            except ExportError as e:
+                print(f"storage-bot: {e}", file=sys.stderr)
+                return 1
+            print(f"Exported {rows} {kind} rows to {target}", file=sys.stderr)
+
+    if not args.no_history:
+        from src.history_manager import HistoryManager
+        from src.tree_diff import to_snapshot
+        history = HistoryManager()
+        history.save_scan(root.path, root)
+        if not scanner.spilled: # A snapshot would read the whole spilled tree back
+            history.save_snapshot(root.path, to_snapshot(root))
+        insights = history.get_insights(root.path, root)
+        if insights:
+            report["since_last_scan"] = {
+                "previous_timestamp": insights["previous_timestamp"],
+                "size_diff": insights["size_diff"],
+                "top_changes": [{"name": name, "delta": delta} for name, delta in insights["top_changes"]],
+            }
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    print(f"{root.path}: {format_size(root.size)}")
+    print("\nBy category:")
+    for cat, size in report["categories"].items():
+        print(f"  {cat:<14} {format_size(size):>12}")
+    print(f"\nLargest folders and files in {root.name}:")
+    for n in top_folders:
+        print(f"  {format_size(n.size):>12}  {n.name}{os.sep if n.is_dir else ''}")
+    print("\nLargest files:")
+    for n in top_files:
+        print(f"  {format_size(n.size):>12}  {n.path}")
+    if "suggestions" in report:
+        print("\nCleanup suggestions:")
+        for cat, nodes in report["suggestions"].items():
+            print(f"  {cat}: {len(nodes)} items, {format_size(sum(n['size'] for n in nodes))}")
+    if "duplicates" in report:
+        groups = report["duplicates"]
+        print(f"\nDuplicates: {len(groups)} groups, "
+              f"{format_size(sum(g['reclaimable'] for g in groups))} reclaimable")
+        for g in groups[:args.top]:
+            print(f"  {format_size(g['size']):>12} x{len(g['paths'])}  {g['paths'][0]}")
+    if "since_last_scan" in report:
+        print(f"\nSince last scan: {'+' if report['since_last_scan']['size_diff'] >= 0 else ''}"
+              f"{format_size(report['since_last_scan']['size_diff'])}")
+    return 0
+
+
+def cmd_estimate(args):
+    from src.quick_estimate import QuickEstimator, is_estimate
+    from src.metrics import recorder
+
+    with recorder.job("estimate", path=args.path) as metrics:
+        estimate = QuickEstimator(args.path, full_depth=args.depth, samples=args.samples,
+                                  time_budget=args.time_budget).estimate()
+        metrics.count("listings", estimate.listings)
+    root = estimate.root
+
+    def entry(node):
+        data = {"path": node.path, "size": node.size, "estimate": is_estimate(node)}
+        if is_estimate(node):
+            data.update(low=node.low, high=node.high)
+        return data
+
+    folders = sorted((c for c in root.children if c.is_dir), key=lambda n: n.size, reverse=True)[:args.top]
+    report = {**entry(root), "seconds": estimate.seconds, "listings": estimate.listings,
+              "estimated_folders": len(estimate.estimated), "top_folders": [entry(n) for n in folders]}
+    if estimate.volume is not None:
+        report["volume"] = dict(zip(("total", "used", "free"), estimate.volume))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    def size_range(node):
+        if not is_estimate(node):
+            return f"{format_size(node.size):>12}"
+        return f"{'~' + format_size(node.size):>12}  ({format_size(node.low)} - {format_size(node.high)})"
+
+    print(f"{root.path}: {size_range(root)}")
+    print(f"  {estimate.listings:,} folders listed in {estimate.seconds:.2f}s, "
+          f"{len(estimate.estimated):,} sized by sampling (95% ranges)")
+    if estimate.volume is not None:
+        print(f"  Volume: {format_size(estimate.volume[1])} used of {format_size(estimate.volume[0])}")
+    print("\nLargest folders:")
+    for node in folders:
+        print(f"  {size_range(node)}  {node.path}")
+    return 0
+
+
+def export_report(report, source, target, fmt=None):
+    from src.exporters import Exporter
+    from src.metrics import recorder
+    with recorder.job("export", report=report, path=target) as metrics:
+        return Exporter(report, source, target, fmt=fmt, metrics=metrics).export()
+
+
+def cmd_export(args):
+    import time
+    from src.history_manager import HistoryManager
+    from src.exporters import ExportError
+    history = HistoryManager()
+    snapshots = history.list_snapshots(args.path)
+    snapshot = history.load_snapshot(snapshots[-1][1]) if snapshots else None
+    if snapshot is None:
+        print(f"storage-bot: no recorded scan of {args.path}; run a scan first", file=sys.stderr)
+        return 1
+    try:
+        rows = export_report("tree", snapshot, args.output, args.format)
+    except ExportError as e:
+        print(f"storage-bot: {e}", file=sys.stderr)
+        return 1
+    stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshots[-1][0]))
+    print(f"Exported {rows} rows from the scan of {stamp} to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_history(args):
+    import time
+    from src.history_manager import HistoryManager
+
+    start = time.time() - args.days * 86400 if args.days else None
+    resolution, points = HistoryManager().get_trend(os.path.abspath(args.path), start=start)
+    if args.json:
+        json.dump({"path": os.path.abspath(args.path), "resolution": resolution,
+                   "points": [{"timestamp": ts, "min": low, "max": high, "last": last}
+                              for ts, low, high, last in points]}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    if not points:
+        print("No history recorded for this folder yet.")
+        return 1
+    print(f"{len(points)} points at {resolution} resolution")
+    for ts, low, high, last in points:
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+        print(f"  {stamp}  {format_size(last):>12}  (min {format_size(low)}, max {format_size(high)})")
+    return 0
+
+
+def cmd_daemon(args):
+    from src.scan_daemon import serve, default_socket_path, DaemonError
+
+    socket_path = args.socket or default_socket_path()
+    print(f"Scan daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        serve(socket_path, roots=args.roots, socket_mode=int(args.socket_mode, 8),
+              refresh_interval=args.refresh, full_rescan_interval=args.full_rescan,
+              record_history=not args.no_history, throttle=throttle_config(args))
+    except DaemonError as e:
+        print(f"storage-bot: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def add_throttle_arguments(parser):
+    parser.add_argument("--throttle", action="store_true", help="Scan at low CPU and I/O priority and back off "
+                        "while the disk is slow to answer, to protect other workloads")
+    parser.add_argument("--max-ops", type=float, metavar="N", help="Throttle to N scandir/stat/open calls per second")
+    parser.add_argument("--max-read-rate", metavar="SIZE", help="Throttle duplicate hashing to SIZE bytes per second "
+                        "(e.g. 8M)")
+    parser.add_argument("--idle-io", action="store_true", help="Throttle to the idle I/O class: only use the disk "
+                        "when nothing else does (Linux)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="storage-bot", description="Headless disk usage analysis.")
+    parser.add_argument("--metrics", metavar="FILE", help="Append per-job timings and counters to FILE as JSON lines")
+    parser.add_argument("--profile", action="store_true", help="Include a cProfile summary with each job's metrics")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="Scan a folder and report where the space goes")
+    scan.add_argument("paths", nargs="+", metavar="path", help="Folder to scan; several volumes are scanned in parallel")
+    scan.add_argument("--top", type=int, default=10, help="Number of top consumers to list")
+    scan.add_argument("--duplicates", action="store_true", help="Find duplicate files")
+    scan.add_argument("--suggestions", action="store_true", help="List cleanup suggestions")
+    scan.add_argument("--no-history", action="store_true", help="Don't record this scan in the history")
+    scan.add_argument("--json", action="store_true", help="Print the report as JSON")
+    scan.add_argument("--backend", choices=["auto", "thread", "process"], default=None,
+                      help="Scan in this process or fan out to worker processes (default: auto)")
+    scan.add_argument("--workers", type=int, default=None, help="Worker processes for the process backend")
+    scan.add_argument("--memory-budget", metavar="SIZE", help="Keep the scan tree under about SIZE (e.g. 512M) "
+                      "by folding small files and folders into per-folder aggregates")
+    scan.add_argument("--small-files", metavar="SIZE", help="Fold files smaller than SIZE (e.g. 64K)")
+    scan.add_argument("--max-files-per-dir", type=int, metavar="N",
+                      help="Keep only the N largest files of each folder as separate entries")
+    scan.add_argument("--spill-threshold", metavar="SIZE", help="Write finished subtrees to a temporary "
+                      "file once the tree holds about SIZE of nodes, keeping memory bounded")
+    add_throttle_arguments(scan)
+    scan.add_argument("--export-tree", metavar="FILE", help="Write every folder and file to FILE "
+                      "(.csv, .jsonl or .parquet)")
+    scan.add_argument("--export-suggestions", metavar="FILE", help="Write the cleanup suggestions to FILE")
+    scan.add_argument("--export-duplicates", metavar="FILE", help="Write the duplicate groups to FILE")
+    scan.add_argument("--export-format", choices=["csv", "jsonl", "parquet"], default=None,
+                      help="Format of the exports (default: from the file extension)")
+    scan.set_defaults(func=cmd_scan)
+
+    estimate = commands.add_parser("estimate", help="Estimate folder sizes in seconds by sampling deep subtrees")
+    estimate.add_argument("path")
+    estimate.add_argument("--top", type=int, default=10, help="Number of top folders to list")
+    estimate.add_argument("--depth", type=int, default=2, help="Levels listed exactly before sampling")
+    estimate.add_argument("--samples", type=int, default=8, help="Random probes per sampled folder")
+    estimate.add_argument("--time-budget", type=float, default=5.0, help="Seconds of probing before cutting samples")
+    estimate.add_argument("--json", action="store_true", help="Print the estimate as JSON")
+    estimate.set_defaults(func=cmd_estimate)
+
+    export = commands.add_parser("export", help="Export the last recorded scan of a folder without rescanning")
+    export.add_argument("path")
+    export.add_argument("output", help="File to write (.csv, .jsonl or .parquet)")
+    export.add_argument("--format", choices=["csv", "jsonl", "parquet"], default=None,
+                        help="Output format (default: from the file extension)")
+    export.set_defaults(func=cmd_export)
+
+    history = commands.add_parser("history", help="Show the recorded size history of a folder")
+    history.add_argument("path")
+    history.add_argument("--days", type=int, default=None, help="Only show the last N days")
+    history.add_argument("--json", action="store_true", help="Print the history as JSON")
+    history.set_defaults(func=cmd_history)
+
+    daemon = commands.add_parser("daemon", help="Keep scanned trees in memory and answer queries over a Unix socket")
+    daemon.add_argument("roots", nargs="*", metavar="path", help="Folders to scan at startup")
+    daemon.add_argument("--socket", default=None, help="Socket path (default: $STORAGE_BOT_SOCKET or the runtime dir)")
+    daemon.add_argument("--socket-mode", default="660", help="Octal permissions for the socket file")
+    daemon.add_argument("--refresh", type=float, default=300, help="Seconds between incremental refreshes")
+    daemon.add_argument("--full-rescan", type=float, default=6 * 3600, help="Seconds between full rescans")
+    daemon.add_argument("--no-history", action="store_true", help="Don't record daemon scans in the history")
+    add_throttle_arguments(daemon)
+    daemon.set_defaults(func=cmd_daemon)
+    return parser
+
+
+def is_size(text):
+    return text.strip().upper().rstrip("B").rstrip("KMGT").replace(".", "", 1).isdigit()
+
+
+def export_format_ok(target):
+    from src.exporters import format_for_path
+    if format_for_path(target) is None:
+        print(f"storage-bot: can't tell the export format of {target}; use .csv, .jsonl or .parquet "
+              f"or pass the format", file=sys.stderr)
+        return False
+    return True
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics or args.profile:
+        from src.metrics import recorder
+        recorder.jsonl_path = args.metrics or recorder.jsonl_path
+        recorder.profile = args.profile or recorder.profile
+    if args.command == "scan":
+        for path in args.paths:
+            if not os.path.isdir(path):
+                print(f"storage-bot: not a directory: {path}", file=sys.stderr)
+                return 2
+        args.paths = [os.path.abspath(p) for p in args.paths]
+        for size in (args.memory_budget, args.small_files, args.spill_threshold, args.max_read_rate):
+            if size and not is_size(size):
+                print(f"storage-bot: not a size: {size}", file=sys.stderr)
+                return 2
+        for target in (args.export_tree, args.export_suggestions, args.export_duplicates):
+            if target and not (args.export_format or export_format_ok(target)):
+                return 2
+    elif args.command == "estimate":
+        if not os.path.isdir(args.path):
+            print(f"storage-bot: not a directory: {args.path}", file=sys.stderr)
+            return 2
+        args.path = os.path.abspath(args.path)
+    elif args.command == "export":
+        args.path = os.path.abspath(args.path)
+        if not (args.format or export_format_ok(args.output)):
+            return 2
+    elif args.command == "daemon":
+        args.roots = [os.path.abspath(p) for p in args.roots]
+        if args.max_read_rate and not is_size(args.max_read_rate):
+            print(f"storage-bot: not a size: {args.max_read_rate}", file=sys.stderr)
+            return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
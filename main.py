@@ -1,23 +1,51 @@
+import time
+_STARTUP_T0 = time.perf_counter() # Before any heavy import, for the startup report
+
 import sys
 import os
 import datetime
+from functools import partial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QLabel, QPushButton, QStackedWidget, QFileDialog, QSpacerItem, QSizePolicy)
-from PyQt6.QtCore import Qt, QSize, QStorageInfo
+                             QHBoxLayout, QLabel, QPushButton, QStackedWidget, QFileDialog, QSpacerItem, QSizePolicy,
+                             QProgressDialog, QMessageBox, QCheckBox)
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QIcon, QFont, QColor, QPalette
 
 # Import scanner (Assuming it's ready based on previous step)
-from src.scanner import ScanManager, FileNode
+from src.scanner import ScanManager, FileNode, remove_nodes
 from src.history_manager import HistoryManager
+from src.throttle import ThrottleConfig
+from src.exporters import format_for_path
 
-from src.ui.treemap_widget import TreemapWidget
+# Views that aren't visible at startup (charts, treemap, recommendations, ...) are
+# imported when first shown; see the get_* methods on MainWindow.
 from src.ui.storage_list_view import StorageListView
 from src.ui.details_panel import DetailsPanel
-from src.ui.chart_widget import StorageBreakdownChart
-from src.ui.recommendation_view import RecommendationView
+from src.ui.search_box import SearchBox
+from src.ui.drive_list import DriveList
+
+class StartupTimer:
+    """
+    Records named checkpoints since process start (python main.py --startup-report).
+    """
+    def __init__(self, t0: float):
+        self.t0 = t0
+        self.marks = []
+
+    def mark(self, label: str):
+        self.marks.append((label, time.perf_counter() - self.t0))
+
+    def report(self) -> str:
+        lines = ["Startup timing:"]
+        for label, seconds in self.marks:
+            lines.append(f"  {seconds * 1000:8.1f} ms  {label}")
+        return "\n".join(lines)
+
+STARTUP = StartupTimer(_STARTUP_T0)
+STARTUP.mark("imports done")
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, daemon_socket=None):
         super().__init__()
         self.setWindowTitle("Disk Usage Analyzer")
         self.resize(1200, 800)
@@ -27,6 +55,34 @@ class MainWindow(QMainWindow):
         self.scan_manager = ScanManager()
         self.history_manager = HistoryManager()
         self.current_root = None
+        self.suggestions = {}
+        self.duplicates = []
+        self.deletion_worker = None
+        self.deletion_errors = []
+        self.last_diff = None # (TreeDiff, previous timestamp) for the lazily created changes view
+
+        # Client mode: trees are owned by the scan daemon and mirrored a folder at a time
+        self.daemon = None
+        self.remote_tree = None
+        self.remote_poll = None
+        self.remote_scan_root = None
+        self.remote_pending = set() # id() of folders whose next page is being fetched
+        self.estimate = None # QuickEstimate being refined, if any
+        self.estimate_worker = None
+        self.scan_throttle = None # ThrottleConfig of the current scan, reused for its analysis
+        self.export_worker = None
+        self.export_path = None
+        if daemon_socket is not None:
+            from src.scan_daemon import DaemonClient
+            self.daemon = DaemonClient(daemon_socket or None)
+
+        # Created on first use
+        self.chart_widget = None
+        self.recommendation_view = None
+        self.changes_view = None
+        self.trend_chart = None
+        self.treemap_view = None
+        self.diagnostics_view = None
 
         # Main Layout
         central_widget = QWidget()
@@ -43,6 +99,12 @@ class MainWindow(QMainWindow):
 
         # 3. Detail Panel (Right side)
         self.setup_detail_panel()
+
+        # Probe drives after the window is up; buttons fill in as volumes answer
+        QTimer.singleShot(0, self.drive_list.start)
+        if self.daemon is not None:
+            QTimer.singleShot(0, self.open_daemon_tree)
+        STARTUP.mark("window constructed")
         
     def setup_ui_theme(self):
         # Basic Windows 11-ish Dark Mode Palette
@@ -79,25 +141,12 @@ class MainWindow(QMainWindow):
         lbl_drives.setStyleSheet("color: #AAAAAA; font-weight: bold; padding-bottom: 5px;")
         layout.addWidget(lbl_drives)
 
-        # Detect Drives
-        for volume in QStorageInfo.mountedVolumes():
-            if volume.isValid() and volume.isReady():
-                name = volume.displayName() or volume.rootPath()
-                btn_drive = QPushButton(f"{name} ({self.format_size_simple(volume.bytesAvailable())} free)")
-                btn_drive.setFixedHeight(40)
-                btn_drive.setStyleSheet("""
-                    QPushButton {
-                        background-color: #333333; 
-                        color: white; 
-                        border-radius: 4px; 
-                        text-align: left;
-                        padding-left: 10px;
-                    }
-                    QPushButton:hover { background-color: #404040; }
-                """)
-                # Capture path in loop
-                btn_drive.clicked.connect(lambda checked, p=volume.rootPath(): self.start_scan(p))
-                layout.addWidget(btn_drive)
+        # Detect Drives (in the background, so a stale network mount can't hold up the window)
+        self.drive_list = DriveList()
+        self.drive_list.scanRequested.connect(self.start_scan)
+        self.drive_list.multiScanRequested.connect(self.start_scan)
+        self.drive_list.driveReady.connect(lambda root: STARTUP.mark(f"drive ready: {root}"))
+        layout.addWidget(self.drive_list)
 
         layout.addSpacing(20)
 
@@ -120,6 +169,18 @@ class MainWindow(QMainWindow):
         self.btn_scan.clicked.connect(self.select_folder)
         
         layout.addWidget(self.btn_scan)
+
+        self.chk_estimate = QCheckBox("Quick estimate first")
+        self.chk_estimate.setToolTip("Show estimated folder sizes within seconds, then refine them into exact ones")
+        self.chk_estimate.setStyleSheet("color: #DDDDDD;")
+        layout.addWidget(self.chk_estimate)
+
+        self.chk_throttle = QCheckBox("Gentle scan")
+        self.chk_throttle.setToolTip("Scan at low CPU and disk priority and slow down while the disk is busy, "
+                                     "so other programs stay responsive")
+        self.chk_throttle.setStyleSheet("color: #DDDDDD;")
+        self.chk_throttle.setChecked(ThrottleConfig.from_env() is not None)
+        layout.addWidget(self.chk_throttle)
         
         layout.addSpacing(20)
         
@@ -143,18 +204,83 @@ class MainWindow(QMainWindow):
         self.btn_recs.setEnabled(False) # Enable after analysis
         layout.addWidget(self.btn_recs)
 
+        self.btn_changes = QPushButton("What Changed")
+        self.btn_changes.setFixedHeight(40)
+        self.btn_changes.setStyleSheet("""
+            QPushButton {
+                background-color: #333333; 
+                color: white; 
+                border-radius: 4px; 
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        self.btn_changes.clicked.connect(self.show_changes)
+        self.btn_changes.setEnabled(False) # Enable once a previous scan is available to diff
+        layout.addWidget(self.btn_changes)
+
+        self.btn_trends = QPushButton("Storage Trends")
+        self.btn_trends.setFixedHeight(40)
+        self.btn_trends.setStyleSheet("""
+            QPushButton {
+                background-color: #333333; 
+                color: white; 
+                border-radius: 4px; 
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        self.btn_trends.clicked.connect(self.show_trends)
+        self.btn_trends.setEnabled(False) # Enable once a scan has been recorded
+        layout.addWidget(self.btn_trends)
+
+        self.btn_treemap = QPushButton("Treemap View")
+        self.btn_treemap.setFixedHeight(40)
+        self.btn_treemap.setStyleSheet("""
+            QPushButton {
+                background-color: #333333; 
+                color: white; 
+                border-radius: 4px; 
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        self.btn_treemap.clicked.connect(self.toggle_treemap)
+        self.btn_treemap.setEnabled(False) # Enable after scan
+        layout.addWidget(self.btn_treemap)
+
+        self.btn_export = QPushButton("Export Scan...")
+        self.btn_export.setFixedHeight(40)
+        self.btn_export.setStyleSheet("""
+            QPushButton {
+                background-color: #333333; 
+                color: white; 
+                border-radius: 4px; 
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        self.btn_export.clicked.connect(lambda: self.export_report("tree"))
+        self.btn_export.setEnabled(False) # Enable after scan
+        layout.addWidget(self.btn_export)
+
         layout.addStretch()
+
+        self.btn_diagnostics = QPushButton("Diagnostics")
+        self.btn_diagnostics.setFixedHeight(30)
+        self.btn_diagnostics.setStyleSheet("""
+            QPushButton {
+                background-color: #333333; 
+                color: #AAAAAA; 
+                border-radius: 4px; 
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        self.btn_diagnostics.clicked.connect(self.show_diagnostics)
+        layout.addWidget(self.btn_diagnostics)
         
         self.main_layout.addWidget(self.sidebar)
 
-    def format_size_simple(self, size):
-        # Quick formatter for drive list
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024:
-                return f"{size:.0f}{unit}"
-            size /= 1024
-        return f"{size:.0f}PB"
-
     def setup_content_area(self):
         self.content_area = QWidget()
         layout = QVBoxLayout(self.content_area)
@@ -174,14 +300,19 @@ class MainWindow(QMainWindow):
         self.insights_label.setWordWrap(True)
         self.insights_label.hide()
 
-        header_layout.addWidget(self.header_label)
+        self.search_box = SearchBox()
+        self.search_box.setFixedWidth(320)
+        self.search_box.nodeChosen.connect(self.on_search_result)
+        self.search_box.searchRequested.connect(self.on_remote_search)
+
+        title_row = QHBoxLayout()
+        title_row.addWidget(self.header_label, 1)
+        title_row.addWidget(self.search_box)
+        header_layout.addLayout(title_row)
         header_layout.addWidget(self.insights_label)
         
-        # Chart Widget
-        self.chart_widget = StorageBreakdownChart()
-        self.chart_widget.setFixedHeight(200)
-        self.chart_widget.hide()
-        header_layout.addWidget(self.chart_widget)
+        # The category chart is created when the first scan starts (QtCharts loads on demand)
+        self.header_layout = header_layout
         
         layout.addWidget(header_container)
         
@@ -200,14 +331,67 @@ class MainWindow(QMainWindow):
         self.storage_view.itemClicked.connect(self.on_treemap_clicked)
         self.stack.addWidget(self.storage_view)
         
-        # Page 2: Recommendations
-        self.recommendation_view = RecommendationView()
-        self.stack.addWidget(self.recommendation_view)
+        # Recommendations, What Changed, Storage Trends and Treemap pages are added on first use
         
         self.main_layout.addWidget(self.content_area, 1)
 
+    def get_chart_widget(self):
+        if self.chart_widget is None:
+            from src.ui.chart_widget import StorageBreakdownChart
+            self.chart_widget = StorageBreakdownChart()
+            self.chart_widget.setFixedHeight(200)
+            self.chart_widget.hide()
+            self.header_layout.addWidget(self.chart_widget)
+        return self.chart_widget
+
+    def get_recommendation_view(self):
+        if self.recommendation_view is None:
+            from src.ui.recommendation_view import RecommendationView
+            self.recommendation_view = RecommendationView()
+            self.recommendation_view.deleteRequested.connect(self.start_deletion)
+            self.recommendation_view.exportRequested.connect(self.export_report)
+            self.recommendation_view.set_data(self.suggestions, self.duplicates)
+            self.stack.addWidget(self.recommendation_view)
+        return self.recommendation_view
+
+    def get_changes_view(self):
+        if self.changes_view is None:
+            from src.ui.changes_view import ChangesView
+            self.changes_view = ChangesView()
+            if self.last_diff is not None:
+                self.changes_view.set_diff(*self.last_diff)
+            self.stack.addWidget(self.changes_view)
+        return self.changes_view
+
+    def get_trend_chart(self):
+        if self.trend_chart is None:
+            from src.ui.trend_chart import StorageTrendChart
+            self.trend_chart = StorageTrendChart(self.history_manager)
+            if self.current_root is not None:
+                self.trend_chart.set_path(self.current_root.path)
+            self.stack.addWidget(self.trend_chart)
+        return self.trend_chart
+
+    def get_treemap_view(self):
+        if self.treemap_view is None:
+            from src.ui.treemap_widget import TreemapWidget
+            self.treemap_view = TreemapWidget()
+            self.treemap_view.itemClicked.connect(self.on_treemap_clicked)
+            if self.current_root is not None:
+                self.treemap_view.set_data(self.current_root)
+            self.stack.addWidget(self.treemap_view)
+        return self.treemap_view
+
+    def get_diagnostics_view(self):
+        if self.diagnostics_view is None:
+            from src.ui.diagnostics_view import DiagnosticsView
+            self.diagnostics_view = DiagnosticsView(self.scan_manager)
+            self.stack.addWidget(self.diagnostics_view)
+        return self.diagnostics_view
+
     def setup_detail_panel(self):
         self.detail_panel = DetailsPanel()
+        self.detail_panel.deleteRequested.connect(self.start_deletion)
         self.detail_panel.setFixedWidth(300)
         self.detail_panel.setStyleSheet("background-color: #252525; border-left: 1px solid #3D3D3D;")
         self.detail_panel.hide()
@@ -219,24 +403,61 @@ class MainWindow(QMainWindow):
             self.start_scan(folder)
 
     def start_scan(self, folder):
-        self.header_label.setText(f"Scanning: {folder}...")
+        if self.daemon is not None:
+            self.start_remote_scan(folder)
+            return
+        if self.estimate_worker is not None:
+            self.estimate_worker.cancel()
+            self.estimate_worker = None
+            self.estimate = None
+        # A list of roots (drives ticked in the sidebar) is scanned in parallel into one tree
+        multi = isinstance(folder, list)
+        self.header_label.setText(f"Scanning: {', '.join(folder) if multi else folder}...")
         self.insights_label.hide()
-        self.chart_widget.hide()
+        # The chart fills in from category totals streamed by the scanner
+        chart = self.get_chart_widget()
+        chart.reset()
+        chart.show()
         self.btn_scan.setEnabled(False)
         self.btn_recs.setEnabled(False)
+        self.btn_changes.setEnabled(False)
+        self.btn_treemap.setEnabled(False)
+        self.btn_export.setEnabled(False)
+        self.search_box.set_index(None)
         
         self.stack.setCurrentIndex(0)
         self.page_placeholder.setText("Scanning... This process utilizes optimized multi-threading.")
-        self.scan_manager.start_scan(folder, self.on_scan_finished)
+        # Caps come from STORAGE_BOT_THROTTLE_*; without them only priority and backoff apply
+        self.scan_throttle = (ThrottleConfig.from_env() or ThrottleConfig()) if self.chk_throttle.isChecked() else None
+        if self.scan_throttle is not None:
+            self.page_placeholder.setText("Scanning gently... Other programs get the disk first, "
+                                          "so this can take longer.")
+        if not multi and self.chk_estimate.isChecked():
+            self.estimate_worker = self.scan_manager.start_estimate(
+                folder, self.on_estimated, self.on_estimate_refined, self.on_estimate_finished,
+                on_progress=self.header_label.setText, on_categories=chart.apply_category_deltas,
+                throttle=self.scan_throttle)
+        elif multi:
+            self.scan_manager.start_multi_scan(folder, self.on_scan_finished, on_progress=self.page_placeholder.setText,
+                                               on_categories=chart.apply_category_deltas, throttle=self.scan_throttle)
+        else:
+            self.scan_manager.start_scan(folder, self.on_scan_finished,
+                                         on_categories=chart.apply_category_deltas, throttle=self.scan_throttle)
 
-    def on_scan_finished(self, root_node):
-        self.current_root = root_node
+    def on_scan_finished(self, root_node, spilled):
         self.btn_scan.setEnabled(True)
+        if root_node is None:
+            self.header_label.setText("Scan cancelled")
+            return
+        self.current_root = root_node
         self.header_label.setText(f"Scan Complete: {root_node.path}")
         
         # Save History & Get Insights
         self.history_manager.save_scan(root_node.path, root_node)
         insights = self.history_manager.get_insights(root_node.path, root_node)
+        if self.trend_chart is not None:
+            self.trend_chart.set_path(root_node.path)
+        self.btn_trends.setEnabled(True)
         
         if insights:
             self.show_insights(insights)
@@ -244,24 +465,126 @@ class MainWindow(QMainWindow):
             self.insights_label.setText("First scan recorded. Insights will appear on future scans.")
             self.insights_label.show()
             
-        # Update Chart
-        self.chart_widget.update_data(root_node)
-        self.chart_widget.show()
-
         # Show Treemap
         self.stack.setCurrentIndex(1)
         self.storage_view.set_data(root_node)
+        if self.treemap_view is not None:
+            self.treemap_view.set_data(root_node)
+        self.btn_treemap.setText("Treemap View")
+        self.btn_treemap.setEnabled(True)
+        self.btn_export.setEnabled(True)
         
         # Start background analysis
-        self.scan_manager.start_analysis(root_node, self.on_analysis_finished)
+        self.scan_manager.start_analysis(root_node, self.on_analysis_finished, throttle=self.scan_throttle)
+        if spilled:
+            # Snapshots and the name index would read the whole spilled tree back into memory
+            self.insights_label.setText(self.insights_label.text() + " This scan was too large for memory; "
+                                        "folders are read back from disk as you open them, and search "
+                                        "and \"What Changed\" are unavailable.")
+            self.insights_label.show()
+            return
+        self.scan_manager.start_diff(root_node, self.history_manager, self.on_diff_finished)
+        self.scan_manager.start_indexing(root_node, self.on_index_finished)
+
+    def from_estimate_worker(self):
+        # Results of a cancelled estimate can still be queued when the next scan starts
+        return self.estimate_worker is not None and self.sender() is self.estimate_worker.signals
+
+    def on_estimated(self, estimate):
+        if not self.from_estimate_worker():
+            return
+        self.estimate = estimate
+        self.current_root = estimate.root
+        root = estimate.root
+        text = (f"Estimated {self.format_size(root.size)} in {estimate.seconds:.1f}s "
+                f"(95% range {self.format_size(root.low)} \u2013 {self.format_size(root.high)})")
+        if estimate.volume is not None:
+            text += f"; the volume reports {self.format_size(estimate.volume[1])} used"
+        self.insights_label.setText(text + ". Sizes marked \u2248 are refined in the background.")
+        self.insights_label.show()
+        self.stack.setCurrentIndex(1)
+        self.storage_view.set_data(root)
+
+    def on_estimate_refined(self, placeholder, exact):
+        if not self.from_estimate_worker() or self.estimate is None:
+            return
+        parent = self.estimate.apply_refinement(placeholder, exact)
+        if parent is None:
+            return
+        self.storage_view.replace_node(placeholder, exact)
+        for folder in (parent, *parent.ancestors()):
+            self.storage_view.refresh_folder(folder)
+
+    def on_estimate_finished(self, root_node, spilled):
+        if not self.from_estimate_worker():
+            return
+        self.estimate = None
+        self.estimate_worker = None
+        if root_node is None:
+            self.on_scan_finished(None, False)
+            return
+        current = self.storage_view.current_view_node
+        self.on_scan_finished(root_node, spilled)
+        # Every size is exact now; stay in the folder the user was browsing
+        if current is not None and current is not root_node and current.parent is not None:
+            self.storage_view.navigate_to(current)
 
     def on_analysis_finished(self, suggestions, duplicates):
-        self.recommendation_view.set_data(suggestions, duplicates)
+        self.suggestions = suggestions
+        self.duplicates = duplicates
+        if self.recommendation_view is not None:
+            self.recommendation_view.set_data(suggestions, duplicates)
         self.btn_recs.setEnabled(True)
         # Optional: Notification or badge on the button
 
+    def on_diff_finished(self, diff, previous_timestamp):
+        if diff is None:
+            return
+        self.last_diff = (diff, previous_timestamp)
+        if self.changes_view is not None:
+            self.changes_view.set_diff(diff, previous_timestamp)
+        self.btn_changes.setEnabled(True)
+
+    def on_index_finished(self, index):
+        # Ignore an index built for a tree that has since been replaced
+        if index.root is self.current_root:
+            self.search_box.set_index(index)
+
+    def on_search_result(self, node):
+        if self.remote_tree is not None:
+            # Daemon results are detached; mirror the folders leading to them first
+            remote_tree = self.remote_tree
+            self.remote_call(partial(remote_tree.fetch_route, node.path),
+                             lambda route: self.on_remote_route(remote_tree, route))
+            return
+        self.show_search_result(node)
+
+    def show_search_result(self, node):
+        # Show the result in the list view, whichever page was open
+        self.stack.setCurrentIndex(1)
+        self.btn_treemap.setText("Treemap View")
+        self.storage_view.reveal(node)
+        self.on_treemap_clicked(node)
+
     def show_recommendations(self):
-        self.stack.setCurrentWidget(self.recommendation_view)
+        self.stack.setCurrentWidget(self.get_recommendation_view())
+
+    def show_changes(self):
+        self.stack.setCurrentWidget(self.get_changes_view())
+
+    def show_trends(self):
+        self.stack.setCurrentWidget(self.get_trend_chart())
+
+    def show_diagnostics(self):
+        self.stack.setCurrentWidget(self.get_diagnostics_view())
+
+    def toggle_treemap(self):
+        if self.treemap_view is not None and self.stack.currentWidget() is self.treemap_view:
+            self.stack.setCurrentWidget(self.storage_view)
+            self.btn_treemap.setText("Treemap View")
+        else:
+            self.stack.setCurrentWidget(self.get_treemap_view())
+            self.btn_treemap.setText("List View")
 
     def show_insights(self, insights):
         diff = insights['size_diff']
@@ -285,10 +608,242 @@ class MainWindow(QMainWindow):
         self.insights_label.setText(msg)
         self.insights_label.show()
 
+    def start_deletion(self, nodes, permanent):
+        if self.deletion_worker is not None or self.export_worker is not None:
+            QMessageBox.information(self, "Deletion Running" if self.export_worker is None else "Export Running",
+                                    "Please wait for the current cleanup or export to finish.")
+            if self.recommendation_view is not None:
+                self.recommendation_view.deletion_finished()
+            return
+
+        self.deletion_errors = []
+        self.deletion_progress = QProgressDialog("Cleaning up...", "Cancel", 0, len(nodes), self)
+        self.deletion_progress.setWindowTitle("Cleanup")
+        self.deletion_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.deletion_progress.setMinimumDuration(300) # Only show for non-trivial batches
+        self.deletion_progress.setValue(0)
+
+        self.deletion_worker = self.scan_manager.start_deletion(
+            nodes,
+            on_finish=self.on_deletion_finished,
+            on_progress=self.on_deletion_progress,
+            on_deleted=self.on_nodes_deleted,
+            on_error=self.on_deletion_error,
+            permanent_categories={"Cache"} if permanent else None,
+        )
+        self.deletion_progress.canceled.connect(self.deletion_worker.cancel)
+
+    def on_deletion_progress(self, done, total):
+        self.deletion_progress.setLabelText(f"Cleaning up... {done} of {total} items")
+        self.deletion_progress.setValue(done)
+
+    def on_nodes_deleted(self, nodes):
+        # Update the scan tree in place instead of rescanning
+        removal = remove_nodes(nodes)
+        self.suggestions = removal.prune_suggestions(self.suggestions)
+        self.duplicates = removal.prune_duplicates(self.duplicates)
+
+        if self.recommendation_view is not None:
+            self.recommendation_view.apply_removal(removal)
+        self.storage_view.apply_removal(removal)
+        if self.treemap_view is not None:
+            self.treemap_view.apply_removal(removal)
+        self.detail_panel.apply_removal(removal)
+        self.search_box.apply_removal(removal)
+        if self.current_root is not None and self.chart_widget is not None:
+            self.chart_widget.apply_category_deltas(removal.category_deltas, self.current_root.size)
+
+    def on_deletion_error(self, node, message):
+        self.deletion_errors.append(f"{node.name}: {message}")
+
+    def on_deletion_finished(self, deleted, failed, cancelled):
+        self.deletion_worker = None
+        self.deletion_progress.reset()
+        if self.recommendation_view is not None:
+            self.recommendation_view.deletion_finished()
+
+        msg = f"Successfully removed {deleted} items."
+        if cancelled:
+            msg += "\nCleanup was cancelled before all items were processed."
+        if self.deletion_errors:
+            msg += f"\n\nErrors ({failed}):\n" + "\n".join(self.deletion_errors[:5])
+            if failed > 5: msg += "\n..."
+        QMessageBox.information(self, "Cleanup Result", msg)
+
+    def export_report(self, report):
+        # Exports read the tree from a worker thread, so they don't overlap with deletions
+        if self.export_worker is not None or self.deletion_worker is not None:
+            QMessageBox.information(self, "Export", "Please wait for the current cleanup or export to finish.")
+            return
+        source = {"tree": self.current_root, "suggestions": self.suggestions, "duplicates": self.duplicates}[report]
+        if source is None:
+            return
+        titles = {"tree": "Export Scan", "suggestions": "Export Cleanup Suggestions",
+                  "duplicates": "Export Duplicate Groups"}
+        base = os.path.basename(self.current_root.path) if self.current_root is not None else "scan"
+        path, selected = QFileDialog.getSaveFileName(
+            self, titles[report], os.path.join(os.path.expanduser("~"), f"{base or 'scan'}-{report}.csv"),
+            "CSV (*.csv);;JSON Lines (*.jsonl);;Parquet (*.parquet)")
+        if not path:
+            return
+        if format_for_path(path) is None:
+            path += "." + selected.split("*.")[-1].rstrip(")")
+
+        self.export_path = path
+        self.export_progress = QProgressDialog(f"{titles[report]}...", "Cancel", 0, 1000, self)
+        self.export_progress.setWindowTitle(titles[report])
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+        self.export_progress.setValue(0)
+        self.export_worker = self.scan_manager.start_export(report, source, path, self.on_export_finished,
+                                                            on_progress=self.on_export_progress,
+                                                            on_error=self.on_export_error)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+
+    def on_export_progress(self, rows, fraction):
+        self.export_progress.setLabelText(f"Exporting... {rows:,} rows written")
+        self.export_progress.setValue(int(fraction * 1000))
+
+    def on_export_finished(self, rows):
+        self.export_worker = None
+        self.export_progress.reset()
+        if rows is None:
+            return # Cancelled; nothing was written
+        QMessageBox.information(self, "Export Complete", f"Wrote {rows:,} rows to {self.export_path}.")
+
+    def on_export_error(self, message):
+        self.export_worker = None
+        self.export_progress.reset()
+        QMessageBox.warning(self, "Export Failed", message)
+
     def on_treemap_clicked(self, node):
+        if self.remote_tree is not None and self.remote_tree.is_more(node):
+            self.fetch_remote_page(self.remote_tree, self.remote_tree.more_parent(node))
+            return
         self.detail_panel.show()
         self.detail_panel.update_selection(node)
 
+    def remote_call(self, call, on_finish):
+        # Daemon requests block on a socket, so they run in the pool; errors end up in the header
+        self.scan_manager.start_remote_call(call, on_finish, on_error=self.on_remote_error)
+
+    def on_remote_error(self, message):
+        self.remote_pending.clear()
+        self.header_label.setText(f"Scan daemon error: {message}")
+
+    def open_daemon_tree(self):
+        # Show the first tree the daemon already holds, so the viewer opens without scanning
+        self.remote_call(partial(self.daemon.call, "trees"), self.on_daemon_trees)
+
+    def on_daemon_trees(self, trees):
+        ready = [t for t in trees if t["scanned_at"]]
+        if ready:
+            self.on_remote_ready(ready[0])
+        else:
+            self.page_placeholder.setText("Connected to the scan daemon. Select a drive or folder to scan.")
+
+    def start_remote_scan(self, folder):
+        roots = folder if isinstance(folder, list) else [folder]
+        self.remote_call(partial(self.daemon.call, "scan", roots=roots), self.on_remote_scan_started)
+
+    def on_remote_scan_started(self, status):
+        if status["scanned_at"]:
+            self.on_remote_ready(status) # Already held (possibly being refreshed); show it now
+            return
+        self.header_label.setText(f"Daemon scanning: {status['root']}...")
+        self.stack.setCurrentIndex(0)
+        self.page_placeholder.setText("The scan daemon is scanning this folder...")
+        if self.remote_poll is None:
+            # Single shot, restarted once each answer is in, so polls never pile up
+            self.remote_poll = QTimer(self)
+            self.remote_poll.setSingleShot(True)
+            self.remote_poll.setInterval(500)
+            self.remote_poll.timeout.connect(self.poll_remote_scan)
+        self.remote_scan_root = status["root"]
+        self.remote_poll.start()
+
+    def poll_remote_scan(self):
+        self.remote_call(partial(self.daemon.call, "status", root=self.remote_scan_root), self.on_remote_status)
+
+    def on_remote_status(self, status):
+        if status["root"] != self.remote_scan_root:
+            return # Another scan was started meanwhile; its own poll is running
+        if status["state"] == "error":
+            self.header_label.setText(f"Scan failed: {status['error']}")
+        elif status["scanned_at"]:
+            self.on_remote_ready(status)
+        else:
+            self.remote_poll.start()
+
+    def on_remote_ready(self, status):
+        from src.scan_daemon import RemoteTree
+        key = status["root"]
+        fetch = lambda: (RemoteTree(self.daemon, key), self.daemon.call("categories", root=key))
+        self.remote_call(fetch, lambda result: self.show_remote_tree(status, *result))
+
+    def show_remote_tree(self, status, remote_tree, categories):
+        from src.scan_daemon import RemoteIndex
+        key = status["root"]
+        self.remote_tree = remote_tree
+        self.remote_pending.clear()
+        self.current_root = remote_tree.root
+        self.header_label.setText(f"{key} (scan daemon)")
+        scanned = datetime.datetime.fromtimestamp(status["refreshed_at"] or status["scanned_at"])
+        self.insights_label.setText(f"Scanned by the daemon; last refreshed {scanned:%Y-%m-%d %H:%M}.")
+        self.insights_label.show()
+
+        chart = self.get_chart_widget()
+        chart.reset()
+        chart.apply_category_deltas(categories)
+        chart.show()
+        self.search_box.set_index(RemoteIndex(self.daemon, key, status))
+
+        # Folders are shown right away and filled in once their first page arrives
+        self.storage_view.loader = partial(self.load_remote_folder, remote_tree)
+        self.storage_view.set_data(remote_tree.root)
+        self.stack.setCurrentIndex(1)
+        # Views that need the whole tree stay local-only
+        for btn in (self.btn_recs, self.btn_changes, self.btn_trends, self.btn_treemap, self.btn_export):
+            btn.setEnabled(False)
+
+    def load_remote_folder(self, remote_tree, folder):
+        if remote_tree.needs_page(folder):
+            self.fetch_remote_page(remote_tree, folder)
+
+    def fetch_remote_page(self, remote_tree, folder):
+        # One request per folder at a time; the page is added here, on the thread the views read the tree from
+        if id(folder) in self.remote_pending:
+            return
+        self.remote_pending.add(id(folder))
+        self.remote_call(partial(remote_tree.fetch_page, folder),
+                         lambda page: self.on_remote_page(remote_tree, folder, page))
+
+    def on_remote_page(self, remote_tree, folder, page):
+        self.remote_pending.discard(id(folder))
+        if remote_tree is not self.remote_tree:
+            return
+        remote_tree.add_page(folder, *page)
+        self.storage_view.refresh_folder(folder)
+
+    def on_remote_route(self, remote_tree, route):
+        if remote_tree is not self.remote_tree:
+            return
+        node = remote_tree.resolve_route(route)
+        if node is None:
+            return
+        if node.parent is not None:
+            self.storage_view.refresh_folder(node.parent)
+        self.show_search_result(node)
+
+    def on_remote_search(self, query):
+        index = self.search_box.index
+        self.remote_call(partial(index.search, query, limit=SearchBox.MAX_RESULTS),
+                         lambda nodes: self.on_remote_search_results(index, query, nodes))
+
+    def on_remote_search_results(self, index, query, nodes):
+        if self.search_box.index is index:
+            self.search_box.show_results(nodes, query)
+
     def format_size(self, size):
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
             if abs(size) < 1024:
@@ -298,6 +853,17 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    STARTUP.mark("QApplication created")
+    # --daemon [SOCKET]: view trees held by a running scan daemon instead of scanning locally
+    daemon_socket = None
+    if "--daemon" in sys.argv:
+        i = sys.argv.index("--daemon")
+        daemon_socket = sys.argv[i + 1] if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("--") else ""
+    window = MainWindow(daemon_socket=daemon_socket)
     window.show()
+    # Runs once the event loop is idle, i.e. after the first paint
+    QTimer.singleShot(0, lambda: STARTUP.mark("first paint"))
+    if "--startup-report" in sys.argv:
+        # Print the report once drives have had a chance to answer, then exit
+        QTimer.singleShot(DriveList.PROBE_TIMEOUT_MS + 100, lambda: (print(STARTUP.report()), app.quit()))
     sys.exit(app.exec())
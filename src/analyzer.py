@@ -0,0 +1,158 @@
+import time
+import hashlib
+from typing import Dict, List, Tuple
+from src.scan_engine import FileNode, is_aggregate
+
+class Analyzer:
+    """
+    Cleanup suggestions and duplicate detection over a scan tree. If `metrics`
+    (a metrics.JobMetrics) is given, phase timings and hashing counts go into it.
+    A `throttle` (src/throttle.py) paces the opens and reads of the hashing
+    phase and runs it at low priority.
+    """
+    def __init__(self, metrics=None, throttle=None):
+        self.metrics = metrics
+        self.throttle = throttle
+        self.files_hashed = 0
+        self.bytes_hashed = 0
+        self.hash_errors = 0
+
+    def analyze(self, root_node: FileNode) -> Tuple[Dict[str, List[FileNode]], List[List[FileNode]]]:
+        start = time.perf_counter()
+        suggestions = self.get_cleanup_suggestions(root_node)
+        if self.metrics is not None:
+            self.metrics.add_time("suggestions", time.perf_counter() - start)
+        return suggestions, self.find_duplicates(root_node)
+
+    def get_cleanup_suggestions(self, node: FileNode) -> Dict[str, List[FileNode]]:
+        suggestions = {
+            "Abandoned Cache": [],
+            "Oversized Media/Archives": [],
+            "Installer Residue": [],
+            "Ghost Folders": []
+        }
+        
+        now = time.time()
+        
+        def traverse(n: FileNode):
+            if n.is_dir:
+                if n.size == 0 and not n.children:
+                    suggestions["Ghost Folders"].append(n)
+                
+                # Check for "Downloads" folder context for installer residue
+                is_downloads = n.name.lower() == "downloads"
+                
+                for child in n.peek_children():
+                    # Pass context if currently in Downloads or child is in Downloads
+                    traverse_recursive(child, in_downloads=is_downloads)
+            else:
+                # File checks
+                self._check_file(n, now, False, suggestions)
+
+        def traverse_recursive(n: FileNode, in_downloads: bool):
+            if n.is_dir:
+                if n.size == 0 and not n.children:
+                    suggestions["Ghost Folders"].append(n)
+                
+                current_is_downloads = in_downloads or (n.name.lower() == "downloads")
+                for child in n.peek_children():
+                    traverse_recursive(child, current_is_downloads)
+            else:
+                self._check_file(n, now, in_downloads, suggestions)
+
+        traverse_recursive(node, False)
+        return suggestions
+
+    def _check_file(self, n: FileNode, now: float, in_downloads: bool, suggestions: Dict):
+        if is_aggregate(n):
+            return # Folded small files can't be reviewed or deleted one by one
+        # Abandoned Cache
+        if n.category == "Cache":
+            if (now - n.modified) > (14 * 86400): # 14 days
+                suggestions["Abandoned Cache"].append(n)
+        
+        # Oversized Media/Archives
+        if n.category in ["Media", "Archives"]:
+            if n.size > (1024 * 1024 * 1024): # 1GB
+                suggestions["Oversized Media/Archives"].append(n)
+        
+        # Installer Residue
+        if in_downloads:
+            if n.name.lower().endswith(('.exe', '.msi', '.dmg', '.pkg')):
+                suggestions["Installer Residue"].append(n)
+
+    def find_duplicates(self, root: FileNode) -> List[List[FileNode]]:
+        size_map: Dict[int, List[FileNode]] = {}
+        
+        def traverse(n: FileNode):
+            if n.is_dir:
+                for child in n.peek_children():
+                    traverse(child)
+            elif not is_aggregate(n):
+                if n.size > 0:
+                    if n.size not in size_map:
+                        size_map[n.size] = []
+                    size_map[n.size].append(n)
+        
+        start = time.perf_counter()
+        traverse(root)
+        
+        # Filter potential duplicates (same size)
+        potential_groups = [group for group in size_map.values() if len(group) > 1]
+        grouped = time.perf_counter()
+        
+        if self.throttle is not None:
+            confirmed_duplicates = self.throttle.run(self._hash_groups, potential_groups)
+        else:
+            confirmed_duplicates = self._hash_groups(potential_groups)
+
+        if self.metrics is not None:
+            self.metrics.add_time("size_grouping", grouped - start)
+            self.metrics.add_time("hashing", time.perf_counter() - grouped)
+            self.metrics.count("size_candidates", sum(len(g) for g in potential_groups))
+            self.metrics.count("files_hashed", self.files_hashed)
+            self.metrics.count("bytes_hashed", self.bytes_hashed)
+            self.metrics.count("hash_errors", self.hash_errors)
+            self.metrics.count("duplicate_groups", len(confirmed_duplicates))
+            if self.throttle is not None:
+                self.throttle.report(self.metrics)
+        return confirmed_duplicates
+
+    def _hash_groups(self, potential_groups: List[List[FileNode]]) -> List[List[FileNode]]:
+        confirmed_duplicates = []
+        
+        for group in potential_groups:
+            hash_map = {}
+            for node in group:
+                try:
+                    partial_hash = self._get_partial_hash(node.path)
+                    if partial_hash:
+                        if partial_hash not in hash_map:
+                            hash_map[partial_hash] = []
+                        hash_map[partial_hash].append(node)
+                except Exception:
+                    continue
+            
+            for hash_group in hash_map.values():
+                if len(hash_group) > 1:
+                    confirmed_duplicates.append(hash_group)
+        return confirmed_duplicates
+
+    def _get_partial_hash(self, path: str) -> str:
+        throttle = self.throttle
+        try:
+            start = time.perf_counter() if throttle is not None else 0.0
+            with open(path, 'rb') as f:
+                if throttle is None:
+                    chunk = f.read(1024)
+                else:
+                    throttle.op(time.perf_counter() - start) # The open
+                    start = time.perf_counter()
+                    chunk = f.read(1024)
+                    throttle.read(len(chunk), time.perf_counter() - start)
+                self.files_hashed += 1
+                self.bytes_hashed += len(chunk)
+                return hashlib.md5(chunk).hexdigest()
+        except OSError:
+            self.hash_errors += 1
+            return ""
@@ -0,0 +1,345 @@
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from src.scan_engine import FileNode, Scanner
+from src.analyzer import Analyzer
+from src.metrics import recorder
+
+# asyncio API for embedding the scanner in services. Blocking scandir/stat/read
+# calls run on a bounded thread pool; batch queues are bounded too, so a slow
+# consumer pauses the scan instead of letting results pile up in memory.
+#
+#   async for batch in AsyncScanner("/data").batches():
+#       ...
+#   root = await AsyncScanner("/data").scan()
+#   suggestions, duplicates = await analyze(root)
+
+_categorizer = Scanner("") # Shares the category rules with the threaded scanner
+
+
+class ScanExecutor:
+    """
+    Thread pool for blocking file system calls with backpressure: at most
+    `max_pending` calls are queued or running per event loop, and callers
+    beyond that wait in `run()` before submitting anything.
+    """
+    def __init__(self, max_workers: int = 8, max_pending: Optional[int] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 2
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan-io")
+        self._semaphores = weakref.WeakKeyDictionary() # event loop -> asyncio.Semaphore
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        async with semaphore:
+            return await loop.run_in_executor(self._pool, func, *args)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_executor: Optional[ScanExecutor] = None
+
+def default_executor() -> ScanExecutor:
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ScanExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    return _default_executor
+
+
+@dataclass
+class ScanBatch:
+    """
+    One listed folder: its file children and what they add up to.
+    """
+    root_path: str
+    folder: FileNode
+    files: List[FileNode] = field(default_factory=list)
+    subfolders: int = 0
+    bytes: int = 0
+    categories: Dict[str, int] = field(default_factory=dict)
+
+
+def _list_dir(path: str, root_dev: Optional[int]) -> Tuple[list, Dict[str, int]]:
+    """
+    Runs on the executor: lists one folder. Returns (name, path, is_dir, size,
+    mtime, category) per entry, plus error and skip counts.
+    """
+    entries = []
+    counters = {"permission_errors": 0, "os_errors": 0, "skipped": 0}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        stat = entry.stat()
+                        entries.append((entry.name, entry.path, False, stat.st_size, stat.st_mtime,
+                                        _categorizer._categorize_file(entry.name)))
+                    elif entry.is_dir(follow_symlinks=False):
+                        if entry.name in ['$RECYCLE.BIN', 'System Volume Information']:
+                            counters["skipped"] += 1
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        if root_dev is not None and stat.st_dev != root_dev:
+                            counters["skipped"] += 1 # Another mount point
+                            continue
+                        entries.append((entry.name, entry.path, True, 0, stat.st_mtime,
+                                        _categorizer._categorize_folder(entry.path)))
+                    else:
+                        counters["skipped"] += 1
+                except PermissionError:
+                    counters["permission_errors"] += 1
+                except OSError:
+                    counters["os_errors"] += 1
+    except PermissionError:
+        counters["permission_errors"] += 1
+    except OSError:
+        counters["os_errors"] += 1
+    return entries, counters
+
+
+def _stat_root(path: str, one_file_system: bool) -> Tuple[float, Optional[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0.0, None
+    return stat.st_mtime, stat.st_dev if one_file_system else None
+
+
+class AsyncScanner:
+    """
+    Scans one root from an event loop. Up to `concurrency` folders of this root
+    are listed at once (on the shared executor), and at most `max_batches`
+    finished batches wait for the consumer before listing pauses.
+
+    With `keep_tree=False` folders are not linked into a tree and folder sizes
+    are not totalled, so memory stays flat on any volume; only the root's size
+    (the total) is filled in. Use it when the batches are all you need.
+
+    Breaking out of `batches()` only stops the scan once the generator is
+    closed, so use the scanner as an async context manager to cancel promptly:
+
+        async with AsyncScanner(path) as scanner:
+            async for batch in scanner.batches():
+                ...
+    """
+    def __init__(self, root_path: str, executor: Optional[ScanExecutor] = None, concurrency: int = 4,
+                 max_batches: int = 32, keep_tree: bool = True, one_file_system: bool = False):
+        self.root_path = root_path
+        self.executor = executor or default_executor()
+        self.concurrency = concurrency
+        self.keep_tree = keep_tree
+        self.one_file_system = one_file_system
+        self.root: Optional[FileNode] = None
+        self.counters = {"files": 0, "dirs": 0, "bytes": 0, "permission_errors": 0, "os_errors": 0, "skipped": 0}
+        self.cancelled = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_batches)
+        self._task: Optional[asyncio.Task] = None
+
+    async def batches(self) -> AsyncIterator[ScanBatch]:
+        """
+        Yields a batch per listed folder. Closing the generator cancels the scan.
+        """
+        if self._task is not None:
+            raise RuntimeError("AsyncScanner can only be iterated once")
+        if self.cancelled:
+            return
+        self._task = asyncio.ensure_future(self._run())
+        try:
+            while True:
+                batch = await self._queue.get()
+                if batch is None:
+                    break
+                yield batch
+            if not self.cancelled:
+                await self._task # Re-raises anything the scan failed with
+        finally:
+            if not self._task.done():
+                await self.cancel()
+
+    async def scan(self) -> Optional[FileNode]:
+        """
+        Runs the whole scan and returns the root (None if cancelled).
+        """
+        async for _ in self.batches():
+            pass
+        return None if self.cancelled else self.root
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.cancel()
+
+    async def cancel(self):
+        """
+        Stops listing new folders and waits for the scan task to wind down.
+        Listings already running on the executor finish in the background.
+        Does nothing once the scan has finished.
+        """
+        if self._task is not None and self._task.done():
+            return
+        self.cancelled = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        try:
+            with recorder.job("scan", path=self.root_path, api="async") as metrics:
+                try:
+                    await self._walk()
+                except asyncio.CancelledError:
+                    metrics.tags["cancelled"] = True
+                    raise
+                finally:
+                    for key, value in self.counters.items():
+                        metrics.count(key, value)
+        except BaseException:
+            # Unblock the consumer even if it isn't reading: drop what's queued, leave the end marker
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            raise
+        await self._queue.put(None)
+
+    async def _walk(self):
+        mtime, root_dev = await self.executor.run(_stat_root, self.root_path, self.one_file_system)
+        root = FileNode(name=os.path.basename(self.root_path) or self.root_path, path=self.root_path, size=0,
+                        is_dir=True, modified=mtime, category=_categorizer._categorize_folder(self.root_path),
+                        latest_modified=mtime)
+        self.root = root
+        folders: asyncio.Queue = asyncio.Queue()
+        folders.put_nowait(root)
+        listed: List[FileNode] = [] # Parents always come before their children
+
+        async def worker():
+            while True:
+                folder = await folders.get()
+                try:
+                    await self._list(folder, root_dev, folders)
+                    if self.keep_tree:
+                        listed.append(folder)
+                finally:
+                    folders.task_done()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        finished = asyncio.ensure_future(folders.join())
+        try:
+            # Workers only return by failing; surface that instead of waiting forever
+            done, _ = await asyncio.wait([finished, *workers], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not finished:
+                    task.result()
+        finally:
+            for task in [finished, *workers]:
+                task.cancel()
+            await asyncio.gather(finished, *workers, return_exceptions=True)
+
+        if self.keep_tree:
+            # Children were listed after their parents, so totals roll up in reverse order
+            for folder in reversed(listed):
+                parent = folder.parent
+                if parent is not None:
+                    parent.size += folder.size
+                    if folder.latest_modified > parent.latest_modified:
+                        parent.latest_modified = folder.latest_modified
+        else:
+            root.size = self.counters["bytes"]
+
+    async def _list(self, folder: FileNode, root_dev: Optional[int], folders: asyncio.Queue):
+        entries, errors = await self.executor.run(_list_dir, folder.path, root_dev)
+        self.counters["dirs"] += 1
+        for key, value in errors.items():
+            self.counters[key] += value
+
+        batch = ScanBatch(self.root_path, folder)
+        for name, path, is_dir, size, mtime, category in entries:
+            node = FileNode(name=name, path=path, size=size, is_dir=is_dir, modified=mtime, category=category,
+                            latest_modified=mtime)
+            if is_dir:
+                batch.subfolders += 1
+                if self.keep_tree:
+                    folder.add_child(node)
+                folders.put_nowait(node)
+                continue
+            folder.add_child(node)
+            folder.size += size
+            if mtime > folder.latest_modified:
+                folder.latest_modified = mtime
+            batch.files.append(node)
+            batch.bytes += size
+            batch.categories[category] = batch.categories.get(category, 0) + size
+        self.counters["files"] += len(batch.files)
+        self.counters["bytes"] += batch.bytes
+        # Waits here while the consumer is behind, which also holds back further listings
+        await self._queue.put(batch)
+
+
+async def scan_all(roots: List[str], executor: Optional[ScanExecutor] = None, **kwargs) -> Dict[str, Optional[FileNode]]:
+    """
+    Scans several roots concurrently on one (shared, bounded) executor.
+    """
+    executor = executor or default_executor()
+    scanners = [AsyncScanner(root, executor=executor, **kwargs) for root in roots]
+    results = await asyncio.gather(*(s.scan() for s in scanners))
+    return dict(zip(roots, results))
+
+
+async def analyze(root: FileNode, executor: Optional[ScanExecutor] = None,
+                  hash_concurrency: int = 8) -> Tuple[Dict[str, List[FileNode]], List[List[FileNode]]]:
+    """
+    Cleanup suggestions and duplicate groups, as Analyzer.analyze() returns them.
+    Tree walks run on the executor; partial hashes are read there too, at most
+    `hash_concurrency` at a time. Cancelling the awaiting task stops hashing.
+    """
+    executor = executor or default_executor()
+    with recorder.job("analysis", path=root.path, api="async") as metrics:
+        analyzer = Analyzer(metrics)
+        with metrics.timer("suggestions"):
+            suggestions = await executor.run(analyzer.get_cleanup_suggestions, root)
+        with metrics.timer("size_grouping"):
+            groups = await executor.run(_size_groups, root)
+        metrics.count("size_candidates", sum(len(g) for g in groups))
+
+        with metrics.timer("hashing"):
+            by_hash: List[Dict[str, List[FileNode]]] = [{} for _ in groups]
+            candidates = iter([(i, node) for i, group in enumerate(groups) for node in group])
+
+            async def hasher():
+                # Shared iterator: each candidate is hashed once, with a fixed number in flight
+                for i, node in candidates:
+                    partial_hash = await executor.run(analyzer._get_partial_hash, node.path)
+                    if partial_hash:
+                        by_hash[i].setdefault(partial_hash, []).append(node)
+
+            await asyncio.gather(*(hasher() for _ in range(hash_concurrency)))
+
+        duplicates = [nodes for hashes in by_hash for nodes in hashes.values() if len(nodes) > 1]
+        metrics.count("files_hashed", analyzer.files_hashed)
+        metrics.count("bytes_hashed", analyzer.bytes_hashed)
+        metrics.count("hash_errors", analyzer.hash_errors)
+        metrics.count("duplicate_groups", len(duplicates))
+    return suggestions, duplicates
+
+
+def _size_groups(root: FileNode) -> List[List[FileNode]]:
+    # Same candidates as Analyzer.find_duplicates: non-empty files sharing a size
+    size_map: Dict[int, List[FileNode]] = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.is_dir:
+            stack.extend(node.children)
+        elif node.size > 0:
+            size_map.setdefault(node.size, []).append(node)
+    return [group for group in size_map.values() if len(group) > 1]
@@ -0,0 +1,104 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Optional, Set
+from PyQt6.QtCore import QObject, pyqtSignal, QRunnable
+from src.metrics import recorder
+from src.scan_engine import is_aggregate
+
+class DeletionSignals(QObject):
+    progress = pyqtSignal(int, int)        # done, total
+    deleted = pyqtSignal(list)             # batch of FileNodes that were removed from disk
+    item_error = pyqtSignal(object, str)   # FileNode, error message
+    finished = pyqtSignal(int, int, bool)  # deleted count, failed count, cancelled
+
+class DeletionWorker(QRunnable):
+    """
+    Deletes a batch of nodes off the GUI thread with a bounded number of
+    concurrent filesystem operations.
+
+    Nodes whose category is in `permanent_categories` are removed outright instead
+    of going to the Recycle Bin, since trashing cache data only moves the bytes.
+    """
+    def __init__(self, nodes: list, permanent_categories: Optional[Set[str]] = None,
+                 max_concurrency: int = 4, batch_size: int = 200):
+        super().__init__()
+        self.nodes = nodes
+        self.permanent_categories = permanent_categories or set()
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = batch_size
+        self.signals = DeletionSignals()
+        self.stop_requested = False
+
+    def cancel(self):
+        self.stop_requested = True
+
+    def run(self):
+        with recorder.job("deletion", items=len(self.nodes)) as metrics:
+            deleted_count, failed = self._delete_all()
+            metrics.count("deleted", deleted_count)
+            metrics.count("failed", failed)
+            metrics.tags["cancelled"] = self.stop_requested
+        self.signals.finished.emit(deleted_count, failed, self.stop_requested)
+
+    def _delete_all(self):
+        total = len(self.nodes)
+        done = 0
+        failed = 0
+        deleted_count = 0
+        batch: List = []
+        last_emit = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = {}
+            queue = iter(self.nodes)
+
+            while True:
+                # Keep only a small window in flight so cancellation takes effect quickly
+                while not self.stop_requested and len(pending) < self.max_concurrency * 2:
+                    node = next(queue, None)
+                    if node is None:
+                        break
+                    pending[executor.submit(self._delete_one, node)] = node
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = pending.pop(future)
+                    done += 1
+                    error = future.exception()
+                    if error is None:
+                        batch.append(node)
+                        deleted_count += 1
+                    else:
+                        failed += 1
+                        self.signals.item_error.emit(node, str(error))
+
+                # Report in batches so thousands of items don't flood the event loop
+                now = time.monotonic()
+                if len(batch) >= self.batch_size or now - last_emit > 0.1:
+                    if batch:
+                        self.signals.deleted.emit(batch)
+                        batch = []
+                    self.signals.progress.emit(done, total)
+                    last_emit = now
+
+        if batch:
+            self.signals.deleted.emit(batch)
+        self.signals.progress.emit(done, total)
+        return deleted_count, failed
+
+    def _delete_one(self, node):
+        if is_aggregate(node):
+            raise OSError("small files grouped by the scan can't be deleted one by one; delete their folder instead")
+        if node.category in self.permanent_categories:
+            if os.path.isdir(node.path) and not os.path.islink(node.path):
+                shutil.rmtree(node.path)
+            else:
+                os.remove(node.path)
+        else:
+            import send2trash # Loaded on first use, it isn't needed to start the app
+            send2trash.send2trash(node.path)
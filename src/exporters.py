@@ -0,0 +1,234 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+from json.encoder import encode_basestring_ascii
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.scan_engine import FileNode, AggregateNode, Scanner
+from src.tree_diff import SNAP_NAME, SNAP_SIZE, SNAP_MTIME, SNAP_CHILDREN
+
+# Streaming report export. Rows are generated straight from the scan tree (or a
+# history snapshot), the suggestions and the duplicate groups, and written a
+# chunk at a time, so memory stays flat no matter how many files are exported.
+# Parquet needs pyarrow, which is optional; CSV and JSON Lines need nothing.
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+TREE_COLUMNS = ("path", "kind", "size", "category", "modified", "depth", "count")
+SUGGESTION_COLUMNS = ("suggestion", "path", "size", "category", "modified")
+DUPLICATE_COLUMNS = ("group", "size", "reclaimable", "copies", "path", "modified")
+INT_COLUMNS = {"size", "depth", "count", "group", "reclaimable", "copies"}
+FLOAT_COLUMNS = {"modified"}
+
+
+class ExportError(Exception):
+    pass
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """
+    The export format implied by a file name (".csv", ".jsonl"/".ndjson", ".parquet"), if any.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}.get(ext)
+
+
+def iter_tree(root) -> Iterator[tuple]:
+    """
+    One row per folder, file and aggregate, parents before children. `root`
+    is a FileNode tree or a snapshot (see tree_diff.to_snapshot). Only the
+    folders on the current path are held, and spilled folders are read
+    without being kept.
+    """
+    if isinstance(root, list):
+        yield from _iter_snapshot(root)
+        return
+    yield _tree_row(root, 0)
+    stack = [iter(root.peek_children())] if root.is_dir else []
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        yield _tree_row(node, len(stack))
+        if node.is_dir:
+            stack.append(iter(node.peek_children()))
+
+
+def _tree_row(node: FileNode, depth: int) -> tuple:
+    if node.is_dir:
+        return (node.path, "folder", node.size, node.category, node.modified, depth, 0)
+    if isinstance(node, AggregateNode):
+        return (node.path, "aggregate", node.size, node.category, node.modified, depth, node.count)
+    return (node.path, "file", node.size, node.category, node.modified, depth, 1)
+
+
+def _iter_snapshot(root: list) -> Iterator[tuple]:
+    # Snapshots don't store categories; they're derived from names like a scan would
+    categorizer = Scanner("")
+    path = root[SNAP_NAME]
+    yield (path, "folder", root[SNAP_SIZE], categorizer._categorize_folder(path), root[SNAP_MTIME], 0, 0)
+    stack = [(path, iter(root[SNAP_CHILDREN] or ()))]
+    while stack:
+        parent, children = stack[-1]
+        entry = next(children, None)
+        if entry is None:
+            stack.pop()
+            continue
+        path = os.path.join(parent, entry[SNAP_NAME])
+        if entry[SNAP_CHILDREN] is None:
+            yield (path, "file", entry[SNAP_SIZE], categorizer._categorize_file(entry[SNAP_NAME]),
+                   entry[SNAP_MTIME], len(stack), 1)
+        else:
+            yield (path, "folder", entry[SNAP_SIZE], categorizer._categorize_folder(path), entry[SNAP_MTIME],
+                   len(stack), 0)
+            stack.append((path, iter(entry[SNAP_CHILDREN])))
+
+
+def iter_suggestions(suggestions: Dict[str, List[FileNode]]) -> Iterator[tuple]:
+    for suggestion, nodes in suggestions.items():
+        for node in nodes:
+            yield (suggestion, node.path, node.size, node.category, node.modified)
+
+
+def iter_duplicates(duplicates: List[List[FileNode]]) -> Iterator[tuple]:
+    for group_id, group in enumerate(duplicates, 1):
+        size = group[0].size
+        for node in group:
+            yield (group_id, size, size * (len(group) - 1), len(group), node.path, node.modified)
+
+
+REPORTS = {
+    "tree": (TREE_COLUMNS, iter_tree),
+    "suggestions": (SUGGESTION_COLUMNS, iter_suggestions),
+    "duplicates": (DUPLICATE_COLUMNS, iter_duplicates),
+}
+
+
+class Exporter:
+    """
+    Writes one report ("tree", "suggestions" or "duplicates") of `source` to
+    `path` in `fmt` (from the file name if not given), `chunk_rows` rows at a
+    time. `on_progress(rows, fraction)` is called after every chunk; for the
+    tree the fraction is by bytes, since the number of nodes isn't known up
+    front. The file is written under a temporary name and only appears once
+    complete; `cancel()` stops between chunks and removes it.
+    """
+    CHUNK_ROWS = 50000
+
+    def __init__(self, report: str, source, path: str, fmt: Optional[str] = None,
+                 on_progress: Optional[Callable[[int, float], None]] = None, chunk_rows: int = CHUNK_ROWS,
+                 metrics=None):
+        if report not in REPORTS:
+            raise ExportError(f"unknown report: {report}")
+        fmt = fmt or format_for_path(path)
+        if fmt not in FORMATS:
+            raise ExportError(f"unknown export format for {path}; use one of {', '.join(FORMATS)}")
+        self.report = report
+        self.source = source
+        self.path = path
+        self.fmt = fmt
+        self.on_progress = on_progress
+        self.chunk_rows = max(1, chunk_rows)
+        self.metrics = metrics
+        self.stop_requested = False
+        self.rows = 0
+        self._done = 0.0
+        self._total = self._measure()
+
+    def cancel(self):
+        self.stop_requested = True
+
+    def _measure(self) -> float:
+        if self.report == "tree":
+            return float(self.source[SNAP_SIZE] if isinstance(self.source, list) else self.source.size)
+        if self.report == "suggestions":
+            return float(sum(len(nodes) for nodes in self.source.values()))
+        return float(sum(len(group) for group in self.source))
+
+    def export(self) -> Optional[int]:
+        """
+        Returns the number of rows written, or None if cancelled.
+        """
+        columns, rows = REPORTS[self.report]
+        write = {"csv": self._write_csv, "jsonl": self._write_jsonl, "parquet": self._write_parquet}[self.fmt]
+        start = time.perf_counter()
+        tmp = self.path + ".part"
+        try:
+            write(tmp, columns, self._chunks(rows(self.source)))
+            if self.stop_requested:
+                os.remove(tmp)
+                return None
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.add_time("export", time.perf_counter() - start)
+                self.metrics.count("rows", self.rows)
+                if self.stop_requested:
+                    self.metrics.tags["cancelled"] = True
+        if self.metrics is not None:
+            self.metrics.count("bytes_written", os.path.getsize(self.path))
+        return self.rows
+
+    def _chunks(self, rows: Iterator[tuple]) -> Iterator[List[tuple]]:
+        while not self.stop_requested:
+            chunk = list(islice(rows, self.chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+            self.rows += len(chunk)
+            if self.report == "tree":
+                self._done += sum(row[2] for row in chunk if row[1] != "folder")
+            else:
+                self._done += len(chunk)
+            if self.on_progress:
+                self.on_progress(self.rows, min(1.0, self._done / self._total) if self._total else 1.0)
+
+    def _write_csv(self, path: str, columns: Tuple[str, ...], chunks: Iterator[List[tuple]]):
+        # Names that aren't valid UTF-8 are written back as their original bytes
+        with open(path, "w", newline="", encoding="utf-8", errors="surrogateescape") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows(chunk)
+
+    def _write_jsonl(self, path: str, columns: Tuple[str, ...], chunks: Iterator[List[tuple]]):
+        # A fixed line template with only the strings JSON-encoded is several times faster than
+        # json.dumps per row; ASCII escapes keep names that aren't valid UTF-8 representable
+        template = "{" + ", ".join(f"{json.dumps(name)}: %s" for name in columns) + "}\n"
+        strings = [i for i, name in enumerate(columns) if name not in INT_COLUMNS and name not in FLOAT_COLUMNS]
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                for row in chunk:
+                    values = list(row)
+                    for i in strings:
+                        values[i] = encode_basestring_ascii(values[i])
+                    f.write(template % tuple(values))
+
+    def _write_parquet(self, path: str, columns: Tuple[str, ...], chunks: Iterator[List[tuple]]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Parquet export needs pyarrow (pip install pyarrow); CSV and JSON Lines don't")
+        schema = pa.schema([(name, pa.int64() if name in INT_COLUMNS else
+                             pa.float64() if name in FLOAT_COLUMNS else pa.string()) for name in columns])
+        # Each chunk becomes one row group
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_arrays([self._arrow_column(pa, chunk, i, schema.field(i).type)
+                                                         for i in range(len(columns))], schema=schema))
+
+    @staticmethod
+    def _arrow_column(pa, chunk: List[tuple], i: int, type_):
+        try:
+            return pa.array([row[i] for row in chunk], type=type_)
+        except UnicodeEncodeError:
+            # Names that aren't valid UTF-8 get replacement characters, as Parquet strings must be UTF-8
+            return pa.array([row[i].encode("utf-8", "surrogateescape").decode("utf-8", "replace")
+                             for row in chunk], type=type_)
@@ -1,16 +1,35 @@
+import bisect
+import datetime
+import gzip
+import hashlib
 import json
 import os
 import time
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from src.metrics import timed
+
+# Rollup tiers, finest first: (name, bucket length in seconds or None for calendar months, retention in days)
+ROLLUP_TIERS = [
+    ("daily", 86400, 400),
+    ("weekly", 7 * 86400, 5 * 365),
+    ("monthly", None, 20 * 365),
+]
 
 class HistoryManager:
-    def __init__(self, storage_file: str = "storage_history.json"):
+    def __init__(self, storage_file: str = "storage_history.json", rollup_file: str = "storage_rollups.json"):
         # Store history in a user_data folder or local relative path
         self.storage_path = os.path.join(os.getcwd(), "user_data", storage_file)
+        self.rollup_path = os.path.join(os.path.dirname(self.storage_path), rollup_file)
+        self.snapshot_dir = os.path.join(os.path.dirname(self.storage_path), "snapshots")
         self.history: Dict = {}
+        # {path: {tier: [bucket, ...]}}, each bucket a [start, min, max, last, count] list
+        self.rollups: Dict = {}
+        self.raw_retention_days = 30
         self._load_history()
+        self._load_rollups()
 
+    @timed("history.load")
     def _load_history(self):
         if os.path.exists(self.storage_path):
             try:
@@ -27,9 +46,73 @@ class HistoryManager:
         with open(self.storage_path, 'w') as f:
             json.dump(self.history, f, indent=4)
 
+    @timed("history.load_rollups")
+    def _load_rollups(self):
+        if os.path.exists(self.rollup_path):
+            try:
+                with open(self.rollup_path, 'r') as f:
+                    self.rollups = json.load(f)
+            except json.JSONDecodeError:
+                self.rollups = {}
+        else:
+            self.rollups = {}
+
+        # Seed rollups for roots recorded before tiered retention existed
+        seeded = False
+        for norm_path, entries in self.history.items():
+            if norm_path not in self.rollups:
+                for entry in entries:
+                    self._add_to_rollups(norm_path, entry["timestamp"], entry["total_size"])
+                seeded = True
+        if seeded:
+            self._save_rollups()
+
+    def _save_rollups(self):
+        os.makedirs(os.path.dirname(self.rollup_path), exist_ok=True)
+        with open(self.rollup_path, 'w') as f:
+            # Compact: rollups are kept for years and can hold many roots
+            json.dump(self.rollups, f, separators=(',', ':'))
+
+    @staticmethod
+    def _bucket_start(bucket_seconds: Optional[int], timestamp: float) -> float:
+        if bucket_seconds is None:
+            dt = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+            return datetime.datetime(dt.year, dt.month, 1, tzinfo=datetime.timezone.utc).timestamp()
+        if bucket_seconds == 7 * 86400:
+            # Align weeks to Monday (the epoch was a Thursday)
+            offset = 4 * 86400
+            return ((timestamp - offset) // bucket_seconds) * bucket_seconds + offset
+        return (timestamp // bucket_seconds) * bucket_seconds
+
+    def _add_to_rollups(self, norm_path: str, timestamp: float, total_size: int):
+        tiers = self.rollups.setdefault(norm_path, {})
+        for name, bucket_seconds, keep_days in ROLLUP_TIERS:
+            buckets = tiers.setdefault(name, [])
+            start = self._bucket_start(bucket_seconds, timestamp)
+
+            # Scans normally arrive in order, so this is almost always the last bucket
+            idx = bisect.bisect_left(buckets, [start])
+            if idx < len(buckets) and buckets[idx][0] == start:
+                bucket = buckets[idx]
+                bucket[1] = min(bucket[1], total_size)
+                bucket[2] = max(bucket[2], total_size)
+                if idx == len(buckets) - 1:
+                    bucket[3] = total_size
+                bucket[4] += 1
+            else:
+                buckets.insert(idx, [start, total_size, total_size, total_size, 1])
+
+            cutoff = timestamp - keep_days * 86400
+            drop = bisect.bisect_left(buckets, [cutoff])
+            if drop:
+                del buckets[:drop]
+
+    @timed("history.save_scan")
     def save_scan(self, path: str, root_node, retention_days: int = 30):
         """
         Saves the summary of a scan for a specific path.
+        Raw entries are kept for `retention_days`; beyond that the daily, weekly
+        and monthly rollups carry the long-term trend.
         """
         # Normalize path to ensure consistency
         norm_path = os.path.normpath(path)
@@ -61,9 +144,55 @@ class HistoryManager:
         
         # Sort by timestamp just in case
         self.history[norm_path].sort(key=lambda x: x["timestamp"])
+        self.raw_retention_days = retention_days
         
         self._save_history()
 
+        self._add_to_rollups(norm_path, timestamp, root_node.size)
+        self._save_rollups()
+
+    @timed("history.trend")
+    def get_trend(self, path: str, start: Optional[float] = None, end: Optional[float] = None,
+                  max_points: int = 400) -> Tuple[str, List[Tuple[float, int, int, int]]]:
+        """
+        Returns (resolution, points) for the total size of `path` between `start` and `end`.
+        Each point is (timestamp, min, max, last). The finest resolution that covers the
+        range with at most `max_points` points is used: raw scans, then daily, weekly
+        and monthly rollups.
+        """
+        norm_path = os.path.normpath(path)
+        now = time.time()
+        end = end if end is not None else now
+        start = start if start is not None else 0.0
+
+        raw = self.history.get(norm_path, [])
+        # Raw entries are complete back to the prune cutoff of the latest save
+        raw_covers = bool(raw) and start >= raw[-1]["timestamp"] - self.raw_retention_days * 86400
+        if raw_covers:
+            timestamps = [entry["timestamp"] for entry in raw]
+            lo = bisect.bisect_left(timestamps, start)
+            hi = bisect.bisect_right(timestamps, end)
+            if hi - lo <= max_points:
+                return "raw", [(e["timestamp"], e["total_size"], e["total_size"], e["total_size"])
+                               for e in raw[lo:hi]]
+
+        tiers = self.rollups.get(norm_path, {})
+        chosen = None
+        for name, _, keep_days in ROLLUP_TIERS:
+            buckets = tiers.get(name, [])
+            lo = bisect.bisect_left(buckets, [start])
+            hi = bisect.bisect_right(buckets, [end, float("inf")])
+            chosen = (name, buckets[lo:hi])
+            # A day of slack so a range computed just before this call still matches its tier
+            covers = start >= now - (keep_days + 1) * 86400
+            if covers and hi - lo <= max_points:
+                break
+
+        if chosen is None:
+            return "raw", []
+        name, buckets = chosen
+        return name, [(b[0], b[1], b[2], b[3]) for b in buckets]
+
     def get_insights(self, path: str, current_root_node) -> Optional[Dict]:
         """
         Compares the current scan with the most recent *previous* scan.
@@ -109,6 +238,59 @@ class HistoryManager:
             "top_changes": child_changes[:3] # Top 3 changes
         }
 
+    def _snapshot_folder(self, norm_path: str) -> str:
+        # One folder per scanned root, named by a hash of the path
+        digest = hashlib.sha1(norm_path.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.snapshot_dir, digest)
+
+    @timed("history.save_snapshot")
+    def save_snapshot(self, path: str, snapshot: list, timestamp: Optional[float] = None, keep: int = 2):
+        """
+        Stores a full tree snapshot (see tree_diff.to_snapshot) for later diffing.
+        Only the newest `keep` snapshots per root are retained, since they can be large.
+        """
+        norm_path = os.path.normpath(path)
+        folder = self._snapshot_folder(norm_path)
+        os.makedirs(folder, exist_ok=True)
+
+        timestamp = timestamp or time.time()
+        target = os.path.join(folder, f"{int(timestamp * 1000)}.json.gz")
+        tmp = target + ".tmp"
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=1) as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(tmp, target)
+
+        for old in self.list_snapshots(path)[:-keep]:
+            try:
+                os.remove(old[1])
+            except OSError:
+                pass
+
+    def list_snapshots(self, path: str) -> List[Tuple[float, str]]:
+        """
+        Returns (timestamp, file) pairs for the stored snapshots of a root, oldest first.
+        """
+        folder = self._snapshot_folder(os.path.normpath(path))
+        if not os.path.isdir(folder):
+            return []
+        snapshots = []
+        for name in os.listdir(folder):
+            if name.endswith(".json.gz"):
+                try:
+                    snapshots.append((int(name.split(".")[0]) / 1000, os.path.join(folder, name)))
+                except ValueError:
+                    continue
+        snapshots.sort()
+        return snapshots
+
+    @timed("history.load_snapshot")
+    def load_snapshot(self, snapshot_file: str) -> Optional[list]:
+        try:
+            with gzip.open(snapshot_file, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
     def format_size(self, size):
         # Helper to format size for insights text
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -0,0 +1,174 @@
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Qt-free instrumentation: per-job timers and counters, optional cProfile capture,
+# and JSON lines export. Workers record into the shared `recorder` below.
+
+# Counters reported per second of job time in the exported metrics
+RATE_COUNTERS = ("files", "dirs", "bytes", "bytes_hashed", "files_hashed", "nodes")
+
+_job_ids = itertools.count(1)
+
+class JobMetrics:
+    """
+    Timings and counters for one unit of work (a scan, an analysis, a history save...).
+    """
+    def __init__(self, name: str, tags: Optional[Dict] = None):
+        self.id = next(_job_ids)
+        self.name = name
+        self.tags = dict(tags or {})
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        self.profile_text: Optional[str] = None
+        self.thread = threading.current_thread().name
+
+    @contextmanager
+    def timer(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def add_time(self, phase: str, seconds: float):
+        self.timers[phase] = self.timers.get(phase, 0.0) + seconds
+
+    def count(self, key: str, n: float = 1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._t0
+
+    def rates(self) -> Dict[str, float]:
+        if not self.duration:
+            return {}
+        return {f"{key}_per_sec": self.counters[key] / self.duration for key in RATE_COUNTERS if key in self.counters}
+
+    def to_dict(self) -> Dict:
+        data = {
+            "job": self.name,
+            "id": self.id,
+            "started": self.started,
+            "duration": self.duration,
+            "thread": self.thread,
+            "tags": self.tags,
+            "timers": self.timers,
+            "counters": self.counters,
+            "rates": self.rates(),
+        }
+        if self.profile_text is not None:
+            data["profile"] = self.profile_text
+        return data
+
+
+class MetricsRecorder:
+    """
+    Keeps the most recent jobs, notifies listeners (from the worker's thread) and
+    optionally appends every finished job to a JSON lines file.
+
+    Set `profile` to capture a cProfile summary for each job; it slows the job
+    down noticeably, so it is off unless STORAGE_BOT_PROFILE=1 or toggled in the
+    diagnostics panel. STORAGE_BOT_METRICS=<file> turns on the JSON lines log.
+    """
+    def __init__(self, max_jobs: int = 500):
+        self._jobs = deque(maxlen=max_jobs)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[JobMetrics], None]] = []
+        self.profile = os.environ.get("STORAGE_BOT_PROFILE") == "1"
+        self.jsonl_path: Optional[str] = os.environ.get("STORAGE_BOT_METRICS") or None
+
+    @contextmanager
+    def job(self, name: str, **tags):
+        metrics = JobMetrics(name, tags)
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                profiler = None # Another profiler is already active in this thread
+        try:
+            yield metrics
+        except Exception as e:
+            metrics.tags["error"] = str(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+                metrics.profile_text = out.getvalue()
+            metrics.finish()
+            self.record(metrics)
+
+    def record(self, metrics: JobMetrics):
+        with self._lock:
+            self._jobs.append(metrics)
+            listeners = list(self._listeners)
+        if self.jsonl_path:
+            try:
+                self.export_jsonl(self.jsonl_path, [metrics])
+            except OSError:
+                pass
+        for listener in listeners:
+            listener(metrics)
+
+    def jobs(self) -> List[JobMetrics]:
+        with self._lock:
+            return list(self._jobs)
+
+    def clear(self):
+        with self._lock:
+            self._jobs.clear()
+
+    def add_listener(self, listener: Callable[[JobMetrics], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[JobMetrics], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def export_jsonl(self, path: str, jobs: Optional[List[JobMetrics]] = None) -> int:
+        """
+        Appends one JSON object per job to `path`. Returns the number written.
+        """
+        jobs = self.jobs() if jobs is None else jobs
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "a") as f:
+            for metrics in jobs:
+                f.write(json.dumps(metrics.to_dict()) + "\n")
+        return len(jobs)
+
+
+recorder = MetricsRecorder()
+
+
+def timed(name: str):
+    """
+    Decorator that records each call of the function as a job.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with recorder.job(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
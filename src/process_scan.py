@@ -0,0 +1,426 @@
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.scan_engine import FileNode, Scanner, ScanBudget
+
+# Optional process-pool scan backend. Worker processes walk whole subtrees and
+# send them back as flat arrays (one pickled blob per subtree instead of a
+# pickled object graph); the parent only stitches those arrays into FileNodes.
+
+BACKENDS = ("auto", "thread", "process")
+
+# Category codes used in the flat results; file categories first, then folder ones
+CATEGORIES = ("Unknown", "Apps", "Cache", "Media", "Development", "Archives", "Folder", "Downloads")
+_CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES)}
+
+# A worker costs an interpreter start plus the scan engine's imports, about 0.1s
+# (they start in parallel). Per entry, on a warm 190k-entry tree, a worker walks in
+# about 6 µs against 10 µs for the in-process scanner, and the parent then spends
+# 2-3.5 µs turning it into FileNodes. With two workers that saves about 4 µs per
+# entry, which repays the startup from roughly 25k entries; the threshold leaves
+# a margin. Stitching stays serial, which caps the speedup at two to three times.
+MIN_ENTRIES_FOR_PROCESSES = 50000
+SAMPLE_BUDGET = 5000     # Entries listed by the heuristic before it decides the tree is big
+MAX_SPLIT_DEPTH = 3      # How deep the parent descends looking for subtrees to hand out
+SUBTREES_PER_WORKER = 4  # Extra subtrees per worker so one huge folder doesn't leave others idle
+
+_categorizer = Scanner("") # Shares the category rules with the in-process scanner
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Where workers import src from
+
+# Flat subtree result: (names joined by "\0", parent index, size, mtime, latest mtime,
+# is_dir flags, category codes, category byte totals, counters). Entry 0 is the subtree
+# root and parents always precede their children.
+SubtreeResult = Tuple[str, array, array, array, array, bytes, bytes, Dict[str, int], Dict[str, int]]
+
+
+def _scan_subtree(path: str, root_dev: Optional[int]) -> SubtreeResult:
+    """
+    Runs in a worker process: walks `path` and returns it in flat form.
+    """
+    categorize_file = _categorizer._categorize_file
+    categorize_folder = _categorizer._categorize_folder
+    codes = _CATEGORY_CODES
+
+    names = [os.path.basename(path)]
+    parents = array("i", [-1])
+    sizes = array("q", [0])
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = 0.0
+    mtimes = array("d", [mtime])
+    is_dir = bytearray([1])
+    cats = bytearray([codes[categorize_folder(path)]])
+    totals: Dict[str, int] = {}
+    counters = {"files": 0, "dirs": 1, "bytes": 0, "permission_errors": 0, "os_errors": 0, "skipped": 0}
+
+    stack = [(0, path)]
+    while stack:
+        index, folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat()
+                            cat = categorize_file(entry.name)
+                            names.append(entry.name)
+                            parents.append(index)
+                            sizes.append(stat.st_size)
+                            mtimes.append(stat.st_mtime)
+                            is_dir.append(0)
+                            cats.append(codes[cat])
+                            totals[cat] = totals.get(cat, 0) + stat.st_size
+                            counters["files"] += 1
+                            counters["bytes"] += stat.st_size
+                        elif entry.is_dir(follow_symlinks=False):
+                            if entry.name in ['$RECYCLE.BIN', 'System Volume Information']:
+                                counters["skipped"] += 1
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            if root_dev is not None and stat.st_dev != root_dev:
+                                counters["skipped"] += 1 # Another mount point
+                                continue
+                            names.append(entry.name)
+                            parents.append(index)
+                            sizes.append(0)
+                            mtimes.append(stat.st_mtime)
+                            is_dir.append(1)
+                            cats.append(codes[categorize_folder(entry.path)])
+                            counters["dirs"] += 1
+                            stack.append((len(names) - 1, entry.path))
+                        else:
+                            counters["skipped"] += 1
+                    except PermissionError:
+                        counters["permission_errors"] += 1
+                    except OSError:
+                        counters["os_errors"] += 1
+        except PermissionError:
+            counters["permission_errors"] += 1
+        except OSError:
+            counters["os_errors"] += 1
+
+    # Children always come after their parent, so one backwards pass totals every folder
+    latest = array("d", mtimes)
+    for i in range(len(names) - 1, 0, -1):
+        p = parents[i]
+        sizes[p] += sizes[i]
+        if latest[i] > latest[p]:
+            latest[p] = latest[i]
+
+    return "\0".join(names), parents, sizes, mtimes, latest, bytes(is_dir), bytes(cats), totals, counters
+
+
+def _stitch(placeholder: FileNode, result: SubtreeResult):
+    """
+    Fills `placeholder` (the subtree root, already in the tree) from a worker's flat result.
+    """
+    names, parents, sizes, mtimes, latest, is_dir, cats, _, _ = result
+    names = names.split("\0")
+    placeholder.size = sizes[0]
+    placeholder.latest_modified = latest[0]
+    nodes = [placeholder]
+    append = nodes.append
+    sep = os.sep
+    for i in range(1, len(names)):
+        parent = nodes[parents[i]]
+        node = FileNode(names[i], parent.path + sep + names[i], sizes[i], bool(is_dir[i]), mtimes[i],
+                        CATEGORIES[cats[i]], latest[i])
+        parent.children.append(node)
+        node.parent = parent
+        append(node)
+
+
+class _WorkerPool:
+    """
+    Worker processes started as `python -m src.scan_worker`, so they import
+    the scan engine and nothing else: not the parent's main module, which
+    for the desktop app would load Qt and every view in each worker. Each
+    worker is fed one subtree at a time over its stdin by a thread here.
+    """
+    def __init__(self, workers: int):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (_PACKAGE_ROOT, env.get("PYTHONPATH")) if p)
+        self.procs = [subprocess.Popen([sys.executable, "-m", "src.scan_worker"], stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, env=env) for _ in range(workers)]
+        self.stopped = False
+
+    def scan(self, folders: List[FileNode], root_dev: Optional[int]) -> Iterator[Tuple[FileNode, SubtreeResult]]:
+        """
+        Yields (folder, result) for every folder, in the order they finish.
+        """
+        pending = deque(folders)
+        lock = threading.Lock()
+        results: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+        def feed(proc):
+            while True:
+                with lock:
+                    if self.stopped or not pending:
+                        break
+                    folder = pending.popleft()
+                try:
+                    pickle.dump((folder.path, root_dev), proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+                    proc.stdin.flush()
+                    ok, value = pickle.load(proc.stdout)
+                except (OSError, EOFError, pickle.UnpicklingError) as e:
+                    results.put((folder, False, f"scan worker exited: {e!r}"))
+                    break
+                results.put((folder, ok, value))
+            results.put(None)
+
+        for proc in self.procs:
+            threading.Thread(target=feed, args=(proc,), daemon=True).start()
+        running = len(self.procs)
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+                continue
+            folder, ok, value = item
+            if not ok and not self.stopped:
+                raise RuntimeError(f"scanning {folder.path} failed: {value}")
+            if ok:
+                yield folder, value
+
+    def close(self, kill: bool = False):
+        # Idle workers exit when their stdin closes; busy ones are killed when cancelling
+        self.stopped = True
+        for proc in self.procs:
+            if kill:
+                proc.kill()
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+        for proc in self.procs:
+            proc.wait()
+            proc.stdout.close()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def worth_processes(root_path: str, workers: int) -> bool:
+    """
+    Whether a process pool is likely to pay for its startup cost. Needs several
+    cores and a big tree: a whole volume is judged by its used inode count, a
+    folder by how quickly a breadth-first listing exhausts SAMPLE_BUDGET entries.
+    """
+    if workers < 2:
+        return False
+    if os.path.ismount(root_path) and hasattr(os, "statvfs"):
+        try:
+            st = os.statvfs(root_path)
+            if st.f_files:
+                return st.f_files - st.f_ffree >= MIN_ENTRIES_FOR_PROCESSES
+        except OSError:
+            pass
+
+    # Folders (and file systems without inode counts): the first two levels alone
+    # filling the budget means the full tree is very likely well past the threshold
+    seen = 0
+    level = [root_path]
+    for _ in range(2):
+        next_level = []
+        for folder in level:
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        seen += 1
+                        if seen >= SAMPLE_BUDGET:
+                            return True
+                        if entry.is_dir(follow_symlinks=False):
+                            next_level.append(entry.path)
+            except OSError:
+                continue
+        level = next_level
+    return False
+
+
+class ProcessScanner:
+    """
+    Drop-in alternative to Scanner that fans subtrees out to a process pool.
+    With backend "auto" it first checks worth_processes() and otherwise scans
+    in-process with a plain Scanner. Cancelling stops stitching immediately
+    and kills the workers.
+    """
+    def __init__(self, root_path: str, on_categories: Optional[Callable[[Dict[str, int]], None]] = None,
+                 category_interval: float = 0.25, metrics=None, one_file_system: bool = False,
+                 backend: str = "auto", workers: Optional[int] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown scan backend: {backend}")
+        self.root_path = root_path
+        self.on_categories = on_categories
+        self.category_interval = category_interval
+        self.metrics = metrics
+        self.one_file_system = one_file_system
+        self.backend = backend
+        self.workers = workers or default_workers()
+        self.stop_requested = False
+        self.fallback: Optional[Scanner] = None
+        self.counters = {"files": 0, "dirs": 0, "bytes": 0, "permission_errors": 0, "os_errors": 0, "skipped": 0}
+
+    @property
+    def spilled(self) -> bool:
+        return self.fallback is not None and self.fallback.spilled
+
+    def cancel(self):
+        self.stop_requested = True
+        if self.fallback is not None:
+            self.fallback.cancel()
+
+    def scan(self) -> Optional[FileNode]:
+        use_processes = self.backend == "process" or (
+            self.backend == "auto" and worth_processes(self.root_path, self.workers))
+        if not use_processes:
+            self.fallback = Scanner(self.root_path, on_categories=self.on_categories,
+                                    category_interval=self.category_interval, metrics=self.metrics,
+                                    one_file_system=self.one_file_system)
+            if self.stop_requested:
+                self.fallback.cancel()
+            if self.metrics is not None:
+                self.metrics.tags["backend"] = "thread"
+            return self.fallback.scan()
+
+        start = time.perf_counter()
+        root_dev = None
+        if self.one_file_system:
+            try:
+                root_dev = os.stat(self.root_path).st_dev
+            except OSError:
+                pass
+        root, expanded, frontier, categories = self._split(root_dev)
+        if self.on_categories and categories:
+            self.on_categories(categories)
+        split_done = time.perf_counter()
+
+        stitch_seconds = 0.0
+        if frontier and not self.stop_requested:
+            pool = _WorkerPool(min(self.workers, len(frontier)))
+            try:
+                for folder, result in pool.scan(frontier, root_dev):
+                    if self.stop_requested:
+                        break
+                    t0 = time.perf_counter()
+                    _stitch(folder, result)
+                    stitch_seconds += time.perf_counter() - t0
+                    for key, value in result[8].items():
+                        self.counters[key] += value
+                    if self.on_categories and result[7]:
+                        self.on_categories(result[7])
+            finally:
+                pool.close(kill=self.stop_requested)
+
+        # Folders the parent listed itself are totalled last, deepest first
+        for node in reversed(expanded):
+            node.size = sum(c.size for c in node.children)
+            node.latest_modified = max([node.latest_modified] + [c.latest_modified for c in node.children])
+
+        if self.metrics is not None:
+            self.metrics.tags["backend"] = "process"
+            self.metrics.tags["workers"] = self.workers
+            self.metrics.add_time("split", split_done - start)
+            self.metrics.add_time("stitch", stitch_seconds)
+            self.metrics.add_time("walk", time.perf_counter() - start)
+            self.metrics.count("subtrees", len(frontier))
+            for key, value in self.counters.items():
+                self.metrics.count(key, value)
+            if self.stop_requested:
+                self.metrics.tags["cancelled"] = True
+        return None if self.stop_requested else root
+
+    def _split(self, root_dev: Optional[int]):
+        """
+        Lists the top levels in this process until there are enough subtrees to
+        keep every worker busy. Returns the root, the folders listed here (in
+        breadth-first order), the placeholder folders left for workers and the
+        category totals of files found along the way.
+        """
+        path = self.root_path
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = 0.0
+        root = FileNode(name=os.path.basename(path) or path, path=path, size=0, is_dir=True, modified=mtime,
+                        category=_categorizer._categorize_folder(path), latest_modified=mtime)
+        expanded: List[FileNode] = []
+        categories: Dict[str, int] = {}
+        counters = self.counters
+        counters["dirs"] += 1
+        frontier = [root]
+        target = self.workers * SUBTREES_PER_WORKER
+
+        for _ in range(MAX_SPLIT_DEPTH):
+            if len(frontier) >= target or self.stop_requested:
+                break
+            next_frontier = []
+            for folder in frontier:
+                expanded.append(folder)
+                try:
+                    with os.scandir(folder.path) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_file(follow_symlinks=False):
+                                    stat = entry.stat()
+                                    cat = _categorizer._categorize_file(entry.name)
+                                    folder.add_child(FileNode(name=entry.name, path=entry.path, size=stat.st_size,
+                                                              is_dir=False, modified=stat.st_mtime, category=cat,
+                                                              latest_modified=stat.st_mtime))
+                                    categories[cat] = categories.get(cat, 0) + stat.st_size
+                                    counters["files"] += 1
+                                    counters["bytes"] += stat.st_size
+                                elif entry.is_dir(follow_symlinks=False):
+                                    if entry.name in ['$RECYCLE.BIN', 'System Volume Information']:
+                                        counters["skipped"] += 1
+                                        continue
+                                    stat = entry.stat(follow_symlinks=False)
+                                    if root_dev is not None and stat.st_dev != root_dev:
+                                        counters["skipped"] += 1
+                                        continue
+                                    child = FileNode(name=entry.name, path=entry.path, size=0, is_dir=True,
+                                                     modified=stat.st_mtime,
+                                                     category=_categorizer._categorize_folder(entry.path),
+                                                     latest_modified=stat.st_mtime)
+                                    folder.add_child(child)
+                                    next_frontier.append(child)
+                                else:
+                                    counters["skipped"] += 1
+                            except PermissionError:
+                                counters["permission_errors"] += 1
+                            except OSError:
+                                counters["os_errors"] += 1
+                except PermissionError:
+                    counters["permission_errors"] += 1
+                except OSError:
+                    counters["os_errors"] += 1
+            frontier = next_frontier
+
+        # Folders in the final frontier are counted by the workers that scan them
+        counters["dirs"] += len(expanded) - 1
+        return root, expanded, frontier, categories
+
+
+def make_scanner(root_path: str, backend: Optional[str] = None, workers: Optional[int] = None, **kwargs):
+    """
+    Returns the scanner for `backend` ("auto", "thread" or "process"; defaults to
+    $STORAGE_BOT_SCAN_BACKEND or "auto"). Memory-budgeted scans (a `budget`
+    argument, or one configured in the environment) and throttled scans (a
+    `throttle`) always run in-process.
+    """
+    backend = backend or os.environ.get("STORAGE_BOT_SCAN_BACKEND", "auto")
+    if "budget" not in kwargs:
+        kwargs["budget"] = ScanBudget.from_env()
+    if backend == "thread" or kwargs["budget"] is not None or kwargs.get("throttle") is not None:
+        return Scanner(root_path, **kwargs)
+    del kwargs["budget"]
+    kwargs.pop("throttle", None)
+    return ProcessScanner(root_path, backend=backend, workers=workers, **kwargs)
@@ -0,0 +1,268 @@
+import math
+import os
+import random
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from src.scan_engine import FileNode, Scanner
+
+# Quick-estimate mode: the top levels are listed exactly and deeper subtrees are
+# sized from a few random root-to-leaf probes (Knuth's tree-size estimator), so a
+# first picture of a huge volume takes seconds. The estimated folders are then
+# scanned exactly one by one and swapped into the tree.
+
+Z_95 = 1.96 # Two-sided 95% confidence bounds
+# Student's t for few probes (by degrees of freedom); folded into the variance so
+# estimates can still be summed up the tree and bounded with Z_95
+T_95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26,
+        10: 2.23, 15: 2.13, 20: 2.09, 30: 2.04}
+
+
+@dataclass
+class EstimatedNode(FileNode):
+    """
+    A folder whose size is (partly) estimated. `known` is the number of bytes
+    actually seen, `variance` the variance of the estimate and `pending` the
+    number of estimated folders in this subtree that haven't been scanned yet.
+    Once `pending` drops to zero the size is exact.
+    """
+    known: int = 0
+    variance: float = 0.0
+    pending: int = 0
+
+    @property
+    def low(self) -> int:
+        if not self.pending:
+            return self.size
+        return max(self.known, int(self.size - Z_95 * math.sqrt(self.variance)))
+
+    @property
+    def high(self) -> int:
+        if not self.pending:
+            return self.size
+        return int(self.size + Z_95 * math.sqrt(self.variance))
+
+
+def is_estimate(node: FileNode) -> bool:
+    return isinstance(node, EstimatedNode) and node.pending > 0
+
+
+def volume_usage(path: str) -> Tuple[int, int, int]:
+    """
+    (total, used, free) bytes of the file system holding `path`, from statvfs
+    where available. Used bytes count allocated blocks, so they can differ from
+    the sum of file sizes; they're shown for reference next to the estimate.
+    """
+    if hasattr(os, "statvfs"):
+        st = os.statvfs(path)
+        total = st.f_blocks * st.f_frsize
+        return total, total - st.f_bfree * st.f_frsize, st.f_bavail * st.f_frsize
+    usage = shutil.disk_usage(path)
+    return usage.total, usage.used, usage.free
+
+
+@dataclass
+class QuickEstimate:
+    root: FileNode
+    estimated: List[EstimatedNode] = field(default_factory=list) # Folders still to refine, largest first
+    categories: Dict[str, int] = field(default_factory=dict)    # Bytes per category seen in the listed levels
+    volume: Optional[Tuple[int, int, int]] = None                # (total, used, free) if root is a mount point
+    seconds: float = 0.0
+    listings: int = 0
+
+    def apply_refinement(self, placeholder: EstimatedNode, exact: Optional[FileNode]) -> Optional[FileNode]:
+        """
+        Swaps an estimated folder for its exact scan and corrects every ancestor.
+        Returns the folder whose children changed, or None if the placeholder is
+        no longer part of the tree.
+        """
+        parent = placeholder.parent
+        if parent is None or exact is None:
+            return None
+        exact.name = placeholder.name
+        parent.children = [exact if c is placeholder else c for c in parent.children]
+        exact.parent = parent
+        placeholder.parent = None
+
+        delta = exact.size - placeholder.size
+        for ancestor in exact.ancestors():
+            ancestor.size += delta
+            if exact.latest_modified > ancestor.latest_modified:
+                ancestor.latest_modified = exact.latest_modified
+            if isinstance(ancestor, EstimatedNode):
+                ancestor.known += exact.size - placeholder.known
+                ancestor.variance = max(0.0, ancestor.variance - placeholder.variance)
+                ancestor.pending -= 1
+                if not ancestor.pending:
+                    ancestor.variance = 0.0
+        self.estimated = [n for n in self.estimated if n is not placeholder]
+        return parent
+
+
+class QuickEstimator:
+    """
+    Lists the first `full_depth` levels below the root exactly and estimates
+    the folders at that depth with `samples` random probes each. A probe walks
+    down from the folder picking one subfolder at random at every level and
+    adds the bytes of each visited folder's files, weighted by the product of
+    the branching factors on the way down; the mean of the probes is an
+    unbiased estimate of the subtree's size. Listings are cached across probes,
+    and a folder whose probes happened to visit every subfolder is exact.
+
+    `time_budget` seconds (roughly) caps the probing: once it runs out the
+    remaining folders only get MIN_SAMPLES probes.
+    """
+    MIN_SAMPLES = 2
+    MAX_PROBE_DEPTH = 64
+
+    def __init__(self, root_path: str, full_depth: int = 2, samples: int = 8, time_budget: float = 5.0,
+                 seed: Optional[int] = None, on_categories: Optional[Callable[[Dict[str, int]], None]] = None):
+        self.root_path = root_path
+        self.full_depth = max(1, full_depth)
+        self.samples = max(self.MIN_SAMPLES, samples)
+        self.time_budget = time_budget
+        self.random = random.Random(seed)
+        self.on_categories = on_categories
+        self.stop_requested = False
+        self.listings = 0
+        self._categorizer = Scanner("") # Shares the category rules with the scanner
+
+    def cancel(self):
+        self.stop_requested = True
+
+    def estimate(self) -> Optional[QuickEstimate]:
+        start = time.perf_counter()
+        self.deadline = time.monotonic() + self.time_budget
+        result = QuickEstimate(root=None)
+        result.root = self._list_level(self.root_path, 0, result)
+        if result.root is None:
+            return None
+        if os.path.ismount(self.root_path):
+            try:
+                result.volume = volume_usage(self.root_path)
+            except OSError:
+                pass
+
+        # Probe the boundary folders, then roll the estimates up to the root
+        for node in result.estimated:
+            if self.stop_requested:
+                break
+            self._probe_folder(node)
+        self._roll_up(result.root)
+        result.estimated.sort(key=lambda n: n.size, reverse=True)
+        result.seconds = time.perf_counter() - start
+        result.listings = self.listings
+        if self.on_categories and result.categories:
+            self.on_categories(dict(result.categories))
+        return result
+
+    def _list(self, path: str) -> Tuple[List[Tuple[str, int, float, str]], List[str]]:
+        # (name, size, mtime, category) of each file, and the subfolder paths
+        self.listings += 1
+        files, folders = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            st = entry.stat()
+                            files.append((entry.name, st.st_size, st.st_mtime,
+                                          self._categorizer._categorize_file(entry.name)))
+                        elif entry.is_dir(follow_symlinks=False):
+                            if entry.name not in ('$RECYCLE.BIN', 'System Volume Information'):
+                                folders.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, folders
+
+    def _list_level(self, path: str, depth: int, result: QuickEstimate) -> Optional[FileNode]:
+        if self.stop_requested:
+            return None
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = 0.0
+        name = os.path.basename(path) or path
+        category = self._categorizer._categorize_folder(path)
+        if depth >= self.full_depth:
+            node = EstimatedNode(name=name, path=path, size=0, is_dir=True, modified=mtime, category=category,
+                                 latest_modified=mtime, pending=1)
+            result.estimated.append(node)
+            return node
+
+        node = EstimatedNode(name=name, path=path, size=0, is_dir=True, modified=mtime, category=category,
+                             latest_modified=mtime)
+        files, folders = self._list(path)
+        for file_name, size, file_mtime, cat in files:
+            node.add_child(FileNode(name=file_name, path=os.path.join(path, file_name), size=size, is_dir=False,
+                                    modified=file_mtime, category=cat, latest_modified=file_mtime))
+            node.size += size
+            result.categories[cat] = result.categories.get(cat, 0) + size
+            if file_mtime > node.latest_modified:
+                node.latest_modified = file_mtime
+        for folder in folders:
+            child = self._list_level(folder, depth + 1, result)
+            if child is not None:
+                node.add_child(child)
+        return node
+
+    def _probe_folder(self, node: EstimatedNode):
+        cache: Dict[str, Tuple[int, List[str]]] = {}
+        samples = self.samples if time.monotonic() < self.deadline else self.MIN_SAMPLES
+        estimates = []
+        for _ in range(samples):
+            if self.stop_requested:
+                break
+            estimates.append(self._probe(node.path, cache))
+        if not estimates:
+            return
+
+        node.known = sum(size for size, _ in cache.values())
+        if all(sub in cache for _, subfolders in cache.values() for sub in subfolders):
+            node.size, node.variance = node.known, 0.0 # Every folder was visited: exact
+            return
+        mean = sum(estimates) / len(estimates)
+        node.size = max(node.known, int(mean))
+        if len(estimates) < 2:
+            # Cancelled during the second probe: one probe says nothing about its spread,
+            # so the whole unseen part is left uncertain
+            node.variance = float(node.size - node.known) ** 2
+            return
+        spread = sum((e - mean) ** 2 for e in estimates) / (len(estimates) - 1)
+        t = T_95[max(k for k in T_95 if k <= len(estimates) - 1)] if len(estimates) <= 31 else Z_95
+        node.variance = spread / len(estimates) * (t / Z_95) ** 2
+
+    def _probe(self, path: str, cache: Dict[str, Tuple[int, List[str]]]) -> float:
+        total, weight = 0.0, 1
+        for _ in range(self.MAX_PROBE_DEPTH):
+            if path not in cache:
+                files, folders = self._list(path)
+                cache[path] = (sum(size for _, size, _, _ in files), folders)
+            size, folders = cache[path]
+            total += weight * size
+            if not folders:
+                break
+            weight *= len(folders)
+            path = self.random.choice(folders)
+        return total
+
+    def _roll_up(self, node: FileNode):
+        # Post-order: listed folders add up their children's estimates and variances
+        if not isinstance(node, EstimatedNode) or node.pending:
+            return
+        files_size = node.size
+        node.known = files_size
+        for child in node.children:
+            if not child.is_dir:
+                continue
+            self._roll_up(child)
+            node.size += child.size
+            if isinstance(child, EstimatedNode):
+                node.known += child.known
+                node.variance += child.variance
+                node.pending += child.pending
+            else:
+                node.known += child.size
@@ -0,0 +1,708 @@
+import dataclasses
+import heapq
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from src.scan_engine import FileNode, MultiScanner, Scanner, ScanBudget
+from src.metrics import recorder
+from src.throttle import Throttle, ThrottleConfig
+
+# Resident scan daemon: owns scan trees, keeps them fresh, and answers paginated
+# queries over a local Unix socket so several viewers share one scan.
+#
+# Protocol: one JSON object per line each way. Requests are {"op": ..., ...params};
+# replies are {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+
+PROTOCOL_VERSION = 1
+MAX_PAGE = 5000          # Largest page any query returns
+TOP_CACHE = 1000         # Largest files/folders kept per tree for "top" queries
+SORTED_CACHE = 256       # Folders whose size-sorted children are kept per tree
+
+
+def default_socket_path() -> str:
+    """
+    $STORAGE_BOT_SOCKET, else a per-user socket in the runtime (or temp) directory.
+    """
+    path = os.environ.get("STORAGE_BOT_SOCKET")
+    if path:
+        return path
+    folder = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(folder, f"storage-bot-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+
+def node_summary(node: FileNode) -> Dict:
+    return {"name": node.name, "path": node.path, "size": node.size, "is_dir": node.is_dir,
+            "category": node.category, "modified": node.modified, "children": len(node.children)}
+
+
+class DaemonError(Exception):
+    pass
+
+
+class TreeEntry:
+    """
+    One scanned root and the caches derived from it. Readers and the refresher
+    share `lock`; full rescans build a new tree off the lock and swap it in.
+    """
+    def __init__(self, key: str, roots: List[str]):
+        self.key = key
+        self.roots = roots
+        self.root: Optional[FileNode] = None
+        self.index = None
+        self.categories: Dict[str, int] = {}
+        self.state = "scanning" # scanning, ready or error
+        self.error: Optional[str] = None
+        self.scanned_at = 0.0
+        self.refreshed_at = 0.0
+        self.scan_seconds = 0.0
+        self.budget: Optional[ScanBudget] = None # Folding thresholds the tree was built with, reused by refreshes
+        self.fold_folder_size = 0
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.Lock() # One incremental refresh at a time
+        self.sorted_children: OrderedDict = OrderedDict() # id(folder) -> children largest first
+        self.child_maps: OrderedDict = OrderedDict()      # id(folder) -> {name: child}
+        self.top: Dict[str, List[FileNode]] = {}
+
+    def status(self) -> Dict:
+        return {"root": self.key, "state": self.state, "error": self.error,
+                "size": self.root.size if self.root else 0, "scanned_at": self.scanned_at,
+                "refreshed_at": self.refreshed_at, "scan_seconds": self.scan_seconds,
+                "names": self.index.name_count if self.index else 0}
+
+    def invalidate(self):
+        self.sorted_children.clear()
+        self.child_maps.clear()
+        self.top = {}
+
+
+class ScanDaemon:
+    """
+    Scans roots on request, re-checks them every `refresh_interval` seconds
+    (only folders whose mtime changed are listed again) and runs a full
+    rescan every `full_rescan_interval` seconds to pick up files that grew in
+    place, which don't touch their folder's mtime. With a `throttle`
+    (ThrottleConfig, or $STORAGE_BOT_THROTTLE_*) scans and refreshes are paced
+    and run at low priority.
+    """
+    def __init__(self, refresh_interval: float = 300, full_rescan_interval: float = 6 * 3600,
+                 record_history: bool = True, throttle: Optional[ThrottleConfig] = None):
+        self.refresh_interval = refresh_interval
+        self.full_rescan_interval = full_rescan_interval
+        self.record_history = record_history
+        self.throttle = throttle or ThrottleConfig.from_env()
+        self.trees: Dict[str, TreeEntry] = {}
+        self.lock = threading.Lock()
+        self.history_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    # --- Scanning -----------------------------------------------------------
+
+    def ensure_tree(self, roots: List[str], rescan: bool = False) -> TreeEntry:
+        roots = [os.path.abspath(r) for r in roots]
+        key = roots[0] if len(roots) == 1 else MultiScanner.combined_path(roots)
+        with self.lock:
+            entry = self.trees.get(key)
+            if entry is None:
+                entry = self.trees[key] = TreeEntry(key, roots)
+            elif not rescan or entry.state == "scanning":
+                return entry
+            entry.state = "scanning"
+        threading.Thread(target=self._scan, args=(entry,), daemon=True).start()
+        return entry
+
+    def _scan(self, entry: TreeEntry):
+        from src.process_scan import make_scanner
+        from src.search_index import NameIndex
+        start = time.perf_counter()
+        try:
+            with recorder.job("scan", path=entry.key, source="daemon") as metrics:
+                # Trees stay resident and fully indexed here, so a spill threshold doesn't apply
+                budget = ScanBudget.from_env()
+                if budget is not None:
+                    budget = dataclasses.replace(budget, spill_threshold=0)
+                    budget = None if budget == ScanBudget() else budget
+                throttle = self._throttle()
+                scanner = (MultiScanner(entry.roots, budget=budget, throttle=throttle) if len(entry.roots) > 1
+                           else make_scanner(entry.roots[0], budget=budget, throttle=throttle))
+                scanner.metrics = metrics
+                root = scanner.scan()
+                budget, fold_folder_size = self._folding(scanner, budget)
+            categories = self._totals(root)
+            index = NameIndex(root)
+        except Exception as e:
+            with entry.lock:
+                entry.state = "error" if entry.root is None else "ready"
+                entry.error = str(e)
+            return
+        with entry.lock:
+            entry.root, entry.index, entry.categories = root, index, categories
+            entry.budget, entry.fold_folder_size = budget, fold_folder_size
+            entry.invalidate()
+            entry.state, entry.error = "ready", None
+            entry.scanned_at = entry.refreshed_at = time.time()
+            entry.scan_seconds = time.perf_counter() - start
+        self._record(entry)
+
+    @staticmethod
+    def _folding(scanner, budget: Optional[ScanBudget]) -> Tuple[Optional[ScanBudget], int]:
+        """
+        The thresholds a budgeted scan ended with (memory pressure may have
+        raised them) and the size below which it folded whole subfolders.
+        """
+        if budget is None:
+            return None, 0
+        scanners = list(scanner.scanners.values()) if isinstance(scanner, MultiScanner) else [scanner]
+        if not scanners:
+            return budget, 0
+        tightest = max(scanners, key=lambda s: s.pressure) # Roots of a multi-volume scan are pressed separately
+        budget = dataclasses.replace(budget, small_file_size=tightest.small_file_size,
+                                     max_files_per_dir=tightest.max_files_per_dir)
+        return budget, tightest.fold_folder_size
+
+    def _record(self, entry: TreeEntry):
+        if not self.record_history:
+            return
+        from src.history_manager import HistoryManager
+        with self.history_lock:
+            HistoryManager().save_scan(entry.key, entry.root)
+
+    @staticmethod
+    def _totals(root: FileNode) -> Dict[str, int]:
+        """
+        Re-totals folder sizes and newest mtimes bottom-up; returns bytes per category.
+        """
+        categories: Dict[str, int] = {}
+        folders = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.is_dir:
+                folders.append(node)
+                stack.extend(node.children)
+            else:
+                categories[node.category] = categories.get(node.category, 0) + node.size
+        for folder in reversed(folders): # Parents were collected before their children
+            size, latest = 0, folder.modified
+            for child in folder.children:
+                size += child.size
+                if child.latest_modified > latest:
+                    latest = child.latest_modified
+            folder.size, folder.latest_modified = size, latest
+        return categories
+
+    def refresh(self, entry: TreeEntry) -> int:
+        """
+        Incremental rescan: lists again only folders whose mtime changed (files
+        added, removed or renamed) and scans new subfolders. Returns the number
+        of folders that changed.
+        """
+        if not entry.refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            throttle = self._throttle()
+            if throttle is None:
+                return self._refresh(entry, None)
+            return throttle.run(self._refresh, entry, throttle)
+        finally:
+            entry.refresh_lock.release()
+
+    def _throttle(self) -> Optional[Throttle]:
+        # One per job, so each job's metrics show its own pacing
+        return Throttle(self.throttle) if self.throttle is not None else None
+
+    def _refresh(self, entry: TreeEntry, throttle: Optional[Throttle]) -> int:
+        from src.search_index import NameIndex
+        root = entry.root
+        if root is None or entry.state != "ready":
+            return 0
+        changed = []
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            stack.extend(c for c in folder.children if c.is_dir)
+            start = time.perf_counter()
+            try:
+                mtime = os.stat(folder.path).st_mtime
+            except OSError:
+                continue # Gone (its parent's mtime changed too) or a synthetic multi-volume root
+            finally:
+                if throttle is not None:
+                    throttle.op(time.perf_counter() - start)
+            if mtime != folder.modified:
+                changed.append((folder, mtime))
+        if not changed:
+            entry.refreshed_at = time.time()
+            return 0
+
+        with recorder.job("refresh", path=entry.key) as metrics:
+            # Listing happens off the lock; only the swap of children lists holds it
+            updates = []
+            # With a budget, relisted folders fold their files the way the scan did
+            budget = entry.budget
+            folding = Scanner("", budget=budget)
+            folding.fold_folder_size = entry.fold_folder_size
+            for folder, mtime in changed:
+                existing = {c.name: c for c in folder.children if c.is_dir}
+                children = []
+                staging = FileNode(name=folder.name, path=folder.path, size=0, is_dir=True)
+                kept, aggregates = [], {}
+                try:
+                    with os.scandir(folder.path) as it:
+                        for e in it:
+                            try:
+                                if e.is_file(follow_symlinks=False):
+                                    start = time.perf_counter()
+                                    st = e.stat()
+                                    if throttle is not None:
+                                        throttle.op(time.perf_counter() - start)
+                                    category = folding._categorize_file(e.name)
+                                    if budget is None:
+                                        children.append(FileNode(name=e.name, path=e.path, size=st.st_size,
+                                                                 is_dir=False, modified=st.st_mtime, category=category,
+                                                                 latest_modified=st.st_mtime))
+                                    else:
+                                        folding._add_file(staging, kept, aggregates, e, st.st_size, st.st_mtime,
+                                                          category)
+                                        folding.files += 1 # Tie-breaker in the heap of kept files
+                                elif e.is_dir(follow_symlinks=False):
+                                    if e.name in ['$RECYCLE.BIN', 'System Volume Information']:
+                                        continue
+                                    child = existing.get(e.name)
+                                    if child is None:
+                                        child = Scanner(e.path, budget=budget, throttle=throttle).scan()
+                                        if child is not None and child.size < folding.fold_folder_size:
+                                            # Small folders were folded into their parent's aggregates
+                                            folding._fold_subtree(staging, aggregates, child)
+                                            continue
+                                    if child is not None:
+                                        children.append(child)
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+                if budget is not None:
+                    folding._finish_folder(staging, kept, aggregates)
+                    children.extend(staging.children)
+                updates.append((folder, mtime, children))
+            metrics.count("folders_changed", len(updates))
+            if throttle is not None:
+                throttle.report(metrics)
+
+            with entry.lock:
+                if entry.root is not root:
+                    return 0 # A full rescan replaced the tree meanwhile
+                for folder, mtime, children in updates:
+                    folder.children = children
+                    for child in children:
+                        child.parent = folder
+                    folder.modified = mtime
+                entry.categories = self._totals(root)
+                entry.invalidate()
+                entry.refreshed_at = time.time()
+            index = NameIndex(root)
+            with entry.lock:
+                if entry.root is root:
+                    entry.index = index
+        return len(updates)
+
+    def refresh_loop(self):
+        while not self.stopping.wait(self.refresh_interval):
+            for entry in list(self.trees.values()):
+                if entry.state != "ready":
+                    continue
+                if time.time() - entry.scanned_at >= self.full_rescan_interval:
+                    self.ensure_tree(entry.roots, rescan=True)
+                else:
+                    try:
+                        self.refresh(entry)
+                    except Exception as e:
+                        with entry.lock:
+                            entry.error = f"refresh failed: {e}"
+
+    # --- Queries ------------------------------------------------------------
+
+    def handle(self, request: Dict):
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise DaemonError(f"unknown op: {op}")
+        params = {k: v for k, v in request.items() if k != "op"}
+        return handler(**params)
+
+    def _lookup(self, root: str) -> TreeEntry:
+        # Multi-volume keys aren't paths, so try the key as given first
+        entry = self.trees.get(root) or self.trees.get(os.path.abspath(root))
+        if entry is None:
+            raise DaemonError(f"not scanned: {root}")
+        return entry
+
+    def _entry(self, root: str) -> TreeEntry:
+        entry = self._lookup(root)
+        if entry.root is None:
+            raise DaemonError(f"scan in progress: {root}" if entry.state == "scanning" else entry.error)
+        return entry
+
+    def _find(self, entry: TreeEntry, path: Optional[str]) -> FileNode:
+        node = entry.root
+        if not path or path == node.path:
+            return node
+        sep = os.sep
+        while node.path != path:
+            if path.startswith(node.path.rstrip(sep) + sep):
+                name = path[len(node.path.rstrip(sep)) + 1:].split(sep, 1)[0]
+                child = self._child_map(entry, node).get(name)
+            else:
+                # Multi-volume root: children are named by their absolute paths
+                child = next((c for c in node.children
+                              if path == c.path or path.startswith(c.path.rstrip(sep) + sep)), None)
+            if child is None:
+                raise DaemonError(f"no such path in {entry.key}: {path}")
+            node = child
+        return node
+
+    @staticmethod
+    def _cached(cache: OrderedDict, node: FileNode, build):
+        value = cache.get(id(node))
+        if value is None:
+            value = cache[id(node)] = build(node)
+            while len(cache) > SORTED_CACHE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(id(node))
+        return value
+
+    def _child_map(self, entry: TreeEntry, node: FileNode) -> Dict[str, FileNode]:
+        return self._cached(entry.child_maps, node, lambda n: {c.name: c for c in n.children})
+
+    @staticmethod
+    def _page(items, offset: int, limit: int):
+        limit = max(0, min(int(limit), MAX_PAGE))
+        offset = max(0, int(offset))
+        return [node_summary(n) for n in items[offset:offset + limit]]
+
+    def op_ping(self):
+        return {"version": PROTOCOL_VERSION, "pid": os.getpid(), "trees": len(self.trees)}
+
+    def op_trees(self):
+        return [entry.status() for entry in list(self.trees.values())]
+
+    def op_scan(self, root: Optional[str] = None, roots: Optional[List[str]] = None, rescan: bool = False):
+        return self.ensure_tree(roots or [root], rescan=rescan).status()
+
+    def op_status(self, root: str):
+        return self._lookup(root).status()
+
+    def op_node(self, root: str, path: Optional[str] = None):
+        entry = self._entry(root)
+        with entry.lock:
+            return node_summary(self._find(entry, path))
+
+    def op_children(self, root: str, path: Optional[str] = None, offset: int = 0, limit: int = 500):
+        entry = self._entry(root)
+        with entry.lock:
+            node = self._find(entry, path)
+            children = self._cached(entry.sorted_children, node,
+                                    lambda n: sorted(n.children, key=lambda c: c.size, reverse=True))
+            return {"total": len(children), "size": node.size, "items": self._page(children, offset, limit)}
+
+    def op_top(self, root: str, kind: str = "files", offset: int = 0, limit: int = 50):
+        if kind not in ("files", "folders"):
+            raise DaemonError(f"unknown kind: {kind}")
+        entry = self._entry(root)
+        with entry.lock:
+            top = entry.top.get(kind)
+            if top is None:
+                def walk():
+                    stack = [entry.root]
+                    while stack:
+                        node = stack.pop()
+                        if node.is_dir:
+                            stack.extend(node.children)
+                            if kind == "folders" and node is not entry.root:
+                                yield node
+                        elif kind == "files":
+                            yield node
+                top = entry.top[kind] = heapq.nlargest(TOP_CACHE, walk(), key=lambda n: n.size)
+            return {"total": len(top), "items": self._page(top, offset, limit)}
+
+    def op_categories(self, root: str):
+        entry = self._entry(root)
+        with entry.lock:
+            return dict(entry.categories)
+
+    def op_search(self, root: str, query: str, offset: int = 0, limit: int = 50):
+        entry = self._entry(root)
+        with entry.lock:
+            if entry.index is None:
+                return {"total": 0, "items": []}
+            nodes = entry.index.search(query, limit=min(int(offset) + int(limit), MAX_PAGE))
+            return {"total": entry.index.count(query), "items": self._page(nodes, offset, limit)}
+
+    def op_refresh(self, root: str):
+        entry = self._entry(root)
+        return {"changed": self.refresh(entry), **entry.status()}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.scan_daemon
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("op") == "shutdown":
+                    reply = {"ok": True, "result": None}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    reply = {"ok": True, "result": daemon.handle(request)}
+            except (DaemonError, TypeError, ValueError) as e:
+                reply = {"ok": False, "error": str(e)}
+            except Exception as e:
+                reply = {"ok": False, "error": f"internal error: {e}"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: Optional[str] = None, roots: Optional[List[str]] = None, socket_mode: int = 0o660,
+          **daemon_options):
+    """
+    Runs the daemon in the foreground until a client sends "shutdown".
+    """
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        client = DaemonClient(socket_path, timeout=2)
+        try:
+            client.call("ping")
+        except OSError:
+            os.unlink(socket_path) # Left behind by a daemon that didn't exit cleanly
+        else:
+            raise DaemonError(f"a daemon is already listening on {socket_path}")
+        finally:
+            client.close()
+
+    daemon = ScanDaemon(**daemon_options)
+    # Created with the final permissions, so there's no moment when others could connect
+    old_umask = os.umask(0o777 & ~socket_mode)
+    try:
+        server = _Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.scan_daemon = daemon
+    for root in roots or []:
+        daemon.ensure_tree([root])
+    threading.Thread(target=daemon.refresh_loop, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        daemon.stopping.set()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class DaemonClient:
+    """
+    Blocking client for the daemon. One connection, reused across calls.
+    """
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 10.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock, self._file = sock, sock.makefile("rwb")
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def call(self, op: str, **params):
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                self._file.write(json.dumps({"op": op, **params}).encode() + b"\n")
+                self._file.flush()
+                line = self._file.readline()
+            except OSError:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise DaemonError("daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error") or "request failed")
+        return reply["result"]
+
+
+def _node_from(summary: Dict, parent: Optional[FileNode] = None) -> FileNode:
+    node = FileNode(name=summary["name"], path=summary["path"], size=summary["size"], is_dir=summary["is_dir"],
+                    modified=summary["modified"], category=summary["category"], latest_modified=summary["modified"])
+    if parent is not None:
+        parent.add_child(node)
+    return node
+
+
+class RemoteTree:
+    """
+    A FileNode tree mirrored from the daemon one folder at a time. Folders
+    fetch their `page_size` largest children when first opened; the rest are
+    summarised by a "more items" placeholder that loads the next page.
+    Loading is split into a fetch that only talks to the daemon, which can
+    run on any thread, and a step that changes the tree, which must run on
+    the thread the views read it from.
+    """
+    def __init__(self, client: DaemonClient, root: str, page_size: int = 500):
+        self.client = client
+        self.key = root
+        self.page_size = page_size
+        self.root = _node_from(client.call("node", root=root))
+        self.loaded: Dict[int, int] = {} # id(folder) -> children fetched so far
+        self.more: Dict[int, FileNode] = {} # id(placeholder) -> folder it belongs to
+
+    def needs_page(self, folder: FileNode) -> bool:
+        return folder.is_dir and id(folder) not in self.loaded
+
+    def ensure_children(self, folder: FileNode):
+        if self.needs_page(folder):
+            self.load_more(folder)
+
+    def is_more(self, node: FileNode) -> bool:
+        return id(node) in self.more
+
+    def load_more(self, folder: FileNode):
+        """
+        Fetches the next page of `folder`'s children (replacing its placeholder).
+        """
+        self.add_page(folder, *self.fetch_page(folder))
+
+    def fetch_page(self, folder: FileNode) -> Tuple[int, Dict]:
+        """
+        The network half of load_more(), safe to run off the GUI thread:
+        returns the offset asked for and the daemon's page.
+        """
+        offset = self.loaded.get(id(folder), 0)
+        return offset, self.client.call("children", root=self.key, path=folder.path, offset=offset,
+                                        limit=self.page_size)
+
+    def add_page(self, folder: FileNode, offset: int, page: Dict):
+        """
+        The tree half of load_more(). A page fetched for an offset that has
+        been loaded since is dropped.
+        """
+        if self.loaded.get(id(folder), 0) != offset:
+            return
+        stale = [c for c in folder.children if id(c) in self.more]
+        if stale:
+            folder.children = [c for c in folder.children if id(c) not in self.more]
+            for placeholder in stale:
+                del self.more[id(placeholder)]
+        for item in page["items"]:
+            _node_from(item, folder)
+        offset += len(page["items"])
+        self.loaded[id(folder)] = offset
+        remaining = page["total"] - offset
+        if remaining > 0:
+            rest = folder.size - sum(c.size for c in folder.children)
+            placeholder = FileNode(name=f"{remaining:,} more items (click to load)", path=folder.path, size=max(0, rest),
+                                   is_dir=False, category="Unknown")
+            folder.add_child(placeholder)
+            self.more[id(placeholder)] = folder
+
+    def more_parent(self, placeholder: FileNode) -> Optional[FileNode]:
+        return self.more.get(id(placeholder))
+
+    def resolve(self, path: str) -> Optional[FileNode]:
+        """
+        The mirrored node for `path`, loading each folder on the way (and
+        adding the node itself if it isn't in the pages fetched so far).
+        """
+        return self.resolve_route(self.fetch_route(path))
+
+    def fetch_route(self, path: str) -> Optional[List[Tuple[Dict, Dict]]]:
+        """
+        The network half of resolve(), safe to run off the GUI thread: for
+        each folder on the way to `path`, its first page of children and the
+        summary of the next node. None if the daemon doesn't know `path`.
+        """
+        sep = os.sep
+        if path == self.root.path:
+            return []
+        base = self.root.path.rstrip(sep)
+        if not path.startswith(base + sep):
+            return None
+        route = []
+        folder = self.root.path
+        for part in path[len(base) + 1:].split(sep):
+            target = os.path.join(folder, part)
+            try:
+                page = self.client.call("children", root=self.key, path=folder, offset=0, limit=self.page_size)
+                summary = self.client.call("node", root=self.key, path=target)
+            except DaemonError:
+                return None
+            route.append((page, summary))
+            folder = target
+        return route
+
+    def resolve_route(self, route: Optional[List[Tuple[Dict, Dict]]]) -> Optional[FileNode]:
+        """
+        The tree half of resolve(): mirrors the folders fetch_route() returned.
+        """
+        if route is None:
+            return None
+        node = self.root
+        for page, summary in route:
+            if id(node) not in self.loaded:
+                self.add_page(node, 0, page)
+            child = next((c for c in node.children if not self.is_more(c) and c.path == summary["path"]), None)
+            if child is None:
+                # Beyond the loaded pages: add the node on the way directly
+                child = _node_from(summary, node)
+            node = child
+        return node
+
+
+class RemoteIndex:
+    """
+    Search box adapter: results are detached nodes; resolve them with
+    RemoteTree.resolve() before navigating.
+    """
+    blocking = True # Every search is a round trip to the daemon; the search box runs it off the GUI thread
+
+    def __init__(self, client: DaemonClient, root: str, status: Dict):
+        self.client = client
+        self.key = root
+        self.name_count = status.get("names", 0)
+        self.build_seconds = status.get("scan_seconds", 0.0)
+
+    def memory_bytes(self) -> int:
+        return 0 # Held by the daemon
+
+    def apply_removal(self, removal):
+        pass # The daemon notices deletions on its next refresh
+
+    def search(self, query: str, limit: int = 50) -> List[FileNode]:
+        if not query.strip():
+            return []
+        try:
+            result = self.client.call("search", root=self.key, query=query, limit=limit)
+        except (OSError, DaemonError):
+            return []
+        return [_node_from(item) for item in result["items"]]
@@ -0,0 +1,740 @@
+import heapq
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Dict, Tuple
+
+# Qt-free scan tree and scanner, shared by the GUI workers (src/scanner.py) and the CLI.
+
+@dataclass
+class FileNode:
+    name: str
+    path: str
+    size: int
+    is_dir: bool
+    modified: float = 0.0
+    category: str = "Unknown"
+    # Newest mtime anywhere in this subtree, used to skip unchanged subtrees when diffing
+    latest_modified: float = 0.0
+    children: List['FileNode'] = field(default_factory=list)
+    parent: Optional['FileNode'] = None
+
+    def add_child(self, child: 'FileNode'):
+        self.children.append(child)
+        child.parent = self
+
+    def peek_children(self) -> List['FileNode']:
+        # Folders spilled to disk (src/spill_store.py) read these without keeping them
+        return self.children
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def detach(self) -> 'TreeRemoval':
+        """
+        Removes this node from the tree and subtracts its size from every ancestor.
+        """
+        return remove_nodes([self])
+
+@dataclass
+class AggregateNode(FileNode):
+    """
+    Small files of one category in one folder, folded into a single node by a
+    memory-budgeted scan. `size` is their total, `modified` the newest mtime
+    and `oldest_modified` the oldest. It has no file of its own on disk, so it
+    can't be opened, hashed or deleted.
+    """
+    count: int = 0
+    oldest_modified: float = 0.0
+
+def is_aggregate(node: FileNode) -> bool:
+    return isinstance(node, AggregateNode)
+
+def parse_size(text: str) -> int:
+    """
+    Parses sizes like "512M", "64K" or "2G" (binary units) into bytes.
+    """
+    text = text.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+@dataclass
+class ScanBudget:
+    """
+    Limits on how much of a scan is kept as individual nodes. Files smaller than
+    `small_file_size`, and the smallest files of a folder beyond its
+    `max_files_per_dir` largest ones, are folded into one AggregateNode per
+    folder and category. With `max_memory` (bytes, approximate) the thresholds
+    are raised step by step whenever the tree outgrows it, and already scanned
+    parts are compacted again, folding small subfolders as well. Folder sizes
+    always stay exact. Past `spill_threshold` bytes, completed subtrees are
+    written to disk instead (see src/spill_store.py), so nothing is lost.
+    0 disables a limit.
+    """
+    small_file_size: int = 0
+    max_files_per_dir: int = 0
+    max_memory: int = 0
+    spill_threshold: int = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['ScanBudget']:
+        # STORAGE_BOT_MEMORY_BUDGET, STORAGE_BOT_SMALL_FILE_SIZE, STORAGE_BOT_MAX_FILES_PER_DIR
+        # and STORAGE_BOT_SPILL_THRESHOLD
+        env = os.environ
+        budget = cls(small_file_size=parse_size(env.get("STORAGE_BOT_SMALL_FILE_SIZE", "0")),
+                     max_files_per_dir=int(env.get("STORAGE_BOT_MAX_FILES_PER_DIR", "0")),
+                     max_memory=parse_size(env.get("STORAGE_BOT_MEMORY_BUDGET", "0")),
+                     spill_threshold=parse_size(env.get("STORAGE_BOT_SPILL_THRESHOLD", "0")))
+        if budget.small_file_size or budget.max_files_per_dir or budget.max_memory or budget.spill_threshold:
+            return budget
+        return None
+
+@dataclass
+class TreeRemoval:
+    """
+    What changed when nodes were removed from a scan tree, so views can update
+    only the parts that are affected instead of rebuilding from the root.
+    """
+    removed: List[FileNode] = field(default_factory=list)  # Top-most removed nodes
+    removed_ids: set = field(default_factory=set)          # id() of every node in the removed subtrees
+    affected_ids: set = field(default_factory=set)         # id() of surviving ancestors whose size changed
+    category_deltas: Dict[str, int] = field(default_factory=dict)  # Negative byte deltas per file category
+    bytes_removed: int = 0
+
+    def is_removed(self, node: FileNode) -> bool:
+        return id(node) in self.removed_ids
+
+    def is_affected(self, node: FileNode) -> bool:
+        return id(node) in self.affected_ids
+
+    def prune_suggestions(self, suggestions: Dict[str, List[FileNode]]) -> Dict[str, List[FileNode]]:
+        return {cat: [n for n in nodes if id(n) not in self.removed_ids] for cat, nodes in suggestions.items()}
+
+    def prune_duplicates(self, duplicates: List[List[FileNode]]) -> List[List[FileNode]]:
+        pruned = []
+        for group in duplicates:
+            remaining = [n for n in group if id(n) not in self.removed_ids]
+            if len(remaining) > 1:
+                pruned.append(remaining)
+        return pruned
+
+def _tree_nodes(nodes: List[FileNode]) -> List[FileNode]:
+    # Nodes read from a spilled folder without keeping them (peek_children) are copies that
+    # hang off copies of their folders, whose sizes go stale once something below them is
+    # removed. Swap in the nodes the tree holds by following their names down from the
+    # root; names are unique within a folder. Only paths through spilled folders are looked at.
+    from src.spill_store import SpilledNode
+    by_name: Dict[int, Dict[Tuple[str, bool], FileNode]] = {}
+
+    def resolve(node: FileNode) -> FileNode:
+        chain = [node]
+        while chain[-1].parent is not None:
+            chain.append(chain[-1].parent)
+        real = chain.pop()
+        while chain:
+            step = chain.pop()
+            children = by_name.get(id(real))
+            if children is None:
+                children = by_name[id(real)] = {(c.name, c.is_dir): c for c in real.children}
+            match = children.get((step.name, step.is_dir))
+            if match is None:
+                return node # No longer in the tree
+            real = match
+        return real
+
+    return [resolve(n) if any(isinstance(a, SpilledNode) for a in n.ancestors()) else n for n in nodes]
+
+def remove_nodes(nodes: List[FileNode]) -> TreeRemoval:
+    """
+    Detaches nodes (e.g. after they were deleted from disk) and subtracts their sizes
+    up the parent chain. Cost is proportional to the removed subtrees and their
+    ancestor chains, not to the size of the whole tree.
+    """
+    result = TreeRemoval()
+    resolved = _tree_nodes(nodes)
+    # Copies read from spilled folders are gone too, for lists that still hold them
+    result.removed_ids.update(id(n) for n, r in zip(nodes, resolved) if n is not r)
+    nodes = resolved
+    requested = {id(n) for n in nodes}
+
+    # Skip nodes already covered by a removed ancestor
+    for node in nodes:
+        if not any(id(a) in requested for a in node.ancestors()):
+            result.removed.append(node)
+
+    by_parent: Dict[int, Tuple[FileNode, List[FileNode]]] = {}
+    for node in result.removed:
+        result.bytes_removed += node.size
+
+        # Collect ids and per-category bytes of the whole removed subtree
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            result.removed_ids.add(id(n))
+            if n.is_dir:
+                stack.extend(n.peek_children())
+            else:
+                result.category_deltas[n.category] = result.category_deltas.get(n.category, 0) - n.size
+
+        parent = node.parent
+        if parent is None:
+            continue
+        by_parent.setdefault(id(parent), (parent, []))[1].append(node)
+        for ancestor in node.ancestors():
+            ancestor.size -= node.size
+            result.affected_ids.add(id(ancestor))
+
+    # One pass over each parent's children, however many of them were removed
+    for parent, removed in by_parent.values():
+        ids = {id(n) for n in removed}
+        parent.children = [c for c in parent.children if id(c) not in ids]
+    for node in result.removed:
+        node.parent = None
+
+    result.affected_ids -= result.removed_ids
+    return result
+
+class Scanner:
+    """
+    Walks a directory tree into FileNodes. Plain callbacks report progress:
+    `on_categories` receives bytes per file category found since the previous
+    call (at most every `category_interval` seconds, plus once at the end).
+    If `metrics` (a metrics.JobMetrics) is given, walk time and entry counts
+    are added to it when the scan ends. With `one_file_system`, folders on a
+    different device than the root (other mounts) are skipped, like `du -x`.
+    A `budget` (ScanBudget) folds small files into aggregate nodes. A
+    `throttle` (src/throttle.py) paces the scandir and stat calls and runs the
+    walk at low priority.
+    """
+    NODE_BYTES = 450 # Rough cost of one FileNode with its name and path strings
+    MAX_PRESSURE = 12
+
+    def __init__(self, root_path: str, on_categories: Optional[Callable[[Dict[str, int]], None]] = None,
+                 category_interval: float = 0.25, metrics=None, one_file_system: bool = False,
+                 budget: Optional[ScanBudget] = None, throttle=None):
+        self.root_path = root_path
+        self.budget = budget
+        self.throttle = throttle
+        if budget is not None:
+            self.small_file_size = budget.small_file_size
+            self.max_files_per_dir = budget.max_files_per_dir
+            self.max_nodes = budget.max_memory // self.NODE_BYTES
+            self.spill_nodes = budget.spill_threshold // self.NODE_BYTES
+        self.spill_store = None # Created on the first spill
+        self._next_spill = 0
+        self._stub_type = () # SpilledNode once something was spilled; compaction leaves stubs alone
+        self.fold_folder_size = 0 # Subfolders below this are folded too, once memory runs short
+        self.pressure = 0
+        self.nodes = 0 # Nodes currently in the tree (kept up to date with a budget)
+        self.folded = 0
+        self._open: List[FileNode] = [] # Folders still being listed, outermost first
+        self.on_categories = on_categories
+        self.category_interval = category_interval
+        self.metrics = metrics
+        self.one_file_system = one_file_system
+        self.root_dev = None
+        self.stop_requested = False
+        self.pending_categories: Dict[str, int] = {}
+        self.last_category_emit = 0.0
+        # Plain counters in the hot loop; copied into `metrics` at the end
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.permission_errors = 0
+        self.os_errors = 0
+        self.skipped = 0 # Symlinks, special files and excluded system folders
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Whether part of the tree was moved to disk, so callers needn't walk it to find out.
+        """
+        return self.spill_store is not None and self.spill_store.records > 0
+
+    def cancel(self):
+        self.stop_requested = True
+
+    def scan(self) -> Optional[FileNode]:
+        start = time.perf_counter()
+        if self.one_file_system:
+            try:
+                self.root_dev = os.stat(self.root_path).st_dev
+            except OSError:
+                self.root_dev = None
+        if self.throttle is not None:
+            root_node = self.throttle.run(self._scan_recursive, self.root_path)
+        else:
+            root_node = self._scan_recursive(self.root_path)
+        self._emit_categories()
+        if self.metrics is not None:
+            self.metrics.add_time("walk", time.perf_counter() - start)
+            for key in ("files", "dirs", "bytes", "permission_errors", "os_errors", "skipped"):
+                self.metrics.count(key, getattr(self, key))
+            if self.budget is not None:
+                self.metrics.count("nodes", self.nodes)
+                self.metrics.count("folded_files", self.folded)
+                if self.spill_store is not None:
+                    self.metrics.count("spilled_nodes", self.spill_store.spilled_nodes)
+                    self.metrics.count("spill_bytes", self.spill_store.bytes_written)
+                self.metrics.tags["budget_pressure"] = self.pressure
+            if self.throttle is not None:
+                self.throttle.report(self.metrics)
+            if self.stop_requested:
+                self.metrics.tags["cancelled"] = True
+        return root_node
+
+    def _scan_recursive(self, path: str) -> FileNode:
+        if self.stop_requested:
+            return None
+        
+        name = os.path.basename(path) or path
+        throttle = self.throttle
+        # Directory modified time isn't critical for our logic, but we can capture it
+        start = time.perf_counter() if throttle is not None else 0.0
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = 0.0
+        if throttle is not None:
+            throttle.op(time.perf_counter() - start)
+            
+        node = FileNode(name=name, path=path, size=0, is_dir=True, modified=mtime, category=self._categorize_folder(path),
+                        latest_modified=mtime)
+        self.dirs += 1
+        self.nodes += 1
+        budget = self.budget
+        if budget is not None:
+            kept: List[Tuple[int, int, FileNode]] = [] # Min-heap of the folder's largest files
+            aggregates: Dict[str, AggregateNode] = {}
+            self._open.append(node)
+
+        try:
+            start = time.perf_counter() if throttle is not None else 0.0
+            with os.scandir(path) as it:
+                if throttle is not None:
+                    throttle.op(time.perf_counter() - start)
+                for entry in it:
+                    if self.stop_requested:
+                        break
+                    
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            if throttle is None:
+                                stat = entry.stat()
+                            else:
+                                start = time.perf_counter()
+                                stat = entry.stat()
+                                throttle.op(time.perf_counter() - start)
+                            size = stat.st_size
+                            mtime = stat.st_mtime
+                            cat = self._categorize_file(entry.name)
+                            if budget is None:
+                                child = FileNode(name=entry.name, path=entry.path, size=size, is_dir=False, modified=mtime,
+                                                 category=cat, latest_modified=mtime)
+                                node.add_child(child)
+                            else:
+                                self._add_file(node, kept, aggregates, entry, size, mtime, cat)
+                            node.size += size
+                            self.files += 1
+                            self.bytes += size
+                            self.pending_categories[cat] = self.pending_categories.get(cat, 0) + size
+                            if mtime > node.latest_modified:
+                                node.latest_modified = mtime
+                        elif entry.is_dir(follow_symlinks=False):
+                            if entry.name in ['$RECYCLE.BIN', 'System Volume Information']:
+                                self.skipped += 1
+                                continue
+                            if self.root_dev is not None:
+                                if throttle is not None:
+                                    throttle.op()
+                                if entry.stat(follow_symlinks=False).st_dev != self.root_dev:
+                                    self.skipped += 1 # Another mount point
+                                    continue
+
+                            child = self._scan_recursive(entry.path)
+                            if child:
+                                node.add_child(child)
+                                node.size += child.size
+                                if child.latest_modified > node.latest_modified:
+                                    node.latest_modified = child.latest_modified
+                        else:
+                            self.skipped += 1
+                    except PermissionError:
+                        self.permission_errors += 1
+                        continue 
+                    except OSError:
+                        self.os_errors += 1
+                        continue
+        except PermissionError:
+            self.permission_errors += 1
+
+        if budget is not None:
+            self._finish_folder(node, kept, aggregates)
+            if self.pressure:
+                self._compact(node, recursive=False) # Subfolders were compacted when they finished
+            if self.spill_nodes and self.nodes > max(self.spill_nodes, self._next_spill):
+                self._spill()
+            if self.max_nodes and self.nodes > self.max_nodes:
+                self._relieve_pressure()
+            self._open.pop()
+        if self.on_categories and time.monotonic() - self.last_category_emit > self.category_interval:
+            self._emit_categories()
+        return node
+
+    def _add_file(self, node: FileNode, kept: list, aggregates: Dict[str, AggregateNode], entry,
+                  size: int, mtime: float, cat: str):
+        if size < self.small_file_size:
+            self._fold(node, aggregates, cat, size, mtime, mtime, 1)
+            return
+        child = FileNode(name=entry.name, path=entry.path, size=size, is_dir=False, modified=mtime, category=cat,
+                         latest_modified=mtime)
+        self.nodes += 1
+        if not self.max_files_per_dir:
+            node.add_child(child)
+            return
+        heapq.heappush(kept, (size, self.files, child))
+        if len(kept) > self.max_files_per_dir:
+            _, _, smallest = heapq.heappop(kept)
+            self.nodes -= 1
+            self._fold(node, aggregates, smallest.category, smallest.size, smallest.modified, smallest.modified, 1)
+
+    def _fold(self, folder: FileNode, aggregates: Dict[str, AggregateNode], cat: str, size: int,
+              newest: float, oldest: float, count: int):
+        agg = aggregates.get(cat)
+        if agg is None:
+            name = f"[Small {cat} files]"
+            agg = AggregateNode(name=name, path=os.path.join(folder.path, name), size=0, is_dir=False,
+                                modified=newest, category=cat, latest_modified=newest, oldest_modified=oldest)
+            agg.parent = folder
+            aggregates[cat] = agg
+            self.nodes += 1
+        agg.size += size
+        agg.count += count
+        self.folded += count
+        if newest > agg.modified:
+            agg.modified = agg.latest_modified = newest
+        if oldest < agg.oldest_modified:
+            agg.oldest_modified = oldest
+
+    def _finish_folder(self, node: FileNode, kept: list, aggregates: Dict[str, AggregateNode]):
+        # Aggregates left by compacting this folder while it was still open absorb the new ones
+        if any(isinstance(c, AggregateNode) for c in node.children):
+            for agg in [c for c in node.children if isinstance(c, AggregateNode)]:
+                other = aggregates.get(agg.category)
+                if other is not None:
+                    agg.size += other.size
+                    agg.count += other.count
+                    agg.modified = agg.latest_modified = max(agg.modified, other.modified)
+                    agg.oldest_modified = min(agg.oldest_modified, other.oldest_modified)
+                    self.nodes -= 1
+                aggregates[agg.category] = agg
+            node.children = [c for c in node.children if not isinstance(c, AggregateNode)]
+        # Thresholds may have been raised while this folder was listed
+        kept.sort(reverse=True)
+        for i, (size, _, child) in enumerate(kept):
+            if size < self.small_file_size or (self.max_files_per_dir and i >= self.max_files_per_dir):
+                self.nodes -= 1
+                self._fold(node, aggregates, child.category, size, child.modified, child.modified, 1)
+            else:
+                node.add_child(child)
+        for agg in aggregates.values():
+            node.children.append(agg)
+
+    def _spill(self):
+        """
+        Moves every completed subfolder of the folders still being listed to
+        the spill store, leaving stubs that know their size.
+        """
+        from src.spill_store import SpillStore, SpilledNode
+        if self.spill_store is None:
+            self.spill_store = SpillStore()
+            self._stub_type = SpilledNode
+        for folder in self._open:
+            children = folder.children
+            for i, child in enumerate(children):
+                if child.is_dir and not isinstance(child, SpilledNode):
+                    children[i], count = self.spill_store.spill(child)
+                    child.parent = None
+                    self.nodes -= count - 1
+        # What is left (open folders, their files and stubs) can't be spilled;
+        # wait for a quarter threshold of new nodes before walking it again
+        self._next_spill = self.nodes + self.spill_nodes // 4
+
+    def _relieve_pressure(self):
+        """
+        Raises the folding thresholds and compacts every folder scanned so far
+        until the tree is comfortably back under the budget.
+        """
+        while self.nodes > self.max_nodes * 0.75 and self.pressure < self.MAX_PRESSURE:
+            self.pressure += 1
+            self.small_file_size = max(self.small_file_size, 4096) * 4
+            self.max_files_per_dir = max(8, (self.max_files_per_dir or 1024) // 2)
+            self.fold_folder_size = self.small_file_size * 16
+            for folder in self._open:
+                self._compact(folder)
+
+    def _compact(self, node: FileNode, recursive: bool = True):
+        aggregates = {c.category: c for c in node.children if isinstance(c, AggregateNode)}
+        folders, files = [], []
+        for child in node.children:
+            if isinstance(child, AggregateNode):
+                continue
+            if isinstance(child, self._stub_type):
+                folders.append(child)
+            elif child.is_dir:
+                if child.size < self.fold_folder_size:
+                    self._fold_subtree(node, aggregates, child)
+                else:
+                    if recursive:
+                        self._compact(child)
+                    folders.append(child)
+            elif child.size < self.small_file_size:
+                self.nodes -= 1
+                self._fold(node, aggregates, child.category, child.size, child.modified, child.modified, 1)
+            else:
+                files.append(child)
+        if self.max_files_per_dir and len(files) > self.max_files_per_dir:
+            files.sort(key=lambda f: f.size, reverse=True)
+            for child in files[self.max_files_per_dir:]:
+                self.nodes -= 1
+                self._fold(node, aggregates, child.category, child.size, child.modified, child.modified, 1)
+            del files[self.max_files_per_dir:]
+        node.children = folders + files + list(aggregates.values())
+
+    def _fold_subtree(self, node: FileNode, aggregates: Dict[str, AggregateNode], folder: FileNode):
+        # A whole small subfolder becomes part of its parent's aggregates
+        folder.parent = None
+        stack = [folder]
+        while stack:
+            n = stack.pop()
+            self.nodes -= 1
+            if n.is_dir:
+                stack.extend(n.children)
+            elif isinstance(n, AggregateNode):
+                self.folded -= n.count # Counted again below
+                self._fold(node, aggregates, n.category, n.size, n.modified, n.oldest_modified, n.count)
+            else:
+                self._fold(node, aggregates, n.category, n.size, n.modified, n.modified, 1)
+
+    def _emit_categories(self):
+        # Stream category totals as deltas so the chart never has to walk the tree
+        self.last_category_emit = time.monotonic()
+        if self.pending_categories and self.on_categories:
+            self.on_categories(self.pending_categories)
+            self.pending_categories = {}
+
+    def _categorize_file(self, filename: str) -> str:
+        lower = filename.lower()
+        if lower.endswith(('.exe', '.dll', '.msi', '.bat', '.cmd', '.dmg', '.pkg')):
+            return "Apps"
+        if lower.endswith(('.log', '.tmp', '.cache', '.chk', '.dmp')):
+            return "Cache"
+        if lower.endswith(('.mp4', '.mov', '.mp3', '.wav', '.jpg', '.png', '.gif', '.mkv', '.avi', '.flac')):
+            return "Media"
+        if lower.endswith(('.py', '.js', '.ts', '.css', '.html', '.java', '.cpp', '.c', '.h', '.json', '.xml', '.md')):
+            return "Development"
+        if lower.endswith(('.zip', '.rar', '.7z', '.tar', '.gz', '.iso')):
+            return "Archives"
+        return "Unknown"
+
+    def _categorize_folder(self, path: str) -> str:
+        name = os.path.basename(path).lower()
+        if name in ['node_modules', 'venv', '.git', 'build', 'dist', '__pycache__']:
+            return "Development"
+        if name in ['temp', 'tmp', 'cache', 'logs']:
+            return "Cache"
+        if name == 'downloads':
+            return "Downloads"
+        return "Folder"
+
+
+def device_info(path: str) -> Tuple[str, bool]:
+    """
+    Returns (device key, rotational) for the disk backing `path`. On Linux the
+    key is the whole block device (partitions and single-disk device-mapper
+    volumes resolve to their disk), so two partitions of one drive share a key.
+    Elsewhere, and for network or virtual file systems, it falls back to st_dev.
+    """
+    try:
+        dev = os.stat(path).st_dev
+    except OSError:
+        return f"path:{path}", True
+    key, rotational = f"dev:{dev}", True # Unknown devices are treated like spinning disks
+    sys_dir = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    if not os.path.isdir(sys_dir):
+        return key, rotational
+
+    block = os.path.realpath(sys_dir)
+    for _ in range(8): # Device-mapper stacks are shallow; don't loop forever on odd layouts
+        if os.path.exists(os.path.join(block, "partition")):
+            block = os.path.dirname(block)
+            continue
+        slaves_dir = os.path.join(block, "slaves")
+        slaves = os.listdir(slaves_dir) if os.path.isdir(slaves_dir) else []
+        if len(slaves) == 1:
+            block = os.path.realpath(os.path.join(slaves_dir, slaves[0]))
+            continue
+        break
+
+    key = f"block:{os.path.basename(block)}"
+    try:
+        with open(os.path.join(block, "queue", "rotational")) as f:
+            rotational = f.read().strip() != "0"
+    except OSError:
+        pass
+    return key, rotational
+
+
+class MultiScanner:
+    """
+    Scans several roots (usually whole volumes) at once and joins them under one
+    synthetic root node. Roots are grouped by backing device: each device gets
+    at most `rotational_limit` concurrent scans if it is a spinning disk and
+    `solid_state_limit` otherwise, so separate disks run in parallel while a
+    shared spindle isn't thrashed by seeks from competing walks.
+
+    Each root is scanned with one_file_system, so nested mounts are only counted
+    once; a root inside another root on the same device is dropped.
+    `on_root_finished(path, node)` is called from the scanning thread. A
+    `budget`'s memory cap is shared evenly between the roots, and so are a
+    `throttle`'s caps (one Throttle paces every scan).
+    """
+    def __init__(self, roots: List[str], on_categories: Optional[Callable[[Dict[str, int]], None]] = None,
+                 category_interval: float = 0.25, metrics=None,
+                 on_root_finished: Optional[Callable[[str, Optional[FileNode]], None]] = None,
+                 rotational_limit: int = 1, solid_state_limit: int = 4, budget: Optional[ScanBudget] = None,
+                 throttle=None):
+        self.roots = self._outermost(roots)
+        self.budget = budget
+        self.throttle = throttle
+        self.on_categories = on_categories
+        self.category_interval = category_interval
+        self.metrics = metrics
+        self.on_root_finished = on_root_finished
+        self.rotational_limit = rotational_limit
+        self.solid_state_limit = solid_state_limit
+        self.scanners: Dict[str, Scanner] = {}
+        self.stop_requested = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def combined_path(roots: List[str]) -> str:
+        # Stable key for the joined tree, used for history and snapshots
+        return " + ".join(sorted(roots))
+
+    @staticmethod
+    def _outermost(roots: List[str]) -> List[str]:
+        roots = list(dict.fromkeys(os.path.abspath(r) for r in roots))
+        kept = []
+        for root in roots:
+            contained = False
+            for other in roots:
+                if other == root or os.path.commonpath([other, root]) != other:
+                    continue
+                try:
+                    contained = os.stat(other).st_dev == os.stat(root).st_dev
+                except OSError:
+                    contained = False
+                if contained:
+                    break
+            if not contained:
+                kept.append(root)
+        return kept
+
+    @property
+    def spilled(self) -> bool:
+        return any(scanner.spilled for scanner in self.scanners.values())
+
+    def cancel(self):
+        self.stop_requested = True
+        with self._lock:
+            for scanner in self.scanners.values():
+                scanner.cancel()
+
+    def devices(self) -> Dict[str, Tuple[int, List[str]]]:
+        """
+        Device key -> (concurrency limit, roots on that device).
+        """
+        groups: Dict[str, Tuple[int, List[str]]] = {}
+        for root in self.roots:
+            key, rotational = device_info(root)
+            limit = self.rotational_limit if rotational else self.solid_state_limit
+            groups.setdefault(key, (max(1, limit), []))[1].append(root)
+        return groups
+
+    def scan(self) -> Optional[FileNode]:
+        start = time.perf_counter()
+        groups = self.devices()
+        results: Dict[str, Optional[FileNode]] = {}
+        budget = self.budget
+        if budget is not None and (budget.max_memory or budget.spill_threshold):
+            budget = ScanBudget(budget.small_file_size, budget.max_files_per_dir,
+                                budget.max_memory // max(1, len(self.roots)),
+                                budget.spill_threshold // max(1, len(self.roots)))
+
+        def emit_categories(deltas):
+            # Scanner threads report independently; keep callbacks serialized
+            with self._lock:
+                self.on_categories(deltas)
+
+        def drain(queue: List[str]):
+            while not self.stop_requested:
+                with self._lock:
+                    if not queue:
+                        return
+                    root = queue.pop(0)
+                    scanner = Scanner(root, on_categories=emit_categories if self.on_categories else None,
+                                      category_interval=self.category_interval, one_file_system=True,
+                                      budget=budget, throttle=self.throttle)
+                    self.scanners[root] = scanner
+                t0 = time.perf_counter()
+                node = scanner.scan()
+                if node is not None:
+                    node.name = root # Absolute names keep paths joined under the synthetic root correct
+                results[root] = node
+                if self.metrics is not None:
+                    self.metrics.add_time(f"walk {root}", time.perf_counter() - t0)
+                if self.on_root_finished:
+                    self.on_root_finished(root, node)
+
+        threads = []
+        for limit, roots in groups.values():
+            queue = list(roots)
+            for _ in range(min(limit, len(roots))):
+                thread = threading.Thread(target=drain, args=(queue,), daemon=True)
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        if self.metrics is not None:
+            self.metrics.add_time("walk", time.perf_counter() - start)
+            self.metrics.count("devices", len(groups))
+            for scanner in self.scanners.values():
+                for key in ("files", "dirs", "bytes", "permission_errors", "os_errors", "skipped"):
+                    self.metrics.count(key, getattr(scanner, key))
+            if self.throttle is not None:
+                self.throttle.report(self.metrics)
+            if self.stop_requested:
+                self.metrics.tags["cancelled"] = True
+
+        nodes = [results[r] for r in self.roots if results.get(r) is not None]
+        if self.stop_requested or not nodes:
+            return None
+        if len(self.roots) == 1:
+            nodes[0].name = os.path.basename(nodes[0].path) or nodes[0].path
+            return nodes[0]
+
+        combined = FileNode(name=f"{len(nodes)} volumes", path=self.combined_path(self.roots), size=0,
+                            is_dir=True, category="Folder")
+        for node in nodes:
+            combined.add_child(node)
+            combined.size += node.size
+            combined.latest_modified = max(combined.latest_modified, node.latest_modified)
+        return combined
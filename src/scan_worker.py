@@ -0,0 +1,26 @@
+import pickle
+import sys
+from src.process_scan import _scan_subtree
+
+# Worker process of the process scan backend, started as `python -m src.scan_worker`.
+# It imports only the scan engine, whatever the parent's main module is (the GUI
+# included), and scans one subtree per request it reads from stdin.
+
+
+def main():
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    while True:
+        try:
+            path, root_dev = pickle.load(requests)
+        except EOFError:
+            return # The parent is done with us
+        try:
+            reply = (True, _scan_subtree(path, root_dev))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, replies, protocol=pickle.HIGHEST_PROTOCOL)
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
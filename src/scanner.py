@@ -1,245 +1,370 @@
 import os
-import time
-import hashlib
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional
 from PyQt6.QtCore import QObject, pyqtSignal, QRunnable, QThreadPool
+from src.scan_engine import FileNode, TreeRemoval, remove_nodes, Scanner, MultiScanner, ScanBudget
+from src.analyzer import Analyzer
+from src.tree_diff import to_snapshot, diff_trees
+from src.search_index import NameIndex
+from src.process_scan import make_scanner
+from src.quick_estimate import QuickEstimator
+from src.throttle import Throttle, ThrottleConfig
+from src.exporters import Exporter
+from src.metrics import recorder
 
-@dataclass
-class FileNode:
-    name: str
-    path: str
-    size: int
-    is_dir: bool
-    modified: float = 0.0
-    category: str = "Unknown"
-    children: List['FileNode'] = field(default_factory=list)
-    parent: Optional['FileNode'] = None
-
-    def add_child(self, child: 'FileNode'):
-        self.children.append(child)
-        child.parent = self
+# Qt adapters around the pure-Python engine; FileNode and remove_nodes are re-exported for the UI.
 
 class ScanSignals(QObject):
     progress = pyqtSignal(str)
-    finished = pyqtSignal(object) # Returns FileNode root
+    categories = pyqtSignal(dict) # Bytes per file category found since the last emit
+    finished = pyqtSignal(object, bool) # FileNode root (None if cancelled), whether part of it was spilled to disk
+    error = pyqtSignal(str)
+
+class EstimateSignals(QObject):
+    estimated = pyqtSignal(object) # QuickEstimate
+    refined = pyqtSignal(object, object) # Estimated folder, its exact FileNode
+    progress = pyqtSignal(str)
+    categories = pyqtSignal(dict)
+    finished = pyqtSignal(object, bool) # Root of the estimate, exact once every refinement has been applied; spilled
     error = pyqtSignal(str)
 
 class AnalysisSignals(QObject):
     finished = pyqtSignal(dict, list) # suggestions, duplicates
     error = pyqtSignal(str)
 
+class DiffSignals(QObject):
+    finished = pyqtSignal(object, float) # TreeDiff (or None if no previous snapshot), previous timestamp
+    error = pyqtSignal(str)
+
+class IndexSignals(QObject):
+    finished = pyqtSignal(object) # NameIndex
+    error = pyqtSignal(str)
+
+class ExportSignals(QObject):
+    progress = pyqtSignal(int, float) # Rows written, fraction done
+    finished = pyqtSignal(object) # Rows written, or None if cancelled
+    error = pyqtSignal(str)
+
+class RemoteSignals(QObject):
+    finished = pyqtSignal(object) # Whatever the call returned
+    error = pyqtSignal(str)
+
+def make_throttle(config: Optional[ThrottleConfig]) -> Optional[Throttle]:
+    # Each job gets its own Throttle, so its counters end up in that job's metrics
+    return Throttle(config) if config is not None else None
+
 class ScannerWorker(QRunnable):
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, throttle: Optional[ThrottleConfig] = None):
         super().__init__()
         self.root_path = root_path
         self.signals = ScanSignals()
-        self.stop_requested = False
+        # In-process unless STORAGE_BOT_SCAN_BACKEND asks for processes: stitching their results
+        # holds the GIL the GUI needs, and only big trees on several cores gain from them
+        self.scanner = make_scanner(root_path, backend=os.environ.get("STORAGE_BOT_SCAN_BACKEND", "thread"),
+                                    on_categories=self.signals.categories.emit, throttle=make_throttle(throttle))
+
+    def cancel(self):
+        self.scanner.cancel()
 
     def run(self):
         try:
-            root_node = self._scan_recursive(self.root_path)
-            self.signals.finished.emit(root_node)
+            with recorder.job("scan", path=self.root_path) as metrics:
+                self.scanner.metrics = metrics
+                root_node = self.scanner.scan()
+            self.signals.finished.emit(root_node, self.scanner.spilled)
         except Exception as e:
             self.signals.error.emit(str(e))
 
-    def _scan_recursive(self, path: str) -> FileNode:
-        if self.stop_requested:
-            return None
-        
-        name = os.path.basename(path) or path
-        # Directory modified time isn't critical for our logic, but we can capture it
+class MultiScanWorker(QRunnable):
+    """
+    Scans several volumes in parallel (limited per backing device) into one
+    combined tree. Progress reports each volume as it finishes.
+    """
+    def __init__(self, roots: List[str], throttle: Optional[ThrottleConfig] = None):
+        super().__init__()
+        self.signals = ScanSignals()
+        self.scanner = MultiScanner(roots, on_categories=self.signals.categories.emit,
+                                    on_root_finished=self.on_root_finished, budget=ScanBudget.from_env(),
+                                    throttle=make_throttle(throttle))
+        self.roots = self.scanner.roots
+        self.finished_roots = 0
+
+    def cancel(self):
+        self.scanner.cancel()
+
+    def on_root_finished(self, root, node):
+        self.finished_roots += 1
+        self.signals.progress.emit(f"Scanned {root} ({self.finished_roots} of {len(self.roots)})")
+
+    def run(self):
         try:
-            mtime = os.path.getmtime(path)
-        except OSError:
-            mtime = 0.0
-            
-        node = FileNode(name=name, path=path, size=0, is_dir=True, modified=mtime, category=self._categorize_folder(path))
+            with recorder.job("scan", path=MultiScanner.combined_path(self.roots), roots=len(self.roots)) as metrics:
+                self.scanner.metrics = metrics
+                root_node = self.scanner.scan()
+            self.signals.finished.emit(root_node, self.scanner.spilled)
+        except Exception as e:
+            self.signals.error.emit(str(e))
 
+class EstimateWorker(QRunnable):
+    """
+    Quick-estimate scan: emits an estimated tree within seconds, then scans
+    the estimated folders exactly, largest first. The tree itself is only
+    changed on the GUI thread, by applying each `refined` result.
+    """
+    def __init__(self, root_path: str, throttle: Optional[ThrottleConfig] = None):
+        super().__init__()
+        self.root_path = root_path
+        self.signals = EstimateSignals()
+        self.estimator = QuickEstimator(root_path, on_categories=self.signals.categories.emit)
+        self.throttle = make_throttle(throttle) # Paces the refinement scans; the probing is brief
+        self.scanner = None
+        self.spilled = False # Whether any refinement spilled part of its tree to disk
+        self.stop_requested = False
+
+    def cancel(self):
+        self.stop_requested = True
+        self.estimator.cancel()
+        if self.scanner is not None:
+            self.scanner.cancel()
+
+    def run(self):
         try:
-            with os.scandir(path) as it:
-                for entry in it:
-                    if self.stop_requested:
-                        break
-                    
-                    try:
-                        if entry.is_file(follow_symlinks=False):
-                            stat = entry.stat()
-                            size = stat.st_size
-                            mtime = stat.st_mtime
-                            cat = self._categorize_file(entry.name)
-                            child = FileNode(name=entry.name, path=entry.path, size=size, is_dir=False, modified=mtime, category=cat)
-                            node.add_child(child)
-                            node.size += size
-                        elif entry.is_dir(follow_symlinks=False):
-                            if entry.name in ['$RECYCLE.BIN', 'System Volume Information']:
-                                continue
-                                
-                            child = self._scan_recursive(entry.path)
-                            if child:
-                                node.add_child(child)
-                                node.size += child.size
-                    except PermissionError:
-                        continue 
-                    except OSError:
-                        continue
-        except PermissionError:
-            pass 
-
-        return node
-
-    def _categorize_file(self, filename: str) -> str:
-        lower = filename.lower()
-        if lower.endswith(('.exe', '.dll', '.msi', '.bat', '.cmd', '.dmg', '.pkg')):
-            return "Apps"
-        if lower.endswith(('.log', '.tmp', '.cache', '.chk', '.dmp')):
-            return "Cache"
-        if lower.endswith(('.mp4', '.mov', '.mp3', '.wav', '.jpg', '.png', '.gif', '.mkv', '.avi', '.flac')):
-            return "Media"
-        if lower.endswith(('.py', '.js', '.ts', '.css', '.html', '.java', '.cpp', '.c', '.h', '.json', '.xml', '.md')):
-            return "Development"
-        if lower.endswith(('.zip', '.rar', '.7z', '.tar', '.gz', '.iso')):
-            return "Archives"
-        return "Unknown"
-
-    def _categorize_folder(self, path: str) -> str:
-        name = os.path.basename(path).lower()
-        if name in ['node_modules', 'venv', '.git', 'build', 'dist', '__pycache__']:
-            return "Development"
-        if name in ['temp', 'tmp', 'cache', 'logs']:
-            return "Cache"
-        if name == 'downloads':
-            return "Downloads"
-        return "Folder"
+            with recorder.job("estimate", path=self.root_path) as metrics:
+                with metrics.timer("estimate"):
+                    estimate = self.estimator.estimate()
+                if estimate is None or self.stop_requested:
+                    self.signals.finished.emit(None, False)
+                    return
+                metrics.count("listings", estimate.listings)
+                metrics.count("estimated_folders", len(estimate.estimated))
+                self.signals.estimated.emit(estimate)
+
+                folders = list(estimate.estimated)
+                with metrics.timer("refine"):
+                    for i, folder in enumerate(folders, 1):
+                        if self.stop_requested:
+                            break
+                        self.signals.progress.emit(f"Refining estimates: {i} of {len(folders)} folders")
+                        self.scanner = Scanner(folder.path, on_categories=self.signals.categories.emit,
+                                               budget=ScanBudget.from_env(), throttle=self.throttle)
+                        exact = self.scanner.scan()
+                        self.spilled = self.spilled or self.scanner.spilled
+                        if self.stop_requested:
+                            break
+                        self.signals.refined.emit(folder, exact)
+                if self.throttle is not None:
+                    self.throttle.report(metrics)
+                if self.stop_requested:
+                    metrics.tags["cancelled"] = True
+            self.signals.finished.emit(None if self.stop_requested else estimate.root, self.spilled)
+        except Exception as e:
+            self.signals.error.emit(str(e))
 
 class AnalysisWorker(QRunnable):
-    def __init__(self, root_node: FileNode):
+    def __init__(self, root_node: FileNode, throttle: Optional[ThrottleConfig] = None):
         super().__init__()
         self.root_node = root_node
+        self.throttle = throttle
         self.signals = AnalysisSignals()
 
     def run(self):
         try:
-            suggestions = self.get_cleanup_suggestions(self.root_node)
-            duplicates = self.find_duplicates(self.root_node)
+            with recorder.job("analysis", path=self.root_node.path) as metrics:
+                analyzer = Analyzer(metrics, throttle=make_throttle(self.throttle))
+                suggestions, duplicates = analyzer.analyze(self.root_node)
             self.signals.finished.emit(suggestions, duplicates)
         except Exception as e:
             self.signals.error.emit(str(e))
 
-    def get_cleanup_suggestions(self, node: FileNode) -> Dict[str, List[FileNode]]:
-        suggestions = {
-            "Abandoned Cache": [],
-            "Oversized Media/Archives": [],
-            "Installer Residue": [],
-            "Ghost Folders": []
-        }
-        
-        now = time.time()
-        
-        def traverse(n: FileNode):
-            if n.is_dir:
-                if n.size == 0 and not n.children:
-                    suggestions["Ghost Folders"].append(n)
-                
-                # Check for "Downloads" folder context for installer residue
-                is_downloads = n.name.lower() == "downloads"
-                
-                for child in n.children:
-                    # Pass context if currently in Downloads or child is in Downloads
-                    traverse_recursive(child, in_downloads=is_downloads)
-            else:
-                # File checks
-                self._check_file(n, now, False, suggestions)
-
-        def traverse_recursive(n: FileNode, in_downloads: bool):
-            if n.is_dir:
-                if n.size == 0 and not n.children:
-                    suggestions["Ghost Folders"].append(n)
-                
-                current_is_downloads = in_downloads or (n.name.lower() == "downloads")
-                for child in n.children:
-                    traverse_recursive(child, current_is_downloads)
-            else:
-                self._check_file(n, now, in_downloads, suggestions)
-
-        traverse_recursive(node, False)
-        return suggestions
-
-    def _check_file(self, n: FileNode, now: float, in_downloads: bool, suggestions: Dict):
-        # Abandoned Cache
-        if n.category == "Cache":
-            if (now - n.modified) > (14 * 86400): # 14 days
-                suggestions["Abandoned Cache"].append(n)
-        
-        # Oversized Media/Archives
-        if n.category in ["Media", "Archives"]:
-            if n.size > (1024 * 1024 * 1024): # 1GB
-                suggestions["Oversized Media/Archives"].append(n)
-        
-        # Installer Residue
-        if in_downloads:
-            if n.name.lower().endswith(('.exe', '.msi', '.dmg', '.pkg')):
-                suggestions["Installer Residue"].append(n)
-
-    def find_duplicates(self, root: FileNode) -> List[List[FileNode]]:
-        size_map: Dict[int, List[FileNode]] = {}
-        
-        def traverse(n: FileNode):
-            if n.is_dir:
-                for child in n.children:
-                    traverse(child)
-            else:
-                if n.size > 0:
-                    if n.size not in size_map:
-                        size_map[n.size] = []
-                    size_map[n.size].append(n)
-        
-        traverse(root)
-        
-        # Filter potential duplicates (same size)
-        potential_groups = [group for group in size_map.values() if len(group) > 1]
-        
-        confirmed_duplicates = []
-        
-        for group in potential_groups:
-            hash_map = {}
-            for node in group:
-                try:
-                    partial_hash = self._get_partial_hash(node.path)
-                    if partial_hash:
-                        if partial_hash not in hash_map:
-                            hash_map[partial_hash] = []
-                        hash_map[partial_hash].append(node)
-                except Exception:
-                    continue
-            
-            for hash_group in hash_map.values():
-                if len(hash_group) > 1:
-                    confirmed_duplicates.append(hash_group)
-                    
-        return confirmed_duplicates
-
-    def _get_partial_hash(self, path: str) -> str:
+class DiffWorker(QRunnable):
+    """
+    Stores a snapshot of the finished scan and diffs it against the previous one.
+    """
+    def __init__(self, root_node: FileNode, history_manager):
+        super().__init__()
+        self.root_node = root_node
+        self.history_manager = history_manager
+        self.signals = DiffSignals()
+
+    def run(self):
         try:
-            with open(path, 'rb') as f:
-                chunk = f.read(1024)
-                return hashlib.md5(chunk).hexdigest()
-        except OSError:
-            return ""
+            path = self.root_node.path
+            with recorder.job("diff", path=path) as metrics:
+                previous = self.history_manager.list_snapshots(path)
+                with metrics.timer("snapshot_save"):
+                    self.history_manager.save_snapshot(path, to_snapshot(self.root_node))
+
+                diff, prev_timestamp = None, 0.0
+                if previous:
+                    prev_timestamp, prev_file = previous[-1]
+                    with metrics.timer("snapshot_load"):
+                        old_tree = self.history_manager.load_snapshot(prev_file)
+                    if old_tree is not None:
+                        with metrics.timer("diff"):
+                            diff = diff_trees(old_tree, self.root_node)
+                        metrics.count("entries", len(diff.entries))
+                        metrics.count("skipped_subtrees", diff.skipped_subtrees)
+
+            self.signals.finished.emit(diff, prev_timestamp if diff is not None else 0.0)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+class IndexWorker(QRunnable):
+    """
+    Builds the name search index for a finished scan.
+    """
+    def __init__(self, root_node: FileNode):
+        super().__init__()
+        self.root_node = root_node
+        self.signals = IndexSignals()
+
+    def run(self):
+        try:
+            with recorder.job("index", path=self.root_node.path) as metrics:
+                index = NameIndex(self.root_node)
+                metrics.count("names", index.name_count)
+                metrics.count("nodes", len(index.nodes))
+                metrics.count("index_bytes", index.memory_bytes())
+            self.signals.finished.emit(index)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+class ExportWorker(QRunnable):
+    """
+    Streams a report to a file (see src/exporters.py). The tree must not be
+    changed while this runs; the caller keeps deletions out until it finishes.
+    """
+    def __init__(self, report: str, source, path: str, fmt: Optional[str] = None):
+        super().__init__()
+        self.signals = ExportSignals()
+        self.exporter = Exporter(report, source, path, fmt=fmt, on_progress=self.signals.progress.emit)
+
+    def cancel(self):
+        self.exporter.cancel()
+
+    def run(self):
+        try:
+            with recorder.job("export", report=self.exporter.report, format=self.exporter.fmt,
+                              path=self.exporter.path) as metrics:
+                self.exporter.metrics = metrics
+                rows = self.exporter.export()
+            self.signals.finished.emit(rows)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+class RemoteCallWorker(QRunnable):
+    """
+    Makes one blocking call to the scan daemon, so the socket round trip
+    doesn't hold up the GUI.
+    """
+    def __init__(self, call):
+        super().__init__()
+        self.call = call
+        self.signals = RemoteSignals()
+
+    def run(self):
+        try:
+            result = self.call()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(result)
 
 class ScanManager:
     def __init__(self):
         self.threadpool = QThreadPool()
-        print(f"Multithreading with maximum {self.threadpool.maxThreadCount()} threads")
+        # Shown in the diagnostics panel
+        self.max_threads = self.threadpool.maxThreadCount()
+
+    def start_scan(self, path: str, on_finish, on_progress=None, on_categories=None,
+                   throttle: Optional[ThrottleConfig] = None):
+        worker = ScannerWorker(path, throttle)
+        worker.signals.finished.connect(on_finish)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_categories:
+            worker.signals.categories.connect(on_categories)
+        self.threadpool.start(worker)
+
+    def start_multi_scan(self, roots: List[str], on_finish, on_progress=None, on_categories=None,
+                         throttle: Optional[ThrottleConfig] = None):
+        worker = MultiScanWorker(roots, throttle)
+        worker.signals.finished.connect(on_finish)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_categories:
+            worker.signals.categories.connect(on_categories)
+        self.threadpool.start(worker)
 
-    def start_scan(self, path: str, on_finish, on_progress=None):
-        worker = ScannerWorker(path)
+    def start_estimate(self, path: str, on_estimated, on_refined, on_finish, on_progress=None,
+                       on_categories=None, throttle: Optional[ThrottleConfig] = None) -> EstimateWorker:
+        """
+        Starts a quick-estimate scan. Returns the worker so the caller can cancel it.
+        """
+        worker = EstimateWorker(path, throttle)
+        worker.signals.estimated.connect(on_estimated)
+        worker.signals.refined.connect(on_refined)
         worker.signals.finished.connect(on_finish)
         if on_progress:
             worker.signals.progress.connect(on_progress)
+        if on_categories:
+            worker.signals.categories.connect(on_categories)
+        self.threadpool.start(worker)
+        return worker
+
+    def start_analysis(self, root_node: FileNode, on_finish, throttle: Optional[ThrottleConfig] = None):
+        worker = AnalysisWorker(root_node, throttle)
+        worker.signals.finished.connect(on_finish)
+        self.threadpool.start(worker)
+
+    def start_diff(self, root_node: FileNode, history_manager, on_finish):
+        worker = DiffWorker(root_node, history_manager)
+        worker.signals.finished.connect(on_finish)
         self.threadpool.start(worker)
 
-    def start_analysis(self, root_node: FileNode, on_finish):
-        worker = AnalysisWorker(root_node)
+    def start_indexing(self, root_node: FileNode, on_finish):
+        worker = IndexWorker(root_node)
         worker.signals.finished.connect(on_finish)
         self.threadpool.start(worker)
+
+    def start_export(self, report: str, source, path: str, on_finish, on_progress=None, on_error=None,
+                     fmt: Optional[str] = None) -> ExportWorker:
+        """
+        Exports "tree", "suggestions" or "duplicates" in the background. Returns
+        the worker so the caller can cancel it. Raises ExportError for an
+        unknown format.
+        """
+        worker = ExportWorker(report, source, path, fmt)
+        worker.signals.finished.connect(on_finish)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        self.threadpool.start(worker)
+        return worker
+
+    def start_remote_call(self, call, on_finish, on_error=None):
+        """
+        Runs `call()` (e.g. a DaemonClient request) in the background.
+        """
+        worker = RemoteCallWorker(call)
+        worker.signals.finished.connect(on_finish)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        self.threadpool.start(worker)
+
+    def start_deletion(self, nodes: List[FileNode], on_finish, on_progress=None, on_deleted=None,
+                       on_error=None, permanent_categories=None) -> 'DeletionWorker':
+        """
+        Deletes nodes in the background. Returns the worker so the caller can cancel it.
+        """
+        from src.deletion_worker import DeletionWorker
+        worker = DeletionWorker(nodes, permanent_categories=permanent_categories)
+        worker.signals.finished.connect(on_finish)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_deleted:
+            worker.signals.deleted.connect(on_deleted)
+        if on_error:
+            worker.signals.item_error.connect(on_error)
+        self.threadpool.start(worker)
+        return worker
@@ -0,0 +1,227 @@
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import partial
+from itertools import chain
+from typing import Dict, List, Optional
+
+# Qt-free name index used by the search box; built off the GUI thread after a scan.
+
+class NameIndex:
+    """
+    Trigram index over the (lower-cased) names of every node in a scan tree.
+
+    Distinct names are stored once, in one string blob ordered by the size of
+    their largest node, and each trigram maps to a compact array of name ids.
+    Because ids follow size order, a search can stop after `scan_budget`
+    candidates and still have seen the largest matches. Trigrams found in more
+    than `max_posting_ratio` of all names filter almost nothing and are not
+    stored; if the index would still exceed `max_memory` bytes, the most common
+    remaining trigrams are dropped too. Queries shorter than three characters
+    (or made only of dropped trigrams) fall back to scanning the blob.
+    """
+    def __init__(self, root, max_memory: int = 256 * 1024 * 1024, max_posting_ratio: float = 0.2):
+        start = time.perf_counter()
+        self.root = root
+        self.max_memory = max_memory
+        self.removed_ids = set()
+
+        # Group nodes by lower-cased name
+        by_name: Dict[str, list] = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            key = node.name.lower()
+            nodes = by_name.get(key)
+            if nodes is None:
+                by_name[key] = [node]
+            else:
+                nodes.append(node)
+            if node.is_dir:
+                stack.extend(node.children)
+
+        # Largest nodes first, both across names and within a name
+        entries = []
+        for key, nodes in by_name.items():
+            if len(nodes) > 1:
+                nodes.sort(key=lambda n: n.size, reverse=True)
+            entries.append((nodes[0].size, key, nodes))
+        entries.sort(key=lambda e: e[0], reverse=True)
+        del by_name
+
+        # Names are joined with "\n", which can't appear in a file name on the platforms we scan
+        self.nodes: List = []
+        self.node_offsets = array('I', [0])
+        self.name_offsets = array('I', [0])
+        self.name_ids: Dict[str, int] = {}
+        names = []
+        pos = 0
+        key_bytes = 0
+        for name_id, (_, key, nodes) in enumerate(entries):
+            self.name_ids[key] = name_id
+            key_bytes += sys.getsizeof(key)
+            names.append(key)
+            pos += len(key) + 1
+            self.name_offsets.append(pos)
+            self.nodes.extend(nodes)
+            self.node_offsets.append(len(self.nodes))
+        self.blob = "\n".join(names) + "\n"
+        del entries
+        self._base_bytes = (sys.getsizeof(self.blob) + sys.getsizeof(self.nodes) + sys.getsizeof(self.name_ids)
+                            + key_bytes + self.node_offsets.itemsize * len(self.node_offsets)
+                            + self.name_offsets.itemsize * len(self.name_offsets))
+
+        postings: Dict[str, array] = defaultdict(partial(array, 'I'))
+        short_names = set()
+        for name_id, key in enumerate(names):
+            if len(key) < 3:
+                short_names.add(key)
+            for gram in {key[i:i + 3] for i in range(len(key) - 2)}:
+                postings[gram].append(name_id)
+        del names
+
+        # Every one or two character string that occurs in some name, so short queries
+        # that can't match skip the blob scan
+        self.short_grams = set()
+        for gram in chain(postings, short_names):
+            self.short_grams.update(gram[i:i + n] for n in (1, 2) for i in range(len(gram) - n + 1))
+
+        # Drop trigrams that are too common to narrow anything down, then enforce the budget
+        limit = max(64, int(len(self.name_offsets) * max_posting_ratio))
+        self.postings = {g: ids for g, ids in postings.items() if len(ids) <= limit}
+        self.dropped = {g for g in postings if g not in self.postings}
+        del postings
+        self._posting_bytes = sum(self._posting_cost(ids) for ids in self.postings.values())
+        if self.memory_bytes() > self.max_memory:
+            for gram in sorted(self.postings, key=lambda g: len(self.postings[g]), reverse=True):
+                self._posting_bytes -= self._posting_cost(self.postings.pop(gram))
+                self.dropped.add(gram)
+                if self.memory_bytes() <= self.max_memory:
+                    break
+
+        self.name_count = len(self.name_offsets) - 1
+        self.build_seconds = time.perf_counter() - start
+
+    @staticmethod
+    def _posting_cost(ids: array) -> int:
+        # Array buffer plus its header, the trigram key and the dict slot
+        return 64 + 56 + 24 + ids.itemsize * len(ids)
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate memory held by the index (not counting the nodes themselves).
+        """
+        return self._base_bytes + self._posting_bytes
+
+    def apply_removal(self, removal):
+        """
+        Hides nodes removed from the tree (see scanner.TreeRemoval) from results.
+        """
+        self.removed_ids |= removal.removed_ids
+
+    def count(self, query: str) -> int:
+        """
+        The number of nodes whose name contains `query`, however many there are.
+        """
+        query = query.strip().lower()
+        if not query or "\n" in query:
+            return 0
+        total = 0
+        for name_id in self._candidates(query):
+            if query in self._name(name_id):
+                for i in range(self.node_offsets[name_id], self.node_offsets[name_id + 1]):
+                    if id(self.nodes[i]) not in self.removed_ids:
+                        total += 1
+        return total
+
+    def _name(self, name_id: int) -> str:
+        return self.blob[self.name_offsets[name_id]:self.name_offsets[name_id + 1] - 1]
+
+    def _candidates(self, query: str):
+        # Yields name ids (in size order) that may contain `query`
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        if any(g not in self.postings and g not in self.dropped for g in grams):
+            return # Some trigram of the query occurs in no name at all
+        if len(query) < 3 and query not in self.short_grams:
+            return
+        lists = [self.postings[g] for g in grams if g in self.postings]
+        if len(query) >= 3 and len(lists) == len(grams):
+            # Every trigram of the query has a posting list: intersect, smallest first
+            # Posting lists are ascending, so membership is a binary search
+            lists.sort(key=len)
+            others = lists[1:]
+            for name_id in lists[0]:
+                for other in others:
+                    pos = bisect_left(other, name_id)
+                    if pos == len(other) or other[pos] != name_id:
+                        break
+                else:
+                    yield name_id
+            return
+        if lists:
+            # Some trigrams were dropped; the rarest remaining one still narrows the search
+            yield from min(lists, key=len)
+            return
+
+        # Short query: scan the blob, which is also in size order
+        find = self.blob.find
+        offsets = self.name_offsets
+        pos = find(query)
+        while pos != -1:
+            name_id = bisect_right(offsets, pos) - 1
+            yield name_id
+            pos = find(query, offsets[name_id + 1])
+
+    def search(self, query: str, limit: int = 50, scan_budget: int = 5000) -> List:
+        """
+        Returns up to `limit` nodes whose name contains `query` (case-insensitive),
+        ranked exact match > prefix > word start > substring, then by size.
+        At most `scan_budget` matching names are ranked, so very common queries
+        rank the largest matches rather than every one.
+        """
+        query = query.strip().lower()
+        if not query or "\n" in query:
+            return []
+
+        scored = []
+        seen = 0
+        prefixes = 0
+        exact_id = self.name_ids.get(query)
+        if exact_id is not None:
+            scored.append((3, exact_id))
+
+        for name_id in self._candidates(query):
+            if name_id == exact_id:
+                continue
+            name = self._name(name_id)
+            pos = name.find(query)
+            if pos == -1:
+                continue
+            if pos == 0:
+                rank = 2
+                prefixes += 1
+            elif not name[pos - 1].isalnum():
+                rank = 1
+            else:
+                rank = 0
+            scored.append((rank, name_id))
+            seen += 1
+            # Candidates come largest first, so nothing later can outrank `limit` prefix matches
+            if seen >= scan_budget or prefixes >= limit:
+                break
+
+        # Stable sort keeps the size order within each rank
+        scored.sort(key=lambda s: s[0], reverse=True)
+
+        results = []
+        for _, name_id in scored:
+            for i in range(self.node_offsets[name_id], self.node_offsets[name_id + 1]):
+                node = self.nodes[i]
+                if id(node) in self.removed_ids:
+                    continue
+                results.append(node)
+                if len(results) >= limit:
+                    return results
+        return results
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import threading
+import zlib
+from typing import Iterable, List, Optional, Tuple
+from src.scan_engine import FileNode, AggregateNode
+
+# Out-of-core scan trees. Once a scan holds more nodes than its spill threshold,
+# completed subtrees are written to a SpillStore and replaced by SpilledNode
+# stubs, which keep their size and read their children back on first access.
+
+KIND_FILE, KIND_DIR, KIND_AGGREGATE = 0, 1, 2
+
+_load_lock = threading.Lock() # Two threads opening the same folder get the same children
+
+
+class SpillStore:
+    """
+    Append-only file of folder records, one zlib-compressed JSON list of
+    children per folder. Child folders point at their own record, so reading a
+    folder never reads its subtree. The file is anonymous (it disappears when
+    the store is garbage collected) and lives in `directory`, or in
+    $STORAGE_BOT_SPILL_DIR / the system temp folder.
+    """
+    def __init__(self, directory: Optional[str] = None):
+        directory = directory or os.environ.get("STORAGE_BOT_SPILL_DIR") or None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.lock = threading.Lock()
+        self.records = 0
+        self.spilled_nodes = 0
+        self.bytes_written = 0
+
+    def spill(self, node: FileNode) -> Tuple['SpilledNode', int]:
+        """
+        Writes `node`'s subtree and returns a stub to put in its place, with
+        the number of in-memory nodes the stub replaces (itself included).
+        """
+        (offset, length), count = self._write_children(node)
+        stub = SpilledNode(name=node.name, path=node.path, size=node.size, is_dir=True, modified=node.modified,
+                           category=node.category, latest_modified=node.latest_modified,
+                           store=self, offset=offset, length=length)
+        stub.parent = node.parent
+        return stub, count + 1
+
+    def _write_children(self, node: FileNode) -> Tuple[Tuple[int, int], int]:
+        records, count, reused = [], 0, 0
+        for child in node.children:
+            count += 1
+            if isinstance(child, SpilledNode) and not child.loaded:
+                reused += 1 # Written by an earlier spill; only the pointer is repeated
+                records.append([child.name, child.size, child.modified, child.latest_modified, child.category,
+                                KIND_DIR, child.offset, child.length])
+            elif child.is_dir:
+                (offset, length), below = self._write_children(child)
+                count += below
+                records.append([child.name, child.size, child.modified, child.latest_modified, child.category,
+                                KIND_DIR, offset, length])
+            elif isinstance(child, AggregateNode):
+                records.append([child.name, child.size, child.modified, child.latest_modified, child.category,
+                                KIND_AGGREGATE, child.count, child.oldest_modified])
+            else:
+                records.append([child.name, child.size, child.modified, child.latest_modified, child.category,
+                                KIND_FILE])
+        data = zlib.compress(json.dumps(records, separators=(",", ":")).encode("utf-8"), 1)
+        with self.lock:
+            offset = self.file.seek(0, os.SEEK_END)
+            self.file.write(data)
+        self.records += 1
+        self.spilled_nodes += len(records) - reused
+        self.bytes_written += len(data)
+        return (offset, len(data)), count
+
+    def read(self, offset: int, length: int) -> list:
+        with self.lock:
+            self.file.seek(offset)
+            data = self.file.read(length)
+        return json.loads(zlib.decompress(data))
+
+    def close(self):
+        self.file.close()
+
+
+class SpilledNode(FileNode):
+    """
+    A folder whose children live in a SpillStore. `children` reads them on first
+    access and keeps them (child folders are stubs again), so browsing only
+    loads the folders that are visited. `peek_children()` reads them without
+    keeping them, for one-off walks such as analysis.
+    """
+    def __init__(self, *args, store: Optional[SpillStore] = None, offset: int = 0, length: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.offset = offset
+        self.length = length
+        self._children = None # The base __init__ assigned [] through the setter
+
+    @property
+    def children(self) -> List[FileNode]:
+        if self._children is None:
+            with _load_lock:
+                if self._children is None:
+                    self._children = self.peek_children()
+        return self._children
+
+    @children.setter
+    def children(self, value: List[FileNode]):
+        self._children = value
+
+    @property
+    def loaded(self) -> bool:
+        return self._children is not None
+
+    def peek_children(self) -> List[FileNode]:
+        if self._children is not None:
+            return self._children
+        children = []
+        for name, size, modified, latest, category, kind, *extra in self.store.read(self.offset, self.length):
+            path = os.path.join(self.path, name)
+            if kind == KIND_DIR:
+                child = SpilledNode(name=name, path=path, size=size, is_dir=True, modified=modified,
+                                    category=category, latest_modified=latest,
+                                    store=self.store, offset=extra[0], length=extra[1])
+            elif kind == KIND_AGGREGATE:
+                child = AggregateNode(name=name, path=path, size=size, is_dir=False, modified=modified,
+                                      category=category, latest_modified=latest, count=extra[0],
+                                      oldest_modified=extra[1])
+            else:
+                child = FileNode(name=name, path=path, size=size, is_dir=False, modified=modified,
+                                 category=category, latest_modified=latest)
+            child.parent = self
+            children.append(child)
+        return children
+
+
+def iter_children(node: FileNode) -> Iterable[FileNode]:
+    """
+    A node's children, read without keeping them if they are still on disk.
+    """
+    if isinstance(node, SpilledNode):
+        return node.peek_children()
+    return node.children
+
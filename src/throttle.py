@@ -0,0 +1,212 @@
+import os
+import platform
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from src.scan_engine import parse_size
+
+# Throttled scans for busy hosts: caps on file system calls per second and on
+# bytes read per second, low CPU and I/O priority, and an adaptive backoff that
+# slows the scan down further whenever the calls it makes get slower (a sign
+# the disk is busy with someone else's work).
+
+IOPRIO_CLASS_BE, IOPRIO_CLASS_IDLE = 2, 3
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1 # With a thread id, applies to that thread only
+# ioprio_set has no libc wrapper; syscall numbers per architecture
+IOPRIO_SET_SYSCALL = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "riscv64": 30, "armv7l": 314}
+NICE = 10
+
+_lowered = threading.local() # Set on threads started by run_at_low_priority
+
+
+@dataclass
+class ThrottleConfig:
+    """
+    Settings for a throttled scan. `max_ops` caps the scandir/stat/open calls
+    per second and `max_read_bytes` the bytes read per second while hashing
+    (0 leaves them uncapped). `low_priority` runs the work at nice 10 and the
+    lowest best-effort I/O priority, or in the idle I/O class with `idle_io`
+    (which may never get a turn on a disk that is always busy). `adaptive`
+    backs off while call latency is well above what the scan saw at its start.
+    """
+    max_ops: float = 0
+    max_read_bytes: float = 0
+    low_priority: bool = True
+    adaptive: bool = True
+    idle_io: bool = False
+
+    @classmethod
+    def from_env(cls) -> Optional['ThrottleConfig']:
+        # STORAGE_BOT_THROTTLE=1 turns throttling on; STORAGE_BOT_THROTTLE_OPS,
+        # STORAGE_BOT_THROTTLE_READ_RATE (e.g. "8M") and STORAGE_BOT_THROTTLE_IDLE_IO=1 configure it
+        env = os.environ
+        config = cls(max_ops=float(env.get("STORAGE_BOT_THROTTLE_OPS", "0")),
+                     max_read_bytes=parse_size(env.get("STORAGE_BOT_THROTTLE_READ_RATE", "0")),
+                     idle_io=env.get("STORAGE_BOT_THROTTLE_IDLE_IO", "") not in ("", "0"))
+        if env.get("STORAGE_BOT_THROTTLE", "") not in ("", "0") or config.max_ops or config.max_read_bytes:
+            return config
+        return None
+
+
+class Throttle:
+    """
+    Paces the calls of one job, shared by all of its threads. Callers report
+    each call with `op()` or `read()`, passing how long it took; the throttle
+    sleeps as needed to keep under the caps. With `adaptive`, the mean latency
+    of every WINDOW is compared with the quickest seen so far: at SLOWDOWN
+    times that, `factor` (the share of the caps the job may use) is halved,
+    otherwise it recovers by a quarter. Below 1, the job also rests
+    (1 / factor - 1) times as long as each call took, so it backs off even
+    without caps.
+    """
+    BURST = 0.1          # Seconds of unused allowance that can be spent at once
+    MIN_SLEEP = 0.005
+    WINDOW = 0.5
+    SLOWDOWN = 2.0
+    MIN_LATENCY = 0.0005 # Calls answered from cache are too fast to say anything about the disk
+    MIN_FACTOR = 1 / 64
+
+    def __init__(self, config: ThrottleConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.factor = 1.0
+        self.baseline: Optional[float] = None
+        self._ops_ready = 0.0
+        self._bytes_ready = 0.0
+        self._window_start = time.monotonic()
+        self._window_latency = 0.0
+        self._window_calls = 0
+        # Reported in the job's metrics
+        self.ops = 0
+        self.bytes = 0
+        self.slept = 0.0
+        self.backoffs = 0
+        self.min_factor = 1.0
+
+    def op(self, latency: Optional[float] = None, n: int = 1):
+        """
+        Accounts for `n` file system calls that took `latency` seconds in total.
+        """
+        with self.lock:
+            self.ops += n
+            if latency is not None:
+                self._observe(latency, n)
+            now = time.monotonic()
+            spacing = n / (self.config.max_ops * self.factor) if self.config.max_ops else 0.0
+            if latency is not None and self.factor < 1:
+                spacing = max(spacing, latency * (1 / self.factor - 1))
+            self._ops_ready = max(self._ops_ready, now - self.BURST) + spacing
+            delay = self._ops_ready - now
+        self._sleep(delay)
+
+    def read(self, nbytes: int, latency: Optional[float] = None):
+        """
+        Accounts for one read of `nbytes` bytes that took `latency` seconds.
+        """
+        with self.lock:
+            self.bytes += nbytes
+            if latency is not None:
+                self._observe(latency, 1)
+            now = time.monotonic()
+            spacing = nbytes / (self.config.max_read_bytes * self.factor) if self.config.max_read_bytes else 0.0
+            if latency is not None and self.factor < 1:
+                spacing = max(spacing, latency * (1 / self.factor - 1))
+            self._bytes_ready = max(self._bytes_ready, now - self.BURST) + spacing
+            delay = self._bytes_ready - now
+        self._sleep(delay)
+
+    def _observe(self, latency: float, n: int):
+        if not self.config.adaptive:
+            return
+        self._window_latency += latency
+        self._window_calls += n
+        now = time.monotonic()
+        if now - self._window_start < self.WINDOW:
+            return
+        mean = self._window_latency / self._window_calls
+        self._window_start, self._window_latency, self._window_calls = now, 0.0, 0
+        if self.baseline is None or mean < self.baseline:
+            self.baseline = mean
+        elif mean > self.baseline * self.SLOWDOWN and mean > self.MIN_LATENCY:
+            self.factor = max(self.MIN_FACTOR, self.factor / 2)
+            self.min_factor = min(self.min_factor, self.factor)
+            self.backoffs += 1
+            return
+        elif self.factor == 1:
+            self.baseline += (mean - self.baseline) * 0.01 # Follow slow drift while uncontended
+        self.factor = min(1.0, self.factor * 1.25)
+
+    def _sleep(self, delay: float):
+        if delay > self.MIN_SLEEP:
+            time.sleep(delay)
+            with self.lock:
+                self.slept += delay
+
+    def run(self, func: Callable, *args):
+        """
+        Calls `func(*args)`, at low priority if configured. Runs it right away
+        on a thread that has already been lowered, e.g. when a throttled
+        refresh scans a new folder.
+        """
+        if not self.config.low_priority or getattr(_lowered, "active", False):
+            return func(*args)
+        return run_at_low_priority(func, *args, idle_io=self.config.idle_io)
+
+    def report(self, metrics):
+        metrics.count("throttle_ops", self.ops)
+        metrics.count("throttle_bytes", self.bytes)
+        metrics.count("throttle_backoffs", self.backoffs)
+        metrics.add_time("throttle_sleep", self.slept)
+        metrics.tags["throttle_min_factor"] = round(self.min_factor, 3)
+
+
+def lower_priority(idle_io: bool = False) -> List[str]:
+    """
+    Lowers the CPU and I/O priority of the calling thread and returns what was
+    changed. Only Linux sets both per thread; elsewhere they would apply to the
+    whole process (the GUI included), so nothing is changed.
+    """
+    if not hasattr(os, "setpriority") or platform.system() != "Linux":
+        return []
+    applied = []
+    tid = threading.get_native_id()
+    try:
+        current = os.getpriority(os.PRIO_PROCESS, tid)
+        if current < NICE:
+            os.setpriority(os.PRIO_PROCESS, tid, NICE)
+        applied.append(f"nice {max(current, NICE)}")
+    except OSError:
+        pass
+    number = IOPRIO_SET_SYSCALL.get(platform.machine())
+    if number is not None:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        prio = (IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) if idle_io else (IOPRIO_CLASS_BE << IOPRIO_CLASS_SHIFT) | 7
+        if libc.syscall(number, IOPRIO_WHO_PROCESS, tid, prio) == 0:
+            applied.append("ioprio idle" if idle_io else "ioprio be/7")
+    return applied
+
+
+def run_at_low_priority(func: Callable, *args, idle_io: bool = False):
+    """
+    Calls `func(*args)` on a new thread with lowered priority and waits for it.
+    Priority can't always be raised back, so a pooled thread is never lowered.
+    """
+    result, error = [], []
+
+    def target():
+        lower_priority(idle_io)
+        _lowered.active = True
+        try:
+            result.append(func(*args))
+        except BaseException as e:
+            error.append(e)
+
+    thread = threading.Thread(target=target, name="throttled", daemon=True)
+    thread.start()
+    thread.join()
+    if error:
+        raise error[0]
+    return result[0]
@@ -0,0 +1,126 @@
+import heapq
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Snapshot nodes are compact nested lists: [name, size, latest_modified, children]
+# where children is None for files and a list of snapshot nodes for directories.
+SNAP_NAME, SNAP_SIZE, SNAP_MTIME, SNAP_CHILDREN = range(4)
+
+
+def to_snapshot(root) -> list:
+    """
+    Converts a FileNode tree into the compact nested-list form stored on disk.
+    The root entry carries the full scanned path instead of its base name.
+    """
+    snapshot = _snapshot_recursive(root)
+    snapshot[SNAP_NAME] = root.path
+    return snapshot
+
+
+def _snapshot_recursive(node) -> list:
+    if not node.is_dir:
+        return [node.name, node.size, node.latest_modified, None]
+    return [node.name, node.size, node.latest_modified, [_snapshot_recursive(child) for child in node.children]]
+
+
+@dataclass
+class DiffEntry:
+    kind: str  # "added", "removed", "grown" or "shrunk"
+    path: str
+    is_dir: bool
+    old_size: int
+    new_size: int
+
+    @property
+    def delta(self) -> int:
+        return self.new_size - self.old_size
+
+
+@dataclass
+class TreeDiff:
+    entries: List[DiffEntry] = field(default_factory=list)
+    total_delta: int = 0
+    skipped_subtrees: int = 0
+
+    def by_kind(self, kind: str) -> List[DiffEntry]:
+        return [e for e in self.entries if e.kind == kind]
+
+    def ranked(self, limit: Optional[int] = None, files_only: bool = False,
+               kind: Optional[str] = None) -> List[DiffEntry]:
+        """
+        Returns entries ordered by absolute byte delta (largest first).
+        """
+        entries = self.entries
+        if files_only or kind:
+            entries = [e for e in entries if not (files_only and e.is_dir) and (kind is None or e.kind == kind)]
+        if limit is None:
+            return sorted(entries, key=lambda e: abs(e.delta), reverse=True)
+        return heapq.nlargest(limit, entries, key=lambda e: abs(e.delta))
+
+
+def _unpack(node):
+    # Normalizes FileNodes and snapshot lists to (name, size, latest_modified, children-or-None)
+    if isinstance(node, list):
+        return node[SNAP_NAME], node[SNAP_SIZE], node[SNAP_MTIME], node[SNAP_CHILDREN]
+    return node.name, node.size, node.latest_modified, (node.children if node.is_dir else None)
+
+
+def diff_trees(old_root, new_root) -> TreeDiff:
+    """
+    Compares two scans of the same root. Either side may be a FileNode tree or a
+    snapshot produced by `to_snapshot`.
+
+    Subtrees whose aggregate size and newest mtime are unchanged are skipped without
+    being walked, so the cost is proportional to what changed rather than to the
+    size of the trees. Added and removed directories are reported as a single entry.
+    """
+    result = TreeDiff()
+    _, old_size, _, _ = _unpack(old_root)
+    _, new_size, _, _ = _unpack(new_root)
+    result.total_delta = new_size - old_size
+
+    root_path = new_root[SNAP_NAME] if isinstance(new_root, list) else new_root.path
+    stack = [(root_path, old_root, new_root)]
+    entries = result.entries
+
+    while stack:
+        path, old, new = stack.pop()
+        _, o_size, o_mtime, o_children = _unpack(old)
+        _, n_size, n_mtime, n_children = _unpack(new)
+
+        if o_size == n_size and o_mtime == n_mtime and (o_children is None) == (n_children is None):
+            result.skipped_subtrees += 1
+            continue
+
+        if (o_children is None) != (n_children is None):
+            # A file became a directory or vice versa
+            entries.append(DiffEntry("removed", path, o_children is not None, o_size, 0))
+            entries.append(DiffEntry("added", path, n_children is not None, 0, n_size))
+            continue
+
+        if o_size != n_size:
+            kind = "grown" if n_size > o_size else "shrunk"
+            entries.append(DiffEntry(kind, path, n_children is not None, o_size, n_size))
+
+        if n_children is None:
+            continue
+
+        old_by_name = {}
+        for child in o_children:
+            old_by_name[_unpack(child)[0]] = child
+
+        for child in n_children:
+            name, c_size, _, c_children = _unpack(child)
+            child_path = os.path.join(path, name)
+            match = old_by_name.pop(name, None)
+            if match is None:
+                entries.append(DiffEntry("added", child_path, c_children is not None, 0, c_size))
+            else:
+                stack.append((child_path, match, child))
+
+        for name, child in old_by_name.items():
+            _, c_size, _, c_children = _unpack(child)
+            entries.append(DiffEntry("removed", os.path.join(path, name), c_children is not None, c_size, 0))
+
+    return result
@@ -0,0 +1,294 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Pure-Python treemap layout, kept free of Qt so it can run in worker threads and benchmarks.
+
+class TreemapRect:
+    """
+    One laid-out block. `is_leaf` blocks are the ones that get filled; directory
+    blocks are only outlined. Aggregate blocks stand in for the many children of
+    `node` that were too small to draw individually.
+    """
+    __slots__ = ("x", "y", "w", "h", "depth", "node", "is_leaf", "is_aggregate", "count")
+
+    def __init__(self, x: float, y: float, w: float, h: float, depth: int, node,
+                 is_leaf: bool = True, is_aggregate: bool = False, count: int = 1):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.depth = depth
+        self.node = node
+        self.is_leaf = is_leaf
+        self.is_aggregate = is_aggregate
+        self.count = count
+
+    def contains(self, px: float, py: float) -> bool:
+        return self.x <= px < self.x + self.w and self.y <= py < self.y + self.h
+
+
+def _worst(row_sum: float, row_min: float, row_max: float, side: float) -> float:
+    # Worst aspect ratio of a row laid along `side` (Bruls, Huizing & van Wijk)
+    s2 = row_sum * row_sum
+    side2 = side * side
+    return max(side2 * row_max / s2, s2 / (side2 * row_min))
+
+
+def squarify(sizes: Sequence[float], x: float, y: float, w: float, h: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Lays out `sizes` (sorted largest first, all positive) in the given rectangle
+    with the squarified algorithm. Returns one (x, y, w, h) per size.
+    """
+    total = sum(sizes)
+    if total <= 0 or w <= 0 or h <= 0:
+        return [(x, y, 0.0, 0.0) for _ in sizes]
+
+    scale = (w * h) / total
+    areas = [s * scale for s in sizes]
+    rects = []
+    i = 0
+    n = len(areas)
+
+    while i < n:
+        side = min(w, h)
+        row_sum = row_min = row_max = areas[i]
+        worst = _worst(row_sum, row_min, row_max, side)
+        j = i + 1
+        while j < n:
+            a = areas[j]
+            candidate = _worst(row_sum + a, min(row_min, a), max(row_max, a), side)
+            if candidate > worst:
+                break
+            row_sum += a
+            row_min = min(row_min, a)
+            row_max = max(row_max, a)
+            worst = candidate
+            j += 1
+
+        if w >= h:
+            # Row becomes a column along the left edge
+            thickness = row_sum / h
+            cy = y
+            for k in range(i, j):
+                rh = areas[k] / thickness
+                rects.append((x, cy, thickness, rh))
+                cy += rh
+            x += thickness
+            w -= thickness
+        else:
+            # Row runs along the top edge
+            thickness = row_sum / w
+            cx = x
+            for k in range(i, j):
+                rw = areas[k] / thickness
+                rects.append((cx, y, rw, thickness))
+                cx += rw
+            y += thickness
+            h -= thickness
+        i = j
+
+    return rects
+
+
+def sorted_children(node) -> list:
+    return sorted((c for c in node.children if c.size > 0), key=lambda c: c.size, reverse=True)
+
+
+def layout_tree(root, x: float, y: float, w: float, h: float,
+                max_depth: int = 8, min_area: float = 36.0, min_side: float = 3.0,
+                children_of: Callable = sorted_children) -> List[TreemapRect]:
+    """
+    Lays out `root` and its descendants in the given rectangle.
+
+    Level-of-detail culling keeps the output proportional to what can be seen:
+    directories deeper than `max_depth` or smaller than `min_side` pixels are
+    drawn as one block, and children whose area would be below `min_area`
+    square pixels are merged into a single aggregate block per directory.
+    Rects are returned parents first. `children_of` returns a node's positive-size
+    children sorted largest first, so callers can supply a cached version.
+    """
+    out: List[TreemapRect] = []
+    stack = [(root, x, y, w, h, 0)]
+
+    while stack:
+        node, nx, ny, nw, nh, depth = stack.pop()
+
+        if (not node.is_dir or not node.children or depth >= max_depth or node.size <= 0
+                or nw < min_side or nh < min_side):
+            out.append(TreemapRect(nx, ny, nw, nh, depth, node))
+            continue
+
+        out.append(TreemapRect(nx, ny, nw, nh, depth, node, is_leaf=False))
+
+        # Children are sorted largest first, so everything after the first tiny one is tiny too
+        scale = (nw * nh) / node.size
+        kids = children_of(node)
+        visible = []
+        visible_size = 0
+        for child in kids:
+            if child.size * scale < min_area:
+                break
+            visible.append(child)
+            visible_size += child.size
+
+        sizes = [c.size for c in visible]
+        rest = node.size - visible_size
+        hidden_count = len(kids) - len(visible)
+        if rest > 0 and hidden_count:
+            sizes.append(rest)
+
+        if not sizes:
+            out[-1].is_leaf = True
+            continue
+
+        rects = squarify(sizes, nx, ny, nw, nh)
+        for child, (cx, cy, cw, ch) in zip(visible, rects):
+            stack.append((child, cx, cy, cw, ch, depth + 1))
+        if len(rects) > len(visible):
+            cx, cy, cw, ch = rects[-1]
+            out.append(TreemapRect(cx, cy, cw, ch, depth + 1, node, is_aggregate=True, count=hidden_count))
+
+    return out
+
+
+class LayoutCache:
+    """
+    Caches sorted children per node and normalized (unit square) layouts per
+    node, so a resize can rescale an existing layout instead of recomputing it.
+    Entries are looked up by node identity and must be invalidated when the
+    tree is mutated (see `invalidate`). Layout workers fill the cache while
+    the GUI thread invalidates it, so every access holds `lock`.
+    """
+    def __init__(self, max_layouts: int = 32, aspect_tolerance: float = 0.15, area_tolerance: float = 2.0):
+        self.max_layouts = max_layouts
+        self.aspect_tolerance = aspect_tolerance
+        self.area_tolerance = area_tolerance
+        self._sorted = {}               # id(node) -> (node, sorted children)
+        self._layouts = OrderedDict()   # (id(node), max_depth, min_area) -> [(node, w, h, normalized rects)]
+        self.lock = threading.Lock()
+        self.generation = 0             # Bumped on every clear/invalidate
+
+    def clear(self):
+        with self.lock:
+            self._sorted.clear()
+            self._layouts.clear()
+            self.generation += 1
+
+    def sorted_children(self, node) -> list:
+        with self.lock:
+            entry = self._sorted.get(id(node))
+            generation = self.generation
+        if entry is not None and entry[0] is node:
+            return entry[1]
+        # Sorted outside the lock; dropped if the tree changed meanwhile
+        children = sorted_children(node)
+        with self.lock:
+            if self.generation == generation:
+                self._sorted[id(node)] = (node, children)
+        return children
+
+    def compute(self, node, w: float, h: float, max_depth: int, min_area: float) -> List[TreemapRect]:
+        """
+        Lays out `node` at the given size and stores the normalized result.
+        """
+        rects = layout_tree(node, 0, 0, w, h, max_depth=max_depth, min_area=min_area,
+                            children_of=self.sorted_children)
+        self.store(node, w, h, max_depth, min_area, rects)
+        return rects
+
+    def store(self, node, w: float, h: float, max_depth: int, min_area: float, rects: List[TreemapRect],
+              generation: Optional[int] = None):
+        """
+        Caches a layout. One computed from the tree as of `generation` is
+        dropped if the cache has been invalidated since.
+        """
+        if w <= 0 or h <= 0:
+            return
+        normalized = [TreemapRect(r.x / w, r.y / h, r.w / w, r.h / h, r.depth, r.node,
+                                  r.is_leaf, r.is_aggregate, r.count) for r in rects]
+        key = (id(node), max_depth, min_area)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            entries = [e for e in self._layouts.pop(key, []) if e[0] is node and (e[1], e[2]) != (w, h)]
+            entries.append((node, w, h, normalized))
+            self._layouts[key] = entries[-4:]
+            while len(self._layouts) > self.max_layouts:
+                self._layouts.popitem(last=False)
+
+    def lookup(self, node, w: float, h: float, max_depth: int, min_area: float,
+               exact: bool = False) -> Optional[List[TreemapRect]]:
+        """
+        Returns a cached layout rescaled to (w, h), or None if no cached layout has
+        a close enough aspect ratio and area. With `exact`, only the same size matches.
+        """
+        if w <= 0 or h <= 0:
+            return None
+        key = (id(node), max_depth, min_area)
+        with self.lock:
+            entries = self._layouts.get(key)
+            if not entries:
+                return None
+            self._layouts.move_to_end(key)
+
+        aspect = w / h
+        best = None
+        for cached_node, cw, ch, normalized in entries:
+            if cached_node is not node:
+                continue
+            if exact:
+                if (cw, ch) == (w, h):
+                    best = normalized
+                    break
+                continue
+            aspect_change = abs((cw / ch) / aspect - 1.0)
+            area_change = max(cw * ch, w * h) / min(cw * ch, w * h)
+            if aspect_change <= self.aspect_tolerance and area_change <= self.area_tolerance:
+                best = normalized
+                break
+        if best is None:
+            return None
+        return [TreemapRect(r.x * w, r.y * h, r.w * w, r.h * h, r.depth, r.node,
+                            r.is_leaf, r.is_aggregate, r.count) for r in best]
+
+    def invalidate(self, removal):
+        """
+        Drops cached data for nodes whose subtree changed (see scanner.TreeRemoval).
+        Layouts of untouched subtrees stay cached.
+        """
+        with self.lock:
+            for node_id in removal.affected_ids | removal.removed_ids:
+                self._sorted.pop(node_id, None)
+            for key in [k for k in self._layouts if k[0] in removal.affected_ids or k[0] in removal.removed_ids]:
+                del self._layouts[key]
+            self.generation += 1
+
+
+class SpatialIndex:
+    """
+    Uniform grid over the filled (leaf) blocks for constant-time hit testing.
+    Leaf blocks tile the treemap without overlapping, so a point lies in at most one.
+    """
+    def __init__(self, rects: List[TreemapRect], cell_size: float = 32.0):
+        self.cell_size = cell_size
+        self.cells = {}
+        for rect in rects:
+            if not rect.is_leaf or rect.w <= 0 or rect.h <= 0:
+                continue
+            x0 = int(rect.x // cell_size)
+            x1 = int((rect.x + rect.w) // cell_size)
+            y0 = int(rect.y // cell_size)
+            y1 = int((rect.y + rect.h) // cell_size)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(rect)
+
+    def hit(self, px: float, py: float) -> Optional[TreemapRect]:
+        bucket = self.cells.get((int(px // self.cell_size), int(py // self.cell_size)))
+        if not bucket:
+            return None
+        for rect in bucket:
+            if rect.contains(px, py):
+                return rect
+        return None
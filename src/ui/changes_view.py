@@ -0,0 +1,107 @@
+import datetime
+import os
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget,
+                             QTreeWidgetItem, QComboBox, QCheckBox)
+from PyQt6.QtGui import QColor, QBrush
+from src.metrics import timed
+
+class ChangesView(QWidget):
+    """
+    "What changed" page: lists the entries that differ from the previous scan,
+    ranked by byte delta.
+    """
+    MAX_ROWS = 1000
+
+    KIND_COLORS = {
+        "added": "#ff6b6b",   # New bytes -> red, like storage increases in the header
+        "grown": "#ff922b",
+        "shrunk": "#51cf66",
+        "removed": "#40c057",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.diff = None
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        self.lbl_header = QLabel("What Changed")
+        self.lbl_header.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        self.layout.addWidget(self.lbl_header)
+
+        self.lbl_summary = QLabel("Changes appear after a folder has been scanned twice.")
+        self.lbl_summary.setStyleSheet("color: #AAAAAA; margin-bottom: 5px;")
+        self.layout.addWidget(self.lbl_summary)
+
+        # Filters
+        filter_layout = QHBoxLayout()
+        self.combo_kind = QComboBox()
+        self.combo_kind.addItems(["All changes", "Added", "Removed", "Grown", "Shrunk"])
+        self.combo_kind.currentIndexChanged.connect(self.render)
+        filter_layout.addWidget(self.combo_kind)
+
+        self.chk_files_only = QCheckBox("Files only")
+        self.chk_files_only.toggled.connect(self.render)
+        filter_layout.addWidget(self.chk_files_only)
+        filter_layout.addStretch()
+        self.layout.addLayout(filter_layout)
+
+        self.tree = QTreeWidget()
+        self.tree.setRootIsDecorated(False)
+        self.tree.setHeaderLabels(["Change", "Delta", "Before", "After", "Path"])
+        self.tree.setColumnWidth(0, 90)
+        self.tree.setColumnWidth(1, 110)
+        self.tree.setColumnWidth(2, 100)
+        self.tree.setColumnWidth(3, 100)
+        self.tree.setStyleSheet("""
+            QTreeWidget {
+                background-color: #252525;
+                border: 1px solid #3D3D3D;
+            }
+            QTreeWidget::item {
+                padding: 5px;
+            }
+        """)
+        self.layout.addWidget(self.tree)
+
+    @timed("view.changes.set_diff")
+    def set_diff(self, diff, previous_timestamp: float):
+        self.diff = diff
+        prev_date = datetime.datetime.fromtimestamp(previous_timestamp).strftime('%Y-%m-%d %H:%M')
+        sign = "+" if diff.total_delta > 0 else "-" if diff.total_delta < 0 else ""
+        self.lbl_summary.setText(
+            f"Compared with the scan from {prev_date}: {sign}{self.format_size(abs(diff.total_delta))} overall, "
+            f"{len(diff.entries)} changed entries."
+        )
+        self.render()
+
+    def render(self):
+        self.tree.clear()
+        if not self.diff:
+            return
+
+        kind = self.combo_kind.currentText().lower()
+        entries = self.diff.ranked(limit=self.MAX_ROWS,
+                                   files_only=self.chk_files_only.isChecked(),
+                                   kind=None if kind == "all changes" else kind)
+
+        items = []
+        for entry in entries:
+            item = QTreeWidgetItem()
+            delta = entry.delta
+            sign = "+" if delta > 0 else "-"
+            item.setText(0, entry.kind.capitalize())
+            item.setText(1, f"{sign}{self.format_size(abs(delta))}")
+            item.setText(2, self.format_size(entry.old_size) if entry.old_size else "")
+            item.setText(3, self.format_size(entry.new_size) if entry.new_size else "")
+            item.setText(4, entry.path + (os.sep if entry.is_dir else ""))
+            item.setForeground(0, QBrush(QColor(self.KIND_COLORS[entry.kind])))
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+
+    def format_size(self, size):
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024:
+                return f"{size:.2f} {unit}"
+            size /= 1024
+        return f"{size:.2f} PB"
@@ -1,7 +1,7 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt6.QtCharts import QChart, QChartView, QPieSeries, QPieSlice
 from PyQt6.QtGui import QPainter, QColor, QFont, QPen
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QMargins, QTimer
 
 class StorageBreakdownChart(QWidget):
     def __init__(self):
@@ -22,7 +22,8 @@ class StorageBreakdownChart(QWidget):
         self.chart.legend().setAlignment(Qt.AlignmentFlag.AlignRight)
         self.chart.legend().setFont(QFont("Segoe UI", 9))
         self.chart.setBackgroundRoundness(0)
-        self.chart.setMargins(0,0,0,0)
+        self.chart.setMargins(QMargins(0, 0, 0, 0))
+        self.chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
         self.chart.setBackgroundVisible(False) # Let parent background show
 
         self.chart_view = QChartView(self.chart)
@@ -44,36 +45,55 @@ class StorageBreakdownChart(QWidget):
             "Unknown": QColor("#868E96")     # Gray
         }
 
-    def update_data(self, root_node):
-        self.series.clear()
-        
-        totals = {cat: 0 for cat in self.colors.keys()}
-        
-        # Traverse and sum
-        self._sum_recursive(root_node, totals)
-        
-        total_size = root_node.size or 1 # Avoid div by zero
-        
-        for cat, size in totals.items():
-            if size > 0:
-                percentage = (size / total_size) * 100
-                if percentage < 1: 
-                    continue # Skip tiny slices
-                
-                slice_ = self.series.append(f"{cat} ({percentage:.1f}%)", size)
-                slice_.setBrush(self.colors.get(cat, QColor("#868E96")))
-                slice_.setLabelVisible(True)
-                slice_.setLabelColor(QColor("white"))
-                
-                # Explode the biggest slice slice
-                # if percentage > 50:
-                #    slice_.setExploded(True)
-                #    slice_.setExplodeDistanceFactor(0.1)
+        self.slices = {} # Category -> QPieSlice, kept for the lifetime of the chart
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(100)
+        self.render_timer.timeout.connect(self._render)
+        self.reset()
 
-    def _sum_recursive(self, node, totals):
-        if not node.is_dir:
-            if node.category in totals:
-                totals[node.category] += node.size
-        else:
-            for child in node.children:
-                self._sum_recursive(child, totals)
+    def reset(self):
+        """
+        Zeroes the totals, e.g. when a new scan starts streaming its categories.
+        """
+        self.totals = {cat: 0 for cat in self.colors.keys()}
+        self.total_size = 0
+        self.render_timer.stop()
+        self._render()
+
+    def apply_category_deltas(self, deltas, total_size=None):
+        """
+        Adds per-category byte deltas (from a streaming scan, a deletion or a
+        file watcher) to the totals. Never walks the tree; repaints are coalesced.
+        """
+        for cat, delta in deltas.items():
+            self.totals[cat] = max(0, self.totals.get(cat, 0) + delta)
+        self.total_size = total_size if total_size is not None else sum(self.totals.values())
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def _slice_for(self, cat):
+        slice_ = self.slices.get(cat)
+        if slice_ is None:
+            slice_ = QPieSlice(cat, 0)
+            slice_.setBrush(self.colors.get(cat, QColor("#868E96")))
+            slice_.setLabelColor(QColor("white"))
+            self.series.append(slice_)
+            self.slices[cat] = slice_
+        return slice_
+
+    def _render(self):
+        # Slices are created once and updated in place, so the chart animates the change
+        total_size = self.total_size or 1 # Avoid div by zero
+        markers = {m.slice(): m for m in self.chart.legend().markers(self.series)}
+        
+        for cat, size in self.totals.items():
+            slice_ = self._slice_for(cat)
+            percentage = (size / total_size) * 100
+            visible = size > 0 and percentage >= 1 # Hide tiny slices
+            slice_.setValue(size if visible else 0)
+            slice_.setLabel(f"{cat} ({percentage:.1f}%)")
+            slice_.setLabelVisible(visible)
+            marker = markers.get(slice_)
+            if marker is not None:
+                marker.setVisible(visible)
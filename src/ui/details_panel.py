@@ -1,13 +1,16 @@
+import datetime
 import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, 
                              QMessageBox)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
 from src.scanner import FileNode
-import send2trash
+from src.scan_engine import is_aggregate
 
 class DetailsPanel(QWidget):
+    deleteRequested = pyqtSignal(list, bool) # FileNodes, permanently delete cache items
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.node = None
@@ -121,6 +124,16 @@ class DetailsPanel(QWidget):
         self.btn_open.show()
         self.btn_delete.show()
 
+        if is_aggregate(node):
+            # Folded by a memory-budgeted scan: there is no single file to delete
+            newest = datetime.datetime.fromtimestamp(node.modified).strftime("%Y-%m-%d")
+            oldest = datetime.datetime.fromtimestamp(node.oldest_modified).strftime("%Y-%m-%d")
+            self.lbl_analysis.setText(
+                f"{node.count:,} small {node.category} files in this folder, grouped to save memory. "
+                f"Modified between {oldest} and {newest}."
+            )
+            self.btn_delete.hide()
+
     def open_in_explorer(self):
         if self.node:
             folder_path = self.node.path if self.node.is_dir else os.path.dirname(self.node.path)
@@ -138,12 +151,26 @@ class DetailsPanel(QWidget):
         )
         
         if confirm == QMessageBox.StandardButton.Yes:
-            try:
-                send2trash.send2trash(self.node.path)
-                QMessageBox.information(self, "Deleted", "Item moved to Recycle Bin.")
-                # TODO: Trigger refresh or remove from tree
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Could not delete: {str(e)}")
+            # Deletion runs in the background; the main window reports the result
+            self.deleteRequested.emit([self.node], False)
+
+    def apply_removal(self, removal):
+        """
+        Keeps the panel in sync after nodes were removed from the scan tree.
+        """
+        if not self.node:
+            return
+        if removal.is_removed(self.node):
+            self.node = None
+            self.lbl_name.setText("Select a file")
+            self.lbl_path.setText("")
+            self.lbl_size.setText("")
+            self.lbl_analysis.setText("")
+            self.lbl_category.hide()
+            self.btn_open.hide()
+            self.btn_delete.hide()
+        elif removal.is_affected(self.node):
+            self.lbl_size.setText(self.format_size(self.node.size))
 
     def format_size(self, size):
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -0,0 +1,154 @@
+import datetime
+import json
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem,
+                             QPushButton, QCheckBox, QPlainTextEdit, QSplitter, QFileDialog)
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QFont
+from src.metrics import recorder
+
+class MetricsBridge(QObject):
+    # Recorder listeners run on the worker's thread; the signal hops to the GUI thread
+    jobRecorded = pyqtSignal(object)
+
+class DiagnosticsView(QWidget):
+    """
+    Recent jobs recorded by src.metrics (scans, analysis, history, view updates)
+    with their timers and counters, plus JSON lines export.
+    """
+    COLUMNS = ["Time", "Job", "Duration", "Rate", "Details"]
+
+    def __init__(self, scan_manager=None):
+        super().__init__()
+        self.scan_manager = scan_manager
+        self.jobs = {} # job id -> JobMetrics
+
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.lbl_header = QLabel("Diagnostics")
+        self.lbl_header.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        header.addWidget(self.lbl_header)
+        header.addStretch()
+
+        self.chk_profile = QCheckBox("Profile jobs (slower)")
+        self.chk_profile.setChecked(recorder.profile)
+        self.chk_profile.setToolTip("Capture a cProfile summary for every job from now on")
+        self.chk_profile.toggled.connect(lambda on: setattr(recorder, "profile", on))
+        header.addWidget(self.chk_profile)
+
+        for text, slot in (("Export JSON Lines...", self.export_jsonl), ("Clear", self.clear)):
+            btn = QPushButton(text)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #333333;
+                    color: white;
+                    border-radius: 4px;
+                    padding: 4px 10px;
+                }
+                QPushButton:hover { background-color: #404040; }
+            """)
+            btn.clicked.connect(slot)
+            header.addWidget(btn)
+        self.layout.addLayout(header)
+
+        self.lbl_summary = QLabel("")
+        self.lbl_summary.setStyleSheet("color: #AAAAAA; margin-bottom: 5px;")
+        self.layout.addWidget(self.lbl_summary)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setColumnWidth(0, 90)
+        self.tree.setColumnWidth(1, 200)
+        self.tree.setColumnWidth(2, 90)
+        self.tree.setColumnWidth(3, 140)
+        self.tree.setStyleSheet("""
+            QTreeWidget { background-color: #2D2D2D; border: none; font-size: 13px; }
+            QHeaderView::section { background-color: #333333; color: white; padding: 4px; border: none; }
+        """)
+        self.tree.currentItemChanged.connect(self.show_details)
+        splitter.addWidget(self.tree)
+
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setFont(QFont("Consolas", 9))
+        self.details.setStyleSheet("background-color: #252525; border: none;")
+        splitter.addWidget(self.details)
+        splitter.setSizes([400, 200])
+        self.layout.addWidget(splitter)
+
+        self.bridge = MetricsBridge(self)
+        self.bridge.jobRecorded.connect(self.add_job)
+        for metrics in recorder.jobs():
+            self.add_job(metrics)
+        recorder.add_listener(self.bridge.jobRecorded.emit)
+
+    def add_job(self, metrics):
+        self.jobs[metrics.id] = metrics
+        rates = metrics.rates()
+        rate = ""
+        for key in ("files_per_sec", "bytes_hashed_per_sec", "nodes_per_sec"):
+            if key in rates:
+                rate = f"{rates[key]:,.0f} {key.replace('_per_sec', '')}/s"
+                break
+        details = ", ".join(f"{k}={v}" for k, v in metrics.tags.items())
+        item = QTreeWidgetItem([
+            datetime.datetime.fromtimestamp(metrics.started).strftime("%H:%M:%S"),
+            metrics.name + (" (profiled)" if metrics.profile_text else ""),
+            f"{(metrics.duration or 0) * 1000:,.1f} ms",
+            rate,
+            details,
+        ])
+        item.setData(0, Qt.ItemDataRole.UserRole, metrics.id)
+        item.setTextAlignment(2, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if "error" in metrics.tags:
+            item.setForeground(1, Qt.GlobalColor.red)
+        self.tree.insertTopLevelItem(0, item) # Newest first
+
+        # Keep the panel bounded like the recorder
+        while self.tree.topLevelItemCount() > 500:
+            old = self.tree.takeTopLevelItem(self.tree.topLevelItemCount() - 1)
+            self.jobs.pop(old.data(0, Qt.ItemDataRole.UserRole), None)
+        self.update_summary()
+
+    def update_summary(self):
+        parts = [f"{len(self.jobs)} jobs recorded"]
+        if self.scan_manager is not None:
+            parts.append(f"thread pool: {self.scan_manager.max_threads} threads")
+        scans = [m for m in self.jobs.values() if m.name == "scan" and m.duration]
+        if scans:
+            last = max(scans, key=lambda m: m.started)
+            c = last.counters
+            parts.append(f"last scan: {c.get('files', 0):,.0f} files, {c.get('dirs', 0):,.0f} folders in "
+                         f"{last.duration:.2f}s, {c.get('permission_errors', 0):,.0f} permission errors, "
+                         f"{c.get('skipped', 0):,.0f} skipped")
+        self.lbl_summary.setText(" · ".join(parts))
+
+    def show_details(self, item, previous=None):
+        if item is None:
+            self.details.clear()
+            return
+        metrics = self.jobs.get(item.data(0, Qt.ItemDataRole.UserRole))
+        if metrics is None:
+            return
+        data = metrics.to_dict()
+        data.pop("profile", None) # Shown below as plain text
+        text = json.dumps(data, indent=2)
+        if metrics.profile_text:
+            text += "\n\n" + metrics.profile_text
+        self.details.setPlainText(text)
+
+    def export_jsonl(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.jsonl", "JSON Lines (*.jsonl)")
+        if path:
+            count = recorder.export_jsonl(path)
+            self.lbl_summary.setText(f"Exported {count} jobs to {path}")
+
+    def clear(self):
+        recorder.clear()
+        self.jobs.clear()
+        self.tree.clear()
+        self.details.clear()
+        self.update_summary()
@@ -0,0 +1,210 @@
+import os
+import re
+import shutil
+import threading
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+
+# File system types that are never worth offering as a scan target
+PSEUDO_FILESYSTEMS = {
+    "proc", "sysfs", "devpts", "devtmpfs", "cgroup", "cgroup2", "securityfs", "pstore", "debugfs",
+    "tracefs", "configfs", "fusectl", "mqueue", "hugetlbfs", "autofs", "binfmt_misc", "bpf", "nsfs",
+    "rpc_pipefs", "efivarfs", "selinuxfs", "ramfs", "squashfs", "tmpfs", "fuse.portal", "fuse.gvfsd-fuse",
+}
+PSEUDO_MOUNT_PREFIXES = ("/dev", "/proc", "/sys", "/run", "/var/run", "/var/lock", "/snap", "/boot/efi")
+
+def list_mount_points():
+    """
+    Returns (root path, display name) for each mounted volume. On Linux the mount
+    table is read directly, so a hung network mount can't block the listing.
+    """
+    if os.path.exists("/proc/self/mounts"):
+        volumes = []
+        seen = set()
+        with open("/proc/self/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # Spaces and tabs in mount points are octal-escaped
+                mount_dir = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+                fs_type = fields[2]
+                if fs_type in PSEUDO_FILESYSTEMS or mount_dir in seen:
+                    continue
+                if mount_dir != "/" and mount_dir.startswith(PSEUDO_MOUNT_PREFIXES) \
+                        and not mount_dir.startswith("/run/media"):
+                    continue
+                seen.add(mount_dir)
+                volumes.append((mount_dir, os.path.basename(mount_dir) or mount_dir))
+        return volumes
+
+    from PyQt6.QtCore import QStorageInfo
+    return [(v.rootPath(), v.displayName() or v.rootPath())
+            for v in QStorageInfo.mountedVolumes() if v.isValid() and v.isReady()]
+
+
+class VolumeProbe(QObject):
+    """
+    Lists volumes and queries their free space on daemon threads, one per
+    volume, so a stale mount only delays its own button and never blocks exit.
+    """
+    listed = pyqtSignal(list)            # [(root path, display name)]
+    probed = pyqtSignal(str, object)     # root path, free bytes (None if it failed)
+
+    def start(self):
+        threading.Thread(target=self._list, daemon=True).start()
+
+    def _list(self):
+        try:
+            volumes = list_mount_points()
+        except Exception:
+            volumes = []
+        self.listed.emit(volumes)
+        for root, _ in volumes:
+            threading.Thread(target=self._probe, args=(root,), daemon=True).start()
+
+    def _probe(self, root):
+        try:
+            free = shutil.disk_usage(root).free
+        except OSError:
+            free = None
+        self.probed.emit(root, free)
+
+
+class DriveList(QWidget):
+    """
+    Sidebar list of drive buttons. Buttons appear as each volume answers; volumes
+    that don't answer within PROBE_TIMEOUT_MS are shown as not responding.
+    Ticking two or more drives offers to scan them together.
+    """
+    scanRequested = pyqtSignal(str)
+    multiScanRequested = pyqtSignal(list) # Root paths to scan in parallel into one tree
+    driveReady = pyqtSignal(str) # Root path, emitted when a volume answers or times out
+
+    PROBE_TIMEOUT_MS = 2000
+
+    BUTTON_STYLE = """
+        QPushButton {
+            background-color: #333333;
+            color: white;
+            border-radius: 4px;
+            text-align: left;
+            padding-left: 10px;
+        }
+        QPushButton:hover { background-color: #404040; }
+        QPushButton:disabled { color: #777777; }
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buttons = {} # root path -> (button, display name)
+        self.checks = {}  # root path -> selection checkbox
+        self.rows = {}    # root path -> row widget holding both
+        self.pending = set()
+
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.setSpacing(10)
+
+        self.status_label = QLabel("Detecting drives...")
+        self.status_label.setStyleSheet("color: #777777;")
+        self.layout.addWidget(self.status_label)
+
+        self.btn_scan_selected = QPushButton("")
+        self.btn_scan_selected.setFixedHeight(30)
+        self.btn_scan_selected.setStyleSheet(self.BUTTON_STYLE)
+        self.btn_scan_selected.clicked.connect(self.scan_selected)
+        self.btn_scan_selected.hide()
+
+        self.probe = VolumeProbe(self)
+        self.probe.listed.connect(self.on_listed)
+        self.probe.probed.connect(self.on_probed)
+
+    def start(self):
+        self.probe.start()
+
+    def on_listed(self, volumes):
+        if not volumes:
+            self.status_label.setText("No drives found.")
+            return
+        for root, name in volumes:
+            # Buttons are created in mount order but stay hidden until the volume answers
+            btn = QPushButton(name)
+            btn.setFixedHeight(40)
+            btn.setStyleSheet(self.BUTTON_STYLE)
+            btn.clicked.connect(lambda checked, p=root: self.scanRequested.emit(p))
+
+            check = QCheckBox()
+            check.setToolTip("Select to scan several drives together")
+            check.setEnabled(False)
+            check.toggled.connect(self.update_selection)
+
+            row = QWidget()
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(0, 0, 0, 0)
+            row_layout.setSpacing(4)
+            row_layout.addWidget(check)
+            row_layout.addWidget(btn, 1)
+            row.hide()
+            self.layout.addWidget(row)
+            self.buttons[root] = (btn, name)
+            self.checks[root] = check
+            self.rows[root] = row
+            self.pending.add(root)
+            QTimer.singleShot(self.PROBE_TIMEOUT_MS, lambda r=root: self.on_timeout(r))
+        self.layout.addWidget(self.btn_scan_selected)
+
+    def on_probed(self, root, free):
+        entry = self.buttons.get(root)
+        if entry is None:
+            return
+        btn, name = entry
+        if free is None:
+            btn.setText(f"{name} (unavailable)")
+            btn.setEnabled(False)
+            self.checks[root].setChecked(False)
+            self.checks[root].setEnabled(False)
+        else:
+            btn.setText(f"{name} ({self.format_size_simple(free)} free)")
+            btn.setEnabled(True)
+            self.checks[root].setEnabled(True)
+        self.rows[root].show()
+        self._resolved(root)
+
+    def on_timeout(self, root):
+        if root not in self.pending:
+            return
+        btn, name = self.buttons[root]
+        # A late answer still fills the button in through on_probed
+        btn.setText(f"{name} (not responding)")
+        btn.setEnabled(False)
+        self.rows[root].show()
+        self._resolved(root)
+
+    def _resolved(self, root):
+        if root in self.pending:
+            self.pending.discard(root)
+            self.driveReady.emit(root)
+        if not self.pending:
+            self.status_label.hide()
+
+    def selected_roots(self):
+        return [root for root, check in self.checks.items() if check.isChecked()]
+
+    def update_selection(self):
+        count = len(self.selected_roots())
+        self.btn_scan_selected.setText(f"Scan {count} Drives Together")
+        self.btn_scan_selected.setVisible(count >= 2)
+
+    def scan_selected(self):
+        roots = self.selected_roots()
+        if len(roots) >= 2:
+            self.multiScanRequested.emit(roots)
+
+    def format_size_simple(self, size):
+        # Quick formatter for drive list
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024:
+                return f"{size:.0f}{unit}"
+            size /= 1024
+        return f"{size:.0f}PB"
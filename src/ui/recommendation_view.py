@@ -1,38 +1,382 @@
-import os
-import send2trash
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTreeWidget, QTreeWidgetItem, 
-                             QPushButton, QLabel, QMessageBox, QHBoxLayout)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTreeView, QAbstractItemView, QMenu,
+                             QPushButton, QLabel, QMessageBox, QHBoxLayout, QCheckBox)
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractItemModel, QModelIndex
 from PyQt6.QtGui import QColor, QBrush, QIcon
+from src.metrics import timed
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024:
+            return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} PB"
+
+
+class _Section:
+    """
+    A top-level row: one suggestion category, or all duplicate groups.
+    `entries` holds FileNodes for suggestions and lists of FileNodes for duplicates.
+    """
+    def __init__(self, title: str, entries: list, is_duplicates: bool, color: str):
+        self.title = title
+        self.entries = entries
+        self.is_duplicates = is_duplicates
+        self.color = color
+        self.loaded = 0 # Rows exposed to the view so far (children are fetched lazily)
+        self.loaded_members = {} # Duplicates only: group row -> members exposed so far
+
+
+class RecommendationModel(QAbstractItemModel):
+    """
+    Lazily populated tree of cleanup suggestions and duplicate groups.
+
+    Rows are handed to the view in chunks as sections are expanded and scrolled,
+    and check state lives in a dict keyed by node id rather than on rows, so
+    building, checking and collecting the selection never walk every suggestion.
+    """
+    COLUMNS = ["Item", "Reason", "Size", "Path"]
+    FETCH_CHUNK = 500
+
+    # internalId of an index encodes its parent: 0 for sections, 1 + section row
+    # for entries of a section, and GROUP_BASE + group row for duplicate members.
+    GROUP_BASE = 1 << 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sections = []
+        self.checked = {} # id(FileNode) -> FileNode
+        self.dup_section = None
+
+    @timed("view.recommendations.set_data")
+    def set_data(self, suggestions, duplicates):
+        self.beginResetModel()
+        self.sections = []
+        self.checked = {}
+        self.dup_section = None
+        for category, nodes in suggestions.items():
+            if nodes:
+                self.sections.append(_Section(category, list(nodes), False, "#4DABF7")) # Blueish header
+        if duplicates:
+            self.dup_section = _Section("Duplicate Files", list(duplicates), True, "#FF922B") # Orange header
+            self.sections.append(self.dup_section)
+        self.endResetModel()
+
+    # --- Structure -------------------------------------------------------
+
+    def _locate(self, index):
+        # Returns (section, entry row or None, member row or None)
+        iid = index.internalId()
+        if iid == 0:
+            return self.sections[index.row()], None, None
+        if iid < self.GROUP_BASE:
+            return self.sections[iid - 1], index.row(), None
+        return self.dup_section, iid - self.GROUP_BASE, index.row()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        section, entry_row, member_row = self._locate(parent)
+        if entry_row is None:
+            return self.createIndex(row, column, 1 + self.sections.index(section))
+        return self.createIndex(row, column, self.GROUP_BASE + entry_row)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        iid = index.internalId()
+        if iid == 0:
+            return QModelIndex()
+        if iid < self.GROUP_BASE:
+            return self.createIndex(iid - 1, 0, 0)
+        return self.createIndex(iid - self.GROUP_BASE, 0, 1 + self.sections.index(self.dup_section))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        if not parent.isValid():
+            return len(self.sections)
+        section, entry_row, member_row = self._locate(parent)
+        if entry_row is None:
+            return section.loaded
+        if member_row is None and section.is_duplicates:
+            return section.loaded_members.get(entry_row, 0)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self.sections)
+        section, entry_row, member_row = self._locate(parent)
+        if entry_row is None:
+            return bool(section.entries)
+        return section.is_duplicates and member_row is None
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return False
+        section, entry_row, member_row = self._locate(parent)
+        if entry_row is None:
+            return section.loaded < len(section.entries)
+        if section.is_duplicates and member_row is None:
+            return section.loaded_members.get(entry_row, 0) < len(section.entries[entry_row])
+        return False
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            return
+        section, entry_row, member_row = self._locate(parent)
+        if entry_row is None:
+            start = section.loaded
+            end = min(len(section.entries), start + self.FETCH_CHUNK)
+            self.beginInsertRows(parent, start, end - 1)
+            section.loaded = end
+            self.endInsertRows()
+        else:
+            group = section.entries[entry_row]
+            start = section.loaded_members.get(entry_row, 0)
+            end = min(len(group), start + self.FETCH_CHUNK)
+            self.beginInsertRows(parent, start, end - 1)
+            section.loaded_members[entry_row] = end
+            self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    # --- Data ------------------------------------------------------------
+
+    def node_at(self, index):
+        """
+        The FileNode behind a file row, or None for section and group rows.
+        """
+        if not index.isValid():
+            return None
+        section, entry_row, member_row = self._locate(index)
+        if entry_row is None:
+            return None
+        if section.is_duplicates:
+            return section.entries[entry_row][member_row] if member_row is not None else None
+        return section.entries[entry_row]
+
+    def group_at(self, index):
+        if not index.isValid():
+            return None
+        section, entry_row, member_row = self._locate(index)
+        if section.is_duplicates and entry_row is not None and member_row is None:
+            return section.entries[entry_row]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == 0 and (self.node_at(index) is not None or self.group_at(index) is not None):
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        section, entry_row, member_row = self._locate(index)
+        column = index.column()
+
+        if entry_row is None:
+            # Section header
+            if role == Qt.ItemDataRole.DisplayRole and column == 0:
+                return f"{section.title} ({len(section.entries)})"
+            if role == Qt.ItemDataRole.ForegroundRole and column == 0:
+                return QBrush(QColor(section.color))
+            return None
+
+        group = self.group_at(index)
+        if group is not None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                if column == 0:
+                    return f"Duplicate Group ({len(group)} files)"
+                if column == 2:
+                    return format_size(group[0].size)
+            if role == Qt.ItemDataRole.CheckStateRole and column == 0:
+                count = sum(1 for n in group if id(n) in self.checked)
+                if count == 0:
+                    return Qt.CheckState.Unchecked
+                return Qt.CheckState.Checked if count == len(group) else Qt.CheckState.PartiallyChecked
+            return None
+
+        node = self.node_at(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return node.name
+            if column == 1:
+                return "Exact Duplicate" if section.is_duplicates else section.title
+            if column == 2:
+                return format_size(node.size)
+            if column == 3:
+                return node.path
+        if role == Qt.ItemDataRole.CheckStateRole and column == 0:
+            return Qt.CheckState.Checked if id(node) in self.checked else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.UserRole:
+            return node
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or index.column() != 0:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        group = self.group_at(index)
+        if group is not None:
+            self.set_group_checked(index, checked)
+            return True
+        node = self.node_at(index)
+        if node is None:
+            return False
+        self._set_checked(node, checked)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        # The owning group's tri-state follows its members
+        parent = index.parent()
+        if self.group_at(parent) is not None:
+            self.dataChanged.emit(parent, parent, [Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def _set_checked(self, node, checked: bool):
+        if checked:
+            self.checked[id(node)] = node
+        else:
+            self.checked.pop(id(node), None)
+
+    # --- Bulk selection ----------------------------------------------------
+
+    def set_group_checked(self, group_index, checked: bool, keep_first: bool = False):
+        """
+        Checks or clears every member of a duplicate group, optionally keeping the
+        first copy unchecked. Costs O(group size).
+        """
+        group = self.group_at(group_index)
+        if group is None:
+            return
+        for i, node in enumerate(group):
+            self._set_checked(node, checked and not (keep_first and i == 0))
+        self._emit_rows_changed(group_index)
+
+    def set_section_checked(self, section_index, checked: bool):
+        section, entry_row, _ = self._locate(section_index)
+        if entry_row is not None:
+            return
+        if section.is_duplicates:
+            # Keep one copy of every group
+            for group in section.entries:
+                for i, node in enumerate(group):
+                    self._set_checked(node, checked and i > 0)
+        else:
+            for node in section.entries:
+                self._set_checked(node, checked)
+        for row in range(section.loaded):
+            self._emit_rows_changed(self.index(row, 0, section_index))
+        self._emit_rows_changed(section_index)
+
+    def _emit_rows_changed(self, parent):
+        self.dataChanged.emit(parent, parent, [Qt.ItemDataRole.CheckStateRole])
+        rows = self.rowCount(parent)
+        if rows:
+            self.dataChanged.emit(self.index(0, 0, parent), self.index(rows - 1, 0, parent),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+    def checked_nodes(self) -> list:
+        return list(self.checked.values())
+
+    # --- Sorting and updates ------------------------------------------------
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        reverse = order == Qt.SortOrder.DescendingOrder
+        node_keys = {
+            0: lambda n: n.name.lower(),
+            1: lambda n: 0,
+            2: lambda n: n.size,
+            3: lambda n: n.path,
+        }
+        node_key = node_keys.get(column, node_keys[2])
+        # Groups sort by the bytes reclaimed when all but one copy is removed
+        group_key = (lambda g: g[0].size * (len(g) - 1)) if column == 2 else (lambda g: node_key(g[0]))
+
+        # Row positions change, so the view fetches again from the top
+        self.beginResetModel()
+        for section in self.sections:
+            section.entries.sort(key=group_key if section.is_duplicates else node_key, reverse=reverse)
+            section.loaded = 0
+            section.loaded_members = {}
+        self.endResetModel()
+
+    def apply_removal(self, removal):
+        """
+        Drops nodes removed from the scan tree (see scanner.remove_nodes), along with
+        duplicate groups that no longer have a duplicate.
+        """
+        removed = removal.removed_ids
+        self.beginResetModel()
+        for section in self.sections:
+            if section.is_duplicates:
+                groups = []
+                for group in section.entries:
+                    remaining = [n for n in group if id(n) not in removed]
+                    if len(remaining) > 1:
+                        groups.append(remaining)
+                section.entries = groups
+            else:
+                section.entries = [n for n in section.entries if id(n) not in removed]
+            section.loaded = 0
+            section.loaded_members = {}
+        self.sections = [s for s in self.sections if s.entries]
+        if self.dup_section is not None and self.dup_section not in self.sections:
+            self.dup_section = None
+        for node_id in [i for i in self.checked if i in removed]:
+            del self.checked[node_id]
+        self.endResetModel()
+
 
 class RecommendationView(QWidget):
+    deleteRequested = pyqtSignal(list, bool) # FileNodes, permanently delete cache items
+    exportRequested = pyqtSignal(str) # "suggestions" or "duplicates"
+
     def __init__(self):
         super().__init__()
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # Header
         self.lbl_header = QLabel("Smart Cleanup Recommendations")
         self.lbl_header.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
         self.layout.addWidget(self.lbl_header)
 
         # Explanation
-        lbl_info = QLabel("Review items below. Checked items will be moved to the Recycle Bin.")
+        lbl_info = QLabel("Review items below. Checked items will be moved to the Recycle Bin. "
+                          "Right-click a group or section for bulk selection.")
         lbl_info.setStyleSheet("color: #AAAAAA; margin-bottom: 5px;")
         self.layout.addWidget(lbl_info)
 
-        # Tree Widget
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Item", "Reason", "Size", "Path"])
+        # Tree View
+        self.model = RecommendationModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.model.modelReset.connect(self._expand_sections)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setSortingEnabled(True)
+        self.tree.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+        self.tree.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.tree.setColumnWidth(0, 300)
         self.tree.setColumnWidth(1, 150)
         self.tree.setColumnWidth(2, 100)
+        self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_context_menu)
         self.tree.setStyleSheet("""
-            QTreeWidget {
+            QTreeView {
                 background-color: #252525;
                 border: 1px solid #3D3D3D;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 padding: 5px;
             }
         """)
@@ -40,131 +384,106 @@ class RecommendationView(QWidget):
 
         # Action Buttons
         btn_layout = QHBoxLayout()
-        
+
         self.btn_refresh = QPushButton("Refresh")
         self.btn_refresh.setEnabled(False) # Only enabled if we have logic to re-run analysis
-        
+
         self.btn_delete = QPushButton("Move Selected to Recycle Bin")
         self.btn_delete.setStyleSheet("""
             QPushButton {
-                background-color: #e03131; 
-                color: white; 
-                font-weight: bold; 
+                background-color: #e03131;
+                color: white;
+                font-weight: bold;
                 padding: 10px;
                 border-radius: 4px;
             }
             QPushButton:hover { background-color: #fa5252; }
         """)
         self.btn_delete.clicked.connect(self.delete_selected)
-        
+
+        self.chk_permanent = QCheckBox("Permanently delete cache items (frees space immediately)")
+        self.chk_permanent.setStyleSheet("color: #AAAAAA;")
+        btn_layout.addWidget(self.chk_permanent)
+
         btn_layout.addStretch()
+
+        self.btn_export = QPushButton("Export...")
+        self.btn_export.setStyleSheet("""
+            QPushButton {
+                background-color: #333333;
+                color: white;
+                padding: 10px;
+                border-radius: 4px;
+            }
+            QPushButton:hover { background-color: #404040; }
+        """)
+        export_menu = QMenu(self.btn_export)
+        export_menu.addAction("Cleanup suggestions...", lambda: self.exportRequested.emit("suggestions"))
+        export_menu.addAction("Duplicate groups...", lambda: self.exportRequested.emit("duplicates"))
+        self.btn_export.setMenu(export_menu)
+        btn_layout.addWidget(self.btn_export)
+
         btn_layout.addWidget(self.btn_delete)
-        
+
         self.layout.addLayout(btn_layout)
 
     def set_data(self, suggestions, duplicates):
-        self.tree.clear()
-        
-        # 1. Add Suggestions
-        for category, nodes in suggestions.items():
-            if not nodes:
-                continue
-                
-            cat_item = QTreeWidgetItem(self.tree)
-            cat_item.setText(0, category)
-            cat_item.setExpanded(True)
-            cat_item.setForeground(0, QBrush(QColor("#4DABF7"))) # Blueish header
-            
-            for node in nodes:
-                item = QTreeWidgetItem(cat_item)
-                item.setText(0, node.name)
-                item.setText(1, category)
-                item.setText(2, self.format_size(node.size))
-                item.setText(3, node.path)
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                item.setCheckState(0, Qt.CheckState.Unchecked)
-                # Store full path in data
-                item.setData(0, Qt.ItemDataRole.UserRole, node.path)
-
-        # 2. Add Duplicates
-        if duplicates:
-            dup_root = QTreeWidgetItem(self.tree)
-            dup_root.setText(0, "Duplicate Files")
-            dup_root.setExpanded(True)
-            dup_root.setForeground(0, QBrush(QColor("#FF922B"))) # Orange header
-            
-            for group in duplicates:
-                group_item = QTreeWidgetItem(dup_root)
-                # Using size for group item
-                size_str = self.format_size(group[0].size)
-                group_item.setText(0, f"Duplicate Group ({len(group)} files)")
-                group_item.setText(2, size_str)
-                group_item.setExpanded(True)
-                
-                # Mark all as unchecked by default
-                for node in group:
-                    item = QTreeWidgetItem(group_item)
-                    item.setText(0, node.name)
-                    item.setText(1, "Exact Duplicate")
-                    item.setText(2, size_str)
-                    item.setText(3, node.path)
-                    item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                    item.setCheckState(0, Qt.CheckState.Unchecked)
-                    item.setData(0, Qt.ItemDataRole.UserRole, node.path)
+        self.model.set_data(suggestions, duplicates)
+        header = self.tree.header()
+        self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    def _expand_sections(self):
+        # Expanding only triggers the first chunk of rows per section
+        for row in range(self.model.rowCount()):
+            self.tree.expand(self.model.index(row, 0))
+
+    def show_context_menu(self, pos):
+        index = self.tree.indexAt(pos)
+        if not index.isValid():
+            return
+        index = index.siblingAtColumn(0)
+        menu = QMenu(self)
+        if self.model.group_at(index) is not None:
+            menu.addAction("Select all in group", lambda: self.model.set_group_checked(index, True))
+            menu.addAction("Select all but first", lambda: self.model.set_group_checked(index, True, keep_first=True))
+            menu.addAction("Clear group", lambda: self.model.set_group_checked(index, False))
+        elif not index.parent().isValid():
+            menu.addAction("Select all in section", lambda: self.model.set_section_checked(index, True))
+            menu.addAction("Clear section", lambda: self.model.set_section_checked(index, False))
+        else:
+            return
+        menu.exec(self.tree.viewport().mapToGlobal(pos))
 
     def delete_selected(self):
-        # Gather items
-        items_to_delete = []
-        
-        iterator = QTreeWidgetItemIterator(self.tree, QTreeWidgetItemIterator.IteratorFlag.Checked)
-        while iterator.value():
-            item = iterator.value()
-            path = item.data(0, Qt.ItemDataRole.UserRole)
-            if path:
-                items_to_delete.append((item, path))
-            iterator += 1
-            
-        if not items_to_delete:
+        # Gather nodes
+        nodes = self.model.checked_nodes()
+
+        if not nodes:
             QMessageBox.information(self, "No Selection", "Please check items to remove.")
             return
 
         # Confirm
-        count = len(items_to_delete)
-        reply = QMessageBox.question(self, "Confirm Deletion", 
-                                     f"Are you sure you want to move {count} items to the Recycle Bin?",
+        count = len(nodes)
+        permanent = self.chk_permanent.isChecked()
+        msg = f"Are you sure you want to move {count} items to the Recycle Bin?"
+        cache_count = sum(1 for n in nodes if n.category == "Cache")
+        if permanent and cache_count:
+            msg += f"\n\n{cache_count} cache items will be permanently deleted instead."
+        reply = QMessageBox.question(self, "Confirm Deletion", msg,
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        
+
         if reply == QMessageBox.StandardButton.Yes:
-            success_count = 0
-            errors = []
-            
-            for item, path in items_to_delete:
-                try:
-                    send2trash.send2trash(path)
-                    # Remove from tree
-                    parent = item.parent()
-                    if parent:
-                        parent.removeChild(item)
-                    else:
-                        # Should not happen for leaf nodes in our structure
-                        pass
-                    success_count += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(path)}: {str(e)}")
-            
-            msg = f"Successfully moved {success_count} items to Recycle Bin."
-            if errors:
-                msg += f"\n\nErrors ({len(errors)}):\n" + "\n".join(errors[:5])
-                if len(errors) > 5: msg += "\n..."
-                
-            QMessageBox.information(self, "Cleanup Result", msg)
+            self.btn_delete.setEnabled(False) # Re-enabled once the background deletion finishes
+            self.deleteRequested.emit(nodes, permanent)
+
+    def apply_removal(self, removal):
+        """
+        Drops the rows of nodes removed from the scan tree.
+        """
+        self.model.apply_removal(removal)
+
+    def deletion_finished(self):
+        self.btn_delete.setEnabled(True)
 
     def format_size(self, size):
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024:
-                return f"{size:.2f} {unit}"
-            size /= 1024
-        return f"{size:.2f} PB"
-
-# Import needed for iterator
-from PyQt6.QtWidgets import QTreeWidgetItemIterator
+        return format_size(size)
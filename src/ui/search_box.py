@@ -0,0 +1,152 @@
+import os
+from PyQt6.QtWidgets import QLineEdit, QCompleter
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QAbstractListModel, QModelIndex
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024:
+            return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} PB"
+
+
+class SearchResultsModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.nodes = []
+
+    def set_nodes(self, nodes):
+        self.beginResetModel()
+        self.nodes = nodes
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.nodes)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.nodes[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            icon = "📁" if node.is_dir else "📄"
+            return f"{icon} {node.name}    {format_size(node.size)}    {os.path.dirname(node.path)}"
+        if role == Qt.ItemDataRole.EditRole:
+            # What the completer puts in the box when a result is picked
+            return node.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return node.path
+        return None
+
+
+class SearchBox(QLineEdit):
+    """
+    Search-as-you-type over the names in the current scan. Results come from a
+    NameIndex built in the background and are shown in a completer popup.
+    """
+    nodeChosen = pyqtSignal(object) # Emits FileNode
+    searchRequested = pyqtSignal(str) # Emitted instead of searching when the index is slow to ask (the scan daemon's)
+
+    DEBOUNCE_MS = 60
+    MAX_RESULTS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.choose_pending = False # Enter was pressed before the results came back
+        self.setClearButtonEnabled(True)
+        self.setStyleSheet("""
+            QLineEdit {
+                background-color: #2D2D2D;
+                color: white;
+                border: 1px solid #3D3D3D;
+                border-radius: 4px;
+                padding: 6px 8px;
+                font-size: 13px;
+            }
+            QLineEdit:focus { border: 1px solid #0078D4; }
+            QLineEdit:disabled { color: #777; }
+        """)
+
+        self.results = SearchResultsModel(self)
+        self.completer = QCompleter(self.results, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(12)
+        self.completer.popup().setStyleSheet("""
+            QListView { background-color: #2D2D2D; color: white; border: 1px solid #3D3D3D; font-size: 13px; }
+            QListView::item { padding: 4px; }
+            QListView::item:selected { background-color: #0078D4; }
+        """)
+        self.completer.setWidget(self)
+        self.completer.activated[QModelIndex].connect(self.on_result_activated)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.textEdited.connect(self.on_text_edited)
+        self.returnPressed.connect(self.choose_first)
+
+        self.set_index(None)
+
+    def set_index(self, index):
+        self.index = index
+        self.choose_pending = False
+        self.results.set_nodes([])
+        if index is None:
+            self.setEnabled(False)
+            self.setPlaceholderText("Search (available after scan)")
+            self.setToolTip("")
+            return
+        self.setEnabled(True)
+        self.setPlaceholderText("Search files and folders...")
+        self.setToolTip(f"{index.name_count:,} distinct names indexed, "
+                        f"{format_size(index.memory_bytes())} index memory, "
+                        f"built in {index.build_seconds:.1f}s")
+        if self.text():
+            self.run_search()
+
+    def apply_removal(self, removal):
+        if self.index is not None:
+            self.index.apply_removal(removal)
+
+    def run_search(self):
+        if self.index is None:
+            return
+        if getattr(self.index, "blocking", False):
+            self.searchRequested.emit(self.text())
+            return
+        self.show_results(self.index.search(self.text(), limit=self.MAX_RESULTS))
+
+    def show_results(self, nodes, query=None):
+        """
+        Shows search results; those for a `query` that is no longer in the box are dropped.
+        """
+        if query is not None and query != self.text():
+            return
+        self.results.set_nodes(nodes)
+        if self.choose_pending:
+            self.choose_pending = False
+            self.completer.popup().hide()
+            if nodes:
+                self.nodeChosen.emit(nodes[0])
+            return
+        if nodes:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def on_text_edited(self, _):
+        self.choose_pending = False
+        self.search_timer.start()
+
+    def choose_first(self):
+        if self.completer.popup().isVisible():
+            return # The completer handles Enter on the highlighted result
+        self.search_timer.stop()
+        self.choose_pending = True
+        self.run_search()
+
+    def on_result_activated(self, index):
+        row = self.completer.completionModel().mapToSource(index).row()
+        if 0 <= row < len(self.results.nodes):
+            self.nodeChosen.emit(self.results.nodes[row])
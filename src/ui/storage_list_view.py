@@ -1,123 +1,229 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QScrollArea, QFrame, QPushButton, QProgressBar)
-from PyQt6.QtCore import Qt, pyqtSignal, QSize
-from PyQt6.QtGui import QColor, QPalette, QIcon, QCursor
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QStackedLayout)
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QRect, QRectF, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPen, QPainter, QShortcut, QKeySequence
 from src.scanner import FileNode
+from src.metrics import timed
+from src.quick_estimate import is_estimate
+from src.scan_engine import is_aggregate
 import os
 
-class StorageListItem(QFrame):
-    def __init__(self, node: FileNode, max_size: int, parent=None):
+CATEGORY_COLORS = {
+    "Apps": "#0078D4",      # Blue
+    "Cache": "#D13438",     # Red
+    "Media": "#B146C2",     # Purple
+    "Development": "#00CC6A", # Green
+    "Archives": "#FFB900",    # Yellow
+    "System": "#737373",      # Grey
+    "Unknown": "#606060"      # Dark Grey
+}
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024:
+            return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} PB"
+
+
+class StorageListModel(QAbstractListModel):
+    """
+    Exposes the children of one folder. Rows are only sorted (largest first)
+    when the view first asks for data, so switching folders is just a model reset.
+    """
+    def __init__(self, parent=None):
         super().__init__(parent)
+        self.node = None
+        self._children = []
+        self._sorted = False
+        self.max_size = 0
+        self.scroll_pos = 0 # Restored when navigating back to this folder
+        self.highlighted = None # Row picked from search results
+
+    def set_node(self, node: FileNode):
+        self.beginResetModel()
         self.node = node
-        self.max_size = max_size
-        self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-        self.setObjectName("StorageListItem")
-        
-        # Style
-        self.setStyleSheet("""
-            #StorageListItem {
-                background-color: #2D2D2D;
-                border-radius: 6px;
-                border: 1px solid #3D3D3D;
-            }
-            #StorageListItem:hover {
-                background-color: #383838;
-                border: 1px solid #505050;
-            }
-        """)
-        
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(15, 10, 15, 10)
-        layout.setSpacing(15)
-        
-        # 1. Icon (Emoji for now, can be real icons later)
-        icon_label = QLabel("📁" if node.is_dir else "📄")
-        icon_label.setStyleSheet("font-size: 24px; background: transparent;")
-        layout.addWidget(icon_label)
-        
-        # 2. Name & Progress Bar Container
-        center_layout = QVBoxLayout()
-        center_layout.setSpacing(5)
-        
-        # Name Row
-        name_label = QLabel(node.name)
-        name_label.setStyleSheet("font-size: 14px; font-weight: bold; color: white; background: transparent;")
-        center_layout.addWidget(name_label)
-        
-        # Progress Bar
-        progress = QProgressBar()
-        progress.setFixedHeight(6)
-        progress.setTextVisible(False)
-        
-        if max_size > 0:
-            percentage = int((node.size / max_size) * 100)
-            progress.setValue(percentage)
+        self._children = node.children if node else []
+        self._sorted = False
+        self.endResetModel()
+
+    def refresh(self):
+        # The folder's children changed in place (e.g. after a deletion)
+        self.set_node(self.node)
+
+    def _ensure_sorted(self):
+        if not self._sorted:
+            self._children = sorted(self._children, key=lambda x: x.size, reverse=True)
+            self.max_size = self._children[0].size if self._children else 0
+            self._sorted = True
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._children)
+
+    def node_at(self, row: int) -> FileNode:
+        self._ensure_sorted()
+        return self._children[row]
+
+    def row_of(self, node: FileNode) -> int:
+        self._ensure_sorted()
+        return next((i for i, c in enumerate(self._children) if c is node), -1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.node_at(index.row()).name
+        if role == Qt.ItemDataRole.UserRole:
+            return self.node_at(index.row())
+        return None
+
+
+class StorageItemDelegate(QStyledItemDelegate):
+    """
+    Paints a storage row (icon, name, relative size bar, size and percentage)
+    directly, instead of building a widget per entry.
+    """
+    ROW_HEIGHT = 72 # Card height plus spacing
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.icon_font = QFont("Segoe UI", 18)
+        self.name_font = QFont("Segoe UI")
+        self.name_font.setPixelSize(14)
+        self.name_font.setBold(True)
+        self.percent_font = QFont("Segoe UI")
+        self.percent_font.setPixelSize(12)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        model = index.model()
+        node = model.node_at(index.row())
+        max_size = model.max_size
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Card
+        rect = option.rect.adjusted(20, 5, -20, -5)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        if node is model.highlighted:
+            painter.setPen(QPen(QColor("#0078D4"), 2))
         else:
-            progress.setValue(0)
-            
-        # Color based on category (matching main theme or independent)
-        color = self.get_category_color(node.category)
-        progress.setStyleSheet(f"""
-            QProgressBar {{
-                background-color: #1A1A1A;
-                border-radius: 3px;
-                border: none;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 3px;
-            }}
-        """)
-        center_layout.addWidget(progress)
-        
-        layout.addLayout(center_layout, 1) # Stretch to fill
-        
-        # 3. Size Info
-        size_layout = QVBoxLayout()
-        size_layout.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        
-        size_text = self.format_size(node.size)
-        size_label = QLabel(size_text)
-        size_label.setStyleSheet("font-size: 14px; font-weight: bold; color: #EEE; background: transparent;")
-        size_layout.addWidget(size_label)
-        
-        if max_size > 0:
-            percent_val = (node.size / max_size) * 100
-            percent_label = QLabel(f"{percent_val:.1f}%")
-            percent_label.setStyleSheet("font-size: 12px; color: #AAA; background: transparent;")
-            percent_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-            size_layout.addWidget(percent_label)
-            
-        layout.addLayout(size_layout)
-
-    def get_category_color(self, category):
-        colors = {
-            "Apps": "#0078D4",      # Blue
-            "Cache": "#D13438",     # Red
-            "Media": "#B146C2",     # Purple
-            "Development": "#00CC6A", # Green
-            "Archives": "#FFB900",    # Yellow
-            "System": "#737373",      # Grey
-            "Unknown": "#606060"      # Dark Grey
-        }
-        return colors.get(category, "#606060")
+            painter.setPen(QPen(QColor("#505050" if hovered else "#3D3D3D"), 1))
+        painter.setBrush(QColor("#383838" if hovered else "#2D2D2D"))
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+
+        # 1. Icon
+        icon_rect = QRect(rect.left() + 15, rect.top(), 34, rect.height())
+        painter.setFont(self.icon_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(icon_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                         "📁" if node.is_dir else "🗃" if is_aggregate(node) else "📄")
+
+        # 3. Size info (right aligned)
+        size_rect = QRect(rect.right() - 15 - 110, rect.top() + 10, 110, 22)
+        estimate = is_estimate(node)
+        text_right = size_rect.left() # Name and bar end here
+        painter.setFont(self.name_font)
+        painter.setPen(QColor("#FFB900" if estimate else "#EEEEEE"))
+        painter.drawText(size_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                         ("\u2248 " if estimate else "") + format_size(node.size))
+        if estimate:
+            # 95% range instead of the percentage until the folder has been scanned exactly
+            text = f"est. {format_size(node.low)} \u2013 {format_size(node.high)}"
+            width = QFontMetrics(self.percent_font).horizontalAdvance(text)
+            range_rect = QRect(size_rect.right() - width, size_rect.bottom(), width, 20)
+            text_right = min(text_right, range_rect.left())
+            painter.setFont(self.percent_font)
+            painter.setPen(QColor("#AAAAAA"))
+            painter.drawText(range_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, text)
+        elif max_size > 0:
+            percent_rect = QRect(size_rect.left(), size_rect.bottom(), size_rect.width(), 20)
+            painter.setFont(self.percent_font)
+            painter.setPen(QColor("#AAAAAA"))
+            painter.drawText(percent_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             f"{(node.size / max_size) * 100:.1f}%")
+
+        # 2. Name & progress bar
+        left = icon_rect.right() + 15
+        name_rect = QRect(left, rect.top() + 12, max(0, text_right - 15 - left), 20)
+        painter.setFont(self.name_font)
+        painter.setPen(QColor("white"))
+        label = f"{node.name} ({node.count:,})" if is_aggregate(node) else node.name
+        name = QFontMetrics(self.name_font).elidedText(label, Qt.TextElideMode.ElideMiddle, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
 
-    def format_size(self, size):
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024:
-                return f"{size:.2f} {unit}"
-            size /= 1024
-        return f"{size:.2f} PB"
+        bar_rect = QRectF(left, name_rect.bottom() + 9, name_rect.width(), 6)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#1A1A1A"))
+        painter.drawRoundedRect(bar_rect, 3, 3)
+        if max_size > 0 and node.size > 0:
+            fill = QRectF(bar_rect)
+            fill.setWidth(max(6.0, bar_rect.width() * node.size / max_size))
+            color = QColor(CATEGORY_COLORS.get(node.category, "#606060"))
+            if estimate:
+                color.setAlpha(110)
+            painter.setBrush(color)
+            painter.drawRoundedRect(fill, 3, 3)
+
+        painter.restore()
 
 
 class StorageListView(QWidget):
+    """
+    Folder browser with breadcrumbs and back/forward history. The list model
+    (and so the sorted order) of recently visited folders is cached, so going
+    back and forth between large folders doesn't sort them again.
+    """
     itemClicked = pyqtSignal(object) # Emits FileNode
 
+    MAX_CACHED_MODELS = 64
+
+    BREADCRUMB_STYLE = """
+        QPushButton {
+            border: none; 
+            color: #AAAAAA; 
+            font-size: 14px; 
+            background: transparent; 
+        }
+        QPushButton:hover { text-decoration: underline; color: #FFF; }
+    """
+    BREADCRUMB_CURRENT_STYLE = """
+        border: none; 
+        color: white; 
+        font-weight: bold; 
+        font-size: 14px; 
+        background: transparent;
+    """
+    NAV_BUTTON_STYLE = """
+        QPushButton {
+            border: none;
+            color: #DDDDDD;
+            font-size: 14px;
+            background: transparent;
+            padding: 0 6px;
+        }
+        QPushButton:hover { color: #FFF; }
+        QPushButton:disabled { color: #555; }
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.root_node = None
         self.current_view_node = None # The folder currently displayed
         self.breadcrumbs = [] # List of nodes from root to current
+        self.history = [] # Visited folders, for back/forward
+        self.history_index = -1
+        self.models = OrderedDict() # id(node) -> StorageListModel, most recently used last
+        self.crumb_buttons = [] # Reused breadcrumb buttons and separators
+        self.crumb_separators = []
+        # Called with a folder before it is shown, e.g. to fetch its children from the scan daemon
+        self.loader = None
         
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
@@ -126,139 +232,249 @@ class StorageListView(QWidget):
         # 1. Breadcrumb Bar
         self.breadcrumb_bar = QWidget()
         self.breadcrumb_bar.setStyleSheet("background-color: #252525; border-bottom: 1px solid #3D3D3D;")
-        self.breadcrumb_layout = QHBoxLayout(self.breadcrumb_bar)
-        self.breadcrumb_layout.setContentsMargins(15, 10, 15, 10)
+        bar_layout = QHBoxLayout(self.breadcrumb_bar)
+        bar_layout.setContentsMargins(10, 10, 15, 10)
+        bar_layout.setSpacing(5)
+        bar_layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
+
+        self.btn_back = QPushButton("\u25C0")
+        self.btn_back.setToolTip("Back (Alt+Left)")
+        self.btn_back.clicked.connect(self.go_back)
+        self.btn_forward = QPushButton("\u25B6")
+        self.btn_forward.setToolTip("Forward (Alt+Right)")
+        self.btn_forward.clicked.connect(self.go_forward)
+        for btn in (self.btn_back, self.btn_forward):
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setStyleSheet(self.NAV_BUTTON_STYLE)
+            btn.setEnabled(False)
+            bar_layout.addWidget(btn)
+        QShortcut(QKeySequence("Alt+Left"), self, self.go_back)
+        QShortcut(QKeySequence("Alt+Right"), self, self.go_forward)
+
+        crumbs = QWidget()
+        self.breadcrumb_layout = QHBoxLayout(crumbs)
+        self.breadcrumb_layout.setContentsMargins(5, 0, 0, 0)
         self.breadcrumb_layout.setSpacing(5)
         self.breadcrumb_layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        bar_layout.addWidget(crumbs, 1)
         
         self.layout.addWidget(self.breadcrumb_bar)
         
-        # 2. Scroll Area for List
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("background-color: #202020; border: none;")
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        self.list_container = QWidget()
-        self.list_layout = QVBoxLayout(self.list_container)
-        self.list_layout.setContentsMargins(20, 20, 20, 20)
-        self.list_layout.setSpacing(10)
-        self.list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        self.scroll_area.setWidget(self.list_container)
-        self.layout.addWidget(self.scroll_area)
+        # 2. Virtualized list: only the visible rows are ever painted
+        self.list_view = QListView()
+        self.list_view.setItemDelegate(StorageItemDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.list_view.setStyleSheet("QListView { background-color: #202020; border: none; padding-top: 15px; }")
+        self.list_view.clicked.connect(lambda index: self.on_item_clicked(index.model().node_at(index.row())))
+
+        self.empty_label = QLabel("This folder is empty.")
+        self.empty_label.setStyleSheet("background-color: #202020; color: #777; font-size: 16px; margin-top: 20px;")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+
+        list_container = QWidget()
+        self.list_stack = QStackedLayout(list_container)
+        self.list_stack.addWidget(self.list_view)
+        self.list_stack.addWidget(self.empty_label)
+        self.layout.addWidget(list_container)
 
+    @timed("view.storage_list.set_data")
     def set_data(self, root_node: FileNode):
         self.root_node = root_node
-        self.breadcrumbs = [root_node]
+        current = self.list_view.model()
+        for model in self.models.values():
+            if model is not current:
+                model.deleteLater() # The displayed one goes once render_list swaps it out
+        self.models.clear()
+        self.history = []
+        self.history_index = -1
         self.navigate_to(root_node)
 
-    def navigate_to(self, node: FileNode):
+    def navigate_to(self, node: FileNode, record: bool = True):
+        if record:
+            # A new visit drops the forward history
+            del self.history[self.history_index + 1:]
+            self.history.append(node)
+            self.history_index = len(self.history) - 1
+        if self.loader is not None:
+            self.loader(node)
         self.current_view_node = node
+        self.breadcrumbs = self._path_to(node)
         self.update_breadcrumbs()
         self.render_list()
+        self.btn_back.setEnabled(self.history_index > 0)
+        self.btn_forward.setEnabled(self.history_index < len(self.history) - 1)
+
+    def reveal(self, node: FileNode):
+        """
+        Opens the folder containing `node` and scrolls to its highlighted row.
+        """
+        if node.parent is None or node is self.root_node:
+            self.navigate_to(node)
+            return
+        self.navigate_to(node.parent)
+        model = self.list_view.model()
+        row = model.row_of(node)
+        if row < 0:
+            return
+        model.highlighted = node
+        index = model.index(row)
+        self.list_view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+        self.list_view.update(index)
+
+    def go_back(self):
+        if self.history_index > 0:
+            self.history_index -= 1
+            self.navigate_to(self.history[self.history_index], record=False)
+
+    def go_forward(self):
+        if self.history_index < len(self.history) - 1:
+            self.history_index += 1
+            self.navigate_to(self.history[self.history_index], record=False)
+
+    def _path_to(self, node: FileNode):
+        path = [node]
+        while node is not self.root_node and node.parent is not None:
+            node = node.parent
+            path.append(node)
+        path.reverse()
+        return path
 
     def update_breadcrumbs(self):
-        # Clear existing
-        for i in reversed(range(self.breadcrumb_layout.count())): 
-            self.breadcrumb_layout.itemAt(i).widget().setParent(None)
-            
-        # Rebuild breadcrumb path based on parent references (if available) or internal tracking
-        # Since node.parent is linked, we can trace back or just use our tracked list.
-        # Let's use our tracked list for valid state management
-        
-        # For this simplified version, let's assume we clicked down.
-        # But if we jump back, we need to correct the list.
-        # Actually `navigate_to` is just render. We need `enter_folder` and `go_up` logic.
-        
-        # Simple Breadcrumb rendering:
-        # Root > Subfolder > Subfolder
-        
-        for i, node in enumerate(self.breadcrumbs):
-            btn = QPushButton(node.name)
-            btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            
-            # Style differently if it's the last one (current)
-            if i == len(self.breadcrumbs) - 1:
-                btn.setStyleSheet("""
-                    border: none; 
-                    color: white; 
-                    font-weight: bold; 
-                    font-size: 14px; 
-                    background: transparent;
-                """)
-            else:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        border: none; 
-                        color: #AAAAAA; 
-                        font-size: 14px; 
-                        background: transparent; 
-                    }
-                    QPushButton:hover { text-decoration: underline; color: #FFF; }
-                """)
-            
-            # Connect click
-            # We need to capture the state at this index
-            btn.clicked.connect(lambda checked, idx=i: self.on_breadcrumb_clicked(idx))
-            
-            self.breadcrumb_layout.addWidget(btn)
-            
-            # Add separator if not last
-            if i < len(self.breadcrumbs) - 1:
+        # Root > Subfolder > Subfolder, reusing the buttons from the previous folder
+        count = len(self.breadcrumbs)
+        while len(self.crumb_buttons) < count:
+            i = len(self.crumb_buttons)
+            if i > 0:
                 sep = QLabel(">")
                 sep.setStyleSheet("color: #666; font-size: 14px;")
                 self.breadcrumb_layout.addWidget(sep)
+                self.crumb_separators.append(sep)
+            btn = QPushButton()
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setProperty("current", None)
+            btn.clicked.connect(lambda checked, idx=i: self.on_breadcrumb_clicked(idx))
+            self.breadcrumb_layout.addWidget(btn)
+            self.crumb_buttons.append(btn)
+
+        for i, btn in enumerate(self.crumb_buttons):
+            visible = i < count
+            btn.setVisible(visible)
+            if i > 0:
+                self.crumb_separators[i - 1].setVisible(visible)
+            if not visible:
+                continue
+            btn.setText(self.breadcrumbs[i].name)
+            # Style differently if it's the last one (current); restyle only on change
+            is_current = i == count - 1
+            if btn.property("current") != is_current:
+                btn.setStyleSheet(self.BREADCRUMB_CURRENT_STYLE if is_current else self.BREADCRUMB_STYLE)
+                btn.setProperty("current", is_current)
     
     def on_breadcrumb_clicked(self, index):
-        # Truncate breadcrumbs up to this index
-        target_node = self.breadcrumbs[index]
-        self.breadcrumbs = self.breadcrumbs[:index+1]
-        self.navigate_to(target_node)
+        self.navigate_to(self.breadcrumbs[index])
+
+    def _model_for(self, node: FileNode) -> StorageListModel:
+        entry = self.models.get(id(node))
+        if entry is not None and entry.node is node:
+            self.models.move_to_end(id(node))
+            return entry
+        model = StorageListModel(self)
+        model.set_node(node)
+        self.models[id(node)] = model
+        while len(self.models) > self.MAX_CACHED_MODELS:
+            _, old = self.models.popitem(last=False)
+            old.deleteLater()
+        return model
 
     def render_list(self):
-        # Clear existing list
-        for i in reversed(range(self.list_layout.count())): 
-            widget = self.list_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-                
-        if not self.current_view_node:
-            return
-            
-        # Sort children by size (descending)
-        children = sorted(self.current_view_node.children, key=lambda x: x.size, reverse=True)
-        
-        # If empty
-        if not children:
-            lbl = QLabel("This folder is empty.")
-            lbl.setStyleSheet("color: #777; font-size: 16px; margin-top: 20px;")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.list_layout.addWidget(lbl)
+        previous = self.list_view.model()
+        if previous is not None:
+            previous.scroll_pos = self.list_view.verticalScrollBar().value()
+            previous.highlighted = None
+
+        node = self.current_view_node
+        if not node:
             return
+        model = self._model_for(node)
+        if model is not previous:
+            self.list_view.setModel(model)
+            if previous is not None and all(m is not previous for m in self.models.values()):
+                previous.deleteLater() # Dropped from the cache while it was displayed
+        self.list_view.verticalScrollBar().setValue(model.scroll_pos)
 
-        # Largest child size for relative bars
-        max_size = children[0].size if children else 1
-        
-        for child in children:
-            item = StorageListItem(child, max_size)
-            # Custom click handling with mouseRelease or installing event filter
-            # Simpler: Make the whole frame clickable by overriding mousePress in StorageListItem
-            # But here we need to know what to do (enter dir or signal file)
-            # We will use a transparent button overlay or just mousePressEvent in the Item class.
-            
-            # Let's attach a callback to the item instance? 
-            # Or subclassing QFrame in StorageListItem enables mousePressEvent. 
-            # We can connect a signal from the item if we added one, 
-            # or just assign a function to an attribute.
-            item.mousePressEvent = lambda event, n=child: self.on_item_clicked(n)
-            
-            self.list_layout.addWidget(item)
+        if not node.children:
+            self.empty_label.setText("This folder hasn't been scanned yet; its size is an estimate."
+                                     if is_estimate(node) else "This folder is empty.")
+            self.list_stack.setCurrentWidget(self.empty_label)
+        else:
+            self.list_stack.setCurrentWidget(self.list_view)
+
+    def refresh_folder(self, node: FileNode):
+        """
+        Re-reads a folder whose children list was extended or replaced.
+        """
+        model = self.models.get(id(node))
+        if node is self.current_view_node:
+            pos = self.list_view.verticalScrollBar().value()
+            if model is not None:
+                model.refresh()
+            self.render_list()
+            self.list_view.verticalScrollBar().setValue(pos)
+        elif model is not None:
+            model.refresh()
+
+    def replace_node(self, old: FileNode, new: FileNode):
+        """
+        Puts `new` in place of `old` (an estimated folder and its exact scan)
+        in the history, and shows it if `old` was the displayed folder.
+        """
+        model = self.models.pop(id(old), None)
+        if model is not None and model is not self.list_view.model():
+            model.deleteLater()
+        self.history = [new if n is old else n for n in self.history]
+        if self.current_view_node is old:
+            # Keep the reader's place; render_list deletes the old model once it's swapped out
+            self._model_for(new).scroll_pos = self.list_view.verticalScrollBar().value()
+            self.navigate_to(new, record=False)
+
+    def apply_removal(self, removal):
+        """
+        Drops cached folder models touched by a removal and refreshes the list
+        only if the displayed folder was affected. The displayed folder's model
+        is refreshed in place, so the list keeps its scroll position.
+        """
+        current = self.list_view.model()
+        node = self.current_view_node
+        keep = id(node) if node is not None and not removal.is_removed(node) else None
+        for node_id in [i for i in self.models if i in removal.affected_ids or i in removal.removed_ids]:
+            if node_id == keep:
+                continue
+            model = self.models.pop(node_id)
+            if model is not current:
+                model.deleteLater()
+        kept = [(i, n) for i, n in enumerate(self.history) if not removal.is_removed(n)]
+        self.history_index = sum(1 for i, _ in kept if i <= self.history_index) - 1
+        self.history = [n for _, n in kept]
+
+        if not self.current_view_node:
+            return
+        if removal.is_removed(self.current_view_node):
+            # Fall back to the deepest breadcrumb that still exists
+            target = next((n for n in reversed(self.breadcrumbs) if not removal.is_removed(n)), self.root_node)
+            already_current = 0 <= self.history_index < len(self.history) and self.history[self.history_index] is target
+            self.navigate_to(target, record=not already_current)
+        elif removal.is_affected(self.current_view_node):
+            self.update_breadcrumbs()
+            self.refresh_folder(self.current_view_node)
 
     def on_item_clicked(self, node: FileNode):
         if node.is_dir:
             # Enter directory
-            self.breadcrumbs.append(node)
             self.navigate_to(node)
         else:
             # Is a file, emit signal for Details Panel
@@ -1,51 +1,90 @@
-from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsSimpleTextItem
-from PyQt6.QtCore import Qt, QRectF, pyqtSignal
-from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QPainter
+from PyQt6.QtWidgets import QWidget, QToolTip
+from PyQt6.QtCore import Qt, QRectF, QRect, QSize, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer
+from PyQt6.QtGui import QColor, QPen, QFont, QFontMetrics, QPainter, QPixmap
 from src.scanner import FileNode
+from src.treemap_layout import layout_tree, SpatialIndex, LayoutCache
+from src.metrics import recorder, timed
 
-class TreemapItem(QGraphicsRectItem):
-    def __init__(self, rect, node: FileNode, color: QColor, parent_item=None):
-        super().__init__(rect, parent_item)
+class LayoutSignals(QObject):
+    finished = pyqtSignal(int, object, object, int, int) # generation, node, rects, width, height
+
+class TreemapLayoutWorker(QRunnable):
+    """
+    Computes a treemap layout off the GUI thread.
+    """
+    def __init__(self, generation: int, node: FileNode, width: int, height: int,
+                 max_depth: int, min_area: float, cache: LayoutCache):
+        super().__init__()
+        self.generation = generation
         self.node = node
-        self.setBrush(QBrush(color))
-        self.setPen(QPen(QColor(30,30,30), 1)) # Borders
-        self.setAcceptHoverEvents(True)
-        
-        # Add Label if space permits
-        if rect.width() > 60 and rect.height() > 20:
-            text = QGraphicsSimpleTextItem(node.name, self)
-            font = QFont("Segoe UI", 9)
-            text.setFont(font)
-            text.setBrush(QBrush(QColor("white")))
-            
-            # Center text
-            text_rect = text.boundingRect()
-            text.setPos(rect.x() + 5, rect.y() + 5)
-            
-            # Clip if too long (basic)
-            if text_rect.width() > rect.width() - 10:
-                pass # TODO: Elide text
-
-    def hoverEnterEvent(self, event):
-        self.setPen(QPen(QColor("white"), 2))
-        super().hoverEnterEvent(event)
-
-    def hoverLeaveEvent(self, event):
-        self.setPen(QPen(QColor(30,30,30), 1))
-        super().hoverLeaveEvent(event)
-
-class TreemapWidget(QGraphicsView):
+        self.width = width
+        self.height = height
+        self.max_depth = max_depth
+        self.min_area = min_area
+        self.cache = cache
+        self.cache_generation = cache.generation # A layout of a tree that has changed since isn't cached
+        self.signals = LayoutSignals()
+
+    def run(self):
+        with recorder.job("treemap.layout", width=self.width, height=self.height) as metrics:
+            rects = layout_tree(self.node, 0, 0, self.width, self.height,
+                                max_depth=self.max_depth, min_area=self.min_area,
+                                children_of=self.cache.sorted_children)
+            metrics.count("rects", len(rects))
+        # Cached even if a newer request superseded it, as it may fit a later size
+        self.cache.store(self.node, self.width, self.height, self.max_depth, self.min_area, rects,
+                         generation=self.cache_generation)
+        self.signals.finished.emit(self.generation, self.node, rects, self.width, self.height)
+
+class TreemapWidget(QWidget):
+    """
+    Squarified treemap painted in a single pass from cached layout rects.
+    The rendered map is kept in a pixmap so hover feedback only repaints the
+    highlighted block.
+
+    Layouts are computed on a background thread. While resizing, the last
+    layout is rescaled and an exact one is requested once resizing settles.
+
+    Double-clicking a folder zooms into it; only the focused subtree is laid
+    out, and layouts stay cached per node and size so going back is instant.
+    Right-click, Backspace, the mouse back button or the header bar zoom out.
+    """
     itemClicked = pyqtSignal(object) # Emits FileNode
+    focusChanged = pyqtSignal(object) # Emits the FileNode being shown
+
+    RESIZE_DEBOUNCE_MS = 150
+    HEADER_HEIGHT = 26
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.scene = QGraphicsScene(self)
-        self.setScene(self.scene)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
+        self.setMouseTracking(True)
+        self.setMinimumSize(100, 100)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+
         self.root_node = None
+        self.focus_node = None # The zoomed-in folder currently laid out
+        self.focus_stack = []  # Folders zoomed out of, for back navigation
+        self.rects = []
+        self.index = None
+        self.hover_rect = None
+        self._pixmap = None
+
+        # Level-of-detail limits
+        self.max_depth = 8
+        self.min_area = 36.0
+
+        # Background layout
+        self.layout_cache = LayoutCache(max_layouts=64)
+        self.layout_pool = QThreadPool(self)
+        self.layout_pool.setMaxThreadCount(1)
+        self._generation = 0
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self.request_layout)
+
+        self.label_font = QFont("Segoe UI", 9)
+        self.header_font = QFont("Segoe UI", 10)
         self.colors = {
             "Apps": QColor("#0078D4"),      # Blue
             "Cache": QColor("#D13438"),     # Red
@@ -56,81 +95,247 @@ class TreemapWidget(QGraphicsView):
             "Unknown": QColor("#606060")      # Dark Grey
         }
 
+    @timed("view.treemap.set_data")
     def set_data(self, root_node: FileNode):
         self.root_node = root_node
+        self.focus_node = root_node
+        self.focus_stack = []
+        self.layout_cache.clear()
         self.draw_treemap()
+        self.focusChanged.emit(self.focus_node)
+
+    def map_size(self):
+        # The treemap area below the header bar
+        return self.width(), max(0, self.height() - self.HEADER_HEIGHT)
+
+    def zoom_in(self, node: FileNode):
+        if node is None or not node.is_dir or node is self.focus_node:
+            return
+        self.focus_stack.append(self.focus_node)
+        self.focus_node = node
+        self.draw_treemap()
+        self.focusChanged.emit(node)
+
+    def zoom_out(self):
+        if not self.focus_stack:
+            return
+        self.focus_node = self.focus_stack.pop()
+        self.draw_treemap()
+        self.focusChanged.emit(self.focus_node)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self.root_node:
+        if not self.focus_node:
+            return
+        # Rescale what we have right away, recompute once the size settles
+        width, height = self.map_size()
+        rects = self.layout_cache.lookup(self.focus_node, width, height, self.max_depth, self.min_area)
+        if rects is not None:
+            # Keep the old pixmap; it is stretched until the settled layout is painted
+            self._set_rects(rects, repaint_pixmap=False)
+        self._resize_timer.start()
+
+    def apply_removal(self, removal):
+        self.layout_cache.invalidate(removal)
+        if not self.focus_node:
+            return
+        if removal.is_removed(self.focus_node):
+            # Zoom out to the closest folder that still exists
+            while self.focus_stack and removal.is_removed(self.focus_node):
+                self.focus_node = self.focus_stack.pop()
+            self.draw_treemap()
+            self.focusChanged.emit(self.focus_node)
+        elif removal.is_affected(self.focus_node):
             self.draw_treemap()
+        else:
+            self.update() # Header totals may have changed
 
     def draw_treemap(self):
-        self.scene.clear()
-        if not self.root_node:
+        self.hover_rect = None
+        self._pixmap = None
+        if not self.focus_node:
+            self._generation += 1 # Drop any layout still in flight
+            self.rects = []
+            self.index = None
+            self.update()
             return
+        self.request_layout()
 
-        width = self.viewport().width()
-        height = self.viewport().height()
-        self.scene.setSceneRect(0, 0, width, height)
-        
-        # Start squarification logic
-        # For simplicity in this first pass, we'll do a basic "slice and dice" or simplified approach
-        # A full squarified algorithm is complex, I will implement a simpler recursive subdivide first
-        # to ensure it works, then refine.
-        
-        self._layout_recursive(self.root_node, QRectF(0, 0, width, height))
-
-    def _layout_recursive(self, node: FileNode, rect: QRectF):
-        # Base case: too small to render
-        if rect.width() < 2 or rect.height() < 2:
+    def request_layout(self):
+        width, height = self.map_size()
+        if not self.focus_node or width <= 0 or height <= 0:
             return
+        self._generation += 1
+        rects = self.layout_cache.lookup(self.focus_node, width, height,
+                                         self.max_depth, self.min_area, exact=True)
+        if rects is not None:
+            self._set_rects(rects)
+            return
+        worker = TreemapLayoutWorker(self._generation, self.focus_node, width, height,
+                                     self.max_depth, self.min_area, self.layout_cache)
+        worker.signals.finished.connect(self._on_layout_finished)
+        self.layout_pool.start(worker)
+
+    def _on_layout_finished(self, generation, node, rects, width, height):
+        # Only show the result of the latest request
+        if generation == self._generation and node is self.focus_node:
+            self._set_rects(rects)
+
+    def _set_rects(self, rects, repaint_pixmap=True):
+        self.rects = rects
+        self.index = None # Built on the next hit test
+        self.hover_rect = None
+        if repaint_pixmap:
+            self._pixmap = None
+        self.update()
+
+    def _color_for(self, rect):
+        if rect.is_aggregate:
+            return QColor("#4A4A4A")
+        color = self.colors.get(rect.node.category, self.colors["Unknown"])
+        # Deeper blocks are slightly darker so neighbouring folders stay distinguishable
+        return color.darker(100 + min(rect.depth, 8) * 6)
+
+    def _render_pixmap(self):
+        width, height = self.map_size()
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, int(width * ratio)), max(1, int(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QColor("#202020"))
+
+        painter = QPainter(pixmap)
+        border = QPen(QColor(30, 30, 30), 1)
+        metrics = QFontMetrics(self.label_font)
+        painter.setFont(self.label_font)
 
-        # If it's a file or empty dir, draw it
-        if not node.children:
-            color = self.colors.get(node.category, self.colors["Unknown"])
-            item = TreemapItem(rect, node, color)
-            self.scene.addItem(item)
+        for rect in self.rects:
+            if not rect.is_leaf:
+                continue
+            block = QRectF(rect.x, rect.y, rect.w, rect.h)
+            painter.fillRect(block, self._color_for(rect))
+            painter.setPen(border)
+            painter.drawRect(block)
+
+            # Label if space permits
+            if rect.w > 60 and rect.h > 20:
+                text = f"{rect.count} smaller items" if rect.is_aggregate else rect.node.name
+                text = metrics.elidedText(text, Qt.TextElideMode.ElideRight, int(rect.w) - 10)
+                painter.setPen(QColor("white"))
+                painter.drawText(QRectF(rect.x + 5, rect.y + 3, rect.w - 10, rect.h - 6),
+                                 Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, text)
+
+        # Outline the top levels of folders so the hierarchy stays readable
+        folder_pen = QPen(QColor(15, 15, 15), 2)
+        painter.setPen(folder_pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for rect in self.rects:
+            if not rect.is_leaf and 0 < rect.depth <= 2:
+                painter.drawRect(QRectF(rect.x, rect.y, rect.w, rect.h))
+
+        painter.end()
+        return pixmap
+
+    def _paint_header(self, painter):
+        header = QRect(0, 0, self.width(), self.HEADER_HEIGHT)
+        painter.fillRect(header, QColor("#252525"))
+        if not self.focus_node:
             return
 
-        # It's a directory with children.
-        # 1. Draw the container (optional, maybe just background)
-        # 2. Divide space for children
-        
-        total_size = node.size
-        if total_size == 0:
+        # Path from the scan root to the focused folder
+        names = [n.name for n in self.focus_stack] + [self.focus_node.name]
+        text = " > ".join(names) + f"  ({self.format_size(self.focus_node.size)})"
+        if self.focus_stack:
+            text = "\u25C0  " + text # Back arrow
+        painter.setFont(self.header_font)
+        painter.setPen(QColor("#DDDDDD"))
+        text = QFontMetrics(self.header_font).elidedText(text, Qt.TextElideMode.ElideLeft, self.width() - 20)
+        painter.drawText(header.adjusted(10, 0, -10, 0),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, text)
+
+    def paintEvent(self, event):
+        width, height = self.map_size()
+        stale = self._pixmap is not None and self._pixmap.deviceIndependentSize().toSize() != QSize(width, height)
+        if self._pixmap is None or (stale and not self._resize_timer.isActive()):
+            self._pixmap = self._render_pixmap()
+
+        painter = QPainter(self)
+        self._paint_header(painter)
+        painter.translate(0, self.HEADER_HEIGHT)
+        if stale and self._resize_timer.isActive():
+            painter.drawPixmap(QRect(0, 0, width, height), self._pixmap)
+        else:
+            painter.drawPixmap(0, 0, self._pixmap)
+        if self.hover_rect is not None:
+            r = self.hover_rect
+            painter.setPen(QPen(QColor("white"), 2))
+            painter.drawRect(QRectF(r.x + 1, r.y + 1, max(0.0, r.w - 2), max(0.0, r.h - 2)))
+        painter.end()
+
+    def _dirty_region(self, rect):
+        return QRect(int(rect.x) - 2, int(rect.y) + self.HEADER_HEIGHT - 2, int(rect.w) + 5, int(rect.h) + 5)
+
+    def hit_test(self, x, y):
+        # Widget coordinates; returns None over the header
+        y -= self.HEADER_HEIGHT
+        if not self.rects or y < 0:
+            return None
+        if self.index is None:
+            self.index = SpatialIndex(self.rects)
+        return self.index.hit(x, y)
+
+    def _folder_below_focus(self, node):
+        # The child of the focused folder that contains `node`
+        while node is not None and node.parent is not self.focus_node:
+            node = node.parent
+        return node
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        rect = self.hit_test(pos.x(), pos.y())
+        if rect is self.hover_rect:
             return
+        if self.hover_rect is not None:
+            self.update(self._dirty_region(self.hover_rect))
+        self.hover_rect = rect
+        if rect is not None:
+            self.update(self._dirty_region(rect))
+            name = f"{rect.count} smaller items in {rect.node.name}" if rect.is_aggregate else rect.node.path
+            QToolTip.showText(event.globalPosition().toPoint(), name, self)
 
-        # Sort children largest to smallest
-        children = sorted(node.children, key=lambda x: x.size, reverse=True)
-        
-        # Simple Slice-and-Dice (Alternating)
-        # For a better aspect ratio (squarified), we need a more complex algo.
-        # Let's stick to slice-and-dice for V1 implementation speed.
-        
-        x, y, w, h = rect.x(), rect.y(), rect.width(), rect.height()
-        
-        horizontal = w > h
-        
-        current_x = x
-        current_y = y
-        
-        for i, child in enumerate(children):
-            ratio = child.size / total_size
-            
-            if horizontal:
-                child_w = w * ratio
-                child_rect = QRectF(current_x, y, child_w, h)
-                current_x += child_w
-            else:
-                child_h = h * ratio
-                child_rect = QRectF(x, current_y, w, child_h)
-                current_y += child_h
-                
-            self._layout_recursive(child, child_rect)
+    def leaveEvent(self, event):
+        if self.hover_rect is not None:
+            self.update(self._dirty_region(self.hover_rect))
+            self.hover_rect = None
+        super().leaveEvent(event)
 
     def mousePressEvent(self, event):
-        item = self.itemAt(event.pos())
-        if isinstance(item, TreemapItem):
-            self.itemClicked.emit(item.node)
+        if event.button() in (Qt.MouseButton.RightButton, Qt.MouseButton.BackButton):
+            self.zoom_out()
+            return
+        pos = event.position()
+        if pos.y() < self.HEADER_HEIGHT:
+            self.zoom_out()
+            return
+        rect = self.hit_test(pos.x(), pos.y())
+        if rect is not None:
+            self.itemClicked.emit(rect.node)
         super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        pos = event.position()
+        rect = self.hit_test(pos.x(), pos.y())
+        if rect is not None and not rect.is_aggregate:
+            self.zoom_in(self._folder_below_focus(rect.node))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Backspace:
+            self.zoom_out()
+        else:
+            super().keyPressEvent(event)
+
+    def format_size(self, size):
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024:
+                return f"{size:.2f} {unit}"
+            size /= 1024
+        return f"{size:.2f} PB"
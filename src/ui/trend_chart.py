@@ -0,0 +1,140 @@
+import time
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QAreaSeries, QDateTimeAxis, QValueAxis
+from PyQt6.QtGui import QPainter, QColor, QFont, QPen
+from PyQt6.QtCore import Qt, QDateTime
+from src.metrics import timed
+
+class StorageTrendChart(QWidget):
+    """
+    Line chart of a root's total size over time. The history manager picks the
+    resolution (raw scans or daily/weekly/monthly rollups) for the selected range.
+    """
+    RANGES = [
+        ("30 Days", 30 * 86400),
+        ("1 Year", 365 * 86400),
+        ("5 Years", 5 * 365 * 86400),
+        ("All", None),
+    ]
+
+    def __init__(self, history_manager):
+        super().__init__()
+        self.history_manager = history_manager
+        self.path = None
+        self.range_seconds = self.RANGES[0][1]
+
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        # Header with range selector
+        header = QHBoxLayout()
+        self.lbl_header = QLabel("Storage Trends")
+        self.lbl_header.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        header.addWidget(self.lbl_header)
+        header.addStretch()
+
+        self.range_buttons = []
+        for label, seconds in self.RANGES:
+            btn = QPushButton(label)
+            btn.setCheckable(True)
+            btn.setChecked(seconds == self.range_seconds)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #333333;
+                    color: white;
+                    border-radius: 4px;
+                    padding: 4px 10px;
+                }
+                QPushButton:checked { background-color: #0078D4; }
+            """)
+            btn.clicked.connect(lambda checked, s=seconds, b=btn: self.set_range(s, b))
+            header.addWidget(btn)
+            self.range_buttons.append(btn)
+        self.layout.addLayout(header)
+
+        self.lbl_resolution = QLabel("")
+        self.lbl_resolution.setStyleSheet("color: #AAAAAA; margin-bottom: 5px;")
+        self.layout.addWidget(self.lbl_resolution)
+
+        # Chart
+        self.chart = QChart()
+        self.chart.setTheme(QChart.ChartTheme.ChartThemeDark)
+        self.chart.setBackgroundVisible(False)
+        self.chart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
+        self.chart.legend().setFont(QFont("Segoe UI", 9))
+
+        self.chart_view = QChartView(self.chart)
+        self.chart_view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.chart_view.setStyleSheet("background: transparent;")
+        self.layout.addWidget(self.chart_view)
+
+    def set_path(self, path: str):
+        self.path = path
+        self.refresh()
+
+    def set_range(self, seconds, button):
+        self.range_seconds = seconds
+        for btn in self.range_buttons:
+            btn.setChecked(btn is button)
+        self.refresh()
+
+    @timed("view.trend_chart.refresh")
+    def refresh(self):
+        self.chart.removeAllSeries()
+        for axis in self.chart.axes():
+            self.chart.removeAxis(axis)
+        if not self.path:
+            return
+
+        start = time.time() - self.range_seconds if self.range_seconds else None
+        resolution, points = self.history_manager.get_trend(self.path, start=start)
+        if not points:
+            self.lbl_resolution.setText("No history recorded for this folder yet.")
+            return
+        self.lbl_resolution.setText(f"{len(points)} points at {resolution} resolution")
+
+        # Pick a display unit from the largest value so the axis stays readable
+        peak = max(p[2] for p in points)
+        unit, divisor = "B", 1
+        for candidate in ['KB', 'MB', 'GB', 'TB']:
+            if peak / divisor < 1024:
+                break
+            divisor *= 1024
+            unit = candidate
+
+        last_series = QLineSeries()
+        last_series.setName(f"Size ({unit})")
+        last_series.setPen(QPen(QColor("#4DABF7"), 2))
+        for ts, _, _, last in points:
+            last_series.append(ts * 1000, last / divisor)
+
+        self.chart.addSeries(last_series)
+        series = [last_series]
+
+        if resolution != "raw":
+            # Shade the min/max band of each rollup bucket
+            lower, upper = QLineSeries(), QLineSeries()
+            for ts, low, high, _ in points:
+                lower.append(ts * 1000, low / divisor)
+                upper.append(ts * 1000, high / divisor)
+            # The area series doesn't take ownership of its boundary lines
+            self._band_lines = (upper, lower)
+            band = QAreaSeries(upper, lower)
+            band.setName("Min/Max")
+            band.setColor(QColor(77, 171, 247, 60))
+            band.setBorderColor(QColor(77, 171, 247, 0))
+            self.chart.addSeries(band)
+            series.append(band)
+
+        axis_x = QDateTimeAxis()
+        axis_x.setFormat("yyyy-MM-dd" if resolution != "raw" else "MM-dd hh:mm")
+        axis_x.setRange(QDateTime.fromMSecsSinceEpoch(int(points[0][0] * 1000)),
+                        QDateTime.fromMSecsSinceEpoch(int(points[-1][0] * 1000) + 1))
+        axis_y = QValueAxis()
+        axis_y.setLabelFormat("%.1f")
+        axis_y.setRange(min(p[1] for p in points) / divisor * 0.95, peak / divisor * 1.05 or 1)
+        self.chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
+        self.chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
+        for s in series:
+            s.attachAxis(axis_x)
+            s.attachAxis(axis_y)
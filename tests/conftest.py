@@ -0,0 +1,65 @@
+import os
+import sys
+import pytest
+
+# Tests import the engines as `src.*`, like cli.py and main.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scan_engine import FileNode
+
+
+def build_tree(base, layout, mtime=1_600_000_000):
+    """
+    Creates files and folders under `base` from a nested dict: an int is a file
+    of that many bytes, a dict a folder. Every entry gets the same mtime, so
+    scans of equal layouts compare equal.
+    """
+    for name, spec in layout.items():
+        path = os.path.join(base, name)
+        if isinstance(spec, dict):
+            os.mkdir(path)
+            build_tree(path, spec, mtime)
+        else:
+            with open(path, "wb") as f:
+                f.write(b"x" * spec)
+        os.utime(path, (mtime, mtime))
+
+
+def signature(node):
+    """
+    A scan tree as nested tuples, children sorted by name, for comparing trees.
+    """
+    if not node.is_dir:
+        return (node.name, node.size, False, type(node).__name__)
+    return (node.name, node.size, True, tuple(sorted((signature(c) for c in node.peek_children()),
+                                                     key=lambda s: (s[0], s[2]))))
+
+
+def make_node(name, size=0, parent=None, is_dir=False, category="Unknown", mtime=0.0):
+    """
+    A FileNode built in memory; its size is added to every ancestor, like a scan would.
+    """
+    path = os.path.join(parent.path, name) if parent is not None else name
+    node = FileNode(name=name, path=path, size=size, is_dir=is_dir, modified=mtime, category=category,
+                    latest_modified=mtime)
+    if parent is not None:
+        parent.add_child(node)
+        for ancestor in node.ancestors():
+            ancestor.size += size
+    return node
+
+
+SAMPLE_LAYOUT = {
+    "docs": {"a.txt": 100, "b.pdf": 2000, "nested": {"c.txt": 30}},
+    "media": {"song.mp3": 5000, "clip.mp4": 7000},
+    "empty": {},
+    "top.zip": 900,
+}
+
+
+@pytest.fixture
+def sample_tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), SAMPLE_LAYOUT)
+    return str(root)
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import pytest
+from conftest import build_tree, signature
+from src.analyzer import Analyzer
+from src.async_scan import AsyncScanner, ScanExecutor, scan_all, analyze
+from src.scan_engine import Scanner
+
+LAYOUT = {f"d{i}": {f"e{j}": {f"f{k}.bin": 100 * i + 10 * j + k + 1 for k in range(5)} for j in range(3)}
+          for i in range(4)}
+LAYOUT.update({"copy_a.txt": 64, "copy_b.txt": 64, "empty": {}})
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), LAYOUT)
+    return str(root)
+
+
+@pytest.fixture
+def executor():
+    executor = ScanExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+def test_scan_builds_the_same_tree_as_the_threaded_scanner(tree, executor):
+    root = asyncio.run(AsyncScanner(tree, executor=executor).scan())
+    assert signature(root) == signature(Scanner(tree).scan())
+
+
+def test_batches_cover_every_file_once(tree, executor):
+    async def collect():
+        scanner = AsyncScanner(tree, executor=executor, keep_tree=False)
+        batches = [batch async for batch in scanner.batches()]
+        return scanner, batches
+
+    scanner, batches = asyncio.run(collect())
+    paths = [f.path for batch in batches for f in batch.files]
+    assert len(paths) == len(set(paths)) == 4 * 3 * 5 + 2
+    assert sum(batch.bytes for batch in batches) == scanner.root.size == Scanner(tree).scan().size
+    assert sum(batch.subfolders for batch in batches) == scanner.counters["dirs"] - 1
+    # Without a tree, folders aren't linked in: only the root's size is filled in
+    assert all(child.is_dir is False for child in scanner.root.children)
+
+
+def test_a_slow_consumer_holds_the_scan_back(tree, executor):
+    async def consume():
+        scanner = AsyncScanner(tree, executor=executor, max_batches=2, concurrency=2)
+        waiting = []
+        async for _ in scanner.batches():
+            await asyncio.sleep(0.01)
+            waiting.append(scanner._queue.qsize())
+        return waiting
+
+    assert max(asyncio.run(consume())) <= 2
+
+
+def test_leaving_the_context_cancels_the_scan(tree, executor):
+    async def first_batch():
+        async with AsyncScanner(tree, executor=executor, max_batches=1, concurrency=1) as scanner:
+            async for batch in scanner.batches():
+                break
+        return scanner
+
+    scanner = asyncio.run(first_batch())
+    assert scanner.cancelled and scanner._task.done()
+    assert scanner.counters["dirs"] < 1 + 4 + 4 * 3
+
+
+def test_cancelled_scanner_returns_nothing(tree, executor):
+    async def run():
+        scanner = AsyncScanner(tree, executor=executor)
+        await scanner.cancel()
+        return await scanner.scan()
+
+    assert asyncio.run(run()) is None
+
+
+def test_scan_all_and_analyze_match_the_threaded_engine(tree, executor):
+    other = os.path.join(tree, "d1")
+    results = asyncio.run(scan_all([tree, other], executor=executor))
+    assert signature(results[other]) == signature(Scanner(other).scan())
+    suggestions, duplicates = asyncio.run(analyze(results[tree], executor=executor))
+    expected_suggestions, expected_duplicates = Analyzer().analyze(Scanner(tree).scan())
+
+    def paths(groups):
+        return sorted(sorted(n.path for n in group) for group in groups)
+
+    assert paths(duplicates) == paths(expected_duplicates)
+    assert {k: paths([v]) for k, v in suggestions.items()} == {k: paths([v]) for k, v in expected_suggestions.items()}
@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import pytest
+from conftest import build_tree
+from src.analyzer import Analyzer
+from src.scan_engine import Scanner
+
+import cli
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # The CLI records history under ./user_data
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "data"
+    root.mkdir()
+    build_tree(str(root), {"Downloads": {"setup.exe": 300, "notes.txt": 10}, "ghost": {},
+                           "a": {"copy1.bin": 2048}, "b": {"copy2.bin": 2048}, "c": {"other.bin": 2048},
+                           "old.log": 50})
+    # Same size as the copies, different first kilobyte
+    with open(root / "c" / "other.bin", "wb") as f:
+        f.write(b"z" * 2048)
+    return str(root)
+
+
+def _run(capsys, *argv):
+    code = cli.main(list(argv))
+    return code, capsys.readouterr()
+
+
+def test_analyzer_confirms_duplicates_by_content(workspace):
+    groups = Analyzer().find_duplicates(Scanner(workspace).scan())
+    assert [sorted(os.path.basename(n.path) for n in g) for g in groups] == [["copy1.bin", "copy2.bin"]]
+
+
+def test_analyzer_suggestions(workspace):
+    old = time.time() - 30 * 86400
+    os.utime(os.path.join(workspace, "old.log"), (old, old))
+    suggestions = Analyzer().get_cleanup_suggestions(Scanner(workspace).scan())
+    names = {kind: [n.name for n in nodes] for kind, nodes in suggestions.items()}
+    assert names["Installer Residue"] == ["setup.exe"]
+    assert names["Ghost Folders"] == ["ghost"]
+    assert names["Abandoned Cache"] == ["old.log"]
+    assert names["Oversized Media/Archives"] == []
+
+
+def test_scan_prints_a_json_report(workspace, capsys):
+    code, out = _run(capsys, "scan", workspace, "--json", "--duplicates", "--no-history", "--backend", "thread")
+    assert code == 0
+    report = json.loads(out.out)
+    assert report["path"] == workspace
+    assert report["total_size"] == 300 + 10 + 3 * 2048 + 50
+    assert report["top_folders"][0]["size"] == 2048 and report["top_folders"][0]["is_dir"]
+    assert {f["path"] for f in report["top_files"]} >= {os.path.join(workspace, "Downloads", "setup.exe")}
+    assert report["duplicates"] == [{"size": 2048, "reclaimable": 2048, "paths": report["duplicates"][0]["paths"]}]
+    assert not os.path.exists("user_data")
+
+
+def test_scans_are_recorded_in_the_history(workspace, capsys):
+    assert _run(capsys, "scan", workspace, "--backend", "thread")[0] == 0
+    os.remove(os.path.join(workspace, "old.log"))
+    code, out = _run(capsys, "scan", workspace, "--json", "--backend", "thread")
+    assert json.loads(out.out)["since_last_scan"]["size_diff"] == -50
+    code, out = _run(capsys, "history", workspace, "--json", "--days", "1")
+    trend = json.loads(out.out)
+    assert code == 0 and trend["resolution"] == "raw"
+    assert [p["last"] for p in trend["points"]] == [6504, 6454]
+    # The whole history comes from the rollups: both scans fall in today's bucket
+    code, out = _run(capsys, "history", workspace, "--json")
+    assert [(p["min"], p["max"], p["last"]) for p in json.loads(out.out)["points"]] == [(6454, 6504, 6454)]
+
+
+def test_bad_arguments_exit_with_2(workspace, capsys):
+    assert _run(capsys, "scan", os.path.join(workspace, "missing"))[0] == 2
+    assert _run(capsys, "scan", workspace, "--memory-budget", "lots")[0] == 2
+    code, out = _run(capsys, "scan", workspace, "--export-tree", "tree.txt")
+    assert code == 2 and "export format" in out.err
+
+
+def test_cli_does_not_import_qt(workspace):
+    script = ("import sys, cli; cli.main(['scan', sys.argv[1], '--json', '--no-history']); "
+              "sys.stderr.write(str(sorted(m for m in sys.modules if m.startswith('PyQt'))))")
+    result = subprocess.run([sys.executable, "-c", script, workspace], cwd=PACKAGE_ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.endswith("[]")
@@ -0,0 +1,100 @@
+import os
+import sys
+import types
+import pytest
+from conftest import build_tree, make_node
+
+pytest.importorskip("PyQt6")
+from src.deletion_worker import DeletionWorker
+from src.scan_engine import AggregateNode
+
+
+@pytest.fixture
+def trash(monkeypatch):
+    # Stands in for the Recycle Bin: records what would have been trashed
+    trashed = []
+    monkeypatch.setitem(sys.modules, "send2trash", types.SimpleNamespace(send2trash=trashed.append))
+    return trashed
+
+
+def _run(worker):
+    events = {"deleted": [], "errors": [], "finished": None}
+    worker.signals.deleted.connect(events["deleted"].append)
+    worker.signals.item_error.connect(lambda node, message: events["errors"].append((node, message)))
+    worker.signals.finished.connect(lambda *result: events.update(finished=result))
+    worker.run()
+    return events
+
+
+def _with_paths(nodes, base):
+    for node in nodes:
+        node.path = os.path.join(base, node.name)
+    return nodes
+
+
+def _file_nodes(base, count, category="Unknown"):
+    build_tree(base, {f"f{i:02}.bin": 10 + i for i in range(count)})
+    return _with_paths([make_node(f"f{i:02}.bin", size=10 + i, category=category) for i in range(count)], base)
+
+
+def test_only_permanent_categories_skip_the_trash(tmp_path, trash):
+    build_tree(str(tmp_path), {"Cache": {"a.tmp": 5, "deep": {"b.tmp": 7}}, "movie.mp4": 100, "old.log": 3})
+    cache = make_node("Cache", is_dir=True, category="Cache")
+    log = make_node("old.log", size=3, category="Cache")
+    movie = make_node("movie.mp4", size=100, category="Media")
+    nodes = _with_paths([cache, log, movie], str(tmp_path))
+
+    events = _run(DeletionWorker(nodes, permanent_categories={"Cache"}))
+    assert events["finished"] == (3, 0, False)
+    assert not os.path.exists(cache.path) and not os.path.exists(log.path) # Removed outright, tree and all
+    assert trash == [movie.path]
+    assert os.path.exists(movie.path) # Only the Recycle Bin would have taken it
+
+    _run(DeletionWorker(_with_paths([make_node("x.mp4", category="Cache")], str(tmp_path))))
+    assert trash[-1] == os.path.join(str(tmp_path), "x.mp4") # No permanent categories: everything is trashed
+
+
+def test_failures_are_reported_per_item(tmp_path, trash):
+    base = str(tmp_path)
+    nodes = _file_nodes(base, 3, category="Cache")
+    missing = _with_paths([make_node("gone.bin", category="Cache")], base)[0]
+    aggregate = AggregateNode(name="[Small Cache files]", path=os.path.join(base, "[Small Cache files]"), size=40,
+                              is_dir=False, category="Cache", count=4)
+
+    events = _run(DeletionWorker(nodes + [missing, aggregate], permanent_categories={"Cache"}))
+    assert events["finished"] == (3, 2, False)
+    failed = {node.name: message for node, message in events["errors"]}
+    assert set(failed) == {"gone.bin", "[Small Cache files]"}
+    assert "delete their folder instead" in failed["[Small Cache files]"]
+    assert sorted(n.name for batch in events["deleted"] for n in batch) == sorted(n.name for n in nodes)
+    assert os.listdir(base) == []
+
+
+def test_deletions_are_reported_in_batches(tmp_path, trash):
+    nodes = [make_node(f"f{i}.bin") for i in range(50)]
+    events = _run(DeletionWorker(_with_paths(nodes, str(tmp_path)), batch_size=10))
+    assert events["finished"] == (50, 0, False)
+    batches = events["deleted"]
+    assert 1 < len(batches) < 50
+    assert all(isinstance(batch, list) for batch in batches)
+    assert sorted(id(n) for batch in batches for n in batch) == sorted(id(n) for n in nodes)
+    assert len(trash) == 50
+
+
+def test_cancel_stops_new_submissions(tmp_path, trash):
+    base = str(tmp_path)
+    nodes = _file_nodes(base, 10)
+    worker = DeletionWorker(nodes, permanent_categories={"Unknown"}, max_concurrency=1)
+    delete_one = worker._delete_one
+
+    def cancel_on_first(node):
+        worker.cancel()
+        delete_one(node)
+    worker._delete_one = cancel_on_first
+
+    events = _run(worker)
+    # Nothing is submitted after the cancel; only what was already in flight (at most two per worker) completes
+    deleted, failed, cancelled = events["finished"]
+    assert cancelled and failed == 0
+    assert 1 <= deleted <= 2
+    assert len(os.listdir(base)) == 10 - deleted
@@ -0,0 +1,116 @@
+import csv
+import json
+import os
+import pytest
+from conftest import build_tree
+from src.analyzer import Analyzer
+from src.exporters import Exporter, ExportError, iter_tree, format_for_path, TREE_COLUMNS, DUPLICATE_COLUMNS
+from src.scan_engine import Scanner, ScanBudget
+from src.tree_diff import to_snapshot
+
+
+@pytest.fixture
+def tree(sample_tree):
+    # A name that isn't valid UTF-8 and one that needs quoting
+    build_tree(sample_tree, {os.fsdecode(b"caf\xe9.txt"): 12, 'say "hi", then go.txt': 34, "dup.zip": 900})
+    return sample_tree
+
+
+def _count(root):
+    return sum(1 for _ in iter_tree(root))
+
+
+def test_csv_has_a_row_per_node(tree, tmp_path):
+    root = Scanner(tree).scan()
+    target = str(tmp_path / "tree.csv")
+    assert Exporter("tree", root, target).export() == _count(root) == 14
+    with open(target, newline="", encoding="utf-8", errors="surrogateescape") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == TREE_COLUMNS
+    by_path = {row[0]: row for row in rows[1:]}
+    assert by_path[tree][1:3] == ["folder", str(root.size)]
+    odd = os.path.join(tree, os.fsdecode(b"caf\xe9.txt"))
+    assert by_path[odd][1:3] == ["file", "12"]
+    assert os.fsencode(odd).endswith(b"caf\xe9.txt")
+    assert by_path[os.path.join(tree, 'say "hi", then go.txt')][2] == "34"
+    assert by_path[os.path.join(tree, "docs", "nested", "c.txt")][5] == "3"
+
+
+def test_jsonl_lines_are_valid_json(tree, tmp_path):
+    root = Scanner(tree).scan()
+    target = str(tmp_path / "tree.jsonl")
+    Exporter("tree", root, target).export()
+    with open(target, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == _count(root)
+    assert list(rows[0]) == list(TREE_COLUMNS)
+    assert rows[0] == {"path": tree, "kind": "folder", "size": root.size, "category": root.category,
+                       "modified": root.modified, "depth": 0, "count": 0}
+    assert sum(row["size"] for row in rows if row["kind"] != "folder") == root.size
+
+
+def test_aggregates_are_exported_with_their_count(tree, tmp_path):
+    root = Scanner(tree, budget=ScanBudget(small_file_size=1000)).scan()
+    rows = list(iter_tree(root))
+    aggregates = [row for row in rows if row[1] == "aggregate"]
+    assert aggregates and sum(row[6] for row in aggregates) + sum(row[1] == "file" for row in rows) == 9
+
+
+def test_snapshot_exports_like_the_tree(tree, tmp_path):
+    root = Scanner(tree).scan()
+    snapshot = to_snapshot(root)
+
+    def without_mtime(rows):
+        # Snapshots keep the newest mtime of each folder rather than its own
+        return [row[:4] + row[5:] for row in rows]
+
+    assert without_mtime(iter_tree(snapshot)) == without_mtime(iter_tree(root))
+    target = str(tmp_path / "snapshot.csv")
+    assert Exporter("tree", snapshot, target).export() == _count(root)
+
+
+def test_duplicates_and_suggestions(tree, tmp_path):
+    root = Scanner(tree).scan()
+    suggestions, duplicates = Analyzer().analyze(root)
+    target = str(tmp_path / "dups.csv")
+    assert Exporter("duplicates", duplicates, target).export() == 2
+    with open(target, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == list(DUPLICATE_COLUMNS)
+    assert {os.path.basename(row["path"]) for row in rows} == {"top.zip", "dup.zip"}
+    assert rows[0]["reclaimable"] == "900" and rows[0]["copies"] == "2"
+    assert Exporter("suggestions", suggestions, str(tmp_path / "s.jsonl")).export() == \
+        sum(len(nodes) for nodes in suggestions.values())
+
+
+def test_progress_and_cancel(tree, tmp_path):
+    root = Scanner(tree).scan()
+    progress = []
+    target = str(tmp_path / "tree.csv")
+    assert Exporter("tree", root, target, chunk_rows=4,
+                    on_progress=lambda rows, fraction: progress.append((rows, fraction))).export() == 14
+    assert [rows for rows, _ in progress] == [4, 8, 12, 14]
+    assert progress[-1][1] == 1.0 and all(a[1] <= b[1] for a, b in zip(progress, progress[1:]))
+
+    cancelled = str(tmp_path / "cancelled.csv")
+    exporter = Exporter("tree", root, cancelled, chunk_rows=4, on_progress=lambda rows, fraction: exporter.cancel())
+    assert exporter.export() is None
+    assert not os.path.exists(cancelled) and not os.path.exists(cancelled + ".part")
+
+
+def test_formats(tree, tmp_path):
+    assert format_for_path("a.NDJSON") == "jsonl" and format_for_path("a.txt") is None
+    root = Scanner(tree).scan()
+    with pytest.raises(ExportError):
+        Exporter("tree", root, str(tmp_path / "tree.txt"))
+    with pytest.raises(ExportError):
+        Exporter("everything", root, str(tmp_path / "tree.csv"))
+
+
+def test_parquet_round_trip(tree, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    root = Scanner(tree).scan()
+    target = str(tmp_path / "tree.parquet")
+    assert Exporter("tree", root, target, chunk_rows=5).export() == _count(root)
+    table = pq.read_table(target)
+    assert table.num_rows == _count(root) and table.column_names == list(TREE_COLUMNS)
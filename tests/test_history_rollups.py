@@ -0,0 +1,89 @@
+import datetime
+import json
+import os
+import time
+import pytest
+from conftest import make_node
+from src.history_manager import HistoryManager
+
+DAY = 86400
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    # HistoryManager keeps its files under ./user_data
+    monkeypatch.chdir(tmp_path)
+    return HistoryManager()
+
+
+def _root(size):
+    root = make_node("/data", is_dir=True)
+    make_node("big", size, parent=root)
+    return root
+
+
+def test_buckets_keep_min_max_last_and_count(history):
+    base = 1_700_006_400 # A Wednesday, 00:00 UTC
+    for hours, size in ((1, 500), (5, 200), (9, 800), (13, 600)):
+        history._add_to_rollups("/data", base + hours * 3600, size)
+    daily = history.rollups["/data"]["daily"]
+    assert daily == [[base, 200, 800, 600, 4]]
+    weekly = history.rollups["/data"]["weekly"]
+    monday = datetime.datetime.fromtimestamp(weekly[0][0], tz=datetime.timezone.utc)
+    assert monday.weekday() == 0 and (monday.hour, monday.minute) == (0, 0)
+    monthly = history.rollups["/data"]["monthly"]
+    first = datetime.datetime.fromtimestamp(monthly[0][0], tz=datetime.timezone.utc)
+    assert (first.day, first.hour) == (1, 0)
+
+
+def test_out_of_order_scans_leave_last_alone(history):
+    base = 1_700_006_400
+    history._add_to_rollups("/data", base + 2 * DAY, 300)
+    history._add_to_rollups("/data", base + 2 * DAY + 60, 350)
+    history._add_to_rollups("/data", base, 100) # Earlier day arrives late
+    history._add_to_rollups("/data", base + 2 * DAY + 30, 900)
+    daily = history.rollups["/data"]["daily"]
+    assert [b[0] for b in daily] == [base, base + 2 * DAY]
+    assert daily[-1][1:] == [300, 900, 900, 3]
+
+
+def test_daily_buckets_expire_after_their_retention(history):
+    now = time.time()
+    history._add_to_rollups("/data", now - 500 * DAY, 100)
+    history._add_to_rollups("/data", now, 200)
+    tiers = history.rollups["/data"]
+    assert len(tiers["daily"]) == 1
+    assert len(tiers["monthly"]) == 2
+
+
+def test_trend_picks_the_finest_resolution_that_fits(history):
+    now = time.time()
+    for day in range(300):
+        history._add_to_rollups("/data", now - day * DAY, 1000 + day)
+    history.history["/data"] = [{"timestamp": now - 60, "total_size": 1000, "children": {}}]
+    assert history.get_trend("/data", start=now - 3600)[0] == "raw"
+    resolution, points = history.get_trend("/data", start=now - 299 * DAY)
+    assert resolution == "daily" and len(points) >= 299
+    resolution, points = history.get_trend("/data", start=now - 299 * DAY, max_points=60)
+    assert resolution == "weekly"
+    assert all(lo <= last <= hi for _, lo, hi, last in points)
+
+
+def test_save_scan_persists_history_and_rollups(history, tmp_path):
+    history.save_scan("/data", _root(1234))
+    history.save_scan("/data", _root(4321))
+    reloaded = HistoryManager()
+    assert [e["total_size"] for e in reloaded.history["/data"]] == [1234, 4321]
+    daily = reloaded.rollups["/data"]["daily"]
+    assert daily[-1][1:] == [1234, 4321, 4321, 2]
+
+
+def test_rollups_are_seeded_from_older_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("user_data")
+    entries = [{"timestamp": 1_700_006_400 + i * DAY, "total_size": 100 * (i + 1), "children": {}} for i in range(3)]
+    with open(os.path.join("user_data", "storage_history.json"), "w") as f:
+        json.dump({"/data": entries}, f)
+    history = HistoryManager()
+    assert [b[3] for b in history.rollups["/data"]["daily"]] == [100, 200, 300]
+    assert os.path.exists(history.rollup_path)
@@ -0,0 +1,132 @@
+import json
+import pytest
+from src import metrics as metrics_module
+from src.metrics import JobMetrics, MetricsRecorder, timed
+
+
+class FakeClock:
+    """
+    Stands in for the time module; tests move it forward by hand.
+    """
+    def __init__(self):
+        self.now = 500.0
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000.0 + self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(metrics_module, "time", clock)
+    return clock
+
+
+def test_timers_and_counters_accumulate(clock):
+    metrics = JobMetrics("scan", {"path": "/data"})
+    for seconds in (0.5, 0.25):
+        with metrics.timer("list"):
+            clock.now += seconds
+    metrics.add_time("hash", 2.0)
+    metrics.add_time("hash", 1.0)
+    metrics.count("files")
+    metrics.count("files", 9)
+    metrics.count("bytes", 4096)
+
+    assert metrics.timers == {"list": pytest.approx(0.75), "hash": pytest.approx(3.0)}
+    assert metrics.counters == {"files": 10, "bytes": 4096}
+    assert metrics.duration is None
+    clock.now += 1.25
+    metrics.finish()
+    assert metrics.duration == pytest.approx(2.0)
+    clock.now += 10
+    metrics.finish()
+    assert metrics.duration == pytest.approx(2.0) # Only the first finish counts
+
+
+def test_timer_records_failed_phases(clock):
+    metrics = JobMetrics("hash")
+    with pytest.raises(RuntimeError):
+        with metrics.timer("read"):
+            clock.now += 0.5
+            raise RuntimeError("disk went away")
+    assert metrics.timers == {"read": pytest.approx(0.5)}
+
+
+def test_rates_cover_only_rate_counters(clock):
+    metrics = JobMetrics("scan")
+    assert metrics.rates() == {} # Not finished yet
+    metrics.count("files", 300)
+    metrics.count("bytes", 6000)
+    metrics.count("permission_errors", 3)
+    clock.now += 3.0
+    metrics.finish()
+    assert metrics.rates() == {"files_per_sec": pytest.approx(100.0), "bytes_per_sec": pytest.approx(2000.0)}
+
+
+def test_export_round_trips(tmp_path, clock):
+    recorder = MetricsRecorder()
+    recorder.jsonl_path = None
+    with recorder.job("scan", path="/data", source="cli") as metrics:
+        metrics.count("files", 40)
+        with metrics.timer("walk"):
+            clock.now += 2.0
+    with pytest.raises(ValueError):
+        with recorder.job("analyze"):
+            raise ValueError("bad tree")
+
+    path = str(tmp_path / "logs" / "metrics.jsonl")
+    assert recorder.export_jsonl(path) == 2
+    assert recorder.export_jsonl(path, recorder.jobs()[:1]) == 1 # Appends
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["job"] for row in rows] == ["scan", "analyze", "scan"]
+    scan, analyze = recorder.jobs()
+    assert rows[0] == rows[2] == scan.to_dict()
+    assert rows[0]["tags"] == {"path": "/data", "source": "cli"}
+    assert rows[0]["timers"] == {"walk": 2.0} and rows[0]["counters"] == {"files": 40}
+    assert rows[0]["rates"] == {"files_per_sec": 20.0}
+    assert rows[0]["duration"] == 2.0 and rows[0]["started"] == 1_700_000_500.0
+    assert rows[1]["tags"] == {"error": "bad tree"}
+    assert "profile" not in rows[0]
+
+
+def test_metrics_env_appends_every_finished_job(tmp_path, monkeypatch):
+    path = tmp_path / "auto.jsonl"
+    monkeypatch.setenv("STORAGE_BOT_METRICS", str(path))
+    recorder = MetricsRecorder()
+    assert recorder.jsonl_path == str(path)
+    monkeypatch.setattr(metrics_module, "recorder", recorder)
+    seen = []
+    recorder.add_listener(seen.append)
+
+    @timed("cleanup")
+    def cleanup():
+        return 7
+
+    with recorder.job("scan") as metrics:
+        metrics.count("files", 3)
+    assert cleanup() == 7
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["job"] for row in rows] == ["scan", "cleanup"]
+    assert rows[0]["counters"] == {"files": 3}
+    assert [m.name for m in seen] == ["scan", "cleanup"]
+
+    recorder.jsonl_path = str(path / "auto.jsonl") # Under a file, so it can't be written
+    with recorder.job("history"): # A log that can't be written doesn't fail the job
+        pass
+    assert len(recorder.jobs()) == 3
+
+
+def test_recorder_keeps_recent_jobs():
+    recorder = MetricsRecorder(max_jobs=3)
+    recorder.jsonl_path = None
+    for i in range(5):
+        with recorder.job(f"job{i}"):
+            pass
+    assert [m.name for m in recorder.jobs()] == ["job2", "job3", "job4"]
+    recorder.clear()
+    assert recorder.jobs() == []
@@ -0,0 +1,69 @@
+import os
+from conftest import build_tree, signature
+from src.scan_engine import MultiScanner, Scanner, ScanBudget
+
+
+def _roots(tmp_path):
+    first, second = tmp_path / "vol1", tmp_path / "vol2"
+    first.mkdir()
+    second.mkdir()
+    build_tree(str(first), {"a": {"x.bin": 100, "y.bin": 200}, "b.bin": 50})
+    build_tree(str(second), {"c": {"z.bin": 1000}})
+    return str(first), str(second)
+
+
+def test_roots_are_joined_under_one_node(tmp_path):
+    first, second = _roots(tmp_path)
+    finished = []
+    totals = {}
+
+    def on_categories(deltas):
+        for cat, size in deltas.items():
+            totals[cat] = totals.get(cat, 0) + size
+
+    scanner = MultiScanner([second, first], on_categories=on_categories,
+                           on_root_finished=lambda path, node: finished.append((path, node.size)))
+    root = scanner.scan()
+    assert root.name == "2 volumes"
+    assert root.path == MultiScanner.combined_path([first, second]) == f"{first} + {second}"
+    assert root.size == 1350 and sum(totals.values()) == 1350
+    by_name = {child.name: child for child in root.children}
+    assert set(by_name) == {first, second}
+    # Each volume's tree is what a single scan of it gives, apart from its absolute name
+    for path, node in by_name.items():
+        single = Scanner(path).scan()
+        single.name = path
+        assert signature(node) == signature(single)
+    assert sorted(finished) == sorted([(first, 350), (second, 1000)])
+
+
+def test_nested_roots_on_the_same_device_are_dropped(tmp_path):
+    first, _ = _roots(tmp_path)
+    inner = os.path.join(first, "a")
+    scanner = MultiScanner([inner, first, first + os.sep])
+    assert scanner.roots == [first]
+    root = scanner.scan()
+    # A single root is returned as is, named like a plain scan
+    assert root.path == first and root.name == os.path.basename(first)
+    assert root.size == 350
+
+
+def test_roots_on_one_device_share_a_group(tmp_path):
+    first, second = _roots(tmp_path)
+    groups = MultiScanner([first, second], rotational_limit=1, solid_state_limit=3).devices()
+    assert len(groups) == 1
+    (limit, roots), = groups.values()
+    assert limit in (1, 3) and sorted(roots) == sorted([first, second])
+
+
+def test_memory_budget_is_split_between_roots(tmp_path):
+    first, second = _roots(tmp_path)
+    scanner = MultiScanner([first, second], budget=ScanBudget(max_memory=4 * 1024 * 1024))
+    assert scanner.scan().size == 1350
+    assert all(s.max_nodes == 2 * 1024 * 1024 // Scanner.NODE_BYTES for s in scanner.scanners.values())
+
+
+def test_cancel_before_scanning_returns_nothing(tmp_path):
+    scanner = MultiScanner(list(_roots(tmp_path)))
+    scanner.cancel()
+    assert scanner.scan() is None
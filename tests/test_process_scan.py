@@ -0,0 +1,82 @@
+import os
+from conftest import build_tree, signature
+from src.metrics import JobMetrics
+from src.process_scan import ProcessScanner, make_scanner, worth_processes, _scan_subtree, _stitch
+from src.scan_engine import FileNode, Scanner
+
+LAYOUT = {f"dir{i}": {f"sub{j}": {f"file{k}.{ext}": 10 * i + j + k for k, ext in enumerate(["txt", "mp4", "zip"])}
+                      for j in range(4)} for i in range(6)}
+LAYOUT.update({"node_modules": {"pkg": {"index.js": 77}}, "empty": {}, "top.log": 5})
+
+
+def _tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), LAYOUT)
+    return str(root)
+
+
+def _nodes(node):
+    yield node
+    for child in node.children:
+        yield from _nodes(child)
+
+
+def test_process_backend_builds_the_same_tree(tmp_path):
+    path = _tree(tmp_path)
+    expected = Scanner(path).scan()
+    metrics = JobMetrics("scan")
+    totals = {}
+
+    def on_categories(deltas):
+        for cat, size in deltas.items():
+            totals[cat] = totals.get(cat, 0) + size
+
+    root = ProcessScanner(path, backend="process", workers=2, metrics=metrics, on_categories=on_categories).scan()
+    assert signature(root) == signature(expected)
+    assert metrics.tags["backend"] == "process" and metrics.counters["files"] == 6 * 4 * 3 + 2
+    assert sum(totals.values()) == expected.size
+    # Paths, parents, categories and mtimes match too
+    scanned = {n.path: n for n in _nodes(expected)}
+    for node in _nodes(root):
+        twin = scanned[node.path]
+        assert (node.category, node.modified, node.latest_modified) == (twin.category, twin.modified,
+                                                                        twin.latest_modified)
+        assert node.parent is None if node is root else node.parent.path == os.path.dirname(node.path)
+
+
+def test_stitch_rebuilds_a_flat_subtree(tmp_path):
+    path = os.path.join(_tree(tmp_path), "dir3")
+    result = _scan_subtree(path, None)
+    placeholder = FileNode(name="dir3", path=path, size=0, is_dir=True)
+    _stitch(placeholder, result)
+    assert signature(placeholder) == signature(Scanner(path).scan())
+    counters = result[-1]
+    assert (counters["files"], counters["dirs"]) == (12, 5)
+
+
+def test_small_trees_and_single_cores_stay_in_process(tmp_path):
+    path = _tree(tmp_path)
+    assert not worth_processes(path, workers=1)
+    assert not worth_processes(path, workers=8)
+    metrics = JobMetrics("scan")
+    scanner = ProcessScanner(path, backend="auto", workers=8, metrics=metrics)
+    assert signature(scanner.scan()) == signature(Scanner(path).scan())
+    assert metrics.tags["backend"] == "thread"
+
+
+def test_make_scanner_keeps_budgets_and_thread_backend_in_process(tmp_path, monkeypatch):
+    path = _tree(tmp_path)
+    monkeypatch.delenv("STORAGE_BOT_SCAN_BACKEND", raising=False)
+    assert type(make_scanner(path, backend="thread")) is Scanner
+    assert isinstance(make_scanner(path), ProcessScanner)
+    monkeypatch.setenv("STORAGE_BOT_SCAN_BACKEND", "thread")
+    assert type(make_scanner(path)) is Scanner
+    monkeypatch.setenv("STORAGE_BOT_SPILL_THRESHOLD", "1M")
+    assert type(make_scanner(path, backend="process")) is Scanner
+
+
+def test_cancelled_scan_returns_nothing(tmp_path):
+    scanner = ProcessScanner(_tree(tmp_path), backend="process", workers=2)
+    scanner.cancel()
+    assert scanner.scan() is None
@@ -0,0 +1,102 @@
+import os
+import pytest
+from conftest import build_tree, signature
+from src.quick_estimate import QuickEstimator, EstimatedNode, is_estimate
+from src.scan_engine import Scanner
+
+
+def _uniform(depth, width=3, files=2, size=100):
+    if depth == 0:
+        return {f"f{i}.bin": size for i in range(files)}
+    layout = {f"d{i}": _uniform(depth - 1, width, files, size) for i in range(width)}
+    layout.update({f"f{i}.bin": size for i in range(files)})
+    return layout
+
+
+@pytest.fixture
+def uneven(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), {
+        "top.bin": 11,
+        "a": {"x": {"deep": _uniform(3, width=2, size=7), "lone.bin": 5}, "y": {"y.bin": 3000}, "a.bin": 1},
+        "b": {"z": {"z1": {"big.bin": 90000}, "z2": {}, "z3": {"small.bin": 1}}},
+        "c": {},
+    })
+    return str(root)
+
+
+def test_top_levels_are_listed_and_deeper_folders_estimated(uneven):
+    result = QuickEstimator(uneven, full_depth=2, seed=1).estimate()
+    names = sorted(node.name for node in result.estimated)
+    assert names == ["x", "y", "z"]
+    assert [n.size for n in result.estimated] == sorted((n.size for n in result.estimated), reverse=True)
+    root = result.root
+    assert is_estimate(root) and root.pending == 3
+    assert root.known <= root.size and root.low <= root.size <= root.high
+    assert result.categories == {"Unknown": 12}
+
+
+def test_uniform_subtrees_are_estimated_exactly(tmp_path):
+    build_tree(str(tmp_path), {"root": _uniform(4)})
+    path = str(tmp_path / "root")
+    result = QuickEstimator(path, full_depth=1, samples=3, seed=2).estimate()
+    assert result.root.size == Scanner(path).scan().size
+    # Every probe sees the same branching, so they all agree
+    assert all(node.variance == 0 for node in result.estimated)
+
+
+def test_folders_probed_completely_are_exact(uneven):
+    result = QuickEstimator(uneven, full_depth=2, samples=8, seed=3).estimate()
+    y = next(n for n in result.estimated if n.name == "y")
+    assert (y.size, y.known, y.variance) == (3000, 3000, 0.0)
+
+
+def test_refinements_converge_on_the_exact_tree(uneven):
+    result = QuickEstimator(uneven, full_depth=2, seed=4).estimate()
+    for placeholder in list(result.estimated):
+        exact = Scanner(placeholder.path).scan()
+        assert result.apply_refinement(placeholder, exact) is not None
+        assert placeholder.parent is None
+    root = result.root
+    assert result.estimated == [] and not is_estimate(root)
+    assert root.low == root.high == root.size
+    assert signature(root) == signature(Scanner(uneven).scan())
+    assert all(not isinstance(n, EstimatedNode) or n.variance == 0 for n in root.children)
+
+
+def test_stale_refinements_are_ignored(uneven):
+    result = QuickEstimator(uneven, full_depth=2, seed=5).estimate()
+    placeholder = result.estimated[0]
+    exact = Scanner(placeholder.path).scan()
+    assert result.apply_refinement(placeholder, exact) is not None
+    size = result.root.size
+    assert result.apply_refinement(placeholder, Scanner(placeholder.path).scan()) is None
+    assert result.apply_refinement(result.estimated[0], None) is None
+    assert result.root.size == size
+
+
+def test_cancelled_estimate_returns_nothing(uneven):
+    estimator = QuickEstimator(uneven)
+    estimator.cancel()
+    assert estimator.estimate() is None
+
+
+def test_cancel_during_the_first_probes(uneven):
+    # "z" has three subfolders, so one probe can't see all of it
+    estimator = QuickEstimator(os.path.join(uneven, "b"), full_depth=1, samples=8, seed=6)
+    probe = estimator._probe
+    probed = []
+
+    def cancelling_probe(path, cache):
+        estimator.cancel() # As if the user cancelled while this probe ran
+        probed.append(path)
+        return probe(path, cache)
+
+    estimator._probe = cancelling_probe
+    result = estimator.estimate()
+    assert len(probed) == 1
+    node = next(n for n in result.estimated if n.path == probed[0])
+    assert node.name == "z" and node.known <= node.size and node.low == node.known
+    assert node.high == node.size + int(1.96 * (node.size - node.known)) or node.size == node.known
+    assert is_estimate(result.root) and result.root.low <= result.root.size <= result.root.high
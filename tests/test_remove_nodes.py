@@ -0,0 +1,61 @@
+from conftest import make_node
+from src.scan_engine import remove_nodes
+
+
+def _tree():
+    root = make_node("root", is_dir=True)
+    docs = make_node("docs", parent=root, is_dir=True)
+    a = make_node("a.txt", 100, parent=docs, category="Documents")
+    b = make_node("b.mp4", 5000, parent=docs, category="Media")
+    sub = make_node("sub", parent=docs, is_dir=True)
+    c = make_node("c.mp4", 700, parent=sub, category="Media")
+    other = make_node("other.zip", 40, parent=root, category="Archives")
+    return root, docs, a, b, sub, c, other
+
+
+def test_sizes_are_subtracted_up_the_parent_chain():
+    root, docs, a, b, sub, c, other = _tree()
+    result = remove_nodes([b, c])
+    assert result.bytes_removed == 5700
+    assert (root.size, docs.size, sub.size) == (140, 100, 0)
+    assert docs.children == [a, sub] and sub.children == []
+    assert b.parent is None and c.parent is None
+    assert result.category_deltas == {"Media": -5700}
+    assert result.affected_ids == {id(root), id(docs), id(sub)}
+    assert result.is_removed(b) and result.is_removed(c) and not result.is_removed(a)
+
+
+def test_nodes_under_a_removed_folder_are_counted_once():
+    root, docs, a, b, sub, c, other = _tree()
+    result = remove_nodes([c, docs, a])
+    assert result.removed == [docs]
+    assert result.bytes_removed == 5800
+    assert root.size == 40 and root.children == [other]
+    assert {id(n) for n in (docs, a, b, sub, c)} == result.removed_ids
+    assert result.category_deltas == {"Documents": -100, "Media": -5700}
+    assert result.affected_ids == {id(root)}
+
+
+def test_same_named_siblings_are_told_apart():
+    root = make_node("root", is_dir=True)
+    first = make_node("dup", 10, parent=root)
+    second = make_node("dup", 10, parent=root)
+    third = make_node("dup", 10, parent=root)
+    remove_nodes([second])
+    assert root.children == [first, third]
+    assert root.size == 20
+
+
+def test_detach_removes_a_single_node():
+    root, docs, a, b, sub, c, other = _tree()
+    result = other.detach()
+    assert result.removed == [other]
+    assert root.children == [docs] and root.size == 5800
+
+
+def test_suggestions_and_duplicates_are_pruned():
+    root, docs, a, b, sub, c, other = _tree()
+    copy = make_node("copy.mp4", 5000, parent=root, category="Media")
+    result = remove_nodes([b])
+    assert result.prune_suggestions({"Large": [b, c], "Old": [a]}) == {"Large": [c], "Old": [a]}
+    assert result.prune_duplicates([[b, copy], [a, c, other]]) == [[a, c, other]]
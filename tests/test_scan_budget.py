@@ -0,0 +1,95 @@
+import os
+import pytest
+from conftest import build_tree
+from src.analyzer import Analyzer
+from src.scan_engine import Scanner, ScanBudget, AggregateNode, is_aggregate, parse_size
+
+
+def _layout(width=3, depth=3):
+    if depth == 0:
+        return {f"f{i}.{ext}": 50 * i + 1 for i in range(12) for ext in ("txt", "log")}
+    layout = {f"d{i}": _layout(width, depth - 1) for i in range(width)}
+    layout.update({"big.mp4": 20000, "tiny.log": 3})
+    return layout
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), _layout())
+    return str(root)
+
+
+def _walk(node):
+    yield node
+    for child in node.children:
+        yield from _walk(child)
+
+
+def _totals(root):
+    # Files (aggregates by their count) and bytes per category
+    files, per_category = 0, {}
+    for node in _walk(root):
+        if not node.is_dir:
+            files += node.count if is_aggregate(node) else 1
+            per_category[node.category] = per_category.get(node.category, 0) + node.size
+    return files, per_category
+
+
+def _folder_sizes(root):
+    return {node.path: node.size for node in _walk(root) if node.is_dir}
+
+
+def test_small_files_are_folded_per_category(tree):
+    exact = Scanner(tree).scan()
+    budgeted = Scanner(tree, budget=ScanBudget(small_file_size=200)).scan()
+    assert _totals(budgeted) == _totals(exact)
+    assert _folder_sizes(budgeted) == _folder_sizes(exact)
+    leaf = os.path.join(tree, "d0", "d0", "d0")
+    folder = next(n for n in _walk(budgeted) if n.path == leaf)
+    aggregates = {n.category: n for n in folder.children if isinstance(n, AggregateNode)}
+    assert set(aggregates) == {"Unknown", "Cache"}
+    assert aggregates["Cache"].count == 4 and aggregates["Cache"].name == "[Small Cache files]"
+    assert all(n.size >= 200 for n in folder.children if not is_aggregate(n))
+
+
+def test_only_the_largest_files_of_a_folder_are_kept(tree):
+    scanner = Scanner(tree, budget=ScanBudget(max_files_per_dir=3))
+    root = scanner.scan()
+    leaf = next(n for n in _walk(root) if n.path == os.path.join(tree, "d1", "d2", "d0"))
+    kept = sorted(n.size for n in leaf.children if not is_aggregate(n))
+    assert kept == [501, 551, 551]
+    assert _totals(root) == _totals(Scanner(tree).scan())
+    assert scanner.nodes == sum(1 for _ in _walk(root))
+
+
+def test_memory_budget_compacts_the_tree(tree):
+    exact = Scanner(tree).scan()
+    scanner = Scanner(tree, budget=ScanBudget(max_memory=100 * Scanner.NODE_BYTES))
+    root = scanner.scan()
+    assert scanner.pressure > 0
+    assert scanner.nodes == sum(1 for _ in _walk(root)) <= 100
+    assert root.size == exact.size
+    assert _totals(root) == _totals(exact)
+    # Whatever folders survive keep their exact size
+    sizes = _folder_sizes(exact)
+    assert all(sizes[path] == size for path, size in _folder_sizes(root).items())
+
+
+def test_aggregates_are_left_out_of_duplicates_and_suggestions(tree):
+    root = Scanner(tree, budget=ScanBudget(small_file_size=10 ** 6)).scan()
+    suggestions, duplicates = Analyzer().analyze(root)
+    assert duplicates == []
+    assert not any(is_aggregate(n) for nodes in suggestions.values() for n in nodes)
+
+
+def test_budget_from_environment(monkeypatch):
+    for name in ("STORAGE_BOT_MEMORY_BUDGET", "STORAGE_BOT_SMALL_FILE_SIZE", "STORAGE_BOT_MAX_FILES_PER_DIR",
+                 "STORAGE_BOT_SPILL_THRESHOLD"):
+        monkeypatch.delenv(name, raising=False)
+    assert ScanBudget.from_env() is None
+    monkeypatch.setenv("STORAGE_BOT_MEMORY_BUDGET", "512M")
+    monkeypatch.setenv("STORAGE_BOT_SMALL_FILE_SIZE", "64k")
+    assert ScanBudget.from_env() == ScanBudget(small_file_size=64 * 1024, max_memory=512 * 1024 ** 2)
+    assert parse_size("1.5G") == 3 * 1024 ** 3 // 2 and parse_size("100") == 100
@@ -0,0 +1,230 @@
+import json
+import os
+import socket
+import threading
+import time
+import pytest
+from conftest import build_tree
+from src.scan_daemon import DaemonClient, DaemonError, RemoteTree, PROTOCOL_VERSION, serve
+
+LAYOUT = {
+    "many": {f"f{i:02}.txt": 100 * (i + 1) for i in range(12)},
+    "media": {"clip.mp4": 50000, "song.mp3": 8000, "nested": {"clip_old.mp4": 30000}},
+    "notes.md": 700,
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), LAYOUT)
+    return str(root)
+
+
+def _start(path, **options):
+    thread = threading.Thread(target=serve, args=(path,), daemon=True,
+                              kwargs={"record_history": False, "refresh_interval": 3600, **options})
+    thread.start()
+    deadline = time.monotonic() + 5
+    probe = DaemonClient(path, timeout=1)
+    while True:
+        try:
+            probe.call("ping")
+            break
+        except OSError:
+            assert time.monotonic() < deadline, "daemon didn't start"
+            time.sleep(0.01)
+    probe.close()
+    return thread
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "d.sock")
+
+
+@pytest.fixture
+def client(socket_path):
+    thread = _start(socket_path)
+    client = DaemonClient(socket_path, timeout=5)
+    yield client
+    client.call("shutdown")
+    thread.join(5)
+    client.close()
+    assert not thread.is_alive()
+    assert not os.path.exists(socket_path)
+
+
+def _scanned(client, root):
+    status = client.call("scan", root=root)
+    deadline = time.monotonic() + 10
+    while status["state"] == "scanning":
+        assert time.monotonic() < deadline, "scan didn't finish"
+        time.sleep(0.01)
+        status = client.call("status", root=root)
+    assert status["state"] == "ready", status["error"]
+    return status
+
+
+def test_protocol(client, socket_path):
+    assert client.call("ping")["version"] == PROTOCOL_VERSION
+    with pytest.raises(DaemonError, match="unknown op"):
+        client.call("frobnicate")
+    with pytest.raises(DaemonError, match="not scanned"):
+        client.call("status", root="/nowhere")
+    with pytest.raises(DaemonError):
+        client.call("ping", bogus=1) # Unexpected parameters are reported, not fatal
+
+    # One JSON object per line, several requests over one connection
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(socket_path)
+        stream = sock.makefile("rwb")
+        stream.write(b'{"op": "ping"}\nnot json\n{"op": "trees"}\n')
+        stream.flush()
+        replies = [json.loads(stream.readline()) for _ in range(3)]
+    assert replies[0]["ok"] and replies[0]["result"]["version"] == PROTOCOL_VERSION
+    assert not replies[1]["ok"] and replies[1]["error"]
+    assert replies[2] == {"ok": True, "result": []}
+
+
+def test_children_pages_and_totals(client, tree):
+    status = _scanned(client, tree)
+    assert status["size"] == sum(100 * (i + 1) for i in range(12)) + 50000 + 8000 + 30000 + 700
+
+    many = os.path.join(tree, "many")
+    first = client.call("children", root=tree, path=many, offset=0, limit=5)
+    rest = client.call("children", root=tree, path=many, offset=5, limit=100)
+    assert first["total"] == rest["total"] == 12
+    assert first["size"] == sum(100 * (i + 1) for i in range(12))
+    sizes = [item["size"] for item in first["items"] + rest["items"]]
+    assert sizes == sorted((100 * (i + 1) for i in range(12)), reverse=True)
+    assert client.call("children", root=tree, path=many, offset=50, limit=5) == {
+        "total": 12, "size": first["size"], "items": []}
+
+    root_children = client.call("children", root=tree)
+    assert [item["name"] for item in root_children["items"]] == ["media", "many", "notes.md"]
+    with pytest.raises(DaemonError, match="no such path"):
+        client.call("children", root=tree, path=os.path.join(tree, "missing"))
+
+
+def test_top_pages(client, tree):
+    _scanned(client, tree)
+    files = client.call("top", root=tree, kind="files", offset=0, limit=2)
+    assert files["total"] == 16
+    assert [item["name"] for item in files["items"]] == ["clip.mp4", "clip_old.mp4"]
+    more = client.call("top", root=tree, kind="files", offset=2, limit=2)
+    assert [item["name"] for item in more["items"]] == ["song.mp3", "f11.txt"]
+
+    folders = client.call("top", root=tree, kind="folders", limit=10)
+    assert [item["name"] for item in folders["items"]] == ["media", "nested", "many"]
+    with pytest.raises(DaemonError, match="unknown kind"):
+        client.call("top", root=tree, kind="links")
+
+
+def test_search_pages_and_totals(client, tree):
+    _scanned(client, tree)
+    page = client.call("search", root=tree, query="f0", limit=4)
+    assert page["total"] == 10
+    assert len(page["items"]) == 4
+    rest = client.call("search", root=tree, query="f0", offset=4, limit=50)
+    assert rest["total"] == 10
+    names = {item["name"] for item in page["items"] + rest["items"]}
+    assert names == {f"f{i:02}.txt" for i in range(10)}
+    assert client.call("search", root=tree, query="nothing like it") == {"total": 0, "items": []}
+
+
+def test_refresh_relists_only_changed_folders(client, tree):
+    _scanned(client, tree)
+    nested = os.path.join(tree, "media", "nested")
+    before = client.call("node", root=tree, path=nested)
+    with open(os.path.join(tree, "many", "added.txt"), "wb") as f:
+        f.write(b"x" * 5000)
+    build_tree(os.path.join(tree, "media"), {"new": {"a.mp4": 4000, "b.mp4": 1000}})
+    os.utime(os.path.join(tree, "media"), None) # build_tree backdates the folder it was given
+
+    result = client.call("refresh", root=tree)
+    assert result["changed"] == 2
+    assert result["size"] == before["size"] + 5000 + 5000 + 88000 + sum(100 * (i + 1) for i in range(12)) + 700 - 30000
+    assert client.call("node", root=tree, path=os.path.join(tree, "media", "new"))["size"] == 5000
+    assert client.call("node", root=tree, path=nested) == before
+    assert client.call("search", root=tree, query="added")["total"] == 1
+    assert client.call("categories", root=tree)["Media"] == 50000 + 8000 + 30000 + 5000
+    assert client.call("refresh", root=tree)["changed"] == 0
+
+
+def test_refresh_keeps_the_scan_budget(monkeypatch, socket_path, tree):
+    monkeypatch.setenv("STORAGE_BOT_SMALL_FILE_SIZE", "1000")
+    thread = _start(socket_path)
+    client = DaemonClient(socket_path, timeout=5)
+    try:
+        _scanned(client, tree)
+        many = os.path.join(tree, "many")
+        folded = client.call("children", root=tree, path=many)
+        assert folded["total"] == 4 # f09-f11 and one aggregate for the rest
+        build_tree(many, {"tiny.txt": 10, "large.txt": 5000})
+        os.utime(many, None)
+        build_tree(tree, {"fresh": {"small.txt": 20, "small2.txt": 30}})
+        os.utime(tree, None)
+
+        assert client.call("refresh", root=tree)["changed"] == 2
+        refolded = client.call("children", root=tree, path=many)
+        assert refolded["total"] == 5
+        assert refolded["size"] == folded["size"] + 5010
+        sizes = {item["name"]: item["size"] for item in refolded["items"]}
+        assert sizes["large.txt"] == 5000 and "tiny.txt" not in sizes
+        assert sizes["[Small Unknown files]"] == sum(100 * (i + 1) for i in range(9)) + 10
+        fresh = client.call("children", root=tree, path=os.path.join(tree, "fresh"))
+        assert [item["name"] for item in fresh["items"]] == ["[Small Unknown files]"]
+    finally:
+        client.call("shutdown")
+        thread.join(5)
+        client.close()
+
+
+def test_stale_socket_is_replaced(socket_path, tree):
+    # A socket file nobody listens on, as left by a daemon that was killed
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    assert os.path.exists(socket_path)
+
+    thread = _start(socket_path)
+    client = DaemonClient(socket_path, timeout=5)
+    try:
+        assert client.call("ping")["trees"] == 0
+        with pytest.raises(DaemonError, match="already listening"):
+            serve(socket_path, record_history=False)
+        assert client.call("ping")["version"] == PROTOCOL_VERSION # The running daemon is untouched
+    finally:
+        client.call("shutdown")
+        thread.join(5)
+        client.close()
+
+
+def test_remote_tree_pages_replace_their_placeholder(client, tree):
+    _scanned(client, tree)
+    remote = RemoteTree(client, tree, page_size=5)
+    many = next(c for c in (remote.ensure_children(remote.root) or remote.root.children) if c.name == "many")
+    assert remote.needs_page(many)
+
+    remote.load_more(many)
+    placeholders = [c for c in many.children if remote.is_more(c)]
+    assert len(many.children) == 6 and len(placeholders) == 1
+    placeholder = placeholders[0]
+    assert placeholder.name.startswith("7 more items")
+    assert remote.more_parent(placeholder) is many
+    assert sum(c.size for c in many.children) == many.size
+
+    offset, page = remote.fetch_page(many)
+    remote.load_more(many) # Loaded meanwhile, so the page fetched above is stale
+    remote.add_page(many, offset, page)
+    assert len(many.children) == 11
+    assert not remote.is_more(placeholder)
+    assert [c.name for c in many.children if remote.is_more(c)] == ["2 more items (click to load)"]
+
+    remote.load_more(many)
+    assert len(many.children) == 12 and not any(remote.is_more(c) for c in many.children)
+    assert not remote.more
+    assert sorted(c.name for c in many.children) == sorted(f"f{i:02}.txt" for i in range(12))
@@ -0,0 +1,88 @@
+import random
+import pytest
+from conftest import make_node
+from src.scan_engine import remove_nodes
+from src.search_index import NameIndex
+
+WORDS = ["report", "photo", "backup", "node_modules", "cache", "Invoice", "readme", "a", "ab", "x-ray", "data"]
+
+
+def _random_tree(seed=5, count=600):
+    rng = random.Random(seed)
+    root = make_node("root", is_dir=True)
+    folders = [root]
+    for i in range(count):
+        name = f"{rng.choice(WORDS)}{rng.choice(['', '_', '.', ' '])}{rng.choice(WORDS)}{rng.randint(0, 40)}"
+        if rng.random() < 0.15:
+            folders.append(make_node(name, parent=rng.choice(folders), is_dir=True))
+        else:
+            make_node(name + rng.choice([".txt", ".jpg", ""]), rng.randint(1, 10 ** 6), parent=rng.choice(folders))
+    return root
+
+
+def _all_nodes(root):
+    stack, nodes = [root], []
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children)
+    return nodes
+
+
+def _queries(nodes, rng):
+    queries = ["a", "ab", "zz", "q", "report", "PHOTO", "e_c", "modules", "nothing-here", ".jp", "x-r"]
+    for node in rng.sample(nodes, 40):
+        name = node.name.lower()
+        start = rng.randrange(len(name))
+        queries.append(name[start:start + rng.randint(1, 6)])
+    return queries
+
+
+@pytest.mark.parametrize("max_memory", [256 * 1024 * 1024, 0])
+def test_search_and_count_match_a_brute_force_scan(max_memory):
+    root = _random_tree()
+    nodes = _all_nodes(root)
+    index = NameIndex(root, max_memory=max_memory)
+    if max_memory == 0:
+        assert not index.postings # Every trigram dropped: every query scans the blob
+    for query in _queries(nodes, random.Random(1)):
+        expected = {id(n) for n in nodes if query.strip().lower() in n.name.lower()}
+        found = index.search(query, limit=10 ** 6, scan_budget=10 ** 6)
+        assert {id(n) for n in found} == expected, query
+        assert len(found) == len(expected)
+        assert index.count(query) == len(expected)
+
+
+def test_results_rank_exact_prefix_word_start_then_substring():
+    root = make_node("root", is_dir=True)
+    substring = make_node("mycache", 9000, parent=root)
+    word_start = make_node("old-cache", 5000, parent=root)
+    prefix = make_node("cache.db", 100, parent=root)
+    exact = make_node("Cache", 10, parent=root, is_dir=True)
+    index = NameIndex(root)
+    assert index.search("cache") == [exact, prefix, word_start, substring]
+    assert index.search("cache", limit=2) == [exact, prefix]
+
+
+def test_same_names_are_ordered_by_size():
+    root = make_node("root", is_dir=True)
+    small = make_node("notes.txt", 10, parent=make_node("a", parent=root, is_dir=True))
+    large = make_node("notes.txt", 99, parent=make_node("b", parent=root, is_dir=True))
+    assert NameIndex(root).search("notes") == [large, small]
+
+
+def test_removed_nodes_are_hidden_from_search_and_count():
+    root = _random_tree(seed=9, count=200)
+    index = NameIndex(root)
+    victims = [n for n in index.search("report", limit=10 ** 6) if not n.is_dir][:5]
+    assert len(victims) == 5
+    before = index.count("report")
+    index.apply_removal(remove_nodes(victims))
+    assert index.count("report") == before - len(victims)
+    assert not {id(n) for n in victims} & {id(n) for n in index.search("report", limit=10 ** 6)}
+
+
+def test_blank_and_multiline_queries_match_nothing():
+    index = NameIndex(_random_tree(count=50))
+    assert index.search("   ") == [] and index.count("") == 0
+    assert index.search("a\nb") == [] and index.count("a\nb") == 0
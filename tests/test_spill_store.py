@@ -0,0 +1,98 @@
+import os
+import pytest
+from conftest import build_tree, signature
+from src.scan_engine import MultiScanner, Scanner, ScanBudget, remove_nodes
+from src.spill_store import SpilledNode, iter_children
+
+LAYOUT = {f"d{i}": {f"e{j}": {f"f{k}.txt": 10 * i + j + k + 1 for k in range(6)} for j in range(4)} for i in range(5)}
+LAYOUT["top.bin"] = 999
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    build_tree(str(root), LAYOUT)
+    return str(root)
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "spill"
+    monkeypatch.setenv("STORAGE_BOT_SPILL_DIR", str(directory))
+    return directory
+
+
+def _spilling_scanner(path):
+    return Scanner(path, budget=ScanBudget(spill_threshold=20 * Scanner.NODE_BYTES))
+
+
+def test_spilled_tree_reads_back_identical(tree, spill_dir):
+    scanner = _spilling_scanner(tree)
+    root = scanner.scan()
+    assert scanner.spilled and scanner.spill_store.records > 0
+    assert spill_dir.is_dir()
+    stubs = [c for c in root.children if isinstance(c, SpilledNode)]
+    assert stubs and not any(stub.loaded for stub in stubs)
+    assert signature(root) == signature(Scanner(tree).scan())
+    # Peeking doesn't keep the children; browsing does
+    assert not any(stub.loaded for stub in stubs)
+    assert stubs[0].children is stubs[0].children and stubs[0].loaded
+    assert [c.name for c in iter_children(stubs[1])] == [c.name for c in stubs[1].peek_children()]
+
+
+def test_spilled_flag(tree, spill_dir):
+    plain = Scanner(tree)
+    plain.scan()
+    assert not plain.spilled
+    roomy = Scanner(tree, budget=ScanBudget(spill_threshold=10 ** 9))
+    roomy.scan()
+    assert not roomy.spilled
+    multi = MultiScanner([os.path.join(tree, "d0"), os.path.join(tree, "d1")],
+                         budget=ScanBudget(spill_threshold=20 * Scanner.NODE_BYTES))
+    multi.scan()
+    assert multi.spilled
+
+
+def test_nodes_read_without_keeping_them_are_removed_from_the_tree(tree, spill_dir):
+    root = _spilling_scanner(tree).scan()
+    stub = next(c for c in root.children if isinstance(c, SpilledNode))
+    # Two levels below a stub, as an analysis would have read them
+    copies = stub.peek_children()[0].peek_children()[:2]
+    size = sum(c.size for c in copies)
+    before = root.size, stub.size
+    result = remove_nodes(copies)
+    assert result.bytes_removed == size
+    assert all(result.is_removed(c) for c in copies)
+    assert (root.size, stub.size) == (before[0] - size, before[1] - size)
+    folder = stub.children[0]
+    assert folder.size == sum(c.size for c in folder.children)
+    assert not {c.name for c in copies} & {c.name for c in folder.children}
+    assert result.removed[0].parent is None and result.removed[0] not in copies
+
+
+def test_nodes_of_a_loaded_folder_are_removed_by_identity(tree, spill_dir):
+    root = _spilling_scanner(tree).scan()
+    stub = next(c for c in root.children if isinstance(c, SpilledNode))
+    folder = stub.children[-1]
+    files = folder.children[1:3]
+    before = root.size
+    result = remove_nodes(files)
+    assert result.removed == files
+    assert root.size == before - sum(f.size for f in files)
+    assert len(folder.children) == 4 and not {f.name for f in files} & {c.name for c in folder.children}
+
+
+def test_separate_removals_from_one_peek_list(tree, spill_dir):
+    root = _spilling_scanner(tree).scan()
+    stub = next(c for c in root.children if isinstance(c, SpilledNode))
+    # Read once, as an analysis pass does, then deleted one at a time
+    folder = stub.peek_children()[0]
+    files = folder.peek_children()
+    remove_nodes([files[0]])
+    remove_nodes([files[1]])
+    real = next(c for c in stub.children if c.name == folder.name)
+    assert {c.name for c in real.children} == {f.name for f in files[2:]}
+    assert real.size == sum(c.size for c in real.children)
+    assert stub.size == sum(c.size for c in stub.children)
+    assert root.size == sum(c.size for c in root.children)
@@ -0,0 +1,55 @@
+import os
+import pytest
+from benchmarks.synthetic_fs import HEADER_SIZE, TreeSpec, generate_tree
+
+SPEC = TreeSpec(width=2, depth=2, files_per_dir=6, mean_file_size=4096, max_file_size=64 * 1024,
+                duplicate_ratio=0.3, deep_chain=3, seed=7)
+
+
+def _layout(root):
+    """
+    Every folder and file under `root`, with the sizes, mtimes and header
+    bytes of the files. Folder mtimes are left out: writing files sets them.
+    """
+    layout = {}
+    for folder, dirs, files in os.walk(root):
+        rel = os.path.relpath(folder, root)
+        layout[rel] = "dir"
+        for name in files:
+            path = os.path.join(folder, name)
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            layout[os.path.join(rel, name)] = (st.st_size, st.st_mtime, header)
+    return layout
+
+
+def _generate(base, spec):
+    os.mkdir(base)
+    return generate_tree(str(base), spec), _layout(str(base))
+
+
+def test_same_spec_generates_the_same_tree(tmp_path):
+    stats, layout = _generate(tmp_path / "a", SPEC)
+    again, layout_again = _generate(tmp_path / "b", SPEC)
+    assert stats == again
+    assert layout == layout_again
+
+    assert stats["dirs"] == SPEC.expected_dirs() == sum(1 for v in layout.values() if v == "dir")
+    assert stats["files"] == SPEC.expected_files() == sum(1 for v in layout.values() if v != "dir")
+    assert stats["bytes"] == sum(v[0] for v in layout.values() if v != "dir")
+    assert stats["duplicates"] > 0
+
+
+def test_another_seed_generates_another_tree(tmp_path):
+    stats, layout = _generate(tmp_path / "a", SPEC)
+    other, other_layout = _generate(tmp_path / "b", TreeSpec(**{**SPEC.to_dict(), "seed": 8}))
+    # Same shape, different contents
+    assert (stats["dirs"], stats["files"]) == (other["dirs"], other["files"])
+    assert layout != other_layout
+
+
+def test_unknown_size_distribution_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="size distribution"):
+        generate_tree(str(tmp_path), TreeSpec(width=1, depth=0, files_per_dir=1, size_distribution="bimodal",
+                                              duplicate_ratio=0))
@@ -0,0 +1,131 @@
+import threading
+import pytest
+from conftest import signature
+from src import throttle as throttle_module
+from src.metrics import JobMetrics
+from src.scan_engine import Scanner
+from src.throttle import Throttle, ThrottleConfig
+
+
+class FakeClock:
+    """
+    Stands in for the time module: sleeping only moves the clock forward.
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle_module, "time", clock)
+    return clock
+
+
+def test_op_cap_paces_calls(clock):
+    throttle = Throttle(ThrottleConfig(max_ops=100, low_priority=False, adaptive=False))
+    for _ in range(100):
+        throttle.op()
+    # A BURST worth of calls goes through at once, the rest at 100 per second
+    assert clock.now - 1000.0 == pytest.approx(1.0 - Throttle.BURST, abs=0.02)
+    assert throttle.ops == 100 and throttle.slept == pytest.approx(clock.now - 1000.0)
+
+
+def test_read_cap_paces_bytes(clock):
+    throttle = Throttle(ThrottleConfig(max_read_bytes=1024 * 1024, low_priority=False, adaptive=False))
+    for _ in range(64):
+        throttle.read(64 * 1024)
+    assert clock.now - 1000.0 == pytest.approx(4.0 - Throttle.BURST, abs=0.02)
+    assert throttle.bytes == 64 * 64 * 1024
+
+
+def test_uncapped_throttle_never_sleeps(clock):
+    throttle = Throttle(ThrottleConfig(low_priority=False))
+    for _ in range(1000):
+        throttle.op(0.001)
+    assert clock.now == 1000.0 and throttle.slept == 0
+
+
+def _window(throttle, clock, latency, calls=10):
+    # One WINDOW's worth of calls that each took `latency`, then the call that closes it
+    for _ in range(calls):
+        throttle.op(latency)
+    clock.now += Throttle.WINDOW
+    throttle.op(latency)
+
+
+def test_backs_off_while_calls_are_slow_and_recovers(clock):
+    throttle = Throttle(ThrottleConfig(low_priority=False))
+    _window(throttle, clock, 0.002)
+    assert throttle.baseline == pytest.approx(0.002) and throttle.factor == 1.0
+    for expected in (0.5, 0.25, 0.125):
+        _window(throttle, clock, 0.02)
+        assert throttle.factor == expected
+    assert throttle.backoffs == 3 and throttle.min_factor == 0.125
+    for _ in range(20):
+        _window(throttle, clock, 0.02)
+    assert throttle.factor == Throttle.MIN_FACTOR
+    for _ in range(40):
+        _window(throttle, clock, 0.002)
+    assert throttle.factor == 1.0
+
+
+def test_backed_off_calls_rest_in_proportion_to_their_latency(clock):
+    throttle = Throttle(ThrottleConfig(low_priority=False, adaptive=False))
+    throttle.factor = 0.25 # As if it had backed off twice
+    start = clock.now
+    for _ in range(100):
+        throttle.op(0.01)
+    # Each call is followed by three times its latency of rest, less the burst allowance
+    assert clock.now - start == pytest.approx(100 * 0.03 - Throttle.BURST, abs=0.05)
+
+
+def test_calls_answered_from_cache_say_nothing_about_the_disk(clock):
+    throttle = Throttle(ThrottleConfig(low_priority=False))
+    _window(throttle, clock, 0.00001)
+    _window(throttle, clock, 0.0004)
+    assert throttle.factor == 1.0 and throttle.backoffs == 0
+
+
+def test_run_lowers_priority_once_per_job():
+    caller = threading.get_ident()
+    plain = Throttle(ThrottleConfig(low_priority=False))
+    assert plain.run(threading.get_ident) == caller
+
+    throttle = Throttle(ThrottleConfig())
+    outer, inner = throttle.run(lambda: (threading.get_ident(), throttle.run(threading.get_ident)))
+    assert outer != caller
+    # Nested runs on a thread that is already lowered don't start another one
+    assert inner == outer
+    with pytest.raises(ZeroDivisionError):
+        throttle.run(lambda: 1 / 0)
+
+
+def test_config_from_environment(monkeypatch):
+    for name in ("STORAGE_BOT_THROTTLE", "STORAGE_BOT_THROTTLE_OPS", "STORAGE_BOT_THROTTLE_READ_RATE",
+                 "STORAGE_BOT_THROTTLE_IDLE_IO"):
+        monkeypatch.delenv(name, raising=False)
+    assert ThrottleConfig.from_env() is None
+    monkeypatch.setenv("STORAGE_BOT_THROTTLE", "1")
+    assert ThrottleConfig.from_env() == ThrottleConfig()
+    monkeypatch.setenv("STORAGE_BOT_THROTTLE", "0")
+    monkeypatch.setenv("STORAGE_BOT_THROTTLE_READ_RATE", "8M")
+    monkeypatch.setenv("STORAGE_BOT_THROTTLE_IDLE_IO", "1")
+    assert ThrottleConfig.from_env() == ThrottleConfig(max_read_bytes=8 * 1024 * 1024, idle_io=True)
+
+
+def test_throttled_scan_builds_the_same_tree(sample_tree):
+    throttle = Throttle(ThrottleConfig(max_ops=100000))
+    metrics = JobMetrics("scan")
+    scanner = Scanner(sample_tree, throttle=throttle, metrics=metrics)
+    assert signature(scanner.scan()) == signature(Scanner(sample_tree).scan())
+    assert throttle.ops > 0
+    assert metrics.counters["throttle_ops"] == throttle.ops and "throttle_min_factor" in metrics.tags
@@ -0,0 +1,65 @@
+import os
+from conftest import build_tree
+from src.scan_engine import Scanner
+from src.tree_diff import diff_trees, to_snapshot, SNAP_NAME, SNAP_CHILDREN
+
+
+def _scan(path):
+    return Scanner(path).scan()
+
+
+def test_unchanged_tree_is_skipped_at_the_root(sample_tree):
+    old = _scan(sample_tree)
+    diff = diff_trees(old, _scan(sample_tree))
+    assert diff.entries == []
+    assert diff.total_delta == 0
+    assert diff.skipped_subtrees == 1
+
+
+def test_reports_added_removed_grown_and_shrunk(sample_tree):
+    old = to_snapshot(_scan(sample_tree))
+    os.remove(os.path.join(sample_tree, "top.zip"))
+    build_tree(os.path.join(sample_tree, "media"), {"new.mkv": 400})
+    with open(os.path.join(sample_tree, "docs", "a.txt"), "ab") as f:
+        f.write(b"y" * 50)
+    with open(os.path.join(sample_tree, "docs", "b.pdf"), "r+b") as f:
+        f.truncate(500)
+    new = _scan(sample_tree)
+
+    diff = diff_trees(old, new)
+    changes = {(e.kind, os.path.relpath(e.path, sample_tree)): e.delta for e in diff.entries}
+    assert changes[("removed", "top.zip")] == -900
+    assert changes[("added", os.path.join("media", "new.mkv"))] == 400
+    assert changes[("grown", os.path.join("docs", "a.txt"))] == 50
+    assert changes[("shrunk", os.path.join("docs", "b.pdf"))] == -1500
+    assert diff.total_delta == new.size - old[1] == -900 + 400 + 50 - 1500
+    # The untouched "empty" and "docs/nested" folders aren't walked
+    assert diff.skipped_subtrees >= 2
+
+
+def test_added_and_removed_folders_are_one_entry_each(sample_tree):
+    old = _scan(sample_tree)
+    build_tree(sample_tree, {"fresh": {"x": 10, "y": 20}})
+    new = _scan(sample_tree)
+    added = diff_trees(old, new).by_kind("added")
+    assert [(os.path.basename(e.path), e.is_dir, e.new_size) for e in added] == [("fresh", True, 30)]
+    removed = diff_trees(new, old).by_kind("removed")
+    assert [(os.path.basename(e.path), e.is_dir, e.old_size) for e in removed] == [("fresh", True, 30)]
+
+
+def test_ranked_orders_by_absolute_delta(sample_tree):
+    old = _scan(sample_tree)
+    os.remove(os.path.join(sample_tree, "media", "clip.mp4"))
+    build_tree(sample_tree, {"grow.bin": 3000})
+    diff = diff_trees(old, _scan(sample_tree))
+    ranked = diff.ranked(files_only=True)
+    assert [os.path.basename(e.path) for e in ranked] == ["clip.mp4", "grow.bin"]
+    assert [os.path.basename(e.path) for e in diff.ranked(limit=1, files_only=True)] == ["clip.mp4"]
+    assert all(e.kind == "added" for e in diff.ranked(kind="added"))
+
+
+def test_snapshot_keeps_the_full_root_path(sample_tree):
+    snapshot = to_snapshot(_scan(sample_tree))
+    assert snapshot[SNAP_NAME] == sample_tree
+    names = sorted(child[SNAP_NAME] for child in snapshot[SNAP_CHILDREN])
+    assert names == ["docs", "empty", "media", "top.zip"]
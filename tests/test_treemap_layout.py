@@ -0,0 +1,135 @@
+import random
+import pytest
+from conftest import make_node
+from src.scan_engine import remove_nodes
+from src.treemap_layout import squarify, layout_tree, LayoutCache, SpatialIndex
+
+
+def _area(rect):
+    return rect[2] * rect[3]
+
+
+def _overlap(a, b):
+    return (min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]) > 1e-9 and
+            min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]) > 1e-9)
+
+
+@pytest.mark.parametrize("w,h", [(400, 300), (120, 900), (50, 50)])
+def test_squarify_areas_are_proportional_and_tile_the_rectangle(w, h):
+    sizes = sorted((random.Random(7).randint(1, 1000) for _ in range(40)), reverse=True)
+    rects = squarify(sizes, 10, 20, w, h)
+    assert len(rects) == len(sizes)
+    scale = w * h / sum(sizes)
+    for size, rect in zip(sizes, rects):
+        assert _area(rect) == pytest.approx(size * scale)
+        x, y, rw, rh = rect
+        assert x >= 10 - 1e-6 and y >= 20 - 1e-6
+        assert x + rw <= 10 + w + 1e-6 and y + rh <= 20 + h + 1e-6
+    assert not any(_overlap(a, b) for i, a in enumerate(rects) for b in rects[i + 1:])
+
+
+def test_squarify_keeps_blocks_roughly_square():
+    rects = squarify([1] * 16, 0, 0, 100, 100)
+    assert all(max(w / h, h / w) < 2 for _, _, w, h in rects)
+
+
+def test_squarify_of_an_empty_area_is_degenerate():
+    assert squarify([3, 2, 1], 5, 5, 0, 100) == [(5, 5, 0.0, 0.0)] * 3
+
+
+def _tree(files):
+    root = make_node("root", is_dir=True)
+    folder = make_node("folder", parent=root, is_dir=True)
+    for i, size in enumerate(files):
+        make_node(f"f{i}", size, parent=folder)
+    make_node("big", 10000, parent=root)
+    return root
+
+
+def test_leaves_cover_the_root_once():
+    root = _tree([500, 300, 200, 100])
+    rects = layout_tree(root, 0, 0, 200, 100)
+    assert rects[0].node is root and not rects[0].is_leaf
+    leaves = [r for r in rects if r.is_leaf]
+    assert sum(r.w * r.h for r in leaves) == pytest.approx(200 * 100)
+    assert {r.node.name for r in leaves} == {"big", "f0", "f1", "f2", "f3"}
+
+
+def test_tiny_children_become_one_aggregate_block():
+    root = _tree([3000] + [1] * 500)
+    rects = layout_tree(root, 0, 0, 200, 100, min_area=36.0)
+    aggregates = [r for r in rects if r.is_aggregate]
+    assert len(aggregates) == 1
+    assert aggregates[0].count == 500 and aggregates[0].node.name == "folder"
+    # Only what can be seen is laid out
+    assert len(rects) < 10
+
+
+def test_depth_limit_draws_deep_folders_as_one_block():
+    root = _tree([500, 300])
+    rects = layout_tree(root, 0, 0, 200, 100, max_depth=1)
+    folder = next(r for r in rects if r.node.name == "folder")
+    assert folder.is_leaf
+    assert not any(r.node.name.startswith("f") and r.node.name != "folder" for r in rects)
+
+
+def test_spatial_index_agrees_with_a_linear_search():
+    rng = random.Random(3)
+    root = _tree([rng.randint(50, 5000) for _ in range(60)])
+    rects = layout_tree(root, 0, 0, 640, 480, min_area=1.0)
+    index = SpatialIndex(rects, cell_size=32.0)
+    leaves = [r for r in rects if r.is_leaf]
+    for _ in range(2000):
+        px, py = rng.uniform(0, 640), rng.uniform(0, 480)
+        expected = next((r for r in leaves if r.contains(px, py)), None)
+        assert index.hit(px, py) is expected
+    assert index.hit(-5, 10) is None
+
+
+def test_layout_cache_hits_until_the_tree_changes():
+    root = _tree([500, 300, 200, 100])
+    folder = next(c for c in root.children if c.name == "folder")
+    cache = LayoutCache()
+    rects = cache.compute(root, 200, 100, max_depth=4, min_area=1.0)
+    cache.compute(folder, 50, 50, max_depth=4, min_area=1.0)
+
+    hit = cache.lookup(root, 200, 100, 4, 1.0, exact=True)
+    assert [(r.x, r.y, r.w, r.h, r.node) for r in hit] == [(r.x, r.y, r.w, r.h, r.node) for r in rects]
+    rescaled = cache.lookup(root, 220, 110, 4, 1.0)
+    assert rescaled is not None and rescaled[0].w == pytest.approx(220)
+    assert cache.lookup(root, 200, 100, 3, 1.0) is None # Different depth, different entry
+
+    generation = cache.generation
+    cache.invalidate(remove_nodes([folder.children[0]]))
+    assert cache.generation == generation + 1
+    assert cache.lookup(root, 200, 100, 4, 1.0) is None
+    assert cache.lookup(folder, 50, 50, 4, 1.0) is None # The removed file's folder changed too
+    recomputed = cache.compute(root, 200, 100, max_depth=4, min_area=1.0)
+    assert "f0" not in {r.node.name for r in recomputed}
+    assert cache.lookup(root, 200, 100, 4, 1.0, exact=True) is not None
+
+
+def test_layout_cache_keeps_untouched_subtrees():
+    root = _tree([500, 300])
+    folder = next(c for c in root.children if c.name == "folder")
+    big = next(c for c in root.children if c.name == "big")
+    cache = LayoutCache()
+    cache.compute(folder, 80, 60, max_depth=4, min_area=1.0)
+    cache.invalidate(remove_nodes([big]))
+    assert cache.lookup(folder, 80, 60, 4, 1.0, exact=True) is not None
+
+
+def test_layout_cache_drops_layouts_computed_before_an_invalidate():
+    root = _tree([500, 300, 200])
+    folder = next(c for c in root.children if c.name == "folder")
+    cache = LayoutCache()
+    # A worker starts laying out the tree as of this generation...
+    generation = cache.generation
+    rects = layout_tree(root, 0, 0, 200, 100, children_of=cache.sorted_children)
+    # ...and the GUI thread deletes a file before the result is stored
+    cache.invalidate(remove_nodes([folder.children[0]]))
+    cache.store(root, 200, 100, 4, 1.0, rects, generation=generation)
+    assert cache.lookup(root, 200, 100, 4, 1.0) is None
+
+    cache.store(root, 200, 100, 4, 1.0, layout_tree(root, 0, 0, 200, 100), generation=cache.generation)
+    assert cache.lookup(root, 200, 100, 4, 1.0) is not None